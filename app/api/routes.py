@@ -1,14 +1,59 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks, Path
-from fastapi.responses import JSONResponse, FileResponse, HTMLResponse, PlainTextResponse
-from typing import List, Optional, Dict, Any
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks, Path, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import (
+    JSONResponse,
+    FileResponse,
+    HTMLResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
+from starlette.background import BackgroundTask
+from typing import List, Optional, Dict, Any, Callable, Iterator, Tuple
 import os
+import shutil
+import asyncio
 import uuid
+import tempfile
 from datetime import datetime
 import simplejson as json
 
-from app.services.document_service import process_document, get_document_info, save_document_result
-from app.core.config import UPLOAD_DIR, RESULTS_DIR
+from app.services.document_service import (
+    process_document,
+    stream_document,
+    inspect_document,
+    get_document_info,
+    get_document_words,
+    load_document_content,
+    render_document_format,
+)
+from app.core.config import (
+    UPLOAD_DIR,
+    RESULTS_DIR,
+    JOB_TIMEOUT_SECONDS,
+    CANCEL_POLL_INTERVAL,
+    BATCH_MAX_WORKERS,
+    THUMBNAIL_DEFAULT_WIDTH,
+    THUMBNAIL_MAX_AGE,
+)
+from pdf2image.exceptions import PDFPopplerTimeoutError
+from app.core.cancellation import CancelToken, ProcessingCancelled, ProcessingTimeout
+from app.core.admission import AdmissionLease, AdmissionRejected, admission_controller
+from app.services.batch_service import (
+    is_archive,
+    is_batch_document,
+    iter_archive_members,
+    process_batch,
+    spool,
+)
 from app.core.version import get_version_info
+from app.core.pdf_text import OCR_MODES, PDF_TEXT_ENGINES
+from app.core.page_ranges import parse_page_ranges
+from app.services.image_service import build_render_options
+from app.services.ocr_cache import get_ocr_cache
+from app.services.ocr_words import words_directory
+from app.services.thumbnail_service import get_thumbnail, thumbnail_etag, validate_width
+from app.services.worker_pool import start_job, start_stream_job
 
 router = APIRouter()
 
@@ -18,6 +63,7 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 @router.post("/process")
 async def upload_and_process_document(
+    request: Request,
     file: UploadFile = File(...),
     extract_text: bool = Form(True),
     extract_tables: bool = Form(True),
@@ -25,20 +71,52 @@ async def upload_and_process_document(
     extract_pages_as_images: bool = Form(False),
     apply_ocr: bool = Form(False),
     ocr_lang: str = Form("por"),
+    pdf_text_engine: Optional[str] = Form(None),
+    stream: bool = Form(False),
+    metadata_only: bool = Form(False),
+    pages: Optional[str] = Form(None),
+    dpi: Optional[int] = Form(None),
+    color_mode: Optional[str] = Form(None),
+    image_format: Optional[str] = Form(None),
+    image_quality: Optional[int] = Form(None),
+    save_page_images: bool = Form(True),
+    ocr: Optional[str] = Form(None),
 ):
     """
     Processa um documento enviado pelo usuário.
 
-    - **file**: Arquivo a ser processado (PDF, DOCX, XLSX)
+    - **file**: Arquivo a ser processado (PDF, DOCX, PPTX, XLSX)
     - **extract_text**: Se deve extrair texto do documento
     - **extract_tables**: Se deve extrair tabelas do documento
     - **extract_images**: Se deve extrair imagens incorporadas no documento
     - **extract_pages_as_images**: Se deve converter páginas inteiras em imagens (apenas para PDF)
     - **apply_ocr**: Se deve aplicar OCR nas imagens extraídas
     - **ocr_lang**: Idioma para OCR (por=português, eng=inglês, auto=detecção automática)
+    - **pdf_text_engine**: Motor de extração de texto de PDFs (pypdf2, pdftotext, pypdfium2)
+    - **stream**: Se deve responder em NDJSON, com um registro por página/tabela/imagem
+      enviado assim que fica pronto
+    - **metadata_only**: Se deve retornar apenas os metadados (como /api/inspect), sem
+      processar o conteúdo nem gravar resultados
+    - **pages**: Páginas a processar, como "1-5,10" ou "20-" (apenas para PDF). Texto,
+      rasterização e OCR ficam restritos às páginas selecionadas
+    - **dpi**: Resolução da rasterização das páginas (36 a 600; padrão RENDER_DPI)
+    - **color_mode**: Modo de cor das páginas rasterizadas (rgb, gray ou bilevel)
+    - **image_format**: Formato das páginas rasterizadas (png, jpeg ou webp)
+    - **image_quality**: Qualidade de compressão para jpeg e webp (1 a 100)
+    - **save_page_images**: Se deve manter as páginas rasterizadas. Com OCR e False, as páginas
+      vão do pdftoppm ao Tesseract em formato não comprimido e são removidas após o OCR
+    - **ocr**: "auto" para aplicar OCR apenas às páginas de PDF sem camada de texto
+      aproveitável (poucos caracteres ou caracteres inválidos), substituindo o texto delas
+
+    O processamento é cancelado se o cliente se desconectar e interrompido com status 504
+    ao exceder JOB_TIMEOUT_SECONDS de tempo real ou JOB_CPU_LIMIT_SECONDS de CPU.
+
+    Cada processamento ocupa capacidade proporcional ao seu custo estimado. Com o serviço
+    ocupado, a requisição aguarda em uma fila limitada; com a fila cheia ou a espera esgotada,
+    a resposta é 429 ou 503 com o cabeçalho Retry-After.
     """
     # Verificar tipo de arquivo
-    allowed_extensions = [".pdf", ".docx", ".xlsx"]
+    allowed_extensions = [".pdf", ".docx", ".pptx", ".xlsx"]
     file_ext = os.path.splitext(file.filename)[1].lower()
 
     if file_ext not in allowed_extensions:
@@ -47,6 +125,35 @@ async def upload_and_process_document(
             detail=f"Tipo de arquivo não suportado. Use: {', '.join(allowed_extensions)}",
         )
 
+    # Verificar motor de extração de texto
+    if pdf_text_engine and pdf_text_engine.lower() not in PDF_TEXT_ENGINES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Motor de extração não suportado. Use: {', '.join(PDF_TEXT_ENGINES)}",
+        )
+
+    # Verificar o modo de OCR do texto das páginas
+    if ocr and ocr.lower() not in OCR_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Modo de OCR não suportado. Use: {', '.join(OCR_MODES)}",
+        )
+    ocr_mode = ocr.lower() if ocr else None
+
+    # Verificar a seleção de páginas e as opções de rasterização
+    try:
+        parse_page_ranges(pages)
+        # Sem OCR, as páginas rasterizadas são o próprio resultado e sempre são mantidas
+        render_options = build_render_options(
+            dpi, color_mode, image_format, image_quality, persist=save_page_images or not apply_ocr
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Somente metadados: lidos direto do upload, sem gravar em UPLOAD_DIR ou RESULTS_DIR
+    if metadata_only:
+        return await _inspect_upload(file)
+
     # Gerar nome único para o arquivo
     unique_filename = f"{uuid.uuid4()}{file_ext}"
     file_path = os.path.join(UPLOAD_DIR, unique_filename)
@@ -58,108 +165,53 @@ async def upload_and_process_document(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao salvar arquivo: {str(e)}")
 
-    # Processar documento
+    # Reservar capacidade conforme o custo estimado do documento (a contagem de páginas lê o
+    # arquivo, por isso roda fora do loop de eventos)
+    cost = await run_in_threadpool(
+        admission_controller.estimate_cost,
+        file_path, extract_images, extract_pages_as_images, apply_ocr, pages, ocr_mode,
+    )
+    lease = await _admit(file_path, cost)
+
+    # Modo streaming: cada registro é enviado assim que a unidade correspondente é concluída
+    if stream:
+        try:
+            future, records = await run_in_threadpool(
+                start_stream_job,
+                stream_document,
+                file_path=file_path,
+                original_filename=file.filename,
+                extract_text=extract_text,
+                extract_tables=extract_tables,
+                extract_images=extract_images,
+                extract_pages_as_images=extract_pages_as_images,
+                apply_ocr=apply_ocr,
+                ocr_lang=ocr_lang,
+                pdf_text_engine=pdf_text_engine,
+                pages=pages,
+                render_options=render_options,
+                ocr_mode=ocr_mode,
+            )
+        except BaseException:
+            lease.release()
+            raise
+        # A capacidade é devolvida quando o worker termina; se a resposta terminar antes
+        # (cliente desconectado), o custo fica como débito até lá
+        lease.release_when_done(future)
+        return StreamingResponse(
+            _ndjson_lines(records),
+            media_type="application/x-ndjson",
+            background=BackgroundTask(lease.expire),
+        )
+
+    # Processar documento em um worker do pool de processos, com os limites deste processamento
+    cancel_token = CancelToken(timeout=JOB_TIMEOUT_SECONDS)
     try:
-        # Se for um arquivo XLSX, tratamos de forma especial para evitar problemas com NaN
-        if file_ext == ".xlsx":
-            try:
-                import pandas as pd
-                import numpy as np
-
-                # Criar resultado básico
-                document_id = str(uuid.uuid4())
-                result = {
-                    "id": document_id,
-                    "filename": file.filename,
-                    "status": "success",
-                    "content": {
-                        "text": "",
-                        "markdown": "",
-                        "html": "",
-                        "tables": []
-                    },
-                    "metadata": {
-                        "title": file.filename,
-                        "sheets": []
-                    }
-                }
-
-                # Processar o arquivo XLSX manualmente
-                excel_file = pd.ExcelFile(file_path)
-                sheet_names = excel_file.sheet_names
-                result["metadata"]["sheets"] = sheet_names
-
-                # Extrair tabelas
-                if extract_tables:
-                    tables = []
-                    for sheet_name in sheet_names:
-                        try:
-                            df = pd.read_excel(file_path, sheet_name=sheet_name)
-
-                            # Substituir NaN por None para compatibilidade com JSON
-                            df = df.replace({np.nan: None})
-
-                            # Extrair cabeçalhos e dados
-                            headers = df.columns.tolist()
-                            data = []
-
-                            # Converter cada linha para lista, substituindo NaN por None
-                            for _, row in df.iterrows():
-                                row_data = []
-                                for col in headers:
-                                    val = row[col]
-                                    if pd.isna(val):
-                                        row_data.append(None)
-                                    else:
-                                        row_data.append(val)
-                                data.append(row_data)
-
-                            tables.append({
-                                "page": 1,  # Excel não tem conceito de página
-                                "sheet": sheet_name,
-                                "data": data,
-                                "headers": headers,
-                            })
-                        except Exception as e:
-                            # Em caso de erro, adicionar informação de erro
-                            tables.append({
-                                "page": 1,
-                                "sheet": sheet_name,
-                                "error": str(e),
-                                "headers": [],
-                                "data": []
-                            })
-
-                    result["content"]["tables"] = tables
-
-                # Extrair texto
-                if extract_text:
-                    text = ""
-                    for sheet_name in sheet_names:
-                        try:
-                            df = pd.read_excel(file_path, sheet_name=sheet_name)
-                            # Substituir NaN por strings vazias para exibição de texto
-                            df = df.fillna("")
-                            text += f"Sheet: {sheet_name}\n\n"
-                            text += df.to_string(index=False, na_rep="") + "\n\n"
-                        except Exception as e:
-                            text += f"Sheet: {sheet_name}\n\nErro ao processar: {str(e)}\n\n"
-
-                    result["content"]["text"] = text
-                    result["content"]["markdown"] = text
-                    result["content"]["html"] = f"<pre>{text}</pre>"
-
-                # Salvar resultado no diretório de resultados
-                save_document_result(document_id, result, file_path, file.filename)
-
-                # Usar simplejson para lidar com valores NaN
-                return result
-            except Exception as e:
-                # Se falhar o processamento especial, tentamos o processamento normal
-                print(f"Erro no processamento especial de XLSX: {str(e)}")
-
-        # Processamento normal para outros tipos de arquivo
-        result = process_document(
+        result = await _run_cancellable(
+            request,
+            cancel_token,
+            lease,
+            process_document,
             file_path=file_path,
             original_filename=file.filename,
             extract_text=extract_text,
@@ -168,10 +220,22 @@ async def upload_and_process_document(
             extract_pages_as_images=extract_pages_as_images,
             apply_ocr=apply_ocr,
             ocr_lang=ocr_lang,
+            pdf_text_engine=pdf_text_engine,
+            pages=pages,
+            render_options=render_options,
+            ocr_mode=ocr_mode,
         )
 
         # Não precisamos mais limpar valores NaN, pois simplejson lida com isso automaticamente
         return result
+    except ProcessingCancelled as e:
+        # Remover o arquivo do processamento interrompido
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+        # 499 segue a convenção do nginx para requisições abandonadas pelo cliente
+        status_code = 504 if isinstance(e, ProcessingTimeout) else 499
+        raise HTTPException(status_code=status_code, detail=str(e))
     except Exception as e:
         # Em caso de erro, retornar uma resposta de erro mais amigável
         error_id = str(uuid.uuid4())
@@ -190,28 +254,290 @@ async def upload_and_process_document(
             "status": "error",
             "error": error_message,
             "content": {
-                "text": "",
                 "markdown": "",
-                "html": "",
                 "tables": []
             }
         }
 
 
+@router.post("/inspect")
+async def inspect_uploaded_document(file: UploadFile = File(...)):
+    """
+    Retorna os metadados de um documento sem processá-lo.
+
+    - **file**: Arquivo a ser inspecionado (PDF, DOCX, PPTX, XLSX)
+
+    Apenas as estruturas de descrição do documento são lidas (trailer e xref do PDF,
+    propriedades dos pacotes DOCX e PPTX e lista de planilhas do XLSX), e nada é gravado em disco.
+    A resposta traz número de páginas, título, planilhas e tamanho.
+    """
+    allowed_extensions = [".pdf", ".docx", ".pptx", ".xlsx"]
+    file_ext = os.path.splitext(file.filename)[1].lower()
+
+    if file_ext not in allowed_extensions:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tipo de arquivo não suportado. Use: {', '.join(allowed_extensions)}",
+        )
+
+    return await _inspect_upload(file)
+
+
+async def _inspect_upload(file: UploadFile) -> Dict[str, Any]:
+    """
+    Extrai os metadados de um arquivo enviado, lendo-o direto do upload.
+
+    Args:
+        file: Arquivo enviado
+
+    Returns:
+        Resultado de inspect_document
+
+    Raises:
+        HTTPException: 400 se o documento não puder ser lido
+    """
+    result = await run_in_threadpool(inspect_document, file.filename, file.filename, file.file)
+    if result["status"] == "error":
+        raise HTTPException(status_code=400, detail=result["message"])
+    return result
+
+
+@router.post("/process/batch")
+async def upload_and_process_batch(
+    files: List[UploadFile] = File(...),
+    extract_text: bool = Form(True),
+    extract_tables: bool = Form(True),
+    extract_images: bool = Form(False),
+    extract_pages_as_images: bool = Form(False),
+    apply_ocr: bool = Form(False),
+    ocr_lang: str = Form("por"),
+    pdf_text_engine: Optional[str] = Form(None),
+):
+    """
+    Processa vários documentos em uma única requisição.
+
+    - **files**: Documentos (PDF, DOCX, PPTX, XLSX) e/ou arquivos ZIP/TAR contendo documentos
+    - Demais parâmetros: os mesmos de /api/process, aplicados a todos os documentos
+
+    Os documentos são distribuídos entre os workers do lote e a resposta é um fluxo NDJSON com
+    um registro "result" por documento, na ordem de conclusão, terminando com um registro
+    "done" com o status agregado (success, partial ou error). O conteúdo de cada documento
+    fica disponível em /api/documents/{id}.
+    """
+    # Verificar motor de extração de texto
+    if pdf_text_engine and pdf_text_engine.lower() not in PDF_TEXT_ENGINES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Motor de extração não suportado. Use: {', '.join(PDF_TEXT_ENGINES)}",
+        )
+
+    if not files:
+        raise HTTPException(status_code=400, detail="Nenhum documento enviado")
+
+    # Os uploads são fechados quando o endpoint retorna, então o conteúdo é copiado para
+    # arquivos temporários próprios; os membros dos arquivos compactados são lidos sob demanda
+    try:
+        uploads = await run_in_threadpool(_copy_batch_uploads, files)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao receber arquivos: {str(e)}")
+
+    # O lote reserva a capacidade dos documentos processados em paralelo
+    cost = await run_in_threadpool(
+        admission_controller.estimate_batch_cost,
+        BATCH_MAX_WORKERS, extract_images, extract_pages_as_images, apply_ocr,
+    )
+    try:
+        lease = await _admit(None, cost)
+    except HTTPException:
+        for _, content, _ in uploads:
+            if content is not None:
+                content.close()
+        raise
+
+    records = process_batch(
+        _iter_batch_sources(uploads),
+        extract_text=extract_text,
+        extract_tables=extract_tables,
+        extract_images=extract_images,
+        extract_pages_as_images=extract_pages_as_images,
+        apply_ocr=apply_ocr,
+        ocr_lang=ocr_lang,
+        pdf_text_engine=pdf_text_engine,
+    )
+    return StreamingResponse(
+        _ndjson_lines(records),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(lease.release),
+    )
+
+
+def _copy_batch_uploads(files: List[UploadFile]) -> List[tuple]:
+    """
+    Copia os arquivos enviados em um lote para arquivos temporários do sistema.
+
+    Documentos vão para a memória (SpooledTemporaryFile) e arquivos compactados para um
+    arquivo temporário anônimo, que não fica em UPLOAD_DIR.
+
+    Args:
+        files: Arquivos enviados
+
+    Returns:
+        Lista de tuplas (nome, conteúdo, é arquivo compactado), com conteúdo None para
+        formatos não suportados
+    """
+    uploads: List[tuple] = []
+    for upload in files:
+        filename = upload.filename or ""
+        if is_archive(filename):
+            archive_file = tempfile.TemporaryFile()
+            shutil.copyfileobj(upload.file, archive_file)
+            archive_file.seek(0)
+            uploads.append((filename, archive_file, True))
+        elif is_batch_document(filename):
+            uploads.append((filename, spool(upload.file), False))
+        else:
+            uploads.append((filename, None, False))
+    return uploads
+
+
+def _iter_batch_sources(uploads: List[tuple]) -> Iterator[tuple]:
+    """
+    Gera os documentos do lote, expandindo os arquivos compactados sob demanda.
+
+    Args:
+        uploads: Arquivos copiados por _copy_batch_uploads
+
+    Yields:
+        Tuplas (nome, conteúdo) para process_batch
+    """
+    consumed = 0
+    try:
+        for filename, content, archive in uploads:
+            consumed += 1
+            if archive:
+                yield from iter_archive_members(content, filename)
+            else:
+                yield filename, content
+    finally:
+        # Fechar os arquivos que não chegaram a ser lidos (cliente desconectado ou erro);
+        # os já entregues são fechados pelo próprio lote
+        for _, content, _ in uploads[consumed:]:
+            if content is not None:
+                content.close()
+
+
+async def _admit(upload_path: Optional[str], cost: float) -> AdmissionLease:
+    """
+    Reserva capacidade de processamento, removendo o que foi enviado se a requisição for recusada.
+
+    Args:
+        upload_path: Caminho do arquivo (ou diretório do lote) enviado
+        cost: Custo estimado do processamento
+
+    Returns:
+        Reserva de capacidade
+
+    Raises:
+        HTTPException: 429 ou 503 com Retry-After se a requisição não puder ser admitida
+    """
+    try:
+        return await admission_controller.acquire(cost)
+    except AdmissionRejected as e:
+        if upload_path and os.path.exists(upload_path):
+            os.remove(upload_path)
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+async def _run_cancellable(
+    request: Request,
+    cancel_token: CancelToken,
+    lease: AdmissionLease,
+    func: Callable[..., Any],
+    **kwargs,
+) -> Any:
+    """
+    Executa um processamento em um worker do pool de processos, vinculado a um token.
+
+    O worker aplica JOB_TIMEOUT_SECONDS e JOB_CPU_LIMIT_SECONDS de forma obrigatória
+    (worker_pool.run_job). Enquanto o processamento roda, verifica periodicamente se o cliente
+    se desconectou e se o tempo limite da requisição foi atingido; nos dois casos, o
+    processamento é interrompido no worker. No tempo limite, a resposta é devolvida
+    imediatamente.
+
+    A capacidade reservada é devolvida apenas quando o trabalho termina de fato. No tempo
+    limite, a reserva expira e o seu custo fica como débito até o worker terminar.
+
+    Args:
+        request: Requisição HTTP em andamento
+        cancel_token: Token com o tempo limite da requisição
+        lease: Reserva de capacidade do processamento
+        func: Função de processamento (recebe cancel_token como argumento nomeado)
+        **kwargs: Argumentos da função
+
+    Returns:
+        Resultado da função
+
+    Raises:
+        ProcessingCancelled: Se o processamento for cancelado ou exceder seus limites
+    """
+    try:
+        future, cancel_event = await run_in_threadpool(start_job, func, **kwargs)
+    except BaseException:
+        lease.release()
+        raise
+    task = asyncio.wrap_future(future)
+    lease.release_when_done(task)
+
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=CANCEL_POLL_INTERVAL)
+        if done:
+            return task.result()
+
+        if not cancel_token.cancelled and await request.is_disconnected():
+            cancel_token.cancel("Cliente desconectado")
+            await run_in_threadpool(cancel_event.set)
+
+        if cancel_token.expired:
+            cancel_token.cancel("Tempo limite de processamento excedido")
+            await run_in_threadpool(cancel_event.set)
+            lease.expire()
+            raise ProcessingTimeout(cancel_token.reason)
+
+
+def _ndjson_lines(records: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    """
+    Serializa registros de processamento no formato NDJSON (um objeto JSON por linha).
+
+    Args:
+        records: Registros gerados pelo processamento em streaming
+
+    Yields:
+        Linhas JSON terminadas em quebra de linha
+    """
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False, ignore_nan=True) + "\n"
+
+
 @router.get("/documents/{document_id}")
 async def get_document(document_id: str):
     """
     Obtém informações sobre um documento processado.
 
     - **document_id**: ID do documento
+
+    O conteúdo inclui o markdown e o texto simples do documento, além de tabelas e imagens.
     """
     try:
         document_info = get_document_info(document_id)
         if not document_info:
             raise HTTPException(status_code=404, detail="Documento não encontrado")
 
-        # Não precisamos mais limpar valores NaN, pois simplejson lida com isso automaticamente
-        return document_info
+        # O markdown e o texto ficam fora de metadata.json e são lidos de content.md
+        return await run_in_threadpool(load_document_content, document_info)
     except HTTPException:
         raise
     except Exception as e:
@@ -240,9 +566,9 @@ async def download_document(
         if format not in ["original", "markdown", "html"]:
             raise HTTPException(status_code=400, detail=f"Formato não suportado: {format}")
 
-        # Obter o caminho do arquivo solicitado
-        file_path = document_info.get("files", {}).get(format)
-        if not file_path or not os.path.exists(file_path):
+        # Obter o caminho do arquivo solicitado (o HTML é gerado e guardado no primeiro acesso)
+        file_path = await run_in_threadpool(render_document_format, document_info, format)
+        if not file_path:
             raise HTTPException(
                 status_code=404, detail=f"Arquivo no formato {format} não disponível"
             )
@@ -290,14 +616,10 @@ async def preview_document(
         if format not in ["markdown", "html", "text"]:
             raise HTTPException(status_code=400, detail=f"Formato não suportado: {format}")
 
-        # Obter o caminho do arquivo solicitado
-        if format == "text":
-            # Para texto, usamos o conteúdo do markdown
-            file_path = document_info.get("files", {}).get("markdown")
-        else:
-            file_path = document_info.get("files", {}).get(format)
-
-        if not file_path or not os.path.exists(file_path):
+        # Obter o caminho do arquivo solicitado (o HTML e o texto simples são gerados a partir do
+        # markdown e guardados no primeiro acesso)
+        file_path = await run_in_threadpool(render_document_format, document_info, format)
+        if not file_path:
             raise HTTPException(
                 status_code=404, detail=f"Conteúdo no formato {format} não disponível"
             )
@@ -326,6 +648,28 @@ async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
 
+@router.get("/status")
+async def get_status():
+    """
+    Retorna a carga atual do serviço de processamento.
+
+    - **load**: Capacidade, uso, processamentos ativos e fila do controle de admissão
+    - **ocr_cache**: Acertos, falhas, taxa de acerto e ocupação do cache de OCR (se ativo)
+    """
+    load = admission_controller.status()
+    busy = load["in_use"] >= load["capacity"] or load["queued"] > 0
+    status = {
+        "status": "busy" if busy else "available",
+        "timestamp": datetime.now().isoformat(),
+        "load": load,
+    }
+
+    ocr_cache = get_ocr_cache()
+    if ocr_cache is not None:
+        status["ocr_cache"] = ocr_cache.stats()
+    return status
+
+
 @router.get("/documents/{document_id}/images")
 async def list_document_images(document_id: str):
     """
@@ -409,6 +753,144 @@ async def get_document_image(document_id: str, image_id: str):
         )
 
 
+@router.get("/documents/{document_id}/pages/{page}/thumbnail")
+async def get_page_thumbnail(
+    request: Request,
+    document_id: str,
+    page: int = Path(..., ge=1, description="Número da página, iniciando em 1"),
+    w: int = Query(THUMBNAIL_DEFAULT_WIDTH, description="Largura da miniatura em pixels"),
+):
+    """
+    Obtém a miniatura de uma página de um PDF processado, gerada sob demanda.
+
+    - **document_id**: ID do documento
+    - **page**: Número da página
+    - **w**: Largura em pixels (a altura segue a proporção da página)
+
+    A página é rasterizada apenas na primeira requisição e guardada em um cache em disco. As
+    respostas trazem ETag e Cache-Control; uma requisição com If-None-Match igual à ETag
+    recebe 304 sem rasterização nem leitura do cache.
+    """
+    try:
+        validate_width(w)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    document_info = get_document_info(document_id)
+    if not document_info:
+        raise HTTPException(status_code=404, detail="Documento não encontrado")
+    if document_info.get("file_type") != "pdf":
+        raise HTTPException(status_code=400, detail="Miniaturas disponíveis apenas para documentos PDF")
+
+    original_path = document_info.get("files", {}).get("original")
+    if not original_path or not os.path.exists(original_path):
+        raise HTTPException(status_code=404, detail="Arquivo original não disponível")
+
+    etag = thumbnail_etag(original_path, document_id, page, w)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={THUMBNAIL_MAX_AGE}"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        thumbnail = await run_in_threadpool(
+            get_thumbnail, original_path, document_id, page, w, JOB_TIMEOUT_SECONDS or None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except PDFPopplerTimeoutError:
+        raise HTTPException(status_code=504, detail="Tempo limite de rasterização excedido")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao gerar miniatura: {str(e)}")
+
+    return FileResponse(path=thumbnail["path"], media_type=thumbnail["media_type"], headers=headers)
+
+
+@router.get("/documents/{document_id}/pages/{page}/words")
+async def get_page_words(
+    document_id: str,
+    page: int = Path(..., ge=1, description="Número da página, iniciando em 1"),
+    x0: Optional[float] = Query(None, description="Borda esquerda da região, em pixels"),
+    y0: Optional[float] = Query(None, description="Borda superior da região, em pixels"),
+    x1: Optional[float] = Query(None, description="Borda direita da região, em pixels"),
+    y1: Optional[float] = Query(None, description="Borda inferior da região, em pixels"),
+    min_conf: Optional[float] = Query(None, ge=0, le=100, description="Confiança mínima (0 a 100)"),
+    limit: Optional[int] = Query(None, ge=1, description="Número máximo de palavras"),
+):
+    """
+    Obtém as palavras reconhecidas pelo OCR em uma página, com posição e confiança.
+
+    - **document_id**: ID do documento
+    - **page**: Número da página
+    - **x0**, **y0**, **x1**, **y1**: Região em pixels da imagem (opcional); são retornadas as
+      palavras que a intersectam
+    - **min_conf**: Confiança mínima das palavras (opcional)
+    - **limit**: Número máximo de palavras retornadas por tabela (opcional)
+
+    As palavras são gravadas durante o OCR quando OCR_WORD_BOXES está ativo. A resposta traz as
+    palavras da página inteira (page_size, total, count e words) e, em "tables", todas as tabelas
+    da página, inclusive as das imagens incorporadas. Apenas os arquivos da página são lidos.
+    """
+    bounds = (x0, y0, x1, y1)
+    region: Optional[Tuple[float, float, float, float]] = None
+    if x0 is not None and y0 is not None and x1 is not None and y1 is not None:
+        if x1 <= x0 or y1 <= y0:
+            raise HTTPException(
+                status_code=400, detail="Região inválida: x1 e y1 devem ser maiores que x0 e y0"
+            )
+        region = (x0, y0, x1, y1)
+    elif any(value is not None for value in bounds):
+        raise HTTPException(status_code=400, detail="Informe x0, y0, x1 e y1 para consultar uma região")
+
+    document_info = get_document_info(document_id)
+    if not document_info:
+        raise HTTPException(status_code=404, detail="Documento não encontrado")
+
+    try:
+        tables = await run_in_threadpool(
+            get_document_words, document_id, document_info, page, region, min_conf, limit
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao ler as palavras do OCR: {str(e)}")
+
+    if not tables:
+        raise HTTPException(status_code=404, detail=f"Palavras do OCR não disponíveis para a página {page}")
+
+    # As palavras da página inteira continuam no nível principal da resposta
+    page_words = next((table for table in tables if table["source"] == "page"), {})
+    words = {k: v for k, v in page_words.items() if k not in ("name", "source", "page")}
+    return {"document_id": document_id, "page": page, **words, "tables": tables}
+
+
+@router.get("/documents/{document_id}/words")
+async def get_document_words_route(
+    document_id: str,
+    min_conf: Optional[float] = Query(None, ge=0, le=100, description="Confiança mínima (0 a 100)"),
+    limit: Optional[int] = Query(None, ge=1, description="Número máximo de palavras por tabela"),
+):
+    """
+    Obtém todas as tabelas de palavras do OCR de um documento, das páginas e das imagens.
+
+    - **document_id**: ID do documento
+    - **min_conf**: Confiança mínima das palavras (opcional)
+    - **limit**: Número máximo de palavras retornadas por tabela (opcional)
+
+    Cada tabela traz name, source ("page" ou "image"), page (null para imagens sem página
+    conhecida), page_size, total, count e words.
+    """
+    document_info = get_document_info(document_id)
+    if not document_info:
+        raise HTTPException(status_code=404, detail="Documento não encontrado")
+
+    try:
+        tables = await run_in_threadpool(
+            get_document_words, document_id, document_info, None, None, min_conf, limit
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao ler as palavras do OCR: {str(e)}")
+
+    return {"document_id": document_id, "tables": tables}
+
+
 @router.post("/documents/{document_id}/images/{image_id}/ocr")
 async def process_image_ocr(
     document_id: str,
@@ -448,9 +930,9 @@ async def process_image_ocr(
         if not image_path or not os.path.exists(image_path):
             raise HTTPException(status_code=404, detail="Arquivo de imagem não encontrado")
 
-        # Importar o serviço de OCR
+        # Importar o serviço de OCR (resultados repetidos vêm do cache persistente)
         from app.services.ocr_service import OCRService
-        ocr_service = OCRService()
+        ocr_service = OCRService(cache=get_ocr_cache())
 
         # Processar OCR na imagem
         if lang == "auto":
@@ -475,7 +957,7 @@ async def process_image_ocr(
         if ocr_result.get("success") and ocr_result.get("text"):
             # Criar diretório para resultados de OCR
             result_dir = os.path.join(RESULTS_DIR, document_id)
-            ocr_dir = os.path.join(result_dir, "ocr")
+            ocr_dir = words_directory(result_dir)
             os.makedirs(ocr_dir, exist_ok=True)
 
             # Salvar texto extraído em arquivo
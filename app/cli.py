@@ -0,0 +1,501 @@
+"""
+Interface de linha de comando para conversão de documentos em massa.
+
+Uso:
+    python -m app.cli convert <diretório> [--output DIR] [--workers N] [opções]
+
+O comando percorre uma árvore de diretórios e processa os documentos diretamente com o
+document_service, sem passar pela API HTTP. Cada documento é convertido em um pool de
+processos e gravado em <saída>/<sha256>/, com o mesmo formato usado pela API; o ID do
+documento é o hash do conteúdo, então arquivos repetidos são convertidos uma única vez.
+
+As conversões concluídas são registradas em um manifesto (convert_manifest.jsonl) no
+diretório de saída. Ao executar o comando novamente com as mesmas opções, os arquivos já
+convertidos são ignorados sem reprocessamento, o que permite retomar uma conversão
+interrompida; com opções diferentes (páginas, OCR, motor de texto etc.), eles são convertidos
+de novo.
+"""
+
+import os
+import sys
+import time
+import hashlib
+import logging
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+import simplejson as json
+
+from app.core.config import (
+    RESULTS_DIR,
+    BATCH_MAX_WORKERS,
+    JOB_TIMEOUT_SECONDS,
+    JOB_CPU_LIMIT_SECONDS,
+)
+from app.core.cancellation import CancelToken, ProcessingCancelled, hard_limits
+from app.core.pdf_text import PDF_TEXT_ENGINES
+from app.core.page_ranges import parse_page_ranges
+from app.services.batch_service import is_batch_document
+from app.services.document_service import process_document
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Nome do manifesto de conversões no diretório de saída
+MANIFEST_NAME = "convert_manifest.jsonl"
+
+# Tamanho dos blocos lidos no cálculo do hash
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class Manifest:
+    """
+    Registro das conversões em formato JSON Lines, gravado uma linha por documento.
+
+    O arquivo é apenas acrescentado, de modo que uma interrupção perde no máximo os
+    documentos em andamento. Em memória ficam apenas o tamanho, a data de modificação, o ID
+    e o resumo das opções dos arquivos convertidos com sucesso, usados para ignorá-los sem
+    recalcular o hash.
+    """
+
+    def __init__(self, path: str):
+        """
+        Carrega o manifesto existente e o abre para acréscimo.
+
+        Args:
+            path: Caminho do arquivo de manifesto
+        """
+        self.path = path
+        self._done: Dict[str, Tuple[int, int, str, Optional[str]]] = {}
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Última linha incompleta de uma execução interrompida
+                        continue
+                    self._update(entry)
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def is_done(self, source: str, stat: os.stat_result, results_dir: str, options_key: Optional[str] = None) -> bool:
+        """
+        Verifica se um arquivo já foi convertido com as mesmas opções e não mudou desde então.
+
+        Args:
+            source: Caminho absoluto do arquivo
+            stat: Resultado de os.stat do arquivo
+            results_dir: Diretório raiz dos resultados
+            options_key: Resumo das opções de processamento (ver options_digest)
+
+        Returns:
+            True se o arquivo pode ser ignorado
+        """
+        done = self._done.get(source)
+        if done is None or done[:2] != (stat.st_size, stat.st_mtime_ns) or done[3] != options_key:
+            return False
+        # Resultados removidos depois da conversão precisam ser gerados de novo
+        return os.path.exists(os.path.join(results_dir, done[2], "metadata.json"))
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """
+        Acrescenta o resultado de um documento ao manifesto.
+
+        Args:
+            entry: Resultado retornado por convert_file
+        """
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._update(entry)
+
+    def close(self) -> None:
+        """
+        Fecha o arquivo de manifesto.
+        """
+        self._file.close()
+
+    def _update(self, entry: Dict[str, Any]) -> None:
+        """Atualiza o índice em memória com uma entrada do manifesto."""
+        source = entry.get("source")
+        if not source:
+            return
+        if entry.get("status") in ("success", "skipped") and entry.get("id"):
+            self._done[source] = (entry.get("size"), entry.get("mtime_ns"), entry["id"], entry.get("options"))
+        else:
+            self._done.pop(source, None)
+
+
+def iter_documents(root: str, exclude: Optional[str] = None) -> Iterator[str]:
+    """
+    Percorre uma árvore de diretórios em ordem estável, gerando os documentos suportados.
+
+    Args:
+        root: Diretório raiz
+        exclude: Diretório ignorado durante a busca (por exemplo, a saída da conversão)
+
+    Yields:
+        Caminhos absolutos dos documentos
+    """
+    exclude = os.path.abspath(exclude) if exclude else None
+
+    for dirpath, dirnames, filenames in os.walk(os.path.abspath(root)):
+        dirnames[:] = sorted(d for d in dirnames if os.path.join(dirpath, d) != exclude)
+        for filename in sorted(filenames):
+            if is_batch_document(filename):
+                yield os.path.join(dirpath, filename)
+
+
+def file_sha256(file_path: str) -> str:
+    """
+    Calcula o hash SHA-256 de um arquivo lendo-o em blocos.
+
+    Args:
+        file_path: Caminho do arquivo
+
+    Returns:
+        Hash em hexadecimal
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def options_digest(options: Dict[str, Any]) -> str:
+    """
+    Calcula um resumo das opções de processamento, usado para decidir se uma conversão
+    anterior pode ser reaproveitada.
+
+    Args:
+        options: Opções de processamento repassadas a process_document
+
+    Returns:
+        Hash das opções em hexadecimal (16 caracteres)
+    """
+    encoded = json.dumps(options, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def convert_file(source: str, results_dir: str, options: Dict[str, Any], force: bool = False) -> Dict[str, Any]:
+    """
+    Converte um documento (executado nos processos do pool).
+
+    Args:
+        source: Caminho absoluto do documento
+        results_dir: Diretório raiz dos resultados
+        options: Opções de processamento repassadas a process_document
+        force: Se deve converter novamente documentos com o mesmo hash
+
+    Returns:
+        Entrada do manifesto com o status (success, skipped ou error)
+    """
+    start = time.perf_counter()
+    stat = os.stat(source)
+    document_id = file_sha256(source)
+    options_key = options_digest(options)
+    result_dir = os.path.join(results_dir, document_id)
+    entry = {
+        "source": source,
+        "id": document_id,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "options": options_key,
+    }
+
+    # Mesmo conteúdo já convertido com as mesmas opções (outro caminho ou execução anterior)
+    if not force and _is_converted(result_dir, options_key):
+        entry.update(status="skipped", elapsed_seconds=round(time.perf_counter() - start, 3))
+        return entry
+
+    # Cada worker converte um arquivo por vez, então o tempo de CPU é medido no processo
+    token = CancelToken(
+        timeout=JOB_TIMEOUT_SECONDS, cpu_limit=JOB_CPU_LIMIT_SECONDS, process_cpu=True
+    )
+    try:
+        with hard_limits(token):
+            document_info = process_document(
+                file_path=source,
+                original_filename=os.path.basename(source),
+                cancel_token=token,
+                document_id=document_id,
+                results_dir=results_dir,
+                **options,
+            )
+        entry["status"] = document_info.get("status", "error")
+        if entry["status"] == "success":
+            _mark_converted(result_dir, options_key)
+        else:
+            entry["message"] = document_info.get("message")
+    except ProcessingCancelled as e:
+        entry.update(status="error", message=str(e))
+    except Exception as e:
+        entry.update(status="error", message=f"Erro ao processar documento: {str(e)}")
+
+    entry["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+    return entry
+
+
+def _is_converted(result_dir: str, options_key: str) -> bool:
+    """Verifica se um diretório de resultados contém uma conversão bem-sucedida com as mesmas opções."""
+    try:
+        with open(os.path.join(result_dir, "metadata.json"), "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return metadata.get("status") == "success" and metadata.get("convert_options") == options_key
+
+
+def _mark_converted(result_dir: str, options_key: str) -> None:
+    """Registra em metadata.json o resumo das opções usadas na conversão."""
+    metadata_path = os.path.join(result_dir, "metadata.json")
+    with open(metadata_path, "r", encoding="utf-8") as f:
+        metadata = json.load(f)
+    metadata["convert_options"] = options_key
+    with open(metadata_path, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+
+def convert(
+    root: str,
+    output: Optional[str] = None,
+    workers: Optional[int] = None,
+    force: bool = False,
+    report_interval: float = 10.0,
+    options: Optional[Dict[str, Any]] = None,
+    out: TextIO = sys.stdout,
+) -> Dict[str, Any]:
+    """
+    Converte todos os documentos de uma árvore de diretórios.
+
+    Args:
+        root: Diretório de entrada
+        output: Diretório raiz dos resultados (padrão: RESULTS_DIR)
+        workers: Número de processos (padrão: BATCH_MAX_WORKERS)
+        force: Se deve reprocessar documentos já convertidos
+        report_interval: Intervalo em segundos entre os relatórios de progresso
+        options: Opções de processamento repassadas a process_document
+        out: Saída dos relatórios
+
+    Returns:
+        Estatísticas da conversão
+    """
+    results_dir = os.path.abspath(output or RESULTS_DIR)
+    workers = workers or BATCH_MAX_WORKERS
+    options = options or {}
+    options_key = options_digest(options)
+    manifest = Manifest(os.path.join(results_dir, MANIFEST_NAME))
+
+    stats: Dict[str, Any] = {
+        "converted": 0,
+        "skipped": 0,
+        "failed": 0,
+        "bytes": 0,
+        "interrupted": False,
+    }
+    failures: List[Dict[str, Any]] = []
+    pending: Dict[Any, str] = {}
+    start = time.perf_counter()
+    last_report = start
+
+    def handle(future) -> None:
+        source = pending.pop(future)
+        try:
+            entry = future.result()
+        except Exception as e:
+            # Falha do próprio processo do pool (por exemplo, encerrado pelo sistema)
+            entry = {"source": source, "status": "error", "message": str(e)}
+        manifest.record(entry)
+
+        if entry["status"] == "success":
+            stats["converted"] += 1
+            stats["bytes"] += entry.get("size", 0)
+        elif entry["status"] == "skipped":
+            stats["skipped"] += 1
+        else:
+            stats["failed"] += 1
+            failures.append(entry)
+
+    def drain(limit: int) -> None:
+        # Aguardar até restarem menos de "limit" documentos no pool, relatando o progresso
+        nonlocal last_report
+        while len(pending) >= max(limit, 1):
+            done, _ = wait(pending, timeout=report_interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                handle(future)
+            if time.perf_counter() - last_report >= report_interval:
+                last_report = time.perf_counter()
+                print(_format_progress(stats, last_report - start, len(pending)), file=out, flush=True)
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        for source in iter_documents(root, exclude=results_dir):
+            # Arquivo sem alterações desde a última conversão com as mesmas opções: ignorar sem
+            # calcular o hash
+            if not force and manifest.is_done(source, os.stat(source), results_dir, options_key):
+                stats["skipped"] += 1
+                continue
+
+            pending[executor.submit(convert_file, source, results_dir, options, force)] = source
+
+            # Limitar os documentos enfileirados para não carregar a árvore inteira
+            drain(workers * 4)
+
+        drain(1)
+
+    except KeyboardInterrupt:
+        # Os documentos em andamento são convertidos de novo na próxima execução
+        stats["interrupted"] = True
+        executor.shutdown(wait=False, cancel_futures=True)
+    finally:
+        executor.shutdown(wait=not stats["interrupted"])
+        manifest.close()
+
+    stats["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+    stats["failures"] = failures
+    _print_summary(stats, out)
+    return stats
+
+
+def _format_progress(stats: Dict[str, Any], elapsed: float, in_flight: int = 0) -> str:
+    """Formata uma linha de progresso com a vazão atual."""
+    rate = stats["converted"] / elapsed if elapsed > 0 else 0.0
+    megabytes = stats["bytes"] / (1024 * 1024)
+    return (
+        f"convertidos={stats['converted']} ignorados={stats['skipped']} falhas={stats['failed']} "
+        f"em_andamento={in_flight} | {rate:.2f} docs/s, "
+        f"{megabytes / elapsed if elapsed > 0 else 0.0:.2f} MB/s"
+    )
+
+
+def _print_summary(stats: Dict[str, Any], out: TextIO) -> None:
+    """Imprime o resumo final da conversão e as falhas."""
+    print(_format_progress(stats, stats["elapsed_seconds"]), file=out)
+    print(f"Tempo total: {stats['elapsed_seconds']:.1f}s", file=out)
+    for failure in stats["failures"]:
+        print(f"FALHA {failure['source']}: {failure.get('message')}", file=out)
+    if stats["interrupted"]:
+        print("Conversão interrompida; execute o mesmo comando para retomar.", file=out)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Analisa os argumentos da linha de comando.
+
+    Args:
+        argv: Argumentos (padrão: sys.argv)
+
+    Returns:
+        Argumentos analisados
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli",
+        description="Ferramentas de linha de comando do Docling",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser(
+        "convert",
+        help="Converte todos os documentos de um diretório sem passar pela API",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    convert_parser.add_argument("directory", help="Diretório com os documentos (PDF, DOCX, PPTX, XLSX)")
+    convert_parser.add_argument(
+        "--output", "-o",
+        help="Diretório raiz dos resultados (padrão: RESULTS_DIR)",
+    )
+    convert_parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=BATCH_MAX_WORKERS,
+        help="Número de processos de conversão",
+    )
+    convert_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Converte novamente documentos já convertidos",
+    )
+    convert_parser.add_argument(
+        "--report-interval",
+        type=float,
+        default=10.0,
+        help="Intervalo em segundos entre os relatórios de progresso",
+    )
+    convert_parser.add_argument("--no-text", action="store_true", help="Não extrai texto")
+    convert_parser.add_argument("--no-tables", action="store_true", help="Não extrai tabelas")
+    convert_parser.add_argument("--extract-images", action="store_true", help="Extrai imagens incorporadas")
+    convert_parser.add_argument(
+        "--pages-as-images",
+        action="store_true",
+        help="Converte páginas de PDF em imagens (requer --extract-images)",
+    )
+    convert_parser.add_argument("--ocr", action="store_true", help="Aplica OCR nas imagens extraídas")
+    convert_parser.add_argument("--ocr-lang", default="por", help="Idioma do OCR (por, eng, auto)")
+    convert_parser.add_argument(
+        "--ocr-auto",
+        action="store_true",
+        help="Aplica OCR apenas às páginas de PDF sem camada de texto aproveitável",
+    )
+    convert_parser.add_argument("--pages", help='Páginas dos PDFs a converter, como "1-5,10"')
+    convert_parser.add_argument(
+        "--pdf-text-engine",
+        choices=PDF_TEXT_ENGINES,
+        help="Motor de extração de texto de PDFs (padrão: PDF_TEXT_ENGINE)",
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Função principal.
+
+    Args:
+        argv: Argumentos (padrão: sys.argv)
+
+    Returns:
+        Código de saída (0 sucesso, 1 com falhas, 130 se interrompido)
+    """
+    args = parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        print(f"Diretório não encontrado: {args.directory}", file=sys.stderr)
+        return 2
+
+    try:
+        parse_page_ranges(args.pages)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    options = {
+        "extract_text": not args.no_text,
+        "extract_tables": not args.no_tables,
+        "extract_images": args.extract_images,
+        "extract_pages_as_images": args.pages_as_images,
+        "apply_ocr": args.ocr,
+        "ocr_lang": args.ocr_lang,
+        "pdf_text_engine": args.pdf_text_engine,
+        "pages": args.pages,
+        "ocr_mode": "auto" if args.ocr_auto else None,
+    }
+    stats = convert(
+        args.directory,
+        output=args.output,
+        workers=args.workers,
+        force=args.force,
+        report_interval=args.report_interval,
+        options=options,
+    )
+
+    if stats["interrupted"]:
+        return 130
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,445 @@
+"""
+Módulo de controle de admissão para os endpoints de processamento.
+
+Este módulo limita a carga simultânea do serviço com um semáforo ponderado: cada
+processamento ocupa unidades de capacidade proporcionais ao custo estimado (tamanho do
+arquivo, número de páginas e de imagens e se há rasterização ou OCR). Requisições acima do
+limite aguardam em uma fila limitada ou são recusadas rapidamente com um tempo sugerido para
+nova tentativa.
+
+Quando a resposta de um processamento é encerrada antes de o worker terminar (tempo limite ou
+cliente desconectado), a reserva expira: o processamento deixa de contar como ativo, mas o seu
+custo permanece em uso como débito até o worker terminar de fato.
+"""
+
+import os
+import math
+import time
+import asyncio
+import logging
+import zipfile
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import PyPDF2
+
+from app.core.config import (
+    ADMISSION_CAPACITY,
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_QUEUE_TIMEOUT,
+    ADMISSION_RETRY_AFTER,
+)
+from app.core.page_ranges import (
+    count_selected_pages,
+    iter_page_numbers,
+    parse_page_ranges,
+    resolve_page_ranges,
+)
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Pesos usados na estimativa de custo (em unidades de capacidade)
+BYTES_PER_UNIT = 10 * 1024 * 1024  # Uma unidade a cada 10 MB
+TEXT_PAGES_PER_UNIT = 50  # Extração de texto: uma unidade a cada 50 páginas
+RENDER_COST_PER_PAGE = 0.25  # Rasterização de uma página pelo poppler
+OCR_COST_PER_PAGE = 1.0  # OCR de uma página pelo Tesseract
+AUTO_OCR_PAGE_FRACTION = 0.25  # Fração esperada de páginas digitalizadas com ocr=auto
+OCR_COST_PER_IMAGE = 0.5  # OCR de uma imagem incorporada ao documento
+
+
+class AdmissionRejected(Exception):
+    """
+    Exceção lançada quando uma requisição não pode ser admitida.
+    """
+
+    def __init__(self, message: str, status_code: int, retry_after: int):
+        """
+        Inicializa a exceção.
+
+        Args:
+            message: Descrição do motivo da recusa
+            status_code: Código HTTP sugerido (429 com a fila cheia, 503 após esperar na fila)
+            retry_after: Segundos sugeridos para uma nova tentativa
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionLease:
+    """
+    Capacidade reservada para um processamento admitido.
+    """
+
+    def __init__(self, controller: "AdmissionController", cost: float):
+        self.controller = controller
+        self.cost = cost
+        self.started_at = time.monotonic()
+        self._released = False
+        self._expired = False
+        self._lock = threading.Lock()
+
+    def release(self, completed: bool = False) -> None:
+        """
+        Devolve a capacidade reservada. Chamadas repetidas são ignoradas.
+
+        Args:
+            completed: Se o processamento terminou normalmente; apenas esses entram na média
+                de duração usada no Retry-After
+        """
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+            expired = self._expired
+        elapsed = time.monotonic() - self.started_at if completed else None
+        self.controller._release(self.cost, elapsed, expired)
+
+    def expire(self) -> None:
+        """
+        Encerra a reserva de um processamento cuja resposta já terminou, mas que ainda pode
+        estar rodando no worker. O custo permanece em uso como débito até release.
+        Chamadas repetidas, ou após release, são ignoradas.
+        """
+        with self._lock:
+            if self._released or self._expired:
+                return
+            self._expired = True
+        self.controller._expire(self.cost)
+
+    def release_when_done(self, future: Any) -> None:
+        """
+        Devolve a capacidade quando o processamento terminar.
+
+        Args:
+            future: Future do processamento (concurrent.futures ou asyncio)
+        """
+        future.add_done_callback(
+            lambda done: self.release(completed=not done.cancelled() and done.exception() is None)
+        )
+
+
+class _Waiter:
+    """Requisição aguardando na fila de admissão."""
+
+    __slots__ = ("cost", "future", "loop", "granted")
+
+    def __init__(self, cost: float, future: asyncio.Future, loop: asyncio.AbstractEventLoop):
+        self.cost = cost
+        self.future = future
+        self.loop = loop
+        self.granted = False
+
+
+class AdmissionController:
+    """
+    Semáforo ponderado com fila FIFO limitada.
+
+    A capacidade é liberada a partir de threads do pool, por isso o estado é protegido por
+    um lock e as requisições em espera são acordadas no seu próprio loop de eventos.
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        max_queue: int = 16,
+        queue_timeout: float = 30.0,
+        retry_after: int = 5,
+    ):
+        """
+        Inicializa o controlador.
+
+        Args:
+            capacity: Capacidade total em unidades de custo
+            max_queue: Número máximo de requisições aguardando na fila (0 desativa a fila)
+            queue_timeout: Tempo máximo de espera na fila em segundos
+            retry_after: Duração inicial estimada de um processamento, usada no Retry-After
+        """
+        self.capacity = float(capacity)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._lock = threading.Lock()
+        self._waiters: Deque[_Waiter] = deque()
+        self._in_use = 0.0
+        self._active = 0
+        # Custo de processamentos expirados que ainda rodam nos workers
+        self._debt = 0.0
+        self._admitted = 0
+        self._rejected = 0
+        # Média móvel da duração dos processamentos, em segundos
+        self._avg_seconds = float(retry_after)
+
+    def estimate_cost(
+        self,
+        file_path: str,
+        extract_images: bool = False,
+        extract_pages_as_images: bool = False,
+        apply_ocr: bool = False,
+        pages: Optional[str] = None,
+        ocr_mode: Optional[str] = None,
+    ) -> float:
+        """
+        Estima o custo de processamento de um arquivo em unidades de capacidade.
+
+        Args:
+            file_path: Caminho para o arquivo enviado
+            extract_images: Se as imagens serão extraídas
+            extract_pages_as_images: Se as páginas serão rasterizadas
+            apply_ocr: Se o OCR será aplicado
+            pages: Páginas selecionadas, como "1-5,10" (None para todas)
+            ocr_mode: "auto" se as páginas sem camada de texto forem rasterizadas e reconhecidas
+
+        Returns:
+            Custo estimado, limitado à capacidade total
+        """
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            size = 0
+
+        page_count = _count_pages(file_path)
+        page_ranges = None
+        if pages and file_path.lower().endswith(".pdf"):
+            # Apenas as páginas selecionadas são extraídas, rasterizadas e enviadas ao OCR
+            page_ranges = resolve_page_ranges(parse_page_ranges(pages), page_count)
+            page_count = max(count_selected_pages(page_ranges), 1)
+
+        cost = 1.0 + size / BYTES_PER_UNIT + page_count / TEXT_PAGES_PER_UNIT
+        if extract_images and extract_pages_as_images:
+            cost += page_count * RENDER_COST_PER_PAGE
+            if apply_ocr:
+                cost += page_count * OCR_COST_PER_PAGE
+        if extract_images and apply_ocr:
+            # As imagens incorporadas também são enviadas ao OCR
+            cost += _count_images(file_path, page_ranges) * OCR_COST_PER_IMAGE
+        if ocr_mode == "auto" and file_path.lower().endswith(".pdf"):
+            # Apenas parte das páginas é rasterizada; o número real só é conhecido durante o processamento
+            cost += page_count * AUTO_OCR_PAGE_FRACTION * (RENDER_COST_PER_PAGE + OCR_COST_PER_PAGE)
+
+        # Um documento maior que a capacidade ainda pode ser processado sozinho
+        return min(cost, self.capacity)
+
+    def estimate_batch_cost(
+        self,
+        workers: int,
+        extract_images: bool = False,
+        extract_pages_as_images: bool = False,
+        apply_ocr: bool = False,
+    ) -> float:
+        """
+        Estima o custo de um lote, cujos documentos são lidos sob demanda.
+
+        O lote processa no máximo "workers" documentos ao mesmo tempo, então o custo é o de um
+        documento típico de uma página (e uma imagem) por worker.
+
+        Args:
+            workers: Número de workers do lote
+            extract_images: Se as imagens serão extraídas
+            extract_pages_as_images: Se as páginas serão rasterizadas
+            apply_ocr: Se o OCR será aplicado
+
+        Returns:
+            Custo estimado, limitado à capacidade total
+        """
+        cost = 1.0 + 1 / TEXT_PAGES_PER_UNIT
+        if extract_images and extract_pages_as_images:
+            cost += RENDER_COST_PER_PAGE
+            if apply_ocr:
+                cost += OCR_COST_PER_PAGE
+        if extract_images and apply_ocr:
+            cost += OCR_COST_PER_IMAGE
+
+        return min(cost * workers, self.capacity)
+
+    async def acquire(self, cost: float) -> AdmissionLease:
+        """
+        Reserva capacidade para um processamento, aguardando na fila se necessário.
+
+        Args:
+            cost: Custo estimado (ver estimate_cost)
+
+        Returns:
+            Reserva que deve ser liberada ao fim do processamento
+
+        Raises:
+            AdmissionRejected: Se a fila estiver cheia ou o tempo de espera se esgotar
+        """
+        cost = min(max(cost, 1.0), self.capacity)
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            # Respeitar a ordem da fila para não deixar documentos grandes esperando indefinidamente
+            if not self._waiters and self._in_use + cost <= self.capacity:
+                self._grant(cost)
+                return AdmissionLease(self, cost)
+
+            if len(self._waiters) >= self.max_queue:
+                self._rejected += 1
+                raise AdmissionRejected(
+                    "Servidor ocupado. Tente novamente mais tarde.", 429, self._retry_after()
+                )
+
+            waiter = _Waiter(cost, loop.create_future(), loop)
+            self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait({waiter.future}, timeout=self.queue_timeout)
+        except BaseException:
+            # Requisição abandonada enquanto aguardava: sair da fila ou devolver a capacidade
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(waiter)
+            if granted:
+                # Nenhum processamento rodou: a duração não entra na média
+                self._release(cost)
+            raise
+
+        with self._lock:
+            granted = waiter.granted
+            if not granted:
+                self._waiters.remove(waiter)
+                self._rejected += 1
+
+        if not granted:
+            raise AdmissionRejected(
+                "Tempo de espera na fila de processamento esgotado.", 503, self._retry_after()
+            )
+        return AdmissionLease(self, cost)
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Retorna a carga atual do serviço.
+
+        Returns:
+            Dicionário com capacidade, uso, processamentos ativos e fila
+        """
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "in_use": round(self._in_use, 2),
+                "utilization": round(self._in_use / self.capacity, 3) if self.capacity else 0.0,
+                "active": self._active,
+                "debt": round(self._debt, 2),
+                "queued": len(self._waiters),
+                "max_queue": self.max_queue,
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "avg_job_seconds": round(self._avg_seconds, 2),
+            }
+
+    def _grant(self, cost: float) -> None:
+        """Registra a capacidade concedida (chamado com o lock adquirido)."""
+        self._in_use += cost
+        self._active += 1
+        self._admitted += 1
+
+    def _expire(self, cost: float) -> None:
+        """Deixa de contar um processamento como ativo, mantendo o seu custo como débito."""
+        with self._lock:
+            self._active -= 1
+            self._debt += cost
+
+    def _release(self, cost: float, elapsed: Optional[float] = None, expired: bool = False) -> None:
+        """Devolve capacidade e acorda as requisições da fila que couberem."""
+        with self._lock:
+            self._in_use = max(self._in_use - cost, 0.0)
+            if expired:
+                self._debt = max(self._debt - cost, 0.0)
+            else:
+                self._active -= 1
+            if elapsed is not None:
+                self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * elapsed
+
+            while self._waiters and self._in_use + self._waiters[0].cost <= self.capacity:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                self._grant(waiter.cost)
+                waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+
+    def _retry_after(self) -> int:
+        """Estima em quantos segundos uma nova tentativa tem chance de ser admitida."""
+        waves = (len(self._waiters) + 1) / max(self._active, 1)
+        return min(max(int(math.ceil(self._avg_seconds * waves)), 1), 300)
+
+
+def _wake(future: asyncio.Future) -> None:
+    """Acorda uma requisição em espera, se ela ainda estiver aguardando."""
+    if not future.done():
+        future.set_result(True)
+
+
+def _count_pages(file_path: str) -> int:
+    """
+    Obtém o número de páginas de um PDF lendo apenas a árvore de páginas.
+
+    Args:
+        file_path: Caminho para o arquivo
+
+    Returns:
+        Número de páginas (1 para outros formatos ou em caso de erro)
+    """
+    if not file_path.lower().endswith(".pdf"):
+        return 1
+
+    try:
+        with open(file_path, "rb") as file:
+            reader = PyPDF2.PdfReader(file)
+            return max(int(reader.trailer["/Root"]["/Pages"]["/Count"]), 1)
+    except Exception as e:
+        logger.debug(f"Não foi possível contar as páginas de {file_path}: {str(e)}")
+        return 1
+
+
+def _count_images(file_path: str, page_ranges: Optional[List[Tuple[int, int]]] = None) -> int:
+    """
+    Conta as imagens incorporadas a um documento sem decodificá-las.
+
+    Nos pacotes DOCX, PPTX e XLSX, conta os arquivos das pastas de mídia. Nos PDFs, conta os
+    XObjects de imagem declarados nos recursos das páginas selecionadas, uma vez por objeto,
+    sem interpretar o conteúdo das páginas.
+
+    Args:
+        file_path: Caminho para o arquivo
+        page_ranges: Intervalos de páginas já resolvidos (None para todas)
+
+    Returns:
+        Número de imagens (0 para outros formatos ou em caso de erro)
+    """
+    lower = file_path.lower()
+    try:
+        if lower.endswith((".docx", ".pptx", ".xlsx")):
+            with zipfile.ZipFile(file_path) as package:
+                return sum(1 for name in package.namelist() if "/media/" in name)
+
+        if lower.endswith(".pdf"):
+            with open(file_path, "rb") as file:
+                reader = PyPDF2.PdfReader(file)
+                if page_ranges is None:
+                    page_ranges = [(1, len(reader.pages))]
+                images = set()
+                for page_number in iter_page_numbers(page_ranges):
+                    resources = reader.pages[page_number - 1].get("/Resources")
+                    resources = resources.get_object() if resources is not None else {}
+                    xobjects = resources.get("/XObject")
+                    xobjects = xobjects.get_object() if xobjects is not None else {}
+                    for reference in xobjects.values():
+                        xobject = reference.get_object()
+                        if xobject.get("/Subtype") == "/Image":
+                            images.add(getattr(reference, "idnum", id(xobject)))
+                return len(images)
+    except Exception as e:
+        logger.debug(f"Não foi possível contar as imagens de {file_path}: {str(e)}")
+    return 0
+
+
+# Controlador compartilhado pelos endpoints de processamento
+admission_controller = AdmissionController(
+    capacity=ADMISSION_CAPACITY,
+    max_queue=ADMISSION_MAX_QUEUE,
+    queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+    retry_after=ADMISSION_RETRY_AFTER,
+)
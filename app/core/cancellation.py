@@ -0,0 +1,348 @@
+"""
+Módulo para cancelamento e limites de tempo de processamento.
+
+Este módulo define o CancelToken, que é repassado pelas camadas de processamento
+(DoclingAdapter, ImageExtractor e OCRService) e verificado entre páginas e imagens.
+O token também controla os subprocessos iniciados pelo próprio serviço, encerrando-os
+quando o processamento é cancelado ou excede os limites configurados.
+
+Por si só, o token é cooperativo: o código Python só é interrompido ao chegar a um ponto de
+verificação. Nos workers do pool de processos, hard_limits torna os limites obrigatórios: uma
+thread vigia o token e, ao atingir um limite, encerra os subprocessos de terceiros do worker
+(tesseract, pdftoppm), interrompe o código Python fora dos pontos de verificação (por exemplo,
+uma página patológica no PyPDF2) e, como último recurso, encerra o próprio worker.
+"""
+
+import os
+import time
+import signal
+import logging
+import resource
+import threading
+import subprocess
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional
+
+from app.core.config import CANCEL_POLL_INTERVAL, JOB_KILL_GRACE_SECONDS
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Sinal enviado ao grupo de processos do worker para interromper um processamento: encerra os
+# subprocessos (ação padrão) e é tratado pelo worker, que lança a exceção do limite atingido
+INTERRUPT_SIGNAL = signal.SIGUSR1
+
+# Indica se o processo atual é um worker isolado em um grupo de processos próprio
+_isolated = False
+
+# Exceção a lançar na thread principal quando INTERRUPT_SIGNAL chegar
+_interrupt: Optional[Exception] = None
+_interrupt_lock = threading.Lock()
+
+
+class ProcessingCancelled(Exception):
+    """
+    Exceção lançada quando um processamento é cancelado.
+    """
+
+
+class ProcessingTimeout(ProcessingCancelled):
+    """
+    Exceção lançada quando um processamento excede o limite de tempo ou de CPU.
+    """
+
+
+class CancelToken:
+    """
+    Token de cancelamento com limites de tempo real e de CPU.
+
+    Com process_cpu, o tempo de CPU é o do processo inteiro (todas as threads e os subprocessos
+    já encerrados) desde a criação do token, o que corresponde ao processamento quando o
+    processo executa um único processamento por vez, como os workers do pool. Sem process_cpu,
+    o tempo é acumulado a partir do relógio de CPU da thread que chama check(), entre duas
+    verificações consecutivas na mesma thread.
+
+    Os limites são aplicados quando check() é chamado ou, dentro de hard_limits, pela thread
+    vigia, a cada CANCEL_POLL_INTERVAL segundos.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        cpu_limit: Optional[float] = None,
+        cancel_event: Optional[Any] = None,
+        process_cpu: bool = False,
+    ):
+        """
+        Inicializa o token.
+
+        Args:
+            timeout: Limite de tempo real em segundos (None ou 0 para ilimitado)
+            cpu_limit: Limite de tempo de CPU em segundos (None ou 0 para ilimitado)
+            cancel_event: Evento externo (por exemplo, um evento do Manager do pool de processos)
+                que cancela o token na próxima verificação quando sinalizado
+            process_cpu: Se o tempo de CPU deve ser medido para o processo inteiro
+        """
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.cpu_limit = cpu_limit or None
+        self.cpu_used = 0.0
+        self.reason: Optional[str] = None
+        self.cancel_event = cancel_event
+        self.process_cpu = process_cpu
+        self._cpu_base = process_cpu_time() if process_cpu else 0.0
+
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._processes: List[subprocess.Popen] = []
+        self._cpu_thread: Optional[int] = None
+        self._cpu_mark = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        """Indica se o token foi cancelado."""
+        return self._event.is_set()
+
+    @property
+    def expired(self) -> bool:
+        """Indica se o limite de tempo real foi atingido."""
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def cancel(self, reason: str = "Processamento cancelado") -> None:
+        """
+        Cancela o processamento e encerra os subprocessos registrados.
+
+        Args:
+            reason: Motivo do cancelamento
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self.reason = reason
+                self._event.set()
+                logger.info(f"Processamento cancelado: {reason}")
+            processes = list(self._processes)
+
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+
+    def remaining(self) -> Optional[float]:
+        """
+        Retorna o tempo real restante em segundos.
+
+        Returns:
+            Segundos restantes (mínimo de 0.001) ou None se não houver limite
+        """
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0.001)
+
+    def check(self) -> None:
+        """
+        Verifica se o processamento deve ser interrompido.
+
+        Raises:
+            ProcessingTimeout: Se o limite de tempo real ou de CPU foi excedido
+            ProcessingCancelled: Se o token foi cancelado
+        """
+        error = self.poll()
+        if error is not None:
+            raise error
+
+    def poll(self) -> Optional[ProcessingCancelled]:
+        """
+        Verifica os limites sem lançar exceção, cancelando o token se algum foi atingido.
+
+        Returns:
+            Exceção correspondente ao motivo da interrupção ou None para continuar
+        """
+        if self.expired:
+            self.cancel("Tempo limite de processamento excedido")
+            return ProcessingTimeout(self.reason)
+
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            self.cancel("Processamento cancelado")
+
+        if self.cpu_limit is not None:
+            self._account_cpu()
+            if self.cpu_used >= self.cpu_limit:
+                self.cancel("Limite de tempo de CPU excedido")
+                return ProcessingTimeout(self.reason)
+
+        if self._event.is_set():
+            return ProcessingCancelled(self.reason)
+        return None
+
+    def _account_cpu(self) -> None:
+        """Atualiza o tempo de CPU consumido pelo processamento."""
+        if self.process_cpu:
+            self.cpu_used = process_cpu_time() - self._cpu_base
+            return
+
+        # Tempo da thread atual desde a última verificação na mesma thread
+        thread_id = threading.get_ident()
+        now = time.thread_time()
+        with self._lock:
+            if self._cpu_thread == thread_id:
+                self.cpu_used += now - self._cpu_mark
+            self._cpu_thread = thread_id
+            self._cpu_mark = now
+
+    def run(self, args: List[str], **kwargs) -> subprocess.CompletedProcess:
+        """
+        Executa um subprocesso vinculado ao token.
+
+        O subprocesso é encerrado se o token for cancelado ou se o tempo restante acabar.
+
+        Args:
+            args: Comando e argumentos
+            **kwargs: Argumentos adicionais para subprocess.Popen
+
+        Returns:
+            Resultado do subprocesso (stdout e stderr em bytes)
+
+        Raises:
+            ProcessingTimeout: Se o tempo restante acabar durante a execução
+            ProcessingCancelled: Se o token for cancelado durante a execução
+        """
+        self.check()
+        process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **kwargs)
+        with self._lock:
+            self._processes.append(process)
+
+        try:
+            stdout, stderr = process.communicate(timeout=self.remaining())
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            self.cancel("Tempo limite de processamento excedido")
+            raise ProcessingTimeout(self.reason)
+        finally:
+            with self._lock:
+                self._processes.remove(process)
+
+        # Um processo encerrado por cancel() termina com código negativo
+        self.check()
+        return subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
+
+
+def process_cpu_time() -> float:
+    """
+    Retorna o tempo de CPU do processo atual.
+
+    Returns:
+        Segundos de CPU (usuário e sistema) de todas as threads do processo e dos subprocessos
+        já encerrados
+    """
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def isolate_process_group() -> None:
+    """
+    Coloca o processo atual (um worker do pool) em um grupo de processos próprio.
+
+    Os subprocessos iniciados pelo worker, inclusive os do pytesseract e do pdf2image, herdam
+    o grupo e são encerrados junto com a interrupção de um processamento por hard_limits.
+    Deve ser chamado na thread principal do worker.
+    """
+    global _isolated
+    os.setpgrp()
+    signal.signal(INTERRUPT_SIGNAL, _on_interrupt)
+    _isolated = True
+
+
+def _on_interrupt(signum, frame) -> None:
+    """Lança na thread principal a exceção do processamento interrompido, uma única vez."""
+    global _interrupt
+    error, _interrupt = _interrupt, None
+    if error is not None:
+        raise error
+
+
+@contextmanager
+def hard_limits(token: CancelToken) -> Iterator[CancelToken]:
+    """
+    Aplica o cancelamento e os limites do token durante o bloco, mesmo sem pontos de
+    verificação.
+
+    Uma thread vigia verifica o token a cada CANCEL_POLL_INTERVAL segundos. Quando o token é
+    cancelado ou um limite é atingido, os subprocessos registrados no token são encerrados e,
+    em um worker isolado por isolate_process_group (com o bloco na thread principal), todo o
+    grupo de processos recebe INTERRUPT_SIGNAL: o tesseract e o pdftoppm terminam e o código
+    Python em execução é interrompido com ProcessingTimeout ou ProcessingCancelled. Se o
+    bloco não terminar em JOB_KILL_GRACE_SECONDS (preso em código nativo), o worker é
+    encerrado e o pool de processos o substitui.
+
+    Args:
+        token: Token do processamento
+
+    Yields:
+        O próprio token
+    """
+    global _interrupt
+    done = threading.Event()
+    isolated = _isolated and threading.current_thread() is threading.main_thread()
+    watchdog = threading.Thread(
+        target=_watch, args=(token, done, isolated), name="job-watchdog", daemon=True
+    )
+    watchdog.start()
+    try:
+        yield token
+    finally:
+        # Um sinal que chegue depois daqui é ignorado por _on_interrupt
+        with _interrupt_lock:
+            done.set()
+            _interrupt = None
+        watchdog.join()
+
+
+def _watch(token: CancelToken, done: threading.Event, isolated: bool) -> None:
+    """Verifica o token até o fim do bloco de hard_limits, interrompendo o processamento."""
+    global _interrupt
+    while not done.wait(CANCEL_POLL_INTERVAL):
+        error = token.poll()
+        if error is None:
+            continue
+        if not isolated:
+            return
+
+        with _interrupt_lock:
+            if done.is_set():
+                return
+            _interrupt = error
+            os.killpg(os.getpgrp(), INTERRUPT_SIGNAL)
+
+        if not done.wait(JOB_KILL_GRACE_SECONDS):
+            logger.error(
+                f"Processamento não respondeu à interrupção ({token.reason}); encerrando o worker"
+            )
+            os._exit(1)
+        return
+
+
+def check_cancelled(cancel_token: Optional[CancelToken]) -> None:
+    """
+    Verifica um token opcional.
+
+    Args:
+        cancel_token: Token de cancelamento ou None
+
+    Raises:
+        ProcessingCancelled: Se o token foi cancelado ou excedeu seus limites
+    """
+    if cancel_token is not None:
+        cancel_token.check()
+
+
+def remaining_time(cancel_token: Optional[CancelToken]) -> Optional[float]:
+    """
+    Retorna o tempo restante de um token opcional.
+
+    Args:
+        cancel_token: Token de cancelamento ou None
+
+    Returns:
+        Segundos restantes ou None se não houver limite
+    """
+    return cancel_token.remaining() if cancel_token is not None else None
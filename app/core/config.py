@@ -14,6 +14,90 @@ UPLOAD_DIR = os.getenv("UPLOAD_DIR", os.path.join(BASE_DIR, "uploads"))
 # Diretório para armazenar resultados processados
 RESULTS_DIR = os.getenv("RESULTS_DIR", os.path.join(BASE_DIR, "results"))
 
+# Motor padrão de extração de texto de PDFs (pypdf2, pdftotext, pypdfium2)
+PDF_TEXT_ENGINE = os.getenv("PDF_TEXT_ENGINE", "pypdf2").lower()
+
+# Número de páginas de PDF rasterizadas por chamada ao poppler (limita a memória por lote)
+RENDER_BATCH_PAGES = int(os.getenv("RENDER_BATCH_PAGES", 10))
+
+# Rasterização padrão das páginas de PDF: resolução (DPI), modo de cor (rgb, gray, bilevel),
+# formato da imagem (png, jpeg, webp) e qualidade de compressão para JPEG/WebP (1 a 100)
+RENDER_DPI = int(os.getenv("RENDER_DPI", 200))
+RENDER_COLOR_MODE = os.getenv("RENDER_COLOR_MODE", "rgb").lower()
+RENDER_FORMAT = os.getenv("RENDER_FORMAT", "png").lower()
+RENDER_QUALITY = int(os.getenv("RENDER_QUALITY", 85))
+
+# OCR seletivo (ocr=auto): páginas com menos caracteres visíveis que OCR_AUTO_MIN_CHARS ou com
+# fração de caracteres inválidos acima de OCR_AUTO_MAX_GARBAGE_RATIO são tratadas como digitalizadas
+OCR_AUTO_MIN_CHARS = int(os.getenv("OCR_AUTO_MIN_CHARS", 30))
+OCR_AUTO_MAX_GARBAGE_RATIO = float(os.getenv("OCR_AUTO_MAX_GARBAGE_RATIO", 0.25))
+
+# Motor de OCR: pytesseract (um processo do Tesseract por imagem) ou tesserocr (API C do
+# Tesseract no próprio processo, com um motor por thread e idioma reaproveitado entre imagens)
+OCR_ENGINE = os.getenv("OCR_ENGINE", "pytesseract").lower()
+
+# Idioma automático do OCR (ocr_lang=auto): maior lado, em pixels, da página reduzida usada pelo
+# OSD do Tesseract e idiomas combinados na primeira passagem de OCR de textos em alfabeto latino
+OCR_OSD_MAX_SIDE = int(os.getenv("OCR_OSD_MAX_SIDE", 1200))
+OCR_AUTO_LATIN_LANGS = os.getenv("OCR_AUTO_LATIN_LANGS", "por+eng")
+
+# Pré-processamento das imagens antes do OCR: ativação, etapas aplicadas (grayscale, resample,
+# threshold, deskew, crop) e resolução alvo da etapa resample (imagens maiores são reduzidas)
+OCR_PREPROCESS = os.getenv("OCR_PREPROCESS", "False").lower() in ("true", "1", "t")
+OCR_PREPROCESS_STEPS = os.getenv("OCR_PREPROCESS_STEPS", "grayscale,resample,threshold,deskew,crop")
+OCR_TARGET_DPI = int(os.getenv("OCR_TARGET_DPI", 300))
+
+# Gravar as palavras reconhecidas pelo OCR (texto, posição, confiança e linha) de cada página em
+# formato colunar (.npz), consultáveis por região ou confiança
+OCR_WORD_BOXES = os.getenv("OCR_WORD_BOXES", "False").lower() in ("true", "1", "t")
+
+# Cache persistente de resultados de OCR (SQLite), indexado pelo SHA-256 da imagem e pelos
+# parâmetros do OCR: ativação, caminho do banco e tamanho máximo dos resultados (bytes)
+OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "True").lower() in ("true", "1", "t")
+OCR_CACHE_PATH = os.getenv("OCR_CACHE_PATH", os.path.join(BASE_DIR, "cache", "ocr.sqlite3"))
+OCR_CACHE_MAX_BYTES = int(os.getenv("OCR_CACHE_MAX_BYTES", 128 * 1024 * 1024))
+
+# Miniaturas de páginas geradas sob demanda: diretório e tamanho máximo do cache (bytes),
+# largura padrão e máxima (pixels), formato (jpeg ou png) e validade informada no Cache-Control
+THUMBNAIL_CACHE_DIR = os.getenv("THUMBNAIL_CACHE_DIR", os.path.join(BASE_DIR, "cache", "thumbnails"))
+THUMBNAIL_CACHE_MAX_BYTES = int(os.getenv("THUMBNAIL_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+THUMBNAIL_DEFAULT_WIDTH = int(os.getenv("THUMBNAIL_DEFAULT_WIDTH", 200))
+THUMBNAIL_MAX_WIDTH = int(os.getenv("THUMBNAIL_MAX_WIDTH", 1200))
+THUMBNAIL_FORMAT = os.getenv("THUMBNAIL_FORMAT", "jpeg").lower()
+THUMBNAIL_MAX_AGE = int(os.getenv("THUMBNAIL_MAX_AGE", 7 * 24 * 3600))
+
+# Limites por processamento: tempo real e tempo de CPU em segundos (0 desativa o limite)
+JOB_TIMEOUT_SECONDS = float(os.getenv("JOB_TIMEOUT_SECONDS", 600))
+JOB_CPU_LIMIT_SECONDS = float(os.getenv("JOB_CPU_LIMIT_SECONDS", 300))
+
+# Intervalo em segundos para verificar se o cliente de um processamento se desconectou
+CANCEL_POLL_INTERVAL = float(os.getenv("CANCEL_POLL_INTERVAL", 0.5))
+
+# Tempo em segundos para um processamento interrompido terminar antes de o worker ser encerrado
+JOB_KILL_GRACE_SECONDS = float(os.getenv("JOB_KILL_GRACE_SECONDS", 10))
+
+# Controle de admissão: capacidade em unidades de custo, tamanho da fila de espera,
+# tempo máximo de espera na fila e duração estimada inicial de um processamento (segundos)
+ADMISSION_CAPACITY = float(os.getenv("ADMISSION_CAPACITY", (os.cpu_count() or 1) * 4))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", 16))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 30))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", 5))
+
+# Pool de processos compartilhado pelos processamentos: número de processos e método de início
+# ("spawn" ou "forkserver"; "fork" copiaria o estado do servidor, que tem várias threads)
+WORKER_POOL_SIZE = int(os.getenv("WORKER_POOL_SIZE", os.cpu_count() or 1))
+WORKER_START_METHOD = os.getenv("WORKER_START_METHOD", "spawn").lower()
+
+# Processamento em lote: documentos de um lote processados ao mesmo tempo, número máximo de documentos e tamanho máximo
+# descompactado dos arquivos ZIP/TAR enviados
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", os.cpu_count() or 1))
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", 5000))
+BATCH_MAX_ARCHIVE_BYTES = int(os.getenv("BATCH_MAX_ARCHIVE_BYTES", 2 * 1024 * 1024 * 1024))
+# Tamanho máximo de cada documento de um arquivo compactado, lido inteiramente para a memória
+BATCH_MAX_MEMBER_BYTES = int(os.getenv("BATCH_MAX_MEMBER_BYTES", 256 * 1024 * 1024))
+# Tamanho máximo de um documento do lote mantido em memória antes de ir para o disco temporário
+BATCH_SPOOL_MAX_BYTES = int(os.getenv("BATCH_SPOOL_MAX_BYTES", 32 * 1024 * 1024))
+
 # Configurações da API
 API_PREFIX = "/api"
 API_VERSION = "v1"
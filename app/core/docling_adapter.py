@@ -6,23 +6,147 @@ isolando o código da aplicação das dependências externas e facilitando teste
 """
 
 import os
+import re
 import tempfile
 import io
 import uuid
+import shutil
+import zipfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Any
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union, Any
 
 # Bibliotecas para processamento de documentos
-import docx
 import PyPDF2
 import pandas as pd
 import openpyxl
 import markdown
+from lxml import etree
 from PIL import Image
 
 # Importar serviço de imagens
 from app.services.image_service import ImageExtractor
+from app.services.ocr_words import words_directory
 from app.core.config import RESULTS_DIR
+from app.core import docx_stream, pdf_text, pptx_package
+from app.core.cancellation import CancelToken, ProcessingCancelled
+from app.core.page_ranges import count_selected_pages, parse_page_ranges, resolve_page_ranges
+
+
+# Marcação de título no início de um bloco de markdown ("# ", "## ", ...)
+_HEADING_MARK = re.compile(r"^#{1,6} ")
+
+
+def record_to_markdown(record: Dict[str, Any]) -> str:
+    """
+    Converte um registro de texto do pipeline no trecho de markdown correspondente.
+
+    Args:
+        record: Registro do tipo "page", "paragraph", "sheet" ou "slide"
+
+    Returns:
+        Trecho de markdown terminado em linha em branco (vazio para outros tipos)
+    """
+    if record["type"] == "page":
+        return record["text"] + "\n\n"
+    if record["type"] == "paragraph":
+        if record.get("level"):
+            return "#" * record["level"] + " " + record["text"] + "\n\n"
+        return record["text"] + "\n\n"
+    if record["type"] == "sheet":
+        return record["text"]
+    if record["type"] == "slide":
+        heading = record.get("title") or f"Slide {record['page']}"
+        body = record["text"] + "\n\n" if record["text"] else ""
+        return "## " + heading + "\n\n" + body
+    return ""
+
+
+def markdown_to_html(md_text: str, file_type: str) -> str:
+    """
+    Gera o HTML a partir do markdown canônico de um documento.
+
+    O markdown de DOCX e PPTX tem títulos e é convertido pela biblioteca markdown; o de PDF e
+    planilhas é texto simples e vai para um bloco <pre>.
+
+    Args:
+        md_text: Conteúdo em markdown
+        file_type: Tipo do arquivo de origem (pdf, docx, pptx, xlsx)
+
+    Returns:
+        Conteúdo em HTML
+    """
+    if file_type in ("docx", "pptx"):
+        return markdown.markdown(md_text)
+    return f"<pre>{md_text}</pre>"
+
+
+def markdown_to_text(md_text: str, file_type: str) -> str:
+    """
+    Gera o texto simples a partir do markdown canônico de um documento.
+
+    No markdown de DOCX e PPTX, cada parágrafo, título ou slide é um bloco separado por linha em
+    branco; o texto tem um bloco por linha, sem a marcação dos títulos. O markdown de PDF e
+    planilhas já é texto simples e é retornado sem alteração.
+
+    Args:
+        md_text: Conteúdo em markdown
+        file_type: Tipo do arquivo de origem (pdf, docx, pptx, xlsx)
+
+    Returns:
+        Conteúdo em texto simples
+    """
+    if file_type not in ("docx", "pptx"):
+        return md_text
+    blocks = (block for block in md_text.split("\n\n") if block)
+    return "\n".join(_HEADING_MARK.sub("", block, count=1) for block in blocks)
+
+
+@contextmanager
+def _open_source(file_path: str, file_obj: Optional[BinaryIO] = None) -> Iterator[BinaryIO]:
+    """
+    Abre o documento para leitura binária, reaproveitando o objeto de arquivo se houver.
+
+    Args:
+        file_path: Caminho do documento
+        file_obj: Objeto de arquivo com o conteúdo (não é fechado ao final)
+
+    Yields:
+        Objeto de arquivo posicionado no início
+    """
+    if file_obj is None:
+        with open(file_path, "rb") as file:
+            yield file
+    else:
+        file_obj.seek(0)
+        yield file_obj
+
+
+@contextmanager
+def _materialized(file_path: str, file_obj: Optional[BinaryIO] = None) -> Iterator[str]:
+    """
+    Garante um caminho no sistema de arquivos para ferramentas externas (poppler, pdftotext).
+
+    Sem objeto de arquivo, o próprio file_path é usado. Com objeto de arquivo, o conteúdo é
+    copiado para um arquivo temporário anônimo do sistema (fora de UPLOAD_DIR), removido ao final.
+
+    Args:
+        file_path: Caminho ou nome do documento (define a extensão do arquivo temporário)
+        file_obj: Objeto de arquivo com o conteúdo
+
+    Yields:
+        Caminho do documento
+    """
+    if file_obj is None:
+        yield file_path
+        return
+
+    suffix = os.path.splitext(file_path)[1]
+    with tempfile.NamedTemporaryFile(prefix="docling_", suffix=suffix) as temp_file:
+        file_obj.seek(0)
+        shutil.copyfileobj(file_obj, temp_file)
+        temp_file.flush()
+        yield temp_file.name
 
 
 class DoclingAdapter:
@@ -52,6 +176,14 @@ class DoclingAdapter:
         extract_pages_as_images: bool = False,
         apply_ocr: bool = False,
         ocr_lang: str = "por",
+        pdf_text_engine: Optional[str] = None,
+        cancel_token: Optional[CancelToken] = None,
+        file_obj: Optional[BinaryIO] = None,
+        pages: Optional[str] = None,
+        render_options: Optional[Dict[str, Any]] = None,
+        ocr_mode: Optional[str] = None,
+        document_id: Optional[str] = None,
+        results_dir: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Processa um documento usando bibliotecas específicas para cada tipo de arquivo.
@@ -64,13 +196,30 @@ class DoclingAdapter:
             extract_pages_as_images: Se deve converter páginas inteiras em imagens (apenas para PDF)
             apply_ocr: Se deve aplicar OCR nas imagens extraídas
             ocr_lang: Idioma para OCR (por=português, eng=inglês, auto=detecção automática)
+            pdf_text_engine: Motor de extração de texto de PDFs (pypdf2, pdftotext, pypdfium2).
+                Se None, usa o motor configurado em PDF_TEXT_ENGINE
+            cancel_token: Token verificado entre páginas e imagens para cancelar o processamento
+            file_obj: Conteúdo do documento em um objeto de arquivo (por exemplo, um membro de
+                um ZIP/TAR em memória); quando informado, file_path é usado apenas como nome
+            pages: Páginas a processar, como "1-5,10" (apenas para PDF; None para todas)
+            render_options: Opções de rasterização das páginas (DPI, modo de cor, formato e
+                qualidade; ver image_service.build_render_options)
+            ocr_mode: "auto" para aplicar OCR apenas às páginas de PDF sem camada de texto
+                aproveitável, substituindo o texto extraído pelo reconhecido (None desativa)
+            document_id: ID do documento, que define o diretório dos arquivos gerados (imagens,
+                texto e palavras do OCR); padrão: um UUID novo
+            results_dir: Diretório raiz dos resultados (padrão: RESULTS_DIR)
 
         Returns:
             Dicionário com os resultados do processamento
+
+        Raises:
+            ProcessingCancelled: Se o processamento for cancelado ou exceder seus limites
         """
         try:
             file_path = str(file_path)  # Converter Path para string se necessário
             file_extension = os.path.splitext(file_path)[1].lower()
+            document_id = document_id or str(uuid.uuid4())
 
             # Inicializar resultado
             processing_result = {
@@ -83,22 +232,42 @@ class DoclingAdapter:
             if file_extension == ".pdf":
                 self._process_pdf(
                     file_path, processing_result, extract_text, extract_tables, extract_images, extract_pages_as_images,
-                    apply_ocr, ocr_lang
+                    apply_ocr, ocr_lang, pdf_text_engine, cancel_token=cancel_token, file_obj=file_obj,
+                    pages=pages, render_options=render_options, ocr_mode=ocr_mode,
+                    document_id=document_id, results_dir=results_dir,
                 )
             elif file_extension == ".docx":
                 self._process_docx(
                     file_path, processing_result, extract_text, extract_tables, extract_images,
-                    apply_ocr, ocr_lang
+                    apply_ocr, ocr_lang, cancel_token=cancel_token, file_obj=file_obj,
+                    document_id=document_id, results_dir=results_dir,
+                )
+            elif file_extension == ".pptx":
+                self._process_pptx(
+                    file_path, processing_result, extract_text, extract_tables, extract_images,
+                    apply_ocr, ocr_lang, cancel_token=cancel_token, file_obj=file_obj,
+                    document_id=document_id, results_dir=results_dir,
                 )
             elif file_extension in [".xlsx", ".xls"]:
-                self._process_excel(file_path, processing_result, extract_text, extract_tables)
+                self._process_excel(
+                    file_path, processing_result, extract_text, extract_tables,
+                    cancel_token=cancel_token, file_obj=file_obj,
+                )
             else:
                 processing_result["status"] = "error"
                 processing_result["message"] = f"Formato de arquivo não suportado: {file_extension}"
                 return processing_result
 
+            # Texto simples derivado do markdown (para PDF e planilhas, o mesmo objeto)
+            md_text = processing_result["content"].get("markdown")
+            if md_text is not None:
+                processing_result["content"]["text"] = markdown_to_text(md_text, file_extension[1:])
+
             return processing_result
 
+        except ProcessingCancelled:
+            # O cancelamento é tratado por quem iniciou o processamento
+            raise
         except Exception as e:
             # Registrar erro e retornar informações sobre a falha
             return {
@@ -107,7 +276,115 @@ class DoclingAdapter:
                 "content": None,
             }
 
-    def _process_pdf(self, file_path, result, extract_text, extract_tables, extract_images, extract_pages_as_images=False, apply_ocr=False, ocr_lang="por"):
+    def iter_records(
+        self,
+        file_path: Union[str, Path],
+        document_id: str,
+        extract_text: bool = True,
+        extract_tables: bool = True,
+        extract_images: bool = False,
+        extract_pages_as_images: bool = False,
+        apply_ocr: bool = False,
+        ocr_lang: str = "por",
+        pdf_text_engine: Optional[str] = None,
+        cancel_token: Optional[CancelToken] = None,
+        file_obj: Optional[BinaryIO] = None,
+        pages: Optional[str] = None,
+        render_options: Optional[Dict[str, Any]] = None,
+        ocr_mode: Optional[str] = None,
+        results_dir: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Processa um documento como um pipeline de registros tipados.
+
+        Cada backend gera um registro por unidade concluída (página, parágrafo, tabela, planilha
+        ou imagem). O OCR é aplicado como um estágio seguinte sobre os registros de imagem, e a
+        montagem da resposta JSON e a gravação em disco são consumidores desse mesmo fluxo. O
+        consumidor pode interromper o processamento a qualquer momento fechando o gerador.
+
+        Args:
+            file_path: Caminho para o arquivo a ser processado
+            document_id: ID do documento (define o diretório das imagens)
+            extract_text: Se deve extrair texto do documento
+            extract_tables: Se deve extrair tabelas do documento
+            extract_images: Se deve extrair imagens incorporadas do documento
+            extract_pages_as_images: Se deve converter páginas inteiras em imagens (apenas para PDF)
+            apply_ocr: Se deve aplicar OCR nas imagens extraídas
+            ocr_lang: Idioma para OCR (por=português, eng=inglês, auto=detecção automática)
+            pdf_text_engine: Motor de extração de texto de PDFs (pypdf2, pdftotext, pypdfium2)
+            cancel_token: Token verificado entre os registros para cancelar o processamento
+            file_obj: Conteúdo do documento em um objeto de arquivo; quando informado,
+                file_path é usado apenas como nome
+            pages: Páginas a processar, como "1-5,10" (apenas para PDF; None para todas)
+            render_options: Opções de rasterização das páginas (DPI, modo de cor, formato e
+                qualidade; ver image_service.build_render_options)
+            ocr_mode: "auto" para aplicar OCR apenas às páginas de PDF sem camada de texto
+                aproveitável, substituindo o texto extraído pelo reconhecido (None desativa)
+            results_dir: Diretório raiz dos resultados (padrão: RESULTS_DIR)
+
+        Yields:
+            Registros com a chave "type" igual a "metadata", "page", "paragraph", "sheet",
+            "slide", "table", "image" ou "error"
+
+        Raises:
+            ValueError: Se o formato do arquivo não for suportado
+            ProcessingCancelled: Durante a iteração, se o processamento for cancelado
+        """
+        file_path = str(file_path)
+        file_extension = os.path.splitext(file_path)[1].lower()
+
+        # Com ocr_lang="auto", o idioma é detectado uma única vez e vale para todo o documento
+        ocr_lang = self._language_selector(ocr_lang)
+
+        if file_extension == ".pdf":
+            records = self.iter_pdf_records(
+                file_path, document_id, extract_text, extract_images, extract_pages_as_images,
+                pdf_text_engine=pdf_text_engine, cancel_token=cancel_token, file_obj=file_obj,
+                pages=pages, render_options=render_options, ocr_mode=ocr_mode, ocr_lang=ocr_lang,
+                results_dir=results_dir,
+            )
+        elif file_extension == ".docx":
+            records = self.iter_docx_records(
+                file_path, document_id, extract_text, extract_tables, extract_images,
+                cancel_token=cancel_token, file_obj=file_obj, results_dir=results_dir,
+            )
+        elif file_extension == ".pptx":
+            records = self.iter_pptx_records(
+                file_path, document_id, extract_text, extract_tables, extract_images,
+                cancel_token=cancel_token, file_obj=file_obj, results_dir=results_dir,
+            )
+        elif file_extension in [".xlsx", ".xls"]:
+            records = self.iter_excel_records(file_path, extract_text, extract_tables, file_obj=file_obj)
+        else:
+            raise ValueError(f"Formato de arquivo não suportado: {file_extension}")
+
+        if extract_images and apply_ocr:
+            records = self._ocr_stage(records, ocr_lang, cancel_token)
+
+        if cancel_token is not None:
+            records = self._cancellation_stage(records, cancel_token)
+
+        return records
+
+    def _process_pdf(
+        self,
+        file_path,
+        result,
+        extract_text,
+        extract_tables,
+        extract_images,
+        extract_pages_as_images=False,
+        apply_ocr=False,
+        ocr_lang="por",
+        pdf_text_engine=None,
+        cancel_token=None,
+        file_obj=None,
+        pages=None,
+        render_options=None,
+        ocr_mode=None,
+        document_id=None,
+        results_dir=None,
+    ):
         """
         Processa um arquivo PDF.
 
@@ -120,255 +397,631 @@ class DoclingAdapter:
             extract_pages_as_images: Se deve converter páginas inteiras em imagens
             apply_ocr: Se deve aplicar OCR nas imagens extraídas
             ocr_lang: Idioma para OCR (por=português, eng=inglês, auto=detecção automática)
+            pdf_text_engine: Motor de extração de texto (pypdf2, pdftotext, pypdfium2)
+            cancel_token: Token de cancelamento verificado entre páginas e imagens
+            file_obj: Conteúdo do PDF em um objeto de arquivo (opcional)
+            pages: Páginas a processar, como "1-5,10" (None para todas)
+            render_options: Opções de rasterização das páginas (opcional)
+            ocr_mode: "auto" para aplicar OCR apenas às páginas sem camada de texto (opcional)
+            document_id: ID do documento (padrão: um UUID novo)
+            results_dir: Diretório raiz dos resultados (padrão: RESULTS_DIR)
         """
-        with open(file_path, "rb") as file:
-            pdf_reader = PyPDF2.PdfReader(file)
+        document_id = document_id or str(uuid.uuid4())
+        ocr_lang = self._language_selector(ocr_lang)
+        records = self.iter_pdf_records(
+            file_path, document_id, extract_text, extract_images, extract_pages_as_images,
+            pdf_text_engine=pdf_text_engine, cancel_token=cancel_token, file_obj=file_obj,
+            pages=pages, render_options=render_options, ocr_mode=ocr_mode, ocr_lang=ocr_lang,
+            results_dir=results_dir,
+        )
+        if extract_images and apply_ocr:
+            records = self._ocr_stage(records, ocr_lang, cancel_token)
+        if cancel_token is not None:
+            records = self._cancellation_stage(records, cancel_token)
+
+        self._collect_records(records, result, extract_text, extract_images)
+
+    def _process_docx(
+        self,
+        file_path,
+        result,
+        extract_text,
+        extract_tables,
+        extract_images,
+        apply_ocr=False,
+        ocr_lang="por",
+        cancel_token=None,
+        file_obj=None,
+        document_id=None,
+        results_dir=None,
+    ):
+        """Processa um arquivo DOCX."""
+        document_id = document_id or str(uuid.uuid4())
+        records = self.iter_docx_records(
+            file_path, document_id, extract_text, extract_tables, extract_images,
+            cancel_token=cancel_token, file_obj=file_obj, results_dir=results_dir,
+        )
+        if extract_images and apply_ocr:
+            records = self._ocr_stage(records, self._language_selector(ocr_lang), cancel_token)
+        if cancel_token is not None:
+            records = self._cancellation_stage(records, cancel_token)
+
+        self._collect_records(records, result, extract_text, extract_images)
+
+    def _process_pptx(
+        self,
+        file_path,
+        result,
+        extract_text,
+        extract_tables,
+        extract_images,
+        apply_ocr=False,
+        ocr_lang="por",
+        cancel_token=None,
+        file_obj=None,
+        document_id=None,
+        results_dir=None,
+    ):
+        """Processa uma apresentação PPTX."""
+        document_id = document_id or str(uuid.uuid4())
+        records = self.iter_pptx_records(
+            file_path, document_id, extract_text, extract_tables, extract_images,
+            cancel_token=cancel_token, file_obj=file_obj, results_dir=results_dir,
+        )
+        if extract_images and apply_ocr:
+            records = self._ocr_stage(records, self._language_selector(ocr_lang), cancel_token)
+        if cancel_token is not None:
+            records = self._cancellation_stage(records, cancel_token)
+
+        self._collect_records(records, result, extract_text, extract_images)
+
+    def _process_excel(self, file_path, result, extract_text, extract_tables, cancel_token=None, file_obj=None):
+        """Processa um arquivo Excel."""
+        records = self.iter_excel_records(file_path, extract_text, extract_tables, file_obj=file_obj)
+        if cancel_token is not None:
+            records = self._cancellation_stage(records, cancel_token)
 
-            # Extrair texto
-            if extract_text:
-                text = ""
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    text += page.extract_text() + "\n\n"
+        self._collect_records(records, result, extract_text, False)
 
-                result["content"]["text"] = text
-                result["content"]["markdown"] = text  # Texto simples como markdown
-                result["content"]["html"] = f"<pre>{text}</pre>"  # Texto simples como HTML
+    def _collect_records(self, records, result, extract_text, extract_images):
+        """
+        Agrega os registros do pipeline no dicionário de resultado da resposta JSON.
 
-            # Extrair imagens
-            if extract_images:
-                print("Iniciando extração de imagens...")
-
-                # Verificar se result é None
-                if result is None:
-                    print("ERRO: result é None!")
-                    return
-
-                # Verificar se content existe
-                if "content" not in result:
-                    print("ERRO: 'content' não existe em result!")
-                    result["content"] = {}
-
-                document_id = result.get("id", str(uuid.uuid4()))
-                print(f"ID do documento: {document_id}")
-
-                # Garantir que o diretório de imagens exista
-                images_dir = os.path.join(RESULTS_DIR, document_id, "images")
-                print(f"Diretório de imagens: {images_dir}")
-                os.makedirs(images_dir, exist_ok=True)
-
-                # Garantir que metadata existe
-                if "metadata" not in result:
-                    print("Criando dicionário metadata")
-                    result["metadata"] = {}
-
-                # Verificar se o extrator de imagens está inicializado
-                if self.image_extractor is None:
-                    print("Erro: ImageExtractor não está inicializado")
-                    result["metadata"]["image_extraction_error"] = "Extrator de imagens não inicializado"
-                    return
-
-                try:
-                    print(f"Chamando extract_from_pdf com extract_pages={extract_pages_as_images}")
-                    images_result = self.image_extractor.extract_images(
-                        file_path=file_path,
-                        document_id=document_id,
-                        extract_pages=extract_pages_as_images,
-                        apply_ocr=apply_ocr,
-                        ocr_lang=ocr_lang
-                    )
-
-                    print(f"Resultado da extração: {images_result}")
-
-                    if images_result.get("success"):
-                        print("Extração bem-sucedida")
-                        result["content"]["images"] = images_result.get("images", [])
-                        result["metadata"]["image_count"] = len(images_result.get("images", []))
-                        print(f"Número de imagens extraídas: {result['metadata']['image_count']}")
-                    else:
-                        print(f"Extração falhou: {images_result.get('error', 'Erro desconhecido')}")
-                        result["metadata"]["image_extraction_error"] = images_result.get("error", "Erro desconhecido")
-                except Exception as e:
-                    print(f"Erro ao extrair imagens: {str(e)}")
-                    print(f"Tipo de erro: {type(e)}")
-                    print(f"Erro detalhado: {repr(e)}")
-                    import traceback
-                    traceback.print_exc()
-                    result["metadata"]["image_extraction_error"] = f"Erro ao extrair imagens: {str(e)}"
-
-            # Metadados
-            if "metadata" not in result:
-                result["metadata"] = {}
-
-            result["metadata"].update({
-                "pages": len(pdf_reader.pages),
+        Args:
+            records: Registros gerados por iter_records
+            result: Dicionário para armazenar os resultados
+            extract_text: Se o texto foi extraído
+            extract_images: Se as imagens foram extraídas
+        """
+        # Garantir que metadata existe
+        if "metadata" not in result:
+            result["metadata"] = {}
+
+        md_text = ""
+        tables = []
+        images = []
+        image_error = None
+        ocr_pages = []
+
+        for record in records:
+            record_type = record["type"]
+            if record_type == "metadata":
+                result["metadata"].update({k: v for k, v in record.items() if k != "type"})
+            elif record_type in ("page", "paragraph", "sheet", "slide"):
+                if record.get("text_source") == "ocr":
+                    ocr_pages.append(record["page"])
+                md_text += record_to_markdown(record)
+            elif record_type == "table":
+                tables.append(record["table"])
+            elif record_type == "image":
+                images.append(record["image"])
+            elif record_type == "error":
+                image_error = record["message"]
+
+        # Extrair texto: apenas o markdown é guardado; o HTML é gerado sob demanda
+        # (markdown_to_html) e, para PDF e planilhas, o markdown já é o próprio texto
+        if extract_text:
+            result["content"]["markdown"] = md_text
+
+        # Páginas cujo texto veio do OCR seletivo
+        if ocr_pages:
+            result["metadata"]["ocr_pages"] = ocr_pages
+
+        # Extrair tabelas
+        if tables:
+            result["content"]["tables"] = tables
+
+        # Extrair imagens
+        if extract_images:
+            if image_error is None:
+                result["content"]["images"] = images
+                result["metadata"]["image_count"] = len(images)
+            else:
+                print(f"Extração de imagens falhou: {image_error}")
+                result["metadata"]["image_extraction_error"] = image_error
+
+    def iter_pdf_records(
+        self,
+        file_path: Union[str, Path],
+        document_id: str,
+        extract_text: bool = True,
+        extract_images: bool = False,
+        extract_pages_as_images: bool = False,
+        pdf_text_engine: Optional[str] = None,
+        cancel_token: Optional[CancelToken] = None,
+        file_obj: Optional[BinaryIO] = None,
+        pages: Optional[str] = None,
+        render_options: Optional[Dict[str, Any]] = None,
+        ocr_mode: Optional[str] = None,
+        ocr_lang: str = "por",
+        results_dir: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Processa um PDF página a página, gerando um registro para cada unidade concluída.
+
+        O primeiro registro traz os metadados do documento. Em seguida são gerados os registros
+        de texto de cada página, intercalados com as imagens da página assim que elas ficam
+        prontas. Falhas na extração de imagens são reportadas como um registro do tipo "error"
+        sem interromper a extração de texto.
+
+        Args:
+            file_path: Caminho para o arquivo PDF
+            document_id: ID do documento (define o diretório das imagens)
+            extract_text: Se deve extrair texto
+            extract_images: Se deve extrair imagens incorporadas
+            extract_pages_as_images: Se deve converter páginas inteiras em imagens
+            pdf_text_engine: Motor de extração de texto (pypdf2, pdftotext, pypdfium2)
+            cancel_token: Token que limita os subprocessos do poppler
+            file_obj: Conteúdo do PDF em um objeto de arquivo (opcional). O PyPDF2 lê direto
+                dele; uma cópia temporária só é criada para o poppler e o pdfium
+            pages: Páginas a processar, como "1-5,10" (None para todas). Texto, rasterização
+                e OCR ficam restritos às páginas selecionadas
+            render_options: Opções de rasterização das páginas (DPI, modo de cor, formato e
+                qualidade; ver image_service.build_render_options)
+            ocr_mode: "auto" para aplicar OCR apenas às páginas sem camada de texto aproveitável
+            ocr_lang: Idioma do OCR seletivo (ou "auto" para detecção automática)
+            results_dir: Diretório raiz dos resultados (padrão: RESULTS_DIR)
+
+        Yields:
+            Registros com a chave "type" igual a "metadata", "page", "image" ou "error". No
+            modo ocr_mode="auto", as páginas reconhecidas por OCR trazem text_source="ocr"
+
+        Raises:
+            ValueError: Se a expressão de páginas for inválida
+        """
+        file_path = str(file_path)
+        page_selection = parse_page_ranges(pages)
+        engine = pdf_text.resolve_engine(pdf_text_engine) if extract_text else None
+
+        # Ferramentas externas exigem um caminho; o PyPDF2 lê do próprio objeto de arquivo
+        auto_ocr = extract_text and ocr_mode == "auto"
+        needs_path = extract_images or auto_ocr or engine in ("pdftotext", "pypdfium2")
+
+        with _materialized(file_path, file_obj if needs_path else None) as source_path, \
+                _open_source(source_path, None if needs_path else file_obj) as file:
+            file_path = source_path
+            pdf_reader = PyPDF2.PdfReader(file)
+            page_count = _pdf_page_count(pdf_reader)
+            page_ranges = (
+                resolve_page_ranges(page_selection, page_count) if page_selection is not None else None
+            )
+
+            metadata = {
+                "type": "metadata",
+                "pages": page_count,
                 "title": (
                     pdf_reader.metadata.title
                     if pdf_reader.metadata and hasattr(pdf_reader.metadata, "title")
                     else "Sem título"
                 ),
-            })
+            }
+            if engine:
+                metadata["pdf_text_engine"] = engine
+            if page_ranges is not None:
+                metadata["page_selection"] = pages
+                metadata["selected_pages"] = count_selected_pages(page_ranges)
+            if auto_ocr:
+                metadata["ocr_mode"] = "auto"
+            yield metadata
 
-    def _process_docx(self, file_path, result, extract_text, extract_tables, extract_images, apply_ocr=False, ocr_lang="por"):
-        """Processa um arquivo DOCX."""
-        doc = docx.Document(file_path)
+            if extract_images:
+                images = self._iter_image_records(
+                    file_path, document_id, extract_pages_as_images, cancel_token, page_ranges,
+                    render_options, results_dir,
+                )
+            else:
+                images = iter(())
 
-        # Extrair texto
-        if extract_text:
-            text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-            result["content"]["text"] = text
-
-            # Converter para markdown (texto simples com formatação básica)
-            md_text = ""
-            for para in doc.paragraphs:
-                if para.style.name.startswith("Heading"):
-                    level = int(para.style.name.replace("Heading", ""))
-                    md_text += "#" * level + " " + para.text + "\n\n"
-                else:
-                    md_text += para.text + "\n\n"
+            # Registro de imagem lido antecipadamente e ainda não entregue
+            pending = None
 
-            result["content"]["markdown"] = md_text
-            result["content"]["html"] = markdown.markdown(md_text)
+            if extract_text:
+                for page_number, page_text in pdf_text.iter_page_texts(
+                    file_path, engine, pdf_reader, cancel_token, page_ranges
+                ):
+                    record = {"type": "page", "page": page_number, "text": page_text}
+                    if auto_ocr:
+                        self._auto_ocr_page(
+                            file_path, record, ocr_lang, render_options, cancel_token, document_id, results_dir
+                        )
+                    yield record
+
+                    # Entregar as imagens que pertencem às páginas já concluídas
+                    while True:
+                        if pending is None:
+                            pending = next(images, None)
+                        if pending is None or (pending.get("page") or 0) > page_number:
+                            break
+                        yield pending
+                        pending = None
+
+            if pending is not None:
+                yield pending
+            yield from images
+
+    def iter_docx_records(
+        self,
+        file_path: Union[str, Path],
+        document_id: str,
+        extract_text: bool = True,
+        extract_tables: bool = True,
+        extract_images: bool = False,
+        cancel_token: Optional[CancelToken] = None,
+        file_obj: Optional[BinaryIO] = None,
+        results_dir: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Processa um DOCX gerando um registro por parágrafo, tabela e imagem.
 
-        # Extrair tabelas
-        if extract_tables and doc.tables:
-            tables = []
-            for i, table in enumerate(doc.tables):
-                table_data = []
-                for row in table.rows:
-                    row_data = [cell.text for cell in row.cells]
-                    table_data.append(row_data)
-                tables.append({"page": 1, "data": table_data})  # DOCX não tem conceito de página
+        O documento é lido em fluxo (ver docx_stream): parágrafos e tabelas são gerados na ordem
+        do documento, em uma única passagem por word/document.xml, sem carregar a árvore inteira.
 
-            result["content"]["tables"] = tables
+        Args:
+            file_path: Caminho para o arquivo DOCX
+            document_id: ID do documento (define o diretório das imagens)
+            extract_text: Se deve extrair texto
+            extract_tables: Se deve extrair tabelas
+            extract_images: Se deve extrair imagens incorporadas
+            cancel_token: Token repassado à extração de imagens
+            file_obj: Conteúdo do DOCX em um objeto de arquivo (opcional)
+            results_dir: Diretório raiz dos resultados (padrão: RESULTS_DIR)
+
+        Yields:
+            Registros com a chave "type" igual a "metadata", "paragraph", "table", "image" ou "error"
+        """
+        file_path = str(file_path)
+
+        with _open_source(file_path, file_obj) as file, zipfile.ZipFile(file) as package:
+            properties: Dict[str, Any] = {}
+            _read_package_properties(package, properties, ())
+            yield {
+                "type": "metadata",
+                "title": properties.get("title", "Sem título"),
+                "pages": 1,  # DOCX não tem conceito de página
+            }
+
+            # Parágrafos e tabelas em uma única passagem por word/document.xml
+            if extract_text or extract_tables:
+                index = 0
+                for block in docx_stream.iter_blocks(package, include_tables=extract_tables):
+                    if block["type"] == "paragraph":
+                        if extract_text:
+                            yield {"type": "paragraph", "index": index, "text": block["text"], "level": block["level"]}
+                        index += 1
+                    else:
+                        # DOCX não tem conceito de página
+                        yield {"type": "table", "table": {"page": 1, "data": block["rows"]}}
 
         # Extrair imagens
         if extract_images:
-            document_id = result.get("id", str(uuid.uuid4()))
+            with _materialized(file_path, file_obj) as source_path:
+                yield from self._iter_image_records(
+                    source_path, document_id, False, cancel_token, results_dir=results_dir
+                )
 
-            # Garantir que o diretório de imagens exista
-            images_dir = os.path.join(RESULTS_DIR, document_id, "images")
-            os.makedirs(images_dir, exist_ok=True)
+    def iter_pptx_records(
+        self,
+        file_path: Union[str, Path],
+        document_id: str,
+        extract_text: bool = True,
+        extract_tables: bool = True,
+        extract_images: bool = False,
+        cancel_token: Optional[CancelToken] = None,
+        file_obj: Optional[BinaryIO] = None,
+        results_dir: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Processa uma apresentação PPTX gerando um registro por slide, tabela e imagem.
+
+        Os slides são lidos em ordem diretamente do pacote (ver pptx_package), sem renderização.
+        As imagens vêm das partes ppt/media/* e trazem o número do primeiro slide que as usa.
 
-            # Garantir que metadata existe
-            if "metadata" not in result:
-                result["metadata"] = {}
+        Args:
+            file_path: Caminho para o arquivo PPTX
+            document_id: ID do documento (define o diretório das imagens)
+            extract_text: Se deve extrair texto
+            extract_tables: Se deve extrair tabelas
+            extract_images: Se deve extrair imagens incorporadas
+            cancel_token: Token repassado à extração de imagens
+            file_obj: Conteúdo do PPTX em um objeto de arquivo (opcional)
+            results_dir: Diretório raiz dos resultados (padrão: RESULTS_DIR)
 
-            # Verificar se o extrator de imagens está inicializado
-            if self.image_extractor is None:
-                print("Erro: ImageExtractor não está inicializado")
-                result["metadata"]["image_extraction_error"] = "Extrator de imagens não inicializado"
-                return
+        Yields:
+            Registros com a chave "type" igual a "metadata", "slide", "table", "image" ou "error"
+        """
+        file_path = str(file_path)
+
+        with _open_source(file_path, file_obj) as file, zipfile.ZipFile(file) as package:
+            metadata = {"title": os.path.basename(file_path)}
+            _read_pptx_metadata(package, metadata)
+            metadata["pages"] = len(pptx_package.slide_paths(package))
+            yield {"type": "metadata", **metadata}
+
+            if extract_text or extract_tables:
+                for slide in pptx_package.iter_slides(package):
+                    if extract_text:
+                        record = {
+                            "type": "slide",
+                            "page": slide["number"],
+                            "title": slide["title"],
+                            "text": "\n".join(slide["paragraphs"]),
+                        }
+                        if slide["hidden"]:
+                            record["hidden"] = True
+                        yield record
+
+                    if extract_tables:
+                        for rows in slide["tables"]:
+                            yield {"type": "table", "table": {"page": slide["number"], "data": rows}}
 
-            try:
-                images_result = self.image_extractor.extract_images(
-                    file_path=file_path,
-                    document_id=document_id,
-                    extract_pages=False,
-                    apply_ocr=apply_ocr,
-                    ocr_lang=ocr_lang
+        # Extrair imagens
+        if extract_images:
+            with _materialized(file_path, file_obj) as source_path:
+                yield from self._iter_image_records(
+                    source_path, document_id, False, cancel_token, results_dir=results_dir
                 )
 
-                if images_result.get("success"):
-                    result["content"]["images"] = images_result.get("images", [])
-                    result["metadata"]["image_count"] = len(images_result.get("images", []))
-                else:
-                    result["metadata"]["image_extraction_error"] = images_result.get("error", "Erro desconhecido")
-            except Exception as e:
-                print(f"Erro ao extrair imagens: {str(e)}")
-                result["metadata"]["image_extraction_error"] = f"Erro ao extrair imagens: {str(e)}"
+    def iter_excel_records(
+        self,
+        file_path: Union[str, Path],
+        extract_text: bool = True,
+        extract_tables: bool = True,
+        file_obj: Optional[BinaryIO] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Processa uma planilha Excel gerando registros por aba.
 
-        # Metadados
-        if "metadata" not in result:
-            result["metadata"] = {}
+        Cada aba é lida uma única vez a partir do mesmo ExcelFile e gera um registro "table"
+        (dados e cabeçalhos) e um registro "sheet" (representação textual).
 
-        result["metadata"].update({
-            "title": (
-                doc.core_properties.title
-                if hasattr(doc, "core_properties") and hasattr(doc.core_properties, "title")
-                else "Sem título"
-            ),
-            "pages": 1,  # DOCX não tem conceito de página
-        })
+        Args:
+            file_path: Caminho para o arquivo Excel
+            extract_text: Se deve extrair texto
+            extract_tables: Se deve extrair tabelas
+            file_obj: Conteúdo da planilha em um objeto de arquivo (opcional)
 
-    def _process_excel(self, file_path, result, extract_text, extract_tables):
-        """Processa um arquivo Excel."""
-        import simplejson as json
+        Yields:
+            Registros com a chave "type" igual a "metadata", "table" ou "sheet"
+        """
         import numpy as np
 
+        file_path = str(file_path)
+        if file_obj is not None:
+            file_obj.seek(0)
+
         # Usar pandas para ler o Excel
-        excel_file = pd.ExcelFile(file_path)
+        excel_file = pd.ExcelFile(file_obj if file_obj is not None else file_path)
         sheet_names = excel_file.sheet_names
 
-        # Extrair tabelas
-        if extract_tables:
-            tables = []
-            for sheet_name in sheet_names:
-                try:
-                    df = pd.read_excel(file_path, sheet_name=sheet_name)
-
-                    # Substituir NaN por None para compatibilidade com JSON
-                    df = df.replace({np.nan: None})
-
-                    # Extrair cabeçalhos e dados
-                    headers = df.columns.tolist()
-
-                    # Converter cada linha para lista, substituindo NaN por None
-                    data = []
-                    for _, row in df.iterrows():
-                        row_data = []
-                        for col in headers:
-                            val = row[col]
-                            if pd.isna(val):
-                                row_data.append(None)
-                            else:
-                                row_data.append(val)
-                        data.append(row_data)
-
-                    tables.append({
+        yield {"type": "metadata", "title": os.path.basename(file_path), "sheets": sheet_names}
+
+        if not (extract_text or extract_tables):
+            return
+
+        for sheet_name in sheet_names:
+            try:
+                df = pd.read_excel(excel_file, sheet_name=sheet_name)
+            except Exception as e:
+                # Em caso de erro, adicionar informação de erro
+                if extract_tables:
+                    yield {
+                        "type": "table",
+                        "table": {
+                            "page": 1,
+                            "sheet": sheet_name,
+                            "error": str(e),
+                            "headers": [],
+                            "data": [],
+                        },
+                    }
+                if extract_text:
+                    yield {
+                        "type": "sheet",
+                        "sheet": sheet_name,
+                        "text": f"Sheet: {sheet_name}\n\nErro ao processar: {str(e)}\n\n",
+                    }
+                continue
+
+            # Extrair tabelas
+            if extract_tables:
+                # Substituir NaN por None para compatibilidade com JSON
+                table_df = df.replace({np.nan: None})
+
+                # Extrair cabeçalhos e dados
+                headers = table_df.columns.tolist()
+
+                # Converter cada linha para lista, substituindo NaN por None
+                data = []
+                for _, row in table_df.iterrows():
+                    row_data = []
+                    for col in headers:
+                        val = row[col]
+                        if pd.isna(val):
+                            row_data.append(None)
+                        else:
+                            row_data.append(val)
+                    data.append(row_data)
+
+                yield {
+                    "type": "table",
+                    "table": {
                         "page": 1,  # Excel não tem conceito de página
                         "sheet": sheet_name,
                         "data": data,
                         "headers": headers,
-                    })
-                except Exception as e:
-                    # Em caso de erro, adicionar informação de erro
-                    tables.append({
-                        "page": 1,
-                        "sheet": sheet_name,
-                        "error": str(e),
-                        "headers": [],
-                        "data": []
-                    })
+                    },
+                }
 
-            result["content"]["tables"] = tables
+            # Extrair texto (cabeçalhos e dados como texto)
+            if extract_text:
+                # Substituir NaN por strings vazias para exibição de texto
+                text_df = df.fillna("")
+                yield {
+                    "type": "sheet",
+                    "sheet": sheet_name,
+                    "text": f"Sheet: {sheet_name}\n\n" + text_df.to_string(index=False, na_rep="") + "\n\n",
+                }
+
+    def _auto_ocr_page(self, file_path, record, ocr_lang, render_options=None, cancel_token=None, document_id=None, results_dir=None):
+        """
+        Aplica OCR a uma página cuja camada de texto parece vazia ou corrompida.
 
-        # Extrair texto (cabeçalhos e dados como texto)
-        if extract_text:
-            text = ""
-            for sheet_name in sheet_names:
-                try:
-                    df = pd.read_excel(file_path, sheet_name=sheet_name)
-                    # Substituir NaN por strings vazias para exibição de texto
-                    df = df.fillna("")
-                    text += f"Sheet: {sheet_name}\n\n"
-                    text += df.to_string(index=False, na_rep="") + "\n\n"
-                except Exception as e:
-                    text += f"Sheet: {sheet_name}\n\nErro ao processar: {str(e)}\n\n"
-
-            result["content"]["text"] = text
-            result["content"]["markdown"] = text  # Texto simples como markdown
-            result["content"]["html"] = f"<pre>{text}</pre>"  # Texto simples como HTML
-
-        # Metadados
-        result["metadata"] = {"title": os.path.basename(file_path), "sheets": sheet_names}
-
-    def get_document_metadata(self, file_path: Union[str, Path]) -> Dict[str, Any]:
+        Páginas com texto aproveitável não são rasterizadas. Nas demais, o texto reconhecido
+        substitui o extraído quando tem mais caracteres visíveis.
+
+        Args:
+            file_path: Caminho para o arquivo PDF
+            record: Registro "page" (atualizado com o texto e a origem do texto)
+            ocr_lang: Idioma para OCR (ou "auto" para detecção automática)
+            render_options: Opções de rasterização (DPI e modo de cor)
+            cancel_token: Token que limita a rasterização e o OCR
+            document_id: ID do documento (define onde as palavras reconhecidas são gravadas)
+            results_dir: Diretório raiz dos resultados (padrão: RESULTS_DIR)
+        """
+        if not pdf_text.needs_ocr(record["text"]) or self.image_extractor is None:
+            return
+
+        words_dir = None
+        if document_id:
+            words_dir = words_directory(os.path.join(results_dir or RESULTS_DIR, document_id))
+        ocr_result = self.image_extractor.ocr_pdf_page(
+            file_path, record["page"], ocr_lang, render_options, cancel_token, words_dir
+        )
+        if not ocr_result["success"]:
+            record["ocr_error"] = ocr_result.get("error", "Erro desconhecido")
+            return
+
+        ocr_text = ocr_result.get("text", "")
+        if pdf_text.score_text_layer(ocr_text)["chars"] > pdf_text.score_text_layer(record["text"])["chars"]:
+            record["text"] = ocr_text
+            record["text_source"] = "ocr"
+            record["ocr_lang"] = ocr_result.get("lang", ocr_lang)
+
+    def _iter_image_records(self, file_path, document_id, extract_pages, cancel_token=None, page_ranges=None, render_options=None, results_dir=None):
         """
-        Extrai metadados de um documento.
+        Gera registros de imagem, convertendo falhas em um registro de erro.
 
         Args:
             file_path: Caminho para o arquivo
+            document_id: ID do documento
+            extract_pages: Se deve converter páginas inteiras em imagens
+            cancel_token: Token que limita a rasterização das páginas
+            page_ranges: Intervalos de páginas já resolvidos (None para todas as páginas)
+            render_options: Opções de rasterização das páginas (None para o padrão)
+            results_dir: Diretório raiz dos resultados (padrão: RESULTS_DIR)
+
+        Yields:
+            Registros do tipo "image" (com a página na chave "page") ou um registro "error"
+        """
+        # Verificar se o extrator de imagens está inicializado
+        if self.image_extractor is None:
+            print("Erro: ImageExtractor não está inicializado")
+            yield {"type": "error", "stage": "images", "message": "Extrator de imagens não inicializado"}
+            return
+
+        try:
+            for image_info in self.image_extractor.iter_images(
+                file_path=file_path,
+                document_id=document_id,
+                extract_pages=extract_pages,
+                cancel_token=cancel_token,
+                page_ranges=page_ranges,
+                render_options=render_options,
+                results_dir=results_dir,
+            ):
+                yield {"type": "image", "page": image_info.get("page"), "image": image_info}
+        except ProcessingCancelled:
+            raise
+        except Exception as e:
+            print(f"Erro ao extrair imagens: {str(e)}")
+            yield {"type": "error", "stage": "images", "message": f"Erro ao extrair imagens: {str(e)}"}
+
+    def _language_selector(self, ocr_lang):
+        """
+        Cria o seletor de idioma compartilhado pelas etapas de OCR de um documento.
+
+        Args:
+            ocr_lang: Idioma para OCR (ou "auto" para detecção automática)
+
+        Returns:
+            Seletor de idioma ou o próprio ocr_lang se o extrator de imagens não estiver disponível
+        """
+        if self.image_extractor is None:
+            return ocr_lang
+        return self.image_extractor.language_selector(ocr_lang)
+
+    def _ocr_stage(self, records, ocr_lang, cancel_token=None):
+        """
+        Estágio do pipeline que aplica OCR em cada registro de imagem que passa por ele.
+
+        Args:
+            records: Registros gerados por um backend
+            ocr_lang: Idioma para OCR (ou "auto" para detecção automática)
+            cancel_token: Token que limita o tempo de cada chamada ao Tesseract
+
+        Yields:
+            Os mesmos registros, com o resultado do OCR em record["image"]["ocr"]
+        """
+        for record in records:
+            if record["type"] == "image" and self.image_extractor is not None:
+                self.image_extractor.ocr_image(record["image"], ocr_lang, cancel_token)
+            yield record
+
+    def _cancellation_stage(self, records, cancel_token):
+        """
+        Estágio do pipeline que verifica o token de cancelamento entre os registros.
+
+        Como cada backend gera um registro por unidade concluída, a verificação acontece
+        entre páginas, parágrafos, planilhas e imagens.
+
+        Args:
+            records: Registros gerados pelos estágios anteriores
+            cancel_token: Token de cancelamento
+
+        Yields:
+            Os mesmos registros, enquanto o processamento não for cancelado
+
+        Raises:
+            ProcessingCancelled: Se o token for cancelado ou exceder seus limites
+        """
+        cancel_token.check()
+        for record in records:
+            cancel_token.check()
+            yield record
+
+    def get_document_metadata(
+        self, file_path: Union[str, Path], file_obj: Optional[BinaryIO] = None
+    ) -> Dict[str, Any]:
+        """
+        Extrai metadados de um documento sem processar o seu conteúdo.
+
+        Apenas as estruturas que descrevem o documento são lidas: o trailer e a tabela xref
+        do PDF, as propriedades dos pacotes DOCX e PPTX (docProps/core.xml e docProps/app.xml)
+        e a lista de planilhas do XLSX (xl/workbook.xml). Nada é gravado em disco.
+
+        Args:
+            file_path: Caminho para o arquivo (ou apenas o nome, se file_obj for informado)
+            file_obj: Conteúdo do documento em um objeto de arquivo (opcional)
 
         Returns:
             Dicionário com metadados do documento
@@ -382,30 +1035,23 @@ class DoclingAdapter:
                 "format": file_extension[1:] if file_extension.startswith(".") else file_extension,
             }
 
-            # Extrair metadados específicos por tipo de arquivo
-            if file_extension == ".pdf":
-                with open(file_path, "rb") as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    metadata["pages"] = len(pdf_reader.pages)
-                    if (
-                        pdf_reader.metadata
-                        and hasattr(pdf_reader.metadata, "title")
-                        and pdf_reader.metadata.title
-                    ):
-                        metadata["title"] = pdf_reader.metadata.title
-
-            elif file_extension == ".docx":
-                doc = docx.Document(file_path)
-                if (
-                    hasattr(doc, "core_properties")
-                    and hasattr(doc.core_properties, "title")
-                    and doc.core_properties.title
-                ):
-                    metadata["title"] = doc.core_properties.title
-
-            elif file_extension in [".xlsx", ".xls"]:
-                excel_file = pd.ExcelFile(file_path)
-                metadata["sheets"] = excel_file.sheet_names
+            with _open_source(file_path, file_obj) as file:
+                file.seek(0, os.SEEK_END)
+                metadata["size"] = file.tell()
+                file.seek(0)
+
+                # Extrair metadados específicos por tipo de arquivo
+                if file_extension == ".pdf":
+                    _read_pdf_metadata(file, metadata)
+                elif file_extension == ".docx":
+                    _read_docx_metadata(file, metadata)
+                elif file_extension == ".pptx":
+                    with zipfile.ZipFile(file) as package:
+                        _read_pptx_metadata(package, metadata)
+                elif file_extension == ".xlsx":
+                    _read_xlsx_metadata(file, metadata)
+                elif file_extension == ".xls":
+                    metadata["sheets"] = pd.ExcelFile(file).sheet_names
 
             return metadata
 
@@ -432,16 +1078,154 @@ class DoclingAdapter:
             if result["status"] != "success" or not result.get("content"):
                 return None
 
-            # Retornar o formato solicitado
-            if output_format.lower() == "markdown" and "markdown" in result["content"]:
-                return result["content"]["markdown"]
-            elif output_format.lower() == "html" and "html" in result["content"]:
-                return result["content"]["html"]
-            elif output_format.lower() == "text" and "text" in result["content"]:
-                return result["content"]["text"]
+            # Retornar o formato solicitado, derivado do markdown
+            md_text = result["content"].get("markdown")
+            if output_format.lower() == "markdown" and md_text is not None:
+                return md_text
+            elif output_format.lower() == "text" and md_text is not None:
+                return markdown_to_text(md_text, Path(file_path).suffix.lower()[1:])
+            elif output_format.lower() == "html" and md_text is not None:
+                return markdown_to_html(md_text, Path(file_path).suffix.lower()[1:])
             else:
                 raise ValueError(f"Formato de saída não suportado: {output_format}")
 
         except Exception as e:
             print(f"Erro ao converter documento: {str(e)}")
             return None
+
+
+# Espaços de nomes das partes de propriedades de pacotes OOXML
+_OOXML_NS = {
+    "cp": "http://schemas.openxmlformats.org/package/2006/metadata/core-properties",
+    "dc": "http://purl.org/dc/elements/1.1/",
+    "dcterms": "http://purl.org/dc/terms/",
+    "ep": "http://schemas.openxmlformats.org/officeDocument/2006/extended-properties",
+    "main": "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+}
+
+
+def _pdf_page_count(pdf_reader: PyPDF2.PdfReader) -> int:
+    """
+    Obtém o número de páginas pelo /Count da raiz da árvore de páginas, sem percorrê-la.
+
+    Args:
+        pdf_reader: Leitor do PDF
+
+    Returns:
+        Número de páginas
+    """
+    try:
+        return int(pdf_reader.trailer["/Root"]["/Pages"]["/Count"])
+    except (KeyError, TypeError, ValueError):
+        # Árvore de páginas sem /Count válido: contar as páginas
+        return len(pdf_reader.pages)
+
+
+def _read_pdf_metadata(file: BinaryIO, metadata: Dict[str, Any]) -> None:
+    """
+    Lê os metadados de um PDF a partir do trailer, sem percorrer as páginas.
+
+    O PdfReader carrega apenas a tabela xref; o número de páginas vem de /Root/Pages/Count
+    e o título do dicionário /Info do trailer.
+
+    Args:
+        file: PDF aberto para leitura binária
+        metadata: Dicionário atualizado com os metadados
+    """
+    pdf_reader = PyPDF2.PdfReader(file)
+    metadata["encrypted"] = pdf_reader.is_encrypted
+    if pdf_reader.is_encrypted:
+        return
+
+    metadata["pages"] = _pdf_page_count(pdf_reader)
+    info = pdf_reader.metadata
+    if info:
+        if info.title:
+            metadata["title"] = info.title
+        if info.author:
+            metadata["author"] = info.author
+        if info.producer:
+            metadata["producer"] = info.producer
+
+
+def _read_docx_metadata(file: BinaryIO, metadata: Dict[str, Any]) -> None:
+    """
+    Lê os metadados de um DOCX a partir das partes de propriedades do pacote.
+
+    Apenas docProps/core.xml e docProps/app.xml são lidos; word/document.xml não é aberto.
+    O número de páginas e palavras é o registrado pelo editor na última gravação.
+
+    Args:
+        file: DOCX aberto para leitura binária
+        metadata: Dicionário atualizado com os metadados
+    """
+    with zipfile.ZipFile(file) as package:
+        _read_package_properties(package, metadata, (("pages", "ep:Pages"), ("words", "ep:Words")))
+
+
+def _read_pptx_metadata(package: zipfile.ZipFile, metadata: Dict[str, Any]) -> None:
+    """
+    Lê os metadados de um PPTX a partir das partes de propriedades do pacote.
+
+    Apenas docProps/core.xml e docProps/app.xml são lidos; os slides não são abertos. O número
+    de slides é o registrado pelo editor na última gravação.
+
+    Args:
+        package: PPTX aberto
+        metadata: Dicionário atualizado com os metadados
+    """
+    _read_package_properties(package, metadata, (("pages", "ep:Slides"), ("words", "ep:Words")))
+
+
+def _read_package_properties(
+    package: zipfile.ZipFile, metadata: Dict[str, Any], counts: Tuple[Tuple[str, str], ...]
+) -> None:
+    """
+    Lê as propriedades de um pacote OOXML (docProps/core.xml e docProps/app.xml).
+
+    Args:
+        package: Pacote aberto
+        metadata: Dicionário atualizado com os metadados
+        counts: Pares (chave, caminho em app.xml) das contagens numéricas a ler
+    """
+    names = set(package.namelist())
+
+    if "docProps/core.xml" in names:
+        core = etree.fromstring(package.read("docProps/core.xml"))
+        for key, path in (
+            ("title", "dc:title"),
+            ("author", "dc:creator"),
+            ("created", "dcterms:created"),
+            ("modified", "dcterms:modified"),
+        ):
+            value = core.findtext(path, namespaces=_OOXML_NS)
+            if value:
+                metadata[key] = value
+
+    if "docProps/app.xml" in names:
+        app = etree.fromstring(package.read("docProps/app.xml"))
+        for key, path in counts:
+            value = app.findtext(path, namespaces=_OOXML_NS)
+            if value and value.isdigit():
+                metadata[key] = int(value)
+
+
+def _read_xlsx_metadata(file: BinaryIO, metadata: Dict[str, Any]) -> None:
+    """
+    Lê a lista de planilhas de um XLSX a partir de xl/workbook.xml, sem carregar células.
+
+    Args:
+        file: XLSX aberto para leitura binária
+        metadata: Dicionário atualizado com os metadados
+    """
+    with zipfile.ZipFile(file) as package:
+        workbook = etree.fromstring(package.read("xl/workbook.xml"))
+        metadata["sheets"] = [
+            sheet.get("name") for sheet in workbook.iterfind("main:sheets/main:sheet", _OOXML_NS)
+        ]
+
+        if "docProps/core.xml" in package.namelist():
+            core = etree.fromstring(package.read("docProps/core.xml"))
+            title = core.findtext("dc:title", namespaces=_OOXML_NS)
+            if title:
+                metadata["title"] = title
@@ -0,0 +1,193 @@
+"""
+Módulo para leitura de documentos DOCX em fluxo, diretamente do pacote OOXML.
+
+O python-docx carrega word/document.xml inteiro em uma árvore e resolve o estilo de cada
+parágrafo a cada acesso. Para documentos com milhares de páginas, isso consome muita memória
+e tempo. Este módulo percorre word/document.xml com o iterparse do lxml, gerando parágrafos e
+tabelas na ordem do documento em uma única passagem e descartando cada elemento após o uso. O
+nível de título de cada estilo é calculado uma vez, a partir de word/styles.xml.
+"""
+
+import re
+import zipfile
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from lxml import etree
+
+# Espaço de nomes do WordprocessingML
+_W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_W = "{%s}" % _W_NS
+
+_BODY = _W + "body"
+_P = _W + "p"
+_TBL = _W + "tbl"
+_R = _W + "r"
+_HYPERLINK = _W + "hyperlink"
+_TR = _W + "tr"
+_TC = _W + "tc"
+_TC_PR = _W + "tcPr"
+_GRID_SPAN = _W + "gridSpan"
+_V_MERGE = _W + "vMerge"
+_VAL = _W + "val"
+
+# Nomes dos estilos de título ("heading 1" nos estilos nativos, "Heading 1" na interface)
+_HEADING_NAME = re.compile(r"heading\s*(\d+)", re.IGNORECASE)
+
+
+def heading_levels(package: zipfile.ZipFile) -> Tuple[Dict[str, int], Optional[str]]:
+    """
+    Calcula o nível de título de cada estilo de parágrafo.
+
+    Args:
+        package: Pacote DOCX aberto
+
+    Returns:
+        Tupla (dicionário {id do estilo: nível}, apenas com os estilos de título; id do estilo
+        de parágrafo padrão, usado por parágrafos sem estilo)
+    """
+    try:
+        styles = etree.fromstring(package.read("word/styles.xml"))
+    except KeyError:
+        return {}, None
+
+    levels: Dict[str, int] = {}
+    default_style = None
+    for style in styles.iterfind(_W + "style"):
+        if style.get(_W + "type") != "paragraph":
+            continue
+        style_id = style.get(_W + "styleId")
+        if style.get(_W + "default") in ("1", "true"):
+            default_style = style_id
+
+        name = style.find(_W + "name")
+        match = _HEADING_NAME.fullmatch(name.get(_VAL, "")) if name is not None else None
+        if match:
+            levels[style_id] = int(match.group(1))
+
+    return levels, default_style
+
+
+def iter_blocks(package: zipfile.ZipFile, include_tables: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Gera os parágrafos e as tabelas do corpo do documento, na ordem em que aparecem.
+
+    Apenas os elementos filhos diretos do corpo são gerados, como em Document.paragraphs e
+    Document.tables do python-docx; os parágrafos das células fazem parte das tabelas. Cada
+    elemento é descartado da árvore logo após ser gerado.
+
+    Args:
+        package: Pacote DOCX aberto
+        include_tables: Se deve gerar as tabelas (com False, as tabelas são apenas descartadas)
+
+    Yields:
+        Dicionários {"type": "paragraph", "text", "level"} ou {"type": "table", "rows"}
+    """
+    levels, default_style = heading_levels(package)
+    default_level = levels.get(default_style, 0)
+
+    with package.open("word/document.xml") as source:
+        for _, element in etree.iterparse(source, events=("end",), tag=(_P, _TBL)):
+            parent = element.getparent()
+            if parent is None or parent.tag != _BODY:
+                # Parágrafos e tabelas dentro de células são lidos com a tabela que os contém
+                continue
+
+            if element.tag == _P:
+                style = element.find(f"{_W}pPr/{_W}pStyle")
+                level = levels.get(style.get(_VAL), 0) if style is not None else default_level
+                yield {"type": "paragraph", "text": paragraph_text(element), "level": level}
+            elif include_tables:
+                yield {"type": "table", "rows": table_rows(element)}
+
+            # Descartar o elemento e os irmãos anteriores já processados
+            element.clear(keep_tail=True)
+            while element.getprevious() is not None:
+                del parent[0]
+
+
+def paragraph_text(paragraph: Any) -> str:
+    """
+    Obtém o texto de um parágrafo, como Paragraph.text do python-docx.
+
+    São considerados os trechos diretos do parágrafo e os de hiperlinks, com tabulações e
+    quebras de linha.
+
+    Args:
+        paragraph: Elemento w:p
+
+    Returns:
+        Texto do parágrafo
+    """
+    parts: List[str] = []
+    for child in paragraph:
+        if child.tag == _R:
+            _run_text(child, parts)
+        elif child.tag == _HYPERLINK:
+            for run in child.iterfind(_R):
+                _run_text(run, parts)
+    return "".join(parts)
+
+
+def table_rows(table: Any) -> List[List[str]]:
+    """
+    Converte uma tabela em linhas de texto, como row.cells do python-docx.
+
+    As mesclagens são resolvidas em uma única passagem pelas linhas, sem reconstruir a grade da
+    tabela a cada acesso: uma célula com gridSpan se repete em cada coluna da grade que ocupa, e
+    a continuação de uma mesclagem vertical (vMerge) repete o texto da célula de origem, na
+    mesma coluna da linha anterior.
+
+    Args:
+        table: Elemento w:tbl
+
+    Returns:
+        Linhas da tabela; o texto de cada célula junta os seus parágrafos com quebras de linha
+    """
+    rows = []
+    # Texto e largura da célula em cada coluna da grade, na linha anterior
+    above: Dict[int, Tuple[str, int]] = {}
+    for row in table.iterfind(_TR):
+        cells: List[str] = []
+        current: Dict[int, Tuple[str, int]] = {}
+        column = _int_property(row.find(f"{_W}trPr/{_W}gridBefore"), 0)
+
+        for cell in row.iterfind(_TC):
+            properties = cell.find(_TC_PR)
+            span = max(_int_property(properties.find(_GRID_SPAN), 1), 1) if properties is not None else 1
+            merge = properties.find(_V_MERGE) if properties is not None else None
+
+            if merge is not None and merge.get(_VAL, "continue") == "continue" and column in above:
+                # Continuação de mesclagem vertical: a largura vem da célula de origem
+                text, span = above[column]
+            else:
+                text = "\n".join(paragraph_text(p) for p in cell.iterfind(_P))
+
+            cells.extend([text] * span)
+            current[column] = (text, span)
+            column += span
+
+        rows.append(cells)
+        above = current
+    return rows
+
+
+def _int_property(element: Any, default: int) -> int:
+    """Lê o atributo w:val inteiro de uma propriedade, com um valor padrão."""
+    if element is None:
+        return default
+    try:
+        return int(element.get(_VAL))
+    except (TypeError, ValueError):
+        return default
+
+
+def _run_text(run: Any, parts: List[str]) -> None:
+    """Acrescenta o texto de um trecho (w:r) à lista."""
+    for child in run:
+        tag = child.tag
+        if tag == _W + "t":
+            parts.append(child.text or "")
+        elif tag == _W + "tab":
+            parts.append("\t")
+        elif tag == _W + "cr" or (tag == _W + "br" and child.get(_W + "type") in (None, "textWrapping")):
+            parts.append("\n")
@@ -0,0 +1,116 @@
+"""
+Módulo para seleção de intervalos de páginas.
+
+Este módulo interpreta expressões como "1-5,10" ou "20-" usadas no parâmetro pages= e as
+converte em intervalos fechados, de modo que apenas as páginas pedidas sejam extraídas,
+rasterizadas e enviadas ao OCR.
+"""
+
+import re
+from typing import Iterator, List, Optional, Tuple
+
+# Intervalo de páginas iniciando em 1; o fim None indica "até a última página"
+PageRange = Tuple[int, Optional[int]]
+
+_RANGE_PATTERN = re.compile(r"^(\d+)(?:\s*-\s*(\d*))?$")
+
+
+def parse_page_ranges(spec: Optional[str]) -> Optional[List[PageRange]]:
+    """
+    Interpreta uma expressão de páginas.
+
+    Aceita páginas isoladas ("10"), intervalos ("1-5") e intervalos abertos ("20-"),
+    separados por vírgula. Os intervalos são ordenados e os sobrepostos são unidos.
+
+    Args:
+        spec: Expressão de páginas (None ou vazia seleciona todas)
+
+    Returns:
+        Lista de intervalos ordenados ou None para todas as páginas
+
+    Raises:
+        ValueError: Se a expressão for inválida
+    """
+    if spec is None or not spec.strip():
+        return None
+
+    ranges: List[PageRange] = []
+    for part in spec.split(","):
+        match = _RANGE_PATTERN.match(part.strip())
+        if not match:
+            raise ValueError(f"Intervalo de páginas inválido: '{part.strip()}'")
+
+        start = int(match.group(1))
+        if match.group(2) is None:
+            end: Optional[int] = start
+        elif match.group(2) == "":
+            end = None
+        else:
+            end = int(match.group(2))
+
+        if start < 1 or (end is not None and end < start):
+            raise ValueError(f"Intervalo de páginas inválido: '{part.strip()}'")
+        ranges.append((start, end))
+
+    # Ordenar e unir intervalos sobrepostos ou adjacentes
+    ranges.sort(key=lambda r: r[0])
+    merged: List[PageRange] = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if last_end is None:
+            break
+        if start <= last_end + 1:
+            merged[-1] = (last_start, None if end is None else max(last_end, end))
+        else:
+            merged.append((start, end))
+
+    return merged
+
+
+def resolve_page_ranges(ranges: Optional[List[PageRange]], page_count: int) -> List[Tuple[int, int]]:
+    """
+    Limita os intervalos ao número de páginas do documento.
+
+    Args:
+        ranges: Intervalos retornados por parse_page_ranges (None para todas as páginas)
+        page_count: Número de páginas do documento
+
+    Returns:
+        Intervalos fechados dentro do documento (páginas inexistentes são descartadas)
+    """
+    if ranges is None:
+        return [(1, page_count)] if page_count > 0 else []
+
+    resolved = []
+    for start, end in ranges:
+        if start > page_count:
+            break
+        resolved.append((start, page_count if end is None else min(end, page_count)))
+    return resolved
+
+
+def count_selected_pages(ranges: List[Tuple[int, int]]) -> int:
+    """
+    Conta as páginas de intervalos já resolvidos.
+
+    Args:
+        ranges: Intervalos retornados por resolve_page_ranges
+
+    Returns:
+        Número de páginas selecionadas
+    """
+    return sum(end - start + 1 for start, end in ranges)
+
+
+def iter_page_numbers(ranges: List[Tuple[int, int]]) -> Iterator[int]:
+    """
+    Gera os números das páginas de intervalos já resolvidos.
+
+    Args:
+        ranges: Intervalos retornados por resolve_page_ranges
+
+    Yields:
+        Números de página iniciando em 1, em ordem crescente
+    """
+    for start, end in ranges:
+        yield from range(start, end + 1)
@@ -0,0 +1,233 @@
+"""
+Módulo com os motores de extração de texto de PDFs.
+
+Este módulo isola as diferentes implementações de extração de texto de PDFs nascidos
+digitais (PyPDF2, pdftotext do poppler e pypdfium2), permitindo escolher o motor por
+requisição sem alterar o restante do adaptador.
+"""
+
+import shutil
+import logging
+import subprocess
+import unicodedata
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import PyPDF2
+
+from app.core.config import PDF_TEXT_ENGINE, OCR_AUTO_MIN_CHARS, OCR_AUTO_MAX_GARBAGE_RATIO
+from app.core.cancellation import CancelToken
+from app.core.page_ranges import iter_page_numbers
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Motores de extração de texto suportados
+PDF_TEXT_ENGINES = ("pypdf2", "pdftotext", "pypdfium2")
+
+# Modos de OCR do texto das páginas: "auto" aplica OCR apenas às páginas sem camada de texto
+OCR_MODES = ("auto",)
+
+# Categorias Unicode de caracteres que não aparecem em texto legível: controle, formato,
+# uso privado, não atribuídos e substitutos (comuns em fontes sem tabela ToUnicode)
+_GARBAGE_CATEGORIES = {"Cc", "Cf", "Co", "Cn", "Cs"}
+
+
+def score_text_layer(text: str) -> Dict[str, Any]:
+    """
+    Avalia a qualidade do texto extraído de uma página.
+
+    Args:
+        text: Texto extraído da camada de texto da página
+
+    Returns:
+        Dicionário com chars (caracteres visíveis) e garbage_ratio (fração desses caracteres
+        que são inválidos, como o caractere de substituição U+FFFD ou de uso privado)
+    """
+    chars = 0
+    garbage = 0
+    for char in text:
+        if char.isspace():
+            continue
+        chars += 1
+        if char == "\ufffd" or unicodedata.category(char) in _GARBAGE_CATEGORIES:
+            garbage += 1
+
+    return {"chars": chars, "garbage_ratio": round(garbage / chars, 3) if chars else 1.0}
+
+
+def needs_ocr(text: str) -> bool:
+    """
+    Indica se uma página parece digitalizada, isto é, sem uma camada de texto aproveitável.
+
+    Args:
+        text: Texto extraído da camada de texto da página
+
+    Returns:
+        True se a página tiver poucos caracteres (OCR_AUTO_MIN_CHARS) ou caracteres inválidos
+        demais (OCR_AUTO_MAX_GARBAGE_RATIO)
+    """
+    score = score_text_layer(text)
+    return score["chars"] < OCR_AUTO_MIN_CHARS or score["garbage_ratio"] > OCR_AUTO_MAX_GARBAGE_RATIO
+
+
+def is_engine_available(engine: str) -> bool:
+    """
+    Verifica se um motor de extração de texto está disponível no ambiente.
+
+    Args:
+        engine: Nome do motor (pypdf2, pdftotext, pypdfium2)
+
+    Returns:
+        True se o motor puder ser utilizado
+    """
+    if engine == "pypdf2":
+        return True
+    if engine == "pdftotext":
+        return shutil.which("pdftotext") is not None
+    if engine == "pypdfium2":
+        try:
+            import pypdfium2  # noqa: F401
+        except ImportError:
+            return False
+        return True
+    return False
+
+
+def resolve_engine(engine: Optional[str] = None) -> str:
+    """
+    Resolve o motor de extração a ser usado.
+
+    Usa o motor configurado em PDF_TEXT_ENGINE quando nenhum é informado e recorre
+    ao PyPDF2 quando o motor solicitado não está instalado.
+
+    Args:
+        engine: Nome do motor solicitado
+
+    Returns:
+        Nome do motor efetivamente utilizado
+
+    Raises:
+        ValueError: Se o motor não for suportado
+    """
+    engine = (engine or PDF_TEXT_ENGINE).lower()
+
+    if engine not in PDF_TEXT_ENGINES:
+        raise ValueError(
+            f"Motor de extração de texto não suportado: {engine}. "
+            f"Use: {', '.join(PDF_TEXT_ENGINES)}"
+        )
+
+    if not is_engine_available(engine):
+        logger.warning(f"Motor de extração {engine} indisponível. Usando 'pypdf2' como fallback.")
+        return "pypdf2"
+
+    return engine
+
+
+def iter_page_texts(
+    file_path: str,
+    engine: str = "pypdf2",
+    pdf_reader: Optional[PyPDF2.PdfReader] = None,
+    cancel_token: Optional[CancelToken] = None,
+    page_ranges: Optional[List[Tuple[int, int]]] = None,
+) -> Iterator[Tuple[int, str]]:
+    """
+    Extrai o texto de um PDF página a página.
+
+    Args:
+        file_path: Caminho para o arquivo PDF
+        engine: Motor de extração (já resolvido com resolve_engine)
+        pdf_reader: Leitor PyPDF2 já aberto, reaproveitado pelo motor pypdf2
+        cancel_token: Token de cancelamento que controla o subprocesso do pdftotext
+        page_ranges: Intervalos de páginas já resolvidos (None para todas as páginas); as
+            demais páginas não são lidas
+
+    Yields:
+        Tuplas (número da página iniciando em 1, texto da página)
+    """
+    if engine == "pdftotext":
+        if page_ranges is None:
+            yield from _iter_pdftotext(file_path, cancel_token)
+        else:
+            # Uma chamada por intervalo, com -f/-l limitando o trabalho do poppler
+            for first_page, last_page in page_ranges:
+                yield from _iter_pdftotext(file_path, cancel_token, first_page, last_page)
+    elif engine == "pypdfium2":
+        yield from _iter_pypdfium2(file_path, page_ranges)
+    else:
+        yield from _iter_pypdf2(file_path, pdf_reader, page_ranges)
+
+
+def _iter_pypdf2(
+    file_path: str,
+    pdf_reader: Optional[PyPDF2.PdfReader],
+    page_ranges: Optional[List[Tuple[int, int]]] = None,
+) -> Iterator[Tuple[int, str]]:
+    """Extrai texto com o PyPDF2 (implementação em Python puro)."""
+    if pdf_reader is None:
+        with open(file_path, "rb") as file:
+            yield from _iter_pypdf2(file_path, PyPDF2.PdfReader(file), page_ranges)
+        return
+
+    if page_ranges is None:
+        page_numbers = range(1, len(pdf_reader.pages) + 1)
+    else:
+        page_numbers = iter_page_numbers(page_ranges)
+
+    for page_number in page_numbers:
+        yield page_number, pdf_reader.pages[page_number - 1].extract_text()
+
+
+def _iter_pdftotext(
+    file_path: str,
+    cancel_token: Optional[CancelToken] = None,
+    first_page: Optional[int] = None,
+    last_page: Optional[int] = None,
+) -> Iterator[Tuple[int, str]]:
+    """Extrai texto com o utilitário pdftotext do poppler."""
+    args = ["pdftotext", "-enc", "UTF-8"]
+    if first_page is not None:
+        args += ["-f", str(first_page), "-l", str(last_page)]
+    args += [file_path, "-"]
+    if cancel_token is not None:
+        # O token encerra o pdftotext em caso de cancelamento ou tempo limite
+        completed = cancel_token.run(args)
+    else:
+        completed = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+    if completed.returncode != 0:
+        raise RuntimeError(
+            f"pdftotext falhou: {completed.stderr.decode('utf-8', errors='replace').strip()}"
+        )
+
+    # O pdftotext separa as páginas com form feed e termina a última página com outro
+    pages: List[str] = completed.stdout.decode("utf-8", errors="replace").split("\f")
+    if pages and pages[-1] == "":
+        pages.pop()
+
+    for offset, text in enumerate(pages):
+        yield (first_page or 1) + offset, text
+
+
+def _iter_pypdfium2(
+    file_path: str, page_ranges: Optional[List[Tuple[int, int]]] = None
+) -> Iterator[Tuple[int, str]]:
+    """Extrai texto com o pypdfium2 (binding do PDFium)."""
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        if page_ranges is None:
+            page_numbers = range(1, len(pdf) + 1)
+        else:
+            page_numbers = iter_page_numbers(page_ranges)
+
+        for page_number in page_numbers:
+            page = pdf[page_number - 1]
+            textpage = page.get_textpage()
+            try:
+                yield page_number, textpage.get_text_range()
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
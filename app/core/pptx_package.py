@@ -0,0 +1,170 @@
+"""
+Módulo para leitura de apresentações PPTX diretamente do pacote OOXML.
+
+As partes XML são lidas com o lxml, sem o python-pptx e sem renderizar os slides: a ordem
+dos slides vem de ppt/presentation.xml, e cada slide (ppt/slides/slideN.xml) é lido uma única
+vez para obter as caixas de texto e as tabelas. O custo cresce linearmente com o número de
+slides.
+"""
+
+import posixpath
+import zipfile
+from typing import Any, Dict, Iterator, List, Optional
+
+from lxml import etree
+
+# Espaços de nomes do PresentationML e do DrawingML
+_NS = {
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+
+_P = "{%s}" % _NS["p"]
+_A = "{%s}" % _NS["a"]
+
+# Tipos de espaço reservado que contêm o título do slide
+_TITLE_PLACEHOLDERS = ("title", "ctrTitle")
+
+# Sufixos dos tipos de relacionamento de mídia (imagens, áudio e vídeo)
+_MEDIA_RELATIONSHIPS = ("/image", "/media", "/audio", "/video")
+
+
+def slide_paths(package: zipfile.ZipFile) -> List[str]:
+    """
+    Obtém as partes dos slides na ordem da apresentação.
+
+    Args:
+        package: Pacote PPTX aberto
+
+    Returns:
+        Nomes das partes dos slides (como "ppt/slides/slide1.xml"), em ordem
+    """
+    presentation = etree.fromstring(package.read("ppt/presentation.xml"))
+    targets = _relationship_targets(package, "ppt/presentation.xml")
+
+    paths = []
+    for slide_id in presentation.iterfind("p:sldIdLst/p:sldId", _NS):
+        target = targets.get(slide_id.get("{%s}id" % _NS["r"]))
+        if target is not None:
+            paths.append(target)
+    return paths
+
+
+def iter_slides(package: zipfile.ZipFile) -> Iterator[Dict[str, Any]]:
+    """
+    Lê os slides em ordem, um de cada vez.
+
+    As formas são percorridas na ordem do documento, incluindo as que estão dentro de grupos.
+    O título vem do espaço reservado de título; as demais caixas de texto formam os parágrafos
+    do slide. Em tabelas, as células cobertas por uma mesclagem ficam vazias, de modo que
+    todas as linhas têm o número de colunas da grade.
+
+    Args:
+        package: Pacote PPTX aberto
+
+    Yields:
+        Dicionários com number (iniciando em 1), path, hidden, title, paragraphs e tables
+    """
+    for number, path in enumerate(slide_paths(package), start=1):
+        root = etree.fromstring(package.read(path))
+        title_parts: List[str] = []
+        paragraphs: List[str] = []
+        tables: List[List[List[str]]] = []
+
+        tree = root.find("p:cSld/p:spTree", _NS)
+        if tree is not None:
+            for shape in tree.iter(_P + "sp", _P + "graphicFrame"):
+                if shape.tag == _P + "graphicFrame":
+                    table = shape.find(".//a:tbl", _NS)
+                    if table is not None:
+                        tables.append(_table_rows(table))
+                    continue
+
+                body = shape.find("p:txBody", _NS)
+                if body is None:
+                    continue
+                texts = [text for text in (_paragraph_text(p) for p in body.iterfind("a:p", _NS)) if text]
+                placeholder = shape.find("p:nvSpPr/p:nvPr/p:ph", _NS)
+                if placeholder is not None and placeholder.get("type") in _TITLE_PLACEHOLDERS:
+                    title_parts.extend(texts)
+                else:
+                    paragraphs.extend(texts)
+
+        yield {
+            "number": number,
+            "path": path,
+            "hidden": root.get("show") == "0",
+            "title": " ".join(title_parts),
+            "paragraphs": paragraphs,
+            "tables": tables,
+        }
+
+
+def media_slides(package: zipfile.ZipFile) -> Dict[str, int]:
+    """
+    Associa cada parte de mídia ao primeiro slide que a utiliza.
+
+    Args:
+        package: Pacote PPTX aberto
+
+    Returns:
+        Dicionário {nome da parte (como "ppt/media/image1.png"): número do slide}
+    """
+    slides: Dict[str, int] = {}
+    for number, path in enumerate(slide_paths(package), start=1):
+        for target in _relationship_targets(package, path, _MEDIA_RELATIONSHIPS).values():
+            slides.setdefault(target, number)
+    return slides
+
+
+def _relationship_targets(package: zipfile.ZipFile, part: str, types: Optional[tuple] = None) -> Dict[str, str]:
+    """Lê os relacionamentos internos de uma parte, resolvendo os destinos no pacote."""
+    directory, filename = posixpath.split(part)
+    rels_path = posixpath.join(directory, "_rels", filename + ".rels")
+    try:
+        rels = etree.fromstring(package.read(rels_path))
+    except KeyError:
+        return {}
+
+    targets = {}
+    for relationship in rels.iterfind("rel:Relationship", _NS):
+        if relationship.get("TargetMode") == "External":
+            continue
+        if types is not None and not relationship.get("Type", "").endswith(types):
+            continue
+        target = relationship.get("Target", "")
+        if target.startswith("/"):
+            target = target.lstrip("/")
+        else:
+            target = posixpath.normpath(posixpath.join(directory, target))
+        targets[relationship.get("Id")] = target
+    return targets
+
+
+def _paragraph_text(paragraph: Any) -> str:
+    """Obtém o texto de um parágrafo do DrawingML (trechos, campos e quebras de linha)."""
+    parts = []
+    for child in paragraph:
+        if child.tag in (_A + "r", _A + "fld"):
+            parts.append(child.findtext("a:t", default="", namespaces=_NS))
+        elif child.tag == _A + "br":
+            parts.append("\n")
+    return "".join(parts).strip()
+
+
+def _table_rows(table: Any) -> List[List[str]]:
+    """Converte uma tabela do DrawingML em linhas de texto."""
+    rows = []
+    for row in table.iterfind("a:tr", _NS):
+        cells = []
+        for cell in row.iterfind("a:tc", _NS):
+            if cell.get("hMerge") == "1" or cell.get("vMerge") == "1":
+                # Célula coberta pela mesclagem de uma célula anterior
+                cells.append("")
+                continue
+            texts = [_paragraph_text(p) for p in cell.iterfind("a:txBody/a:p", _NS)]
+            cells.append("\n".join(text for text in texts if text))
+        rows.append(cells)
+    return rows
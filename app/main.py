@@ -5,11 +5,13 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 import uvicorn
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 from dotenv import load_dotenv
 
 from app.api.routes import router as api_router
 from app.core.version import get_version, get_version_info
+from app.services.worker_pool import shutdown_worker_pool, start_worker_pool
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -23,6 +25,15 @@ BASE_DIR = Path(__file__).resolve().parent
 TEMPLATES_DIR = BASE_DIR / "templates"
 STATIC_DIR = BASE_DIR / "static"
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # O pool de processos é criado uma única vez e encerrado junto com a aplicação
+    start_worker_pool()
+    yield
+    shutdown_worker_pool()
+
+
 # Configurar FastAPI com o caminho base correto para funcionar com o proxy reverso
 app = FastAPI(
     title="Docling Service",
@@ -31,6 +42,7 @@ app = FastAPI(
     # Definir o caminho base para a documentação e rotas
     # Isso é importante quando o serviço está atrás de um proxy reverso
     root_path=BASE_PATH,
+    lifespan=lifespan,
 )
 
 # Configurar templates
@@ -79,6 +91,7 @@ async def http_exception_handler(request, exc):
     return JSONResponse(
         status_code=exc.status_code,
         content={"message": exc.detail},
+        headers=getattr(exc, "headers", None),
     )
 
 
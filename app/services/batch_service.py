@@ -0,0 +1,469 @@
+"""
+Módulo para processamento de documentos em lote.
+
+Este módulo recebe vários arquivos (ou arquivos ZIP/TAR com documentos), distribui o
+processamento entre um pool de workers e gera o resultado de cada documento assim que ele
+é concluído, seguido de um status agregado do lote.
+
+Os membros dos arquivos compactados são lidos direto do fluxo do arquivo para a memória,
+sem extração para o disco. Os documentos são processados no pool de processos compartilhado
+(app.services.worker_pool), pois a extração é limitada pela GIL; o conteúdo de cada documento
+é entregue ao seu worker em bytes, sem passar por arquivos temporários.
+"""
+
+import io
+import os
+import time
+import uuid
+import logging
+import tarfile
+import zipfile
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import IO, Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from app.core.config import (
+    BATCH_MAX_FILES,
+    BATCH_MAX_WORKERS,
+    BATCH_MAX_ARCHIVE_BYTES,
+    BATCH_MAX_MEMBER_BYTES,
+    BATCH_SPOOL_MAX_BYTES,
+)
+from app.core.cancellation import CancelToken, ProcessingCancelled
+from app.services.document_service import process_document
+from app.services.worker_pool import create_cancel_event, run_job, submit_job
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Formatos de documento aceitos em lote
+BATCH_DOCUMENT_EXTENSIONS = (".pdf", ".docx", ".pptx", ".xlsx")
+
+# Formatos de arquivo compactado expandidos em documentos
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+# Tamanho dos blocos copiados do arquivo compactado para a memória
+_CHUNK_SIZE = 1024 * 1024
+
+# Documento de um lote: nome original e conteúdo (None para formatos não suportados)
+BatchSource = Tuple[str, Optional[IO[bytes]]]
+
+
+def is_archive(filename: str) -> bool:
+    """
+    Verifica se um arquivo é um arquivo compactado suportado.
+
+    Args:
+        filename: Nome do arquivo
+
+    Returns:
+        True se o arquivo for ZIP ou TAR
+    """
+    return filename.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def is_batch_document(filename: str) -> bool:
+    """
+    Verifica se um arquivo tem um formato de documento aceito em lote.
+
+    Args:
+        filename: Nome do arquivo
+
+    Returns:
+        True se o formato for suportado
+    """
+    return os.path.splitext(filename)[1].lower() in BATCH_DOCUMENT_EXTENSIONS
+
+
+def spool(source: IO[bytes], limit: Optional[int] = None) -> IO[bytes]:
+    """
+    Copia um fluxo para um arquivo em memória, que passa para o disco temporário do sistema
+    apenas acima de BATCH_SPOOL_MAX_BYTES.
+
+    Args:
+        source: Fluxo de origem
+        limit: Número máximo de bytes aceitos (None para ilimitado)
+
+    Returns:
+        Objeto de arquivo posicionado no início
+
+    Raises:
+        ValueError: Se o conteúdo exceder o limite
+    """
+    target = tempfile.SpooledTemporaryFile(max_size=BATCH_SPOOL_MAX_BYTES)
+    _copy(source, target, limit)
+    return target
+
+
+def _copy(source: IO[bytes], target: IO[bytes], limit: Optional[int]) -> None:
+    """
+    Copia um fluxo em blocos para o objeto de arquivo de destino, deixando-o posicionado no
+    início.
+
+    Args:
+        source: Fluxo de origem
+        target: Objeto de arquivo de destino (fechado se o limite for excedido)
+        limit: Número máximo de bytes aceitos (None para ilimitado)
+
+    Raises:
+        ValueError: Se o conteúdo exceder o limite
+    """
+    copied = 0
+    while True:
+        chunk = source.read(_CHUNK_SIZE)
+        if not chunk:
+            break
+        copied += len(chunk)
+        if limit is not None and copied > limit:
+            target.close()
+            raise ValueError("O conteúdo descompactado excede o limite do lote")
+        target.write(chunk)
+
+    target.seek(0)
+
+
+def iter_archive_members(archive_file: IO[bytes], archive_name: str = "") -> Iterator[BatchSource]:
+    """
+    Lê os documentos de um arquivo ZIP ou TAR sem extraí-los para o disco.
+
+    Cada membro suportado é copiado para a memória no momento em que é consumido, limitado a
+    BATCH_MAX_MEMBER_BYTES por membro e a BATCH_MAX_ARCHIVE_BYTES no total; nenhum arquivo
+    temporário é criado. O TAR é lido em modo sequencial (sem buscas no arquivo). O arquivo
+    compactado é fechado ao final da iteração.
+
+    Args:
+        archive_file: Arquivo compactado aberto para leitura binária
+        archive_name: Nome do arquivo compactado (usado nas mensagens de erro)
+
+    Yields:
+        Tuplas (nome do membro, conteúdo), com conteúdo None para formatos não suportados
+
+    Raises:
+        ValueError: Se o arquivo compactado for inválido ou exceder os limites do lote
+    """
+    try:
+        archive_file.seek(0)
+        if zipfile.is_zipfile(archive_file):
+            archive_file.seek(0)
+            yield from _iter_zip_members(archive_file)
+        else:
+            archive_file.seek(0)
+            yield from _iter_tar_members(archive_file)
+    except (zipfile.BadZipFile, tarfile.TarError) as e:
+        raise ValueError(f"Arquivo compactado inválido {archive_name}: {str(e)}")
+    finally:
+        archive_file.close()
+
+
+def _iter_zip_members(archive_file: IO[bytes]) -> Iterator[BatchSource]:
+    """
+    Lê os documentos de um arquivo ZIP para a memória.
+
+    Args:
+        archive_file: Arquivo ZIP aberto para leitura binária
+
+    Yields:
+        Tuplas (nome do membro, conteúdo), com conteúdo None para formatos não suportados
+    """
+    remaining = BATCH_MAX_ARCHIVE_BYTES
+    with zipfile.ZipFile(archive_file) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            if not is_batch_document(info.filename):
+                yield info.filename, None
+                continue
+            with archive.open(info) as source:
+                content = _read_member(source, remaining)
+            remaining -= len(content.getbuffer())
+            yield info.filename, content
+
+
+def _iter_tar_members(archive_file: IO[bytes]) -> Iterator[BatchSource]:
+    """
+    Lê os documentos de um arquivo TAR (compactado ou não) para a memória, em modo sequencial.
+
+    Args:
+        archive_file: Arquivo TAR aberto para leitura binária
+
+    Yields:
+        Tuplas (nome do membro, conteúdo), com conteúdo None para formatos não suportados
+    """
+    remaining = BATCH_MAX_ARCHIVE_BYTES
+    with tarfile.open(fileobj=archive_file, mode="r|*") as archive:
+        for tar_info in archive:
+            # Ignorar diretórios, links e dispositivos
+            if not tar_info.isfile():
+                continue
+            if not is_batch_document(tar_info.name):
+                yield tar_info.name, None
+                continue
+            source = archive.extractfile(tar_info)
+            if source is None:
+                continue
+            content = _read_member(source, remaining)
+            remaining -= len(content.getbuffer())
+            yield tar_info.name, content
+
+
+def _read_member(source: IO[bytes], remaining: int) -> io.BytesIO:
+    """
+    Copia um membro de arquivo compactado para a memória.
+
+    Args:
+        source: Fluxo do membro
+        remaining: Bytes ainda disponíveis no limite total do arquivo compactado
+
+    Returns:
+        Conteúdo do membro, posicionado no início
+
+    Raises:
+        ValueError: Se o membro exceder BATCH_MAX_MEMBER_BYTES ou o limite restante
+    """
+    content = io.BytesIO()
+    _copy(source, content, min(remaining, BATCH_MAX_MEMBER_BYTES))
+    return content
+
+
+def process_batch(
+    sources: Iterable[BatchSource],
+    extract_text: bool = True,
+    extract_tables: bool = True,
+    extract_images: bool = False,
+    extract_pages_as_images: bool = False,
+    apply_ocr: bool = False,
+    ocr_lang: str = "por",
+    pdf_text_engine: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Processa um lote de documentos em paralelo, gerando o resultado de cada um ao concluir.
+
+    As fontes são consumidas sob demanda, mantendo no máximo o dobro do número de workers
+    em andamento. O conteúdo de cada documento é enviado em bytes ao pool de processos
+    compartilhado e processado por run_job, com seu próprio token e os limites obrigatórios de
+    JOB_TIMEOUT_SECONDS e JOB_CPU_LIMIT_SECONDS. Se o consumidor fechar o gerador (cliente
+    desconectado), os documentos em andamento são interrompidos e os demais não são lidos.
+
+    Args:
+        sources: Documentos do lote como tuplas (nome original, conteúdo)
+        extract_text: Se deve extrair texto dos documentos
+        extract_tables: Se deve extrair tabelas dos documentos
+        extract_images: Se deve extrair imagens incorporadas dos documentos
+        extract_pages_as_images: Se deve converter páginas inteiras em imagens (apenas para PDF)
+        apply_ocr: Se deve aplicar OCR nas imagens extraídas
+        ocr_lang: Idioma para OCR (por=português, eng=inglês, auto=detecção automática)
+        pdf_text_engine: Motor de extração de texto de PDFs (pypdf2, pdftotext, pypdfium2)
+        max_workers: Documentos do lote processados ao mesmo tempo (padrão: BATCH_MAX_WORKERS)
+
+    Yields:
+        Registro "batch", um registro "result" por documento na ordem de conclusão (e um
+        registro "error" se a leitura das fontes falhar) e, por último, "done" com o status
+        agregado
+    """
+    options = {
+        "extract_text": extract_text,
+        "extract_tables": extract_tables,
+        "extract_images": extract_images,
+        "extract_pages_as_images": extract_pages_as_images,
+        "apply_ocr": apply_ocr,
+        "ocr_lang": ocr_lang,
+        "pdf_text_engine": pdf_text_engine,
+    }
+    workers = max_workers or BATCH_MAX_WORKERS
+    batch_id = str(uuid.uuid4())
+    start = time.perf_counter()
+    succeeded = 0
+    failed = 0
+    total = 0
+    source_error = None
+
+    yield {"type": "batch", "id": batch_id}
+
+    sources = iter(sources)
+    pending: Dict[Any, Tuple[int, str]] = {}
+    exhausted = False
+    cancel_event = create_cancel_event()
+    try:
+        while True:
+            # Ler novas fontes enquanto houver espaço na janela de processamento
+            while not exhausted and len(pending) < workers * 2:
+                try:
+                    filename, content = next(sources)
+                except StopIteration:
+                    exhausted = True
+                    break
+                except Exception as e:
+                    exhausted = True
+                    source_error = str(e)
+                    yield {"type": "error", "stage": "sources", "message": source_error}
+                    break
+
+                index = total
+                total += 1
+                if content is None:
+                    failed += 1
+                    ext = os.path.splitext(filename)[1].lower()
+                    yield {
+                        "type": "result",
+                        "index": index,
+                        "filename": filename,
+                        "status": "error",
+                        "message": f"Formato não suportado: {ext or filename}",
+                    }
+                    continue
+                if total > BATCH_MAX_FILES:
+                    content.close()
+                    exhausted = True
+                    total -= 1
+                    source_error = f"O lote excede o limite de {BATCH_MAX_FILES} documentos"
+                    yield {"type": "error", "stage": "sources", "message": source_error}
+                    break
+
+                future = submit_job(
+                    run_job,
+                    _process_source,
+                    cancel_event,
+                    filename=filename,
+                    data=_read_content(content),
+                    options=options,
+                )
+                pending[future] = (index, filename)
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, filename = pending.pop(future)
+                record = _result_record(future, index, filename)
+                if record["status"] == "success":
+                    succeeded += 1
+                else:
+                    failed += 1
+                yield record
+
+    except GeneratorExit:
+        # O consumidor abandonou o lote: interromper o que está em andamento
+        cancel_event.set()
+        raise
+    finally:
+        # O pool é compartilhado: apenas as tarefas deste lote que ainda não começaram são
+        # descartadas
+        for future in pending:
+            future.cancel()
+        close = getattr(sources, "close", None)
+        if close is not None:
+            close()
+
+    if failed == 0 and source_error is None:
+        status = "success"
+    elif succeeded == 0:
+        status = "error"
+    else:
+        status = "partial"
+
+    yield {
+        "type": "done",
+        "id": batch_id,
+        "status": status,
+        "total": total,
+        "succeeded": succeeded,
+        "failed": failed,
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def _read_content(content: IO[bytes]) -> bytes:
+    """
+    Lê o conteúdo de um documento do lote para envio ao pool de processos.
+
+    Args:
+        content: Conteúdo do documento (fechado ao final)
+
+    Returns:
+        Bytes do documento
+    """
+    try:
+        if isinstance(content, io.BytesIO):
+            return content.getvalue()
+        return content.read()
+    finally:
+        content.close()
+
+
+def _process_source(
+    filename: str,
+    data: bytes,
+    options: Dict[str, Any],
+    cancel_token: CancelToken,
+) -> Dict[str, Any]:
+    """
+    Processa um documento do lote em um processo do pool (executado por run_job).
+
+    Apenas o resumo do resultado volta ao processo principal; o conteúdo extraído fica em
+    RESULTS_DIR.
+
+    Args:
+        filename: Nome original do documento
+        data: Conteúdo do documento
+        options: Opções de processamento do lote
+        cancel_token: Token do processamento, vinculado ao evento de cancelamento do lote
+
+    Returns:
+        Resumo do documento processado (id, status, mensagem e contagens)
+    """
+    document_info = process_document(
+        file_path=filename,
+        original_filename=os.path.basename(filename),
+        cancel_token=cancel_token,
+        file_obj=io.BytesIO(data),
+        **options,
+    )
+
+    extracted = document_info.get("content") or {}
+    return {
+        "id": document_info.get("id"),
+        "status": document_info.get("status", "error"),
+        "message": document_info.get("message"),
+        "table_count": len(extracted.get("tables", [])),
+        "image_count": len(extracted.get("images", [])),
+    }
+
+
+def _result_record(future, index: int, filename: str) -> Dict[str, Any]:
+    """
+    Monta o registro de resultado de um documento do lote.
+
+    O conteúdo extraído não é repetido na resposta do lote; ele fica disponível em
+    /api/documents/{id} e nos endpoints de download.
+
+    Args:
+        future: Future do processamento do documento
+        index: Posição do documento no lote
+        filename: Nome do documento no lote
+
+    Returns:
+        Registro do tipo "result"
+    """
+    try:
+        summary = future.result()
+    except ProcessingCancelled as e:
+        return {
+            "type": "result",
+            "index": index,
+            "filename": filename,
+            "status": "error",
+            "message": str(e),
+        }
+    except Exception as e:
+        logger.error(f"Erro ao processar {filename} no lote: {str(e)}")
+        return {
+            "type": "result",
+            "index": index,
+            "filename": filename,
+            "status": "error",
+            "message": f"Erro ao processar documento: {str(e)}",
+        }
+
+    return {"type": "result", "index": index, "filename": filename, **summary}
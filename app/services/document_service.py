@@ -2,16 +2,34 @@ import os
 import simplejson as json
 import uuid
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import BinaryIO, Dict, Any, Iterator, Optional, List, Tuple
 import shutil
 
 from app.core.config import UPLOAD_DIR, RESULTS_DIR
-from app.core.docling_adapter import DoclingAdapter
+from app.core.docling_adapter import (
+    DoclingAdapter,
+    markdown_to_html,
+    markdown_to_text,
+    record_to_markdown,
+)
+from app.core.cancellation import CancelToken, ProcessingCancelled
+from app.services.ocr_words import list_word_tables, query_words, words_directory
 
 # Inicializar o adaptador Docling
 docling_adapter = DoclingAdapter()
 
 
+def reset_adapter() -> None:
+    """
+    Recria o adaptador de documentos do processo.
+
+    Usado nos workers do pool de processos, para que os motores de OCR (e a ligação com o
+    cache de OCR) sejam criados no próprio worker.
+    """
+    global docling_adapter
+    docling_adapter = DoclingAdapter()
+
+
 def process_document(
     file_path: str,
     original_filename: str,
@@ -21,6 +39,14 @@ def process_document(
     extract_pages_as_images: bool = False,
     apply_ocr: bool = False,
     ocr_lang: str = "por",
+    pdf_text_engine: Optional[str] = None,
+    cancel_token: Optional[CancelToken] = None,
+    file_obj: Optional[BinaryIO] = None,
+    document_id: Optional[str] = None,
+    results_dir: Optional[str] = None,
+    pages: Optional[str] = None,
+    render_options: Optional[Dict[str, Any]] = None,
+    ocr_mode: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Processa um documento usando a biblioteca Docling.
@@ -34,16 +60,29 @@ def process_document(
         extract_pages_as_images: Se deve converter páginas inteiras em imagens (apenas para PDF)
         apply_ocr: Se deve aplicar OCR nas imagens extraídas
         ocr_lang: Idioma para OCR (por=português, eng=inglês, auto=detecção automática)
+        pdf_text_engine: Motor de extração de texto de PDFs (pypdf2, pdftotext, pypdfium2)
+        cancel_token: Token de cancelamento e limites de tempo do processamento
+        file_obj: Conteúdo do documento em um objeto de arquivo (por exemplo, um membro de um
+            ZIP/TAR); quando informado, file_path é usado apenas como nome e nada é lido do disco
+        document_id: ID do documento (padrão: um UUID novo)
+        results_dir: Diretório raiz dos resultados (padrão: RESULTS_DIR)
+        pages: Páginas a processar, como "1-5,10" (apenas para PDF; None para todas)
+        render_options: Opções de rasterização das páginas (ver image_service.build_render_options)
+        ocr_mode: "auto" para aplicar OCR apenas às páginas de PDF sem camada de texto
 
     Returns:
         Dicionário com os resultados do processamento
+
+    Raises:
+        ProcessingCancelled: Se o processamento for cancelado ou exceder seus limites
     """
     try:
         # Gerar ID único para o documento
-        document_id = str(uuid.uuid4())
+        document_id = document_id or str(uuid.uuid4())
 
         # Criar diretório para os resultados
-        result_dir = os.path.join(RESULTS_DIR, document_id)
+        results_dir = results_dir or RESULTS_DIR
+        result_dir = os.path.join(results_dir, document_id)
         os.makedirs(result_dir, exist_ok=True)
 
         # Processar o documento usando o adaptador Docling
@@ -55,6 +94,14 @@ def process_document(
             extract_pages_as_images=extract_pages_as_images,
             apply_ocr=apply_ocr,
             ocr_lang=ocr_lang,
+            pdf_text_engine=pdf_text_engine,
+            cancel_token=cancel_token,
+            file_obj=file_obj,
+            pages=pages,
+            render_options=render_options,
+            ocr_mode=ocr_mode,
+            document_id=document_id,
+            results_dir=results_dir,
         )
 
         # Preparar informações do documento
@@ -63,7 +110,7 @@ def process_document(
             "original_filename": original_filename,
             "processed_at": datetime.now().isoformat(),
             "file_type": os.path.splitext(original_filename)[1].lower()[1:],
-            "file_size": os.path.getsize(file_path),
+            "file_size": _file_size(file_path, file_obj),
             "status": processing_result.get("status", "error"),
             "message": processing_result.get(
                 "message", "Erro desconhecido durante o processamento"
@@ -101,25 +148,25 @@ def process_document(
 
             document_info = clean_json_values(document_info)
 
-        # Salvar metadados do documento
-        with open(os.path.join(result_dir, "metadata.json"), "w", encoding="utf-8") as f:
-            json.dump(document_info, f, ensure_ascii=False, indent=2)
-
-        # Salvar conteúdo em markdown se disponível
-        if extract_text and processing_result.get("content", {}).get("markdown"):
-            with open(os.path.join(result_dir, "content.md"), "w", encoding="utf-8") as f:
-                f.write(processing_result["content"]["markdown"])
-
-        # Salvar conteúdo em HTML se disponível
-        if extract_text and processing_result.get("content", {}).get("html"):
-            with open(os.path.join(result_dir, "content.html"), "w", encoding="utf-8") as f:
-                f.write(processing_result["content"]["html"])
+        # Salvar metadados e conteúdo do documento
+        _write_results(result_dir, document_info)
 
         # Copiar o arquivo original para o diretório de resultados
-        shutil.copy2(file_path, os.path.join(result_dir, os.path.basename(file_path)))
+        original_path = os.path.join(result_dir, os.path.basename(file_path))
+        if file_obj is not None:
+            file_obj.seek(0)
+            with open(original_path, "wb") as f:
+                shutil.copyfileobj(file_obj, f)
+        else:
+            shutil.copy2(file_path, original_path)
 
         return document_info
 
+    except ProcessingCancelled as e:
+        # Descartar os resultados parciais do processamento abandonado
+        print(f"Processamento cancelado: {str(e)}")
+        shutil.rmtree(result_dir, ignore_errors=True)
+        raise
     except Exception as e:
         # Registrar erro e repassar a exceção
         print(f"Erro ao processar documento: {str(e)}")
@@ -131,6 +178,337 @@ def process_document(
         raise
 
 
+def inspect_document(
+    file_path: str,
+    original_filename: str,
+    file_obj: Optional[BinaryIO] = None,
+) -> Dict[str, Any]:
+    """
+    Obtém os metadados de um documento sem extrair o conteúdo nem gravar resultados.
+
+    Args:
+        file_path: Caminho para o arquivo (ou apenas o nome, se file_obj for informado)
+        original_filename: Nome original do arquivo
+        file_obj: Conteúdo do documento em um objeto de arquivo (opcional)
+
+    Returns:
+        Dicionário com status, mensagem e metadados (páginas, título, planilhas e tamanho)
+    """
+    metadata = docling_adapter.get_document_metadata(file_path, file_obj=file_obj)
+
+    if metadata.get("status") == "error":
+        return {"filename": original_filename, "status": "error", "message": metadata["message"]}
+
+    return {
+        "filename": original_filename,
+        "status": "success",
+        "message": "Metadados extraídos com sucesso",
+        "metadata": metadata,
+    }
+
+
+def _file_size(file_path: str, file_obj: Optional[BinaryIO] = None) -> int:
+    """
+    Obtém o tamanho do documento em bytes, a partir do disco ou do objeto de arquivo.
+
+    Args:
+        file_path: Caminho do documento
+        file_obj: Objeto de arquivo com o conteúdo (opcional)
+
+    Returns:
+        Tamanho em bytes
+    """
+    if file_obj is None:
+        return os.path.getsize(file_path)
+    file_obj.seek(0, os.SEEK_END)
+    return file_obj.tell()
+
+
+def stream_document(
+    file_path: str,
+    original_filename: str,
+    extract_text: bool = True,
+    extract_tables: bool = True,
+    extract_images: bool = False,
+    extract_pages_as_images: bool = False,
+    apply_ocr: bool = False,
+    ocr_lang: str = "por",
+    pdf_text_engine: Optional[str] = None,
+    cancel_token: Optional[CancelToken] = None,
+    pages: Optional[str] = None,
+    render_options: Optional[Dict[str, Any]] = None,
+    ocr_mode: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Processa um documento gerando registros à medida que cada unidade é concluída.
+
+    Os registros do pipeline do adaptador são repassados ao cliente assim que cada unidade é
+    concluída. O texto é gravado incrementalmente em content.md pelo ContentWriter, de modo
+    que nem o texto completo nem a resposta inteira precisam ficar em memória; o metadata.json
+    final guarda apenas tabelas, imagens e metadados.
+
+    Se o processamento exceder os limites do token, um registro "error" é gerado e os
+    resultados parciais são mantidos. Se o consumidor fechar o gerador (cliente
+    desconectado), o token é cancelado e os resultados parciais são descartados.
+
+    Args:
+        file_path: Caminho para o arquivo a ser processado
+        original_filename: Nome original do arquivo
+        extract_text: Se deve extrair texto do documento
+        extract_tables: Se deve extrair tabelas do documento
+        extract_images: Se deve extrair imagens incorporadas do documento
+        extract_pages_as_images: Se deve converter páginas inteiras em imagens (apenas para PDF)
+        apply_ocr: Se deve aplicar OCR nas imagens extraídas
+        ocr_lang: Idioma para OCR (por=português, eng=inglês, auto=detecção automática)
+        pdf_text_engine: Motor de extração de texto de PDFs (pypdf2, pdftotext, pypdfium2)
+        cancel_token: Token de cancelamento e limites de tempo do processamento
+        pages: Páginas a processar, como "1-5,10" (apenas para PDF; None para todas)
+        render_options: Opções de rasterização das páginas (ver image_service.build_render_options)
+        ocr_mode: "auto" para aplicar OCR apenas às páginas de PDF sem camada de texto
+
+    Yields:
+        Registro "document", os registros de DoclingAdapter.iter_records e, por último,
+        "done" com o status agregado
+    """
+    # Gerar ID único para o documento
+    document_id = str(uuid.uuid4())
+    result_dir = os.path.join(RESULTS_DIR, document_id)
+
+    document_info = {
+        "id": document_id,
+        "original_filename": original_filename,
+        "processed_at": datetime.now().isoformat(),
+        "file_type": os.path.splitext(original_filename)[1].lower()[1:],
+        "file_size": os.path.getsize(file_path),
+        "status": "success",
+        "message": "Documento processado com sucesso",
+    }
+    yield {"type": "document", **document_info}
+
+    # Criar diretório para os resultados
+    os.makedirs(result_dir, exist_ok=True)
+
+    content: Dict[str, Any] = {}
+    metadata: Dict[str, Any] = {}
+    writer = ContentWriter(result_dir, document_info["file_type"])
+
+    try:
+        records = docling_adapter.iter_records(
+            file_path,
+            document_id,
+            extract_text=extract_text,
+            extract_tables=extract_tables,
+            extract_images=extract_images,
+            extract_pages_as_images=extract_pages_as_images,
+            apply_ocr=apply_ocr,
+            ocr_lang=ocr_lang,
+            pdf_text_engine=pdf_text_engine,
+            cancel_token=cancel_token,
+            pages=pages,
+            render_options=render_options,
+            ocr_mode=ocr_mode,
+        )
+
+        for record in records:
+            if record["type"] == "metadata":
+                metadata.update({k: v for k, v in record.items() if k != "type"})
+            elif record["type"] == "table":
+                content.setdefault("tables", []).append(record["table"])
+            elif record["type"] == "image":
+                content.setdefault("images", []).append(record["image"])
+            elif record["type"] == "error" and record.get("stage") == "images":
+                metadata["image_extraction_error"] = record["message"]
+            else:
+                if record.get("text_source") == "ocr":
+                    metadata.setdefault("ocr_pages", []).append(record["page"])
+                writer.write(record)
+
+            yield record
+
+    except GeneratorExit:
+        # O consumidor abandonou o fluxo: interromper o trabalho pendente e descartar o parcial
+        if cancel_token is not None:
+            cancel_token.cancel("Cliente desconectado")
+        writer.close()
+        shutil.rmtree(result_dir, ignore_errors=True)
+        raise
+    except Exception as e:
+        print(f"Erro ao processar documento: {str(e)}")
+        document_info["status"] = "error"
+        document_info["message"] = f"Erro ao processar documento: {str(e)}"
+        yield {"type": "error", "stage": "processing", "message": document_info["message"]}
+    finally:
+        writer.close()
+
+    document_info["content"] = content
+    document_info["metadata"] = metadata
+    document_info["streamed"] = True
+
+    # Salvar metadados do documento
+    with open(os.path.join(result_dir, "metadata.json"), "w", encoding="utf-8") as f:
+        json.dump(document_info, f, ensure_ascii=False, indent=2)
+
+    # Copiar o arquivo original para o diretório de resultados
+    shutil.copy2(file_path, os.path.join(result_dir, os.path.basename(file_path)))
+
+    yield {
+        "type": "done",
+        "id": document_id,
+        "status": document_info["status"],
+        "message": document_info["message"],
+        "pages": metadata.get("pages"),
+        "image_count": len(content.get("images", [])),
+        "table_count": len(content.get("tables", [])),
+    }
+
+
+class ContentWriter:
+    """
+    Consumidor do pipeline que grava o conteúdo textual em disco à medida que chega.
+
+    Os registros "page", "paragraph", "sheet" e "slide" são anexados a content.md, de modo que o
+    texto completo nunca precisa ser mantido em memória. O HTML é derivado sob demanda.
+    """
+
+    def __init__(self, result_dir: str, file_type: str):
+        """
+        Inicializa o gravador.
+
+        Args:
+            result_dir: Diretório de resultados do documento
+            file_type: Tipo do arquivo de origem (pdf, docx, pptx, xlsx)
+        """
+        self.markdown_path = os.path.join(result_dir, "content.md")
+        self.file_type = file_type
+        self._md_file = None
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """
+        Grava o trecho de texto de um registro, ignorando registros sem texto.
+
+        Args:
+            record: Registro gerado pelo pipeline de extração
+        """
+        fragment = record_to_markdown(record)
+        if not fragment:
+            return
+
+        if self._md_file is None:
+            self._md_file = open(self.markdown_path, "w", encoding="utf-8")
+        self._md_file.write(fragment)
+
+    def close(self) -> None:
+        """
+        Finaliza o arquivo gravado.
+        """
+        if self._md_file is None:
+            return
+
+        self._md_file.close()
+        self._md_file = None
+
+
+def _write_results(result_dir: str, document_info: Dict[str, Any]) -> None:
+    """
+    Grava metadata.json e o markdown do documento.
+
+    O markdown é a única representação textual guardada: ele vai para content.md e nem ele nem
+    o texto simples são repetidos em metadata.json. O HTML e o texto são gerados apenas quando
+    solicitados (render_document_format).
+
+    Args:
+        result_dir: Diretório de resultados do documento
+        document_info: Informações do documento, com o conteúdo extraído
+    """
+    content = document_info.get("content") or {}
+    md_text = content.get("markdown")
+
+    metadata = dict(document_info)
+    if "content" in document_info:
+        metadata["content"] = {k: v for k, v in content.items() if k not in ("markdown", "text")}
+    with open(os.path.join(result_dir, "metadata.json"), "w", encoding="utf-8") as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+    if md_text:
+        with open(os.path.join(result_dir, "content.md"), "w", encoding="utf-8") as f:
+            f.write(md_text)
+
+
+def render_document_format(document_info: Dict[str, Any], format: str) -> Optional[str]:
+    """
+    Obtém o arquivo de um documento processado no formato solicitado, gerando-o se necessário.
+
+    Apenas o markdown (content.md) é gravado no processamento. Na primeira solicitação de HTML
+    ou de texto, content.html ou content.txt é gerado a partir dele e mantido no diretório de
+    resultados para as próximas. O markdown de PDF e planilhas já é texto simples e é servido
+    diretamente como texto.
+
+    Args:
+        document_info: Informações do documento (retornadas por get_document_info)
+        format: Formato do arquivo (original, markdown, html, text)
+
+    Returns:
+        Caminho do arquivo ou None se o documento não tiver conteúdo nesse formato
+    """
+    files = document_info.get("files", {})
+    file_type = document_info.get("file_type", "")
+    if format == "text" and file_type not in ("docx", "pptx"):
+        format = "markdown"
+
+    file_path = files.get(format)
+    if file_path and os.path.exists(file_path):
+        return file_path
+
+    markdown_path = files.get("markdown")
+    if format not in _RENDERERS or not markdown_path or not os.path.exists(markdown_path):
+        return None
+
+    filename, render = _RENDERERS[format]
+    output_path = os.path.join(os.path.dirname(markdown_path), filename)
+    # Gravar em um arquivo temporário e renomear, para que requisições simultâneas nunca leiam
+    # um arquivo incompleto
+    temp_path = f"{output_path}.{uuid.uuid4().hex}.tmp"
+    with open(markdown_path, "r", encoding="utf-8") as f:
+        rendered = render(f.read(), file_type)
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(rendered)
+    os.replace(temp_path, output_path)
+
+    files[format] = output_path
+    return output_path
+
+
+# Formatos derivados do markdown: nome do arquivo gerado e função de conversão
+_RENDERERS = {
+    "html": ("content.html", markdown_to_html),
+    "text": ("content.txt", markdown_to_text),
+}
+
+
+def load_document_content(document_info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Acrescenta o markdown e o texto simples, lidos de content.md, às informações do documento.
+
+    Resultados gravados antes de o texto sair de metadata.json já trazem o conteúdo e são
+    mantidos como estão.
+
+    Args:
+        document_info: Informações do documento (retornadas por get_document_info)
+
+    Returns:
+        As mesmas informações, com content["markdown"] e content["text"] quando houver texto
+    """
+    content = document_info.setdefault("content", {})
+    markdown_path = (document_info.get("files") or {}).get("markdown")
+    if "markdown" in content or not markdown_path or not os.path.exists(markdown_path):
+        return document_info
+
+    with open(markdown_path, "r", encoding="utf-8") as f:
+        content["markdown"] = f.read()
+    content["text"] = markdown_to_text(content["markdown"], document_info.get("file_type", ""))
+    return document_info
+
+
 def get_document_info(document_id: str) -> Optional[Dict[str, Any]]:
     """
     Obtém informações sobre um documento processado.
@@ -181,49 +559,88 @@ def get_document_info(document_id: str) -> Optional[Dict[str, Any]]:
     # Adicionar caminhos para arquivos de conteúdo se existirem
     markdown_path = os.path.join(result_dir, "content.md")
     html_path = os.path.join(result_dir, "content.html")
+    text_path = os.path.join(result_dir, "content.txt")
 
     document_info["files"] = {
         "metadata": metadata_path,
         "markdown": markdown_path if os.path.exists(markdown_path) else None,
         "html": html_path if os.path.exists(html_path) else None,
-        "original": os.path.join(
-            result_dir, os.path.basename(document_info.get("original_filename", ""))
-        ),
+        "text": text_path if os.path.exists(text_path) else None,
+        "original": _original_path(result_dir, document_info),
     }
 
     return document_info
 
 
-def save_document_result(document_id: str, result: Dict[str, Any], file_path: str, original_filename: str) -> None:
+def _original_path(result_dir: str, document_info: Dict[str, Any]) -> str:
     """
-    Salva os resultados do processamento de um documento.
+    Localiza a cópia do arquivo original no diretório de resultados.
+
+    A cópia é gravada com o nome do arquivo enviado (por exemplo, o UUID gerado no upload),
+    que pode diferir do nome original; nesse caso é usado o arquivo com a mesma extensão.
 
     Args:
-        document_id: ID do documento
-        result: Resultado do processamento
-        file_path: Caminho para o arquivo original
-        original_filename: Nome original do arquivo
+        result_dir: Diretório de resultados do documento
+        document_info: Metadados do documento
+
+    Returns:
+        Caminho para o arquivo original (que pode não existir)
     """
-    # Criar diretório para os resultados
-    result_dir = os.path.join(RESULTS_DIR, document_id)
-    os.makedirs(result_dir, exist_ok=True)
+    original_path = os.path.join(result_dir, os.path.basename(document_info.get("original_filename", "")))
+    if os.path.isfile(original_path):
+        return original_path
+
+    extension = f".{document_info.get('file_type', '')}"
+    for filename in sorted(os.listdir(result_dir)):
+        candidate = os.path.join(result_dir, filename)
+        if filename.lower().endswith(extension) and os.path.isfile(candidate):
+            return candidate
+    return original_path
+
+
+def get_document_words(
+    document_id: str,
+    document_info: Dict[str, Any],
+    page: Optional[int] = None,
+    region: Optional[Tuple[float, float, float, float]] = None,
+    min_conf: Optional[float] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Consulta as palavras do OCR de um documento, das páginas e das imagens.
 
-    # Salvar metadados do documento
-    with open(os.path.join(result_dir, "metadata.json"), "w", encoding="utf-8") as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
+    Os arquivos são localizados pelo mesmo diretório de OCR usado na gravação (words_directory).
+    As tabelas de imagens cujo nome não indica a página (por exemplo, imagens de DOCX) recebem
+    a página registrada na imagem, quando houver.
 
-    # Salvar conteúdo em markdown se disponível
-    if result.get("content", {}).get("markdown"):
-        with open(os.path.join(result_dir, "content.md"), "w", encoding="utf-8") as f:
-            f.write(result["content"]["markdown"])
+    Args:
+        document_id: ID do documento
+        document_info: Informações do documento (retornadas por get_document_info)
+        page: Página consultada (None para todas as tabelas do documento)
+        region: Região (x0, y0, x1, y1) em pixels, aplicada a cada tabela
+        min_conf: Confiança mínima, de 0 a 100
+        limit: Número máximo de palavras por tabela
 
-    # Salvar conteúdo em HTML se disponível
-    if result.get("content", {}).get("html"):
-        with open(os.path.join(result_dir, "content.html"), "w", encoding="utf-8") as f:
-            f.write(result["content"]["html"])
+    Returns:
+        Uma entrada por tabela com name, source ("page" ou "image"), page e o resultado de
+        query_words
+    """
+    images = (document_info.get("content") or {}).get("images", [])
+    image_pages = {
+        os.path.basename(image["ocr"]["words_file"]): image.get("page")
+        for image in images
+        if (image.get("ocr") or {}).get("words_file")
+    }
 
-    # Copiar o arquivo original para o diretório de resultados
-    shutil.copy2(file_path, os.path.join(result_dir, os.path.basename(file_path)))
+    words_dir = words_directory(os.path.join(RESULTS_DIR, document_id))
+
+    tables = []
+    for table in list_word_tables(words_dir, image_pages):
+        if page is not None and table["page"] != page:
+            continue
+        entry = {key: table[key] for key in ("name", "source", "page")}
+        tables.append({**entry, **query_words(table["path"], region, min_conf, limit)})
+    return tables
 
 
 def list_documents(limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
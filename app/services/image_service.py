@@ -7,21 +7,108 @@ Este módulo fornece funcionalidades para extrair imagens de diferentes tipos de
 
 import os
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
 from pathlib import Path
 import io
+import heapq
 import uuid
+import shutil
+import zipfile
+import tempfile
 
 from PIL import Image
+import PyPDF2
 import pdf2image
-from pdf2image.exceptions import PDFInfoNotInstalledError, PDFPageCountError, PDFSyntaxError
-
-from app.core.config import RESULTS_DIR
-from app.services.ocr_service import OCRService
+from pdf2image.exceptions import (
+    PDFInfoNotInstalledError,
+    PDFPageCountError,
+    PDFPopplerTimeoutError,
+    PDFSyntaxError,
+)
+from PyPDF2.errors import PdfReadError
+
+from app.core.config import (
+    RESULTS_DIR,
+    RENDER_BATCH_PAGES,
+    RENDER_DPI,
+    RENDER_COLOR_MODE,
+    RENDER_FORMAT,
+    RENDER_QUALITY,
+    OCR_WORD_BOXES,
+)
+from app.core.cancellation import CancelToken, ProcessingTimeout, check_cancelled, remaining_time
+from app.core import pptx_package
+from app.core.page_ranges import iter_page_numbers
+from app.services import pdf_images
+from app.services.ocr_cache import get_ocr_cache
+from app.services.ocr_service import LanguageSelector, OCRService
+from app.services.ocr_words import WORDS_SUFFIX, save_word_table, words_directory, words_to_text
 
 # Configurar logger
 logger = logging.getLogger(__name__)
 
+# Opções aceitas na rasterização de páginas
+RENDER_FORMATS = ("png", "jpeg", "webp")
+RENDER_COLOR_MODES = ("rgb", "gray", "bilevel")
+RENDER_DPI_RANGE = (36, 600)
+
+# Extensão dos arquivos gerados para cada formato
+_RENDER_EXTENSIONS = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+
+# Pastas das imagens incorporadas nos pacotes DOCX e PPTX
+DOCX_MEDIA_DIR = "word/media/"
+PPTX_MEDIA_DIR = "ppt/media/"
+
+# Tamanho dos blocos copiados do pacote para o disco
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def build_render_options(
+    dpi: Optional[int] = None,
+    color_mode: Optional[str] = None,
+    image_format: Optional[str] = None,
+    quality: Optional[int] = None,
+    persist: bool = True,
+) -> Dict[str, Any]:
+    """
+    Valida as opções de rasterização de páginas, completando-as com os valores padrão.
+
+    Args:
+        dpi: Resolução em pontos por polegada (padrão: RENDER_DPI)
+        color_mode: Modo de cor: rgb, gray (tons de cinza) ou bilevel (preto e branco)
+        image_format: Formato da imagem: png, jpeg ou webp
+        quality: Qualidade de compressão para JPEG e WebP, de 1 a 100
+        persist: Se False, as páginas são geradas apenas para o OCR, em formato não comprimido,
+            e removidas assim que o OCR é aplicado (use somente com OCR)
+
+    Returns:
+        Dicionário com as chaves dpi, color_mode, format, quality e persist
+
+    Raises:
+        ValueError: Se alguma opção for inválida
+    """
+    dpi = RENDER_DPI if dpi is None else dpi
+    color_mode = (color_mode or RENDER_COLOR_MODE).lower()
+    image_format = (image_format or RENDER_FORMAT).lower()
+    quality = RENDER_QUALITY if quality is None else quality
+
+    if image_format == "jpg":
+        image_format = "jpeg"
+    if not RENDER_DPI_RANGE[0] <= dpi <= RENDER_DPI_RANGE[1]:
+        raise ValueError(f"DPI inválido: {dpi} (use de {RENDER_DPI_RANGE[0]} a {RENDER_DPI_RANGE[1]})")
+    if color_mode not in RENDER_COLOR_MODES:
+        raise ValueError(f"Modo de cor inválido: {color_mode} (use {', '.join(RENDER_COLOR_MODES)})")
+    if image_format not in RENDER_FORMATS:
+        raise ValueError(f"Formato de imagem inválido: {image_format} (use {', '.join(RENDER_FORMATS)})")
+    if not 1 <= quality <= 100:
+        raise ValueError(f"Qualidade inválida: {quality} (use de 1 a 100)")
+    if color_mode == "bilevel" and image_format == "jpeg":
+        # A compressão JPEG reintroduz tons de cinza nas bordas e anula o modo preto e branco
+        raise ValueError("O modo bilevel não é compatível com o formato jpeg")
+
+    return {"dpi": dpi, "color_mode": color_mode, "format": image_format, "quality": quality, "persist": persist}
+
+
 class ImageExtractor:
     """
     Classe para extrair imagens de documentos.
@@ -37,8 +124,8 @@ class ImageExtractor:
             'pptx': self.extract_from_pptx,
         }
 
-        # Inicializar o serviço de OCR
-        self.ocr_service = OCRService()
+        # Inicializar o serviço de OCR, reaproveitando resultados de imagens já reconhecidas
+        self.ocr_service = OCRService(cache=get_ocr_cache())
 
     def extract_images(self, file_path: str, document_id: str, extract_pages: bool = False, apply_ocr: bool = False, ocr_lang: str = "por") -> Dict[str, Any]:
         """
@@ -88,38 +175,12 @@ class ImageExtractor:
                 logger.info(f"Aplicando OCR nas imagens extraídas com idioma: {ocr_lang}")
 
                 # Criar diretório para resultados de OCR
-                ocr_dir = os.path.join(os.path.dirname(images_dir), "ocr")
-                os.makedirs(ocr_dir, exist_ok=True)
+                ocr_dir = self._create_ocr_directory(images_dir)
 
-                # Processar OCR para cada imagem
+                # Processar OCR para cada imagem, detectando o idioma uma única vez
+                languages = self.language_selector(ocr_lang)
                 for image_info in result["images"]:
-                    image_path = image_info["path"]
-
-                    # Detectar idioma automaticamente se solicitado
-                    lang = ocr_lang
-                    if lang == "auto":
-                        lang = self.ocr_service.detect_language(image_path)
-                        logger.info(f"Idioma detectado para {os.path.basename(image_path)}: {lang}")
-
-                    # Aplicar OCR
-                    ocr_result = self.ocr_service.process_image(image_path, lang=lang)
-
-                    # Adicionar resultado do OCR às informações da imagem
-                    image_info["ocr"] = {
-                        "success": ocr_result["success"],
-                        "text": ocr_result.get("text", ""),
-                        "lang": lang
-                    }
-
-                    # Salvar texto extraído em arquivo
-                    if ocr_result["success"] and ocr_result.get("text"):
-                        text_filename = f"{os.path.splitext(os.path.basename(image_path))[0]}.txt"
-                        text_path = os.path.join(ocr_dir, text_filename)
-
-                        with open(text_path, "w", encoding="utf-8") as f:
-                            f.write(ocr_result["text"])
-
-                        image_info["ocr"]["text_file"] = text_path
+                    self._apply_ocr(image_info, ocr_dir, languages)
 
                 # Adicionar informações de OCR ao resultado
                 result["ocr_applied"] = True
@@ -134,7 +195,244 @@ class ImageExtractor:
                 "images": []
             }
 
-    def extract_from_pdf(self, file_path: str, images_dir: str, extract_pages: bool = True) -> Dict[str, Any]:
+    def iter_images(
+        self,
+        file_path: str,
+        document_id: str,
+        extract_pages: bool = False,
+        apply_ocr: bool = False,
+        ocr_lang: Union[str, LanguageSelector] = "por",
+        cancel_token: Optional[CancelToken] = None,
+        page_ranges: Optional[List[Tuple[int, int]]] = None,
+        render_options: Optional[Dict[str, Any]] = None,
+        results_dir: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Extrai imagens de um documento, gerando cada imagem assim que ela fica pronta.
+
+        Diferente de extract_images, as páginas de PDFs são rasterizadas em lotes e o OCR é
+        aplicado imagem a imagem, permitindo que o consumidor processe os resultados sem
+        esperar pelo documento inteiro.
+
+        Args:
+            file_path: Caminho para o arquivo
+            document_id: ID do documento
+            extract_pages: Se True, também extrai páginas como imagens (para PDFs)
+            apply_ocr: Se True, aplica OCR nas imagens extraídas
+            ocr_lang: Idioma para OCR (por=português, eng=inglês, auto=detecção automática uma
+                vez por documento) ou um LanguageSelector compartilhado
+            cancel_token: Token verificado entre os lotes de páginas e entre as imagens
+            page_ranges: Intervalos de páginas a rasterizar (None para todas as páginas); o
+                OCR é aplicado apenas às páginas selecionadas
+            render_options: Opções de rasterização das páginas (ver build_render_options)
+            results_dir: Diretório raiz dos resultados (padrão: RESULTS_DIR); as imagens são
+                gravadas em {results_dir}/{document_id}/images
+
+        Yields:
+            Dicionários com informações de cada imagem extraída
+
+        Raises:
+            FileNotFoundError: Se o arquivo não existir
+            ValueError: Se o formato não for suportado
+            RuntimeError: Se a extração falhar
+            ProcessingCancelled: Se o processamento for cancelado ou exceder seus limites
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+
+        file_ext = os.path.splitext(file_path)[1].lower().replace('.', '')
+        if file_ext not in self.supported_formats:
+            raise ValueError(f"Formato não suportado: {file_ext}")
+
+        images_dir = self._create_images_directory(document_id, results_dir)
+        ocr_dir = self._create_ocr_directory(images_dir) if apply_ocr else None
+
+        if file_ext == "pdf":
+            images = self._iter_pdf_images(file_path, images_dir, extract_pages, cancel_token, page_ranges, render_options)
+        elif file_ext == "docx":
+            images = self._iter_package_media(file_path, images_dir, DOCX_MEDIA_DIR)
+        elif file_ext == "pptx":
+            images = self._iter_pptx_media(file_path, images_dir)
+        else:
+            result = self.supported_formats[file_ext](file_path, images_dir, extract_pages)
+            if not result["success"]:
+                raise RuntimeError(result.get("error", "Erro desconhecido"))
+            images = iter(result["images"])
+
+        languages = self.language_selector(ocr_lang)
+        for image_info in images:
+            check_cancelled(cancel_token)
+            if ocr_dir is not None:
+                self._apply_ocr(image_info, ocr_dir, languages, cancel_token)
+            yield image_info
+
+    def language_selector(self, ocr_lang: Union[str, LanguageSelector]) -> LanguageSelector:
+        """
+        Cria o seletor de idioma de um documento.
+
+        Um mesmo seletor deve ser usado em todas as imagens do documento, para que a detecção
+        automática do idioma aconteça uma única vez.
+
+        Args:
+            ocr_lang: Idioma para OCR (ou "auto") ou um seletor já existente
+
+        Returns:
+            Seletor de idioma (o próprio ocr_lang, se ele já for um seletor)
+        """
+        if isinstance(ocr_lang, LanguageSelector):
+            return ocr_lang
+        return LanguageSelector(self.ocr_service, ocr_lang)
+
+    def ocr_image(self, image_info: Dict[str, Any], ocr_lang: Union[str, LanguageSelector] = "por", cancel_token: Optional[CancelToken] = None) -> None:
+        """
+        Aplica OCR em uma imagem já extraída, salvando o texto no diretório "ocr" do documento.
+
+        Args:
+            image_info: Informações da imagem (atualizadas com a chave "ocr")
+            ocr_lang: Idioma para OCR (ou "auto" para detecção automática) ou o seletor de
+                idioma do documento
+            cancel_token: Token que limita o tempo da chamada ao Tesseract
+        """
+        images_dir = os.path.dirname(image_info["path"])
+        self._apply_ocr(image_info, self._create_ocr_directory(images_dir), ocr_lang, cancel_token)
+
+    def ocr_pdf_page(self, file_path: str, page: int, ocr_lang: Union[str, LanguageSelector] = "por", render_options: Optional[Dict[str, Any]] = None, cancel_token: Optional[CancelToken] = None, words_dir: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Rasteriza uma única página de um PDF e aplica OCR, sem manter a imagem.
+
+        A página é gerada pelo pdftoppm em formato não comprimido (PPM/PGM) em um diretório
+        temporário e lida diretamente pelo Tesseract.
+
+        Args:
+            file_path: Caminho para o arquivo PDF
+            page: Número da página (iniciando em 1)
+            ocr_lang: Idioma para OCR (ou "auto" para detecção automática) ou o seletor de
+                idioma do documento
+            render_options: Opções de rasterização (DPI e modo de cor; ver build_render_options)
+            cancel_token: Token que limita o tempo do pdftoppm e do Tesseract
+            words_dir: Diretório onde gravar as palavras da página (page_N.words.npz) quando
+                OCR_WORD_BOXES estiver ativo
+
+        Returns:
+            Resultado do OCR com as chaves success, text e lang (ou error) e, com as palavras
+            gravadas, words_file e word_count
+
+        Raises:
+            ProcessingCancelled: Se o processamento for cancelado ou exceder seus limites
+        """
+        render = {**(render_options or build_render_options()), "persist": False}
+
+        with tempfile.TemporaryDirectory(prefix="ocr_page_") as temp_dir:
+            image_paths = self._render_pages(file_path, temp_dir, page, page, render, cancel_token)
+            if not image_paths:
+                return {"success": False, "error": f"Página {page} não encontrada", "text": ""}
+
+            languages = self.language_selector(ocr_lang)
+            lang = languages.select(image_paths[0], timeout=remaining_time(cancel_token) or 0)
+
+            ocr_result = self._recognize(image_paths[0], lang, remaining_time(cancel_token) or 0, render["dpi"])
+            if ocr_result["success"]:
+                languages.observe(ocr_result.get("text", ""))
+
+        # Uma falha por tempo limite é reportada como tal, e não como falha de OCR
+        check_cancelled(cancel_token)
+        ocr_result.setdefault("lang", lang)
+
+        data = ocr_result.pop("data", None)
+        if data is not None and words_dir is not None:
+            os.makedirs(words_dir, exist_ok=True)
+            words_path = os.path.join(words_dir, f"page_{page}{WORDS_SUFFIX}")
+            ocr_result["word_count"] = save_word_table(words_path, data)
+            ocr_result["words_file"] = words_path
+        return ocr_result
+
+    def _apply_ocr(self, image_info: Dict[str, Any], ocr_dir: str, ocr_lang: Union[str, LanguageSelector], cancel_token: Optional[CancelToken] = None) -> None:
+        """
+        Aplica OCR em uma imagem extraída e registra o resultado em image_info.
+
+        Args:
+            image_info: Informações da imagem (atualizadas com a chave "ocr")
+            ocr_dir: Diretório para salvar o texto extraído
+            ocr_lang: Idioma para OCR (ou "auto" para detecção automática) ou o seletor de
+                idioma do documento
+            cancel_token: Token que limita o tempo das chamadas ao Tesseract
+
+        Raises:
+            ProcessingCancelled: Se o processamento for cancelado ou exceder seus limites
+        """
+        image_path = image_info["path"]
+
+        # O Tesseract é encerrado pelo pytesseract quando o tempo restante do job acaba
+        check_cancelled(cancel_token)
+
+        # Com "auto", o idioma é detectado na primeira imagem e reaproveitado nas seguintes
+        languages = self.language_selector(ocr_lang)
+        lang = languages.select(image_path, timeout=remaining_time(cancel_token) or 0)
+
+        # Aplicar OCR
+        ocr_result = self._recognize(image_path, lang, remaining_time(cancel_token) or 0, image_info.get("dpi"))
+        if ocr_result["success"]:
+            languages.observe(ocr_result.get("text", ""))
+
+        # Uma falha por tempo limite é reportada como tal, e não como falha de OCR
+        check_cancelled(cancel_token)
+
+        # Adicionar resultado do OCR às informações da imagem
+        image_info["ocr"] = {
+            "success": ocr_result["success"],
+            "text": ocr_result.get("text", ""),
+            "lang": lang
+        }
+
+        # Páginas geradas apenas para o OCR não são mantidas
+        if image_info.pop("transient", False):
+            os.remove(image_path)
+            image_info.update({"path": None, "size_bytes": 0, "persisted": False})
+
+        # Salvar texto extraído em arquivo
+        if ocr_result["success"] and ocr_result.get("text"):
+            text_filename = f"{os.path.splitext(os.path.basename(image_path))[0]}.txt"
+            text_path = os.path.join(ocr_dir, text_filename)
+
+            with open(text_path, "w", encoding="utf-8") as f:
+                f.write(ocr_result["text"])
+
+            image_info["ocr"]["text_file"] = text_path
+
+        # Salvar as palavras com posição e confiança em formato colunar
+        if ocr_result["success"] and "data" in ocr_result:
+            words_filename = f"{os.path.splitext(os.path.basename(image_path))[0]}{WORDS_SUFFIX}"
+            words_path = os.path.join(ocr_dir, words_filename)
+            image_info["ocr"]["word_count"] = save_word_table(words_path, ocr_result["data"])
+            image_info["ocr"]["words_file"] = words_path
+
+    def _recognize(self, image_path: str, lang: str, timeout: float, source_dpi: Optional[float]) -> Dict[str, Any]:
+        """
+        Executa o OCR de uma imagem, obtendo também as palavras quando OCR_WORD_BOXES está ativo.
+
+        Com as palavras, o texto é reconstruído a partir delas, sem uma segunda passagem do
+        Tesseract.
+
+        Args:
+            image_path: Caminho para a imagem
+            lang: Idioma do OCR
+            timeout: Tempo máximo em segundos para o Tesseract (0 para ilimitado)
+            source_dpi: Resolução da imagem (None se desconhecida)
+
+        Returns:
+            Resultado do OCR com a chave "text" e, com OCR_WORD_BOXES, a chave "data"
+        """
+        if not OCR_WORD_BOXES:
+            return self.ocr_service.process_image(image_path, lang=lang, timeout=timeout, source_dpi=source_dpi)
+
+        ocr_result = self.ocr_service.process_image(
+            image_path, lang=lang, output_type="data", timeout=timeout, source_dpi=source_dpi
+        )
+        if ocr_result["success"]:
+            ocr_result["text"] = words_to_text(ocr_result["data"])
+        return ocr_result
+
+    def extract_from_pdf(self, file_path: str, images_dir: str, extract_pages: bool = True, page_ranges: Optional[List[Tuple[int, int]]] = None, render_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Extrai imagens de um documento PDF.
 
@@ -142,6 +440,8 @@ class ImageExtractor:
             file_path: Caminho para o arquivo PDF
             images_dir: Diretório para salvar as imagens
             extract_pages: Se True, também extrai páginas como imagens
+            page_ranges: Intervalos de páginas a rasterizar (None para todas as páginas)
+            render_options: Opções de rasterização das páginas (ver build_render_options)
 
         Returns:
             Dicionário com informações sobre as imagens extraídas
@@ -154,46 +454,12 @@ class ImageExtractor:
             # Garantir que o diretório de imagens exista
             os.makedirs(images_dir, exist_ok=True)
 
-            # Extrair páginas como imagens se solicitado
-            if extract_pages:
-                logger.info("Convertendo páginas do PDF em imagens")
-                try:
-                    # Converter páginas do PDF em imagens
-                    pages = pdf2image.convert_from_path(
-                        file_path,
-                        dpi=200,  # Resolução razoável para a maioria dos casos
-                        fmt="png"
-                    )
-
-                    # Salvar cada página como uma imagem
-                    for i, page in enumerate(pages):
-                        page_number = i + 1
-                        image_filename = f"page_{page_number}.png"
-                        image_path = os.path.join(images_dir, image_filename)
-
-                        # Salvar a imagem
-                        page.save(image_path, "PNG")
-
-                        # Adicionar informações da imagem ao resultado
-                        image_info = {
-                            "filename": image_filename,
-                            "path": image_path,
-                            "type": "page",
-                            "page": page_number,
-                            "format": "png",
-                            "width": page.width,
-                            "height": page.height,
-                            "size_bytes": os.path.getsize(image_path)
-                        }
-                        extracted_images.append(image_info)
-
-                    logger.info(f"Extraídas {len(pages)} páginas como imagens")
-                except (PDFInfoNotInstalledError, PDFPageCountError, PDFSyntaxError) as e:
-                    logger.error(f"Erro ao converter páginas do PDF em imagens: {str(e)}")
-                    return {"error": f"Erro ao converter páginas do PDF: {str(e)}", "images": [], "success": False}
-
-            # TODO: Implementar extração de imagens incorporadas no PDF
-            # Esta funcionalidade será implementada em uma versão futura
+            try:
+                for image_info in self._iter_pdf_images(file_path, images_dir, extract_pages, page_ranges=page_ranges, render_options=render_options):
+                    extracted_images.append(image_info)
+            except (PDFInfoNotInstalledError, PDFPageCountError, PDFSyntaxError) as e:
+                logger.error(f"Erro ao converter páginas do PDF em imagens: {str(e)}")
+                return {"error": f"Erro ao converter páginas do PDF: {str(e)}", "images": [], "success": False}
 
             # Retornar resultado com sucesso
             return {
@@ -209,9 +475,287 @@ class ImageExtractor:
                 "images": extracted_images
             }
 
+    def _iter_pdf_images(self, file_path: str, images_dir: str, extract_pages: bool, cancel_token: Optional[CancelToken] = None, page_ranges: Optional[List[Tuple[int, int]]] = None, render_options: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Gera as imagens de um PDF em ordem de página: as imagens incorporadas e, se
+        solicitado, as páginas rasterizadas em lotes de RENDER_BATCH_PAGES.
+
+        Args:
+            file_path: Caminho para o arquivo PDF
+            images_dir: Diretório para salvar as imagens
+            extract_pages: Se True, também extrai páginas como imagens
+            cancel_token: Token verificado entre os lotes e as páginas; o tempo restante limita
+                o pdftoppm
+            page_ranges: Intervalos de páginas a processar (None para todas as páginas)
+            render_options: Opções de rasterização das páginas (ver build_render_options)
+
+        Yields:
+            Dicionários com informações de cada imagem extraída; a página rasterizada vem antes
+            das imagens incorporadas na mesma página
+        """
+        os.makedirs(images_dir, exist_ok=True)
+
+        embedded = self._iter_embedded_pdf_images(file_path, images_dir, cancel_token, page_ranges)
+        if not extract_pages:
+            yield from embedded
+            return
+
+        pages = self._iter_page_images(file_path, images_dir, cancel_token, page_ranges, render_options)
+        yield from heapq.merge(pages, embedded, key=lambda image_info: image_info["page"])
+
+    def _iter_page_images(self, file_path: str, images_dir: str, cancel_token: Optional[CancelToken] = None, page_ranges: Optional[List[Tuple[int, int]]] = None, render_options: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Gera as páginas de um PDF rasterizadas em lotes de RENDER_BATCH_PAGES.
+
+        Args:
+            file_path: Caminho para o arquivo PDF
+            images_dir: Diretório para salvar as imagens
+            cancel_token: Token verificado entre os lotes; o tempo restante limita o pdftoppm
+            page_ranges: Intervalos de páginas a rasterizar (None para todas as páginas)
+            render_options: Opções de rasterização das páginas (ver build_render_options)
+
+        Yields:
+            Dicionários com informações de cada página rasterizada
+        """
+        render = render_options or build_render_options()
+
+        logger.info(
+            f"Convertendo páginas do PDF em imagens ({render['format']}, {render['dpi']} DPI, {render['color_mode']})"
+        )
+        page_count = 0
+
+        # Sem seleção, o fim do documento é detectado por um lote incompleto
+        for range_first, range_last in [(1, None)] if page_ranges is None else page_ranges:
+            first_page = range_first
+
+            while range_last is None or first_page <= range_last:
+                check_cancelled(cancel_token)
+
+                # Converter um lote de páginas do PDF em imagens
+                last_page = first_page + RENDER_BATCH_PAGES - 1
+                if range_last is not None:
+                    last_page = min(last_page, range_last)
+                image_paths = self._render_pages(file_path, images_dir, first_page, last_page, render, cancel_token)
+
+                for offset, image_path in enumerate(image_paths):
+                    # Apenas o cabeçalho é lido para obter as dimensões
+                    with Image.open(image_path) as image:
+                        width, height = image.size
+
+                    # Adicionar informações da imagem ao resultado
+                    image_info = {
+                        "filename": os.path.basename(image_path),
+                        "path": image_path,
+                        "type": "page",
+                        "page": first_page + offset,
+                        "format": render["format"] if render.get("persist", True) else "pnm",
+                        "width": width,
+                        "height": height,
+                        "dpi": render["dpi"],
+                        "size_bytes": os.path.getsize(image_path)
+                    }
+                    if not render.get("persist", True):
+                        # Página gerada apenas para o OCR, removida em seguida por _apply_ocr
+                        image_info["transient"] = True
+                    yield image_info
+
+                page_count += len(image_paths)
+
+                # Um lote incompleto indica que a última página foi alcançada
+                if len(image_paths) < last_page - first_page + 1:
+                    break
+                first_page = last_page + 1
+
+        logger.info(f"Extraídas {page_count} páginas como imagens")
+
+    def _iter_embedded_pdf_images(self, file_path: str, images_dir: str, cancel_token: Optional[CancelToken] = None, page_ranges: Optional[List[Tuple[int, int]]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Gera as imagens incorporadas em um PDF (XObjects de imagem), página a página.
+
+        JPEG e JPEG 2000 são gravados com os bytes originais; os demais formatos são
+        decodificados e gravados em PNG (ver pdf_images.write_image). Uma imagem desenhada em
+        várias páginas é gravada uma única vez e gerada em cada página em que aparece.
+
+        Args:
+            file_path: Caminho para o arquivo PDF
+            images_dir: Diretório para salvar as imagens
+            cancel_token: Token verificado entre as páginas
+            page_ranges: Intervalos de páginas a processar (None para todas as páginas)
+
+        Yields:
+            Dicionários com informações de cada imagem, com a página e as caixas do desenho
+            (placements, em pontos com origem no canto inferior esquerdo da página)
+        """
+        try:
+            file = open(file_path, "rb")
+        except OSError as e:
+            logger.warning(f"Não foi possível ler as imagens incorporadas de {file_path}: {str(e)}")
+            return
+
+        written: Dict[Tuple[int, int], Optional[Dict[str, Any]]] = {}
+        image_count = 0
+
+        with file:
+            try:
+                pdf_reader = PyPDF2.PdfReader(file)
+            except PdfReadError as e:
+                logger.warning(f"Não foi possível ler as imagens incorporadas de {file_path}: {str(e)}")
+                return
+
+            if page_ranges is None:
+                page_numbers = range(1, len(pdf_reader.pages) + 1)
+            else:
+                page_numbers = iter_page_numbers(page_ranges)
+
+            for page_number in page_numbers:
+                check_cancelled(cancel_token)
+                try:
+                    page_images = list(pdf_images.iter_page_images(pdf_reader.pages[page_number - 1]))
+                except Exception as e:
+                    logger.warning(f"Erro ao ler as imagens da página {page_number} de {file_path}: {str(e)}")
+                    continue
+
+                for index, (key, stream, placements) in enumerate(page_images, start=1):
+                    if key not in written:
+                        base_path = os.path.join(images_dir, f"page_{page_number}_image_{index}")
+                        try:
+                            written[key] = pdf_images.write_image(stream, base_path)
+                        except Exception as e:
+                            logger.warning(f"Erro ao gravar imagem da página {page_number}: {str(e)}")
+                            written[key] = None
+                    saved = written[key]
+                    if saved is None:
+                        continue
+
+                    image_info = {
+                        "filename": os.path.basename(saved["path"]),
+                        "path": saved["path"],
+                        "type": "embedded",
+                        "page": page_number,
+                        "format": saved["format"],
+                        "width": saved["width"],
+                        "height": saved["height"],
+                        "passthrough": saved["passthrough"],
+                        "placements": [
+                            {"x0": x0, "y0": y0, "x1": x1, "y1": y1} for x0, y0, x1, y1 in placements
+                        ],
+                        "size_bytes": os.path.getsize(saved["path"])
+                    }
+                    # Resolução no tamanho desenhado, usada pelo pré-processamento do OCR
+                    dpi = pdf_images.effective_dpi(saved["width"], placements[0])
+                    if dpi:
+                        image_info["dpi"] = dpi
+                    image_count += 1
+                    yield image_info
+
+        logger.info(f"Extraídas {image_count} imagens incorporadas do PDF")
+
+    def _render_pages(self, file_path: str, images_dir: str, first_page: int, last_page: int, render: Dict[str, Any], cancel_token: Optional[CancelToken] = None) -> List[str]:
+        """
+        Rasteriza um lote de páginas, convertendo o tempo limite do pdftoppm em cancelamento.
+
+        Args:
+            file_path: Caminho para o arquivo PDF
+            images_dir: Diretório para salvar as imagens
+            first_page: Primeira página do lote
+            last_page: Última página do lote
+            render: Opções de rasterização (ver build_render_options)
+            cancel_token: Token cujo tempo restante limita o pdftoppm
+
+        Returns:
+            Caminhos das imagens geradas, em ordem de página
+
+        Raises:
+            ProcessingTimeout: Se o pdftoppm exceder o tempo restante do processamento
+        """
+        try:
+            return self._convert_pages(file_path, images_dir, first_page, last_page, render, cancel_token)
+        except PDFPopplerTimeoutError:
+            # O pdf2image já encerrou o pdftoppm ao atingir o tempo limite
+            if cancel_token is not None:
+                cancel_token.cancel("Tempo limite de processamento excedido")
+            raise ProcessingTimeout("Tempo limite de processamento excedido")
+
+    def _convert_pages(self, file_path: str, images_dir: str, first_page: int, last_page: int, render: Dict[str, Any], cancel_token: Optional[CancelToken] = None) -> List[str]:
+        """
+        Rasteriza um lote de páginas, salvando cada uma como page_{n}.{extensão}.
+
+        PNG e JPEG (em cores ou tons de cinza) são gravados diretamente pelo pdftoppm, sem
+        decodificar e recodificar as imagens no Python. O pdftoppm não gera WebP nem imagens
+        de 1 bit, então nesses casos a página é lida em formato bruto (PPM/PGM) e codificada
+        uma única vez pelo Pillow. Páginas que não serão mantidas (persist=False) são gravadas
+        pelo pdftoppm em PPM/PGM, sem compressão, e lidas diretamente pelo Tesseract.
+
+        Args:
+            file_path: Caminho para o arquivo PDF
+            images_dir: Diretório para salvar as imagens
+            first_page: Primeira página do lote
+            last_page: Última página do lote
+            render: Opções de rasterização (ver build_render_options)
+            cancel_token: Token cujo tempo restante limita o pdftoppm
+
+        Returns:
+            Caminhos das imagens geradas, em ordem de página
+
+        Raises:
+            PDFPopplerTimeoutError: Se o pdftoppm exceder o tempo restante
+        """
+        image_format = render["format"]
+        extension = _RENDER_EXTENSIONS[image_format]
+        grayscale = render["color_mode"] != "rgb"
+        image_paths = []
+
+        transient = not render.get("persist", True)
+        if transient or (image_format in ("png", "jpeg") and render["color_mode"] != "bilevel"):
+            if transient:
+                image_format = "ppm"
+                extension = "pgm" if grayscale else "ppm"
+
+            # Prefixo único para não confundir lotes gravados no mesmo diretório
+            prefix = f"render_{uuid.uuid4().hex}"
+            rendered = pdf2image.convert_from_path(
+                file_path,
+                dpi=render["dpi"],
+                fmt=image_format,
+                jpegopt={"quality": render["quality"], "optimize": True} if image_format == "jpeg" else None,
+                grayscale=grayscale,
+                first_page=first_page,
+                last_page=last_page,
+                output_folder=images_dir,
+                output_file=prefix,
+                paths_only=True,
+                timeout=remaining_time(cancel_token),
+            )
+            for offset, rendered_path in enumerate(rendered):
+                image_path = os.path.join(images_dir, f"page_{first_page + offset}.{extension}")
+                os.replace(rendered_path, image_path)
+                image_paths.append(image_path)
+            return image_paths
+
+        pages = pdf2image.convert_from_path(
+            file_path,
+            dpi=render["dpi"],
+            fmt="ppm",
+            grayscale=grayscale,
+            first_page=first_page,
+            last_page=last_page,
+            timeout=remaining_time(cancel_token),
+        )
+        for offset, page in enumerate(pages):
+            image_path = os.path.join(images_dir, f"page_{first_page + offset}.{extension}")
+            if render["color_mode"] == "bilevel":
+                # Limiar fixo, sem pontilhamento, para preservar as bordas do texto
+                page = page.point(lambda value: 255 if value >= 128 else 0, mode="1")
+            if image_format == "webp":
+                page.save(image_path, "WEBP", quality=render["quality"])
+            else:
+                page.save(image_path, "PNG")
+            image_paths.append(image_path)
+        return image_paths
+
     def extract_from_docx(self, file_path: str, images_dir: str, extract_pages: bool = False) -> Dict[str, Any]:
         """
-        Extrai imagens de um documento DOCX.
+        Extrai imagens de um documento DOCX, copiando as partes word/media/* do pacote.
 
         Args:
             file_path: Caminho para o arquivo DOCX
@@ -223,29 +767,85 @@ class ImageExtractor:
         """
         logger.info(f"Extraindo imagens do DOCX: {file_path}")
 
-        try:
-            # Garantir que o diretório de imagens exista
-            os.makedirs(images_dir, exist_ok=True)
+        extracted_images = []
 
-            # TODO: Implementar extração de imagens de documentos DOCX
-            # Esta funcionalidade será implementada em uma versão futura
+        try:
+            for image_info in self._iter_package_media(file_path, images_dir, DOCX_MEDIA_DIR):
+                extracted_images.append(image_info)
 
+            logger.info(f"Extraídas {len(extracted_images)} imagens do DOCX")
             return {
-                "success": False,
-                "error": "Extração de imagens de documentos DOCX ainda não implementada",
-                "images": []
+                "success": True,
+                "images": extracted_images,
+                "count": len(extracted_images)
             }
         except Exception as e:
             logger.error(f"Erro ao extrair imagens do DOCX {file_path}: {str(e)}")
             return {
                 "success": False,
                 "error": f"Erro ao extrair imagens: {str(e)}",
-                "images": []
+                "images": extracted_images
             }
 
+    def _iter_package_media(self, file_path: str, images_dir: str, media_dir: str, media_pages: Optional[Dict[str, int]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Gera as imagens armazenadas em um pacote OOXML (DOCX, PPTX), copiando as partes de mídia.
+
+        Os bytes originais de cada parte são copiados em blocos do ZIP para o disco, sem
+        decodificar e recodificar a imagem. As dimensões são lidas apenas do cabeçalho do
+        arquivo gravado.
+
+        Args:
+            file_path: Caminho para o pacote
+            images_dir: Diretório para salvar as imagens
+            media_dir: Pasta das partes de mídia no pacote (como "word/media/")
+            media_pages: Página (ou slide) de cada parte de mídia, pelo nome da parte (opcional)
+
+        Yields:
+            Dicionários com informações de cada imagem extraída
+
+        Raises:
+            zipfile.BadZipFile: Se o arquivo não for um pacote ZIP válido
+        """
+        os.makedirs(images_dir, exist_ok=True)
+
+        with zipfile.ZipFile(file_path) as package:
+            for member in package.infolist():
+                filename = os.path.basename(member.filename)
+                if member.is_dir() or not member.filename.startswith(media_dir) or not filename:
+                    continue
+
+                image_path = os.path.join(images_dir, filename)
+                with package.open(member) as source, open(image_path, "wb") as target:
+                    shutil.copyfileobj(source, target, _COPY_CHUNK_SIZE)
+
+                image_info = {
+                    "filename": filename,
+                    "path": image_path,
+                    "type": "embedded",
+                    "source": member.filename,
+                    "format": os.path.splitext(filename)[1].lower().lstrip("."),
+                    "width": None,
+                    "height": None,
+                    "size_bytes": member.file_size
+                }
+                if media_pages is not None:
+                    image_info["page"] = media_pages.get(member.filename)
+
+                # Apenas o cabeçalho é lido; formatos que o Pillow não reconhece ficam sem dimensões
+                try:
+                    with Image.open(image_path) as image:
+                        image_info["width"], image_info["height"] = image.size
+                        if image.format:
+                            image_info["format"] = image.format.lower()
+                except Exception as e:
+                    logger.debug(f"Dimensões não disponíveis para {member.filename}: {str(e)}")
+
+                yield image_info
+
     def extract_from_pptx(self, file_path: str, images_dir: str, extract_pages: bool = False) -> Dict[str, Any]:
         """
-        Extrai imagens de uma apresentação PPTX.
+        Extrai imagens de uma apresentação PPTX, copiando as partes ppt/media/* do pacote.
 
         Args:
             file_path: Caminho para o arquivo PPTX
@@ -257,38 +857,54 @@ class ImageExtractor:
         """
         logger.info(f"Extraindo imagens do PPTX: {file_path}")
 
-        try:
-            # Garantir que o diretório de imagens exista
-            os.makedirs(images_dir, exist_ok=True)
+        extracted_images = []
 
-            # TODO: Implementar extração de imagens de apresentações PPTX
-            # Esta funcionalidade será implementada em uma versão futura
+        try:
+            for image_info in self._iter_pptx_media(file_path, images_dir):
+                extracted_images.append(image_info)
 
+            logger.info(f"Extraídas {len(extracted_images)} imagens do PPTX")
             return {
-                "success": False,
-                "error": "Extração de imagens de apresentações PPTX ainda não implementada",
-                "images": []
+                "success": True,
+                "images": extracted_images,
+                "count": len(extracted_images)
             }
         except Exception as e:
             logger.error(f"Erro ao extrair imagens do PPTX {file_path}: {str(e)}")
             return {
                 "success": False,
                 "error": f"Erro ao extrair imagens: {str(e)}",
-                "images": []
+                "images": extracted_images
             }
 
-    def _create_images_directory(self, document_id: str) -> str:
+    def _iter_pptx_media(self, file_path: str, images_dir: str) -> Iterator[Dict[str, Any]]:
+        """
+        Gera as mídias de uma apresentação PPTX com o número do primeiro slide que as usa.
+
+        Args:
+            file_path: Caminho para o arquivo PPTX
+            images_dir: Diretório para salvar as imagens
+
+        Yields:
+            Dicionários com informações de cada imagem extraída
+        """
+        with zipfile.ZipFile(file_path) as package:
+            media_pages = pptx_package.media_slides(package)
+        yield from self._iter_package_media(file_path, images_dir, PPTX_MEDIA_DIR, media_pages)
+
+    def _create_images_directory(self, document_id: str, results_dir: Optional[str] = None) -> str:
         """
         Cria um diretório para armazenar as imagens extraídas.
 
         Args:
             document_id: ID do documento
+            results_dir: Diretório raiz dos resultados (padrão: RESULTS_DIR)
 
         Returns:
             Caminho para o diretório de imagens
         """
         # Diretório do documento
-        document_dir = os.path.join(RESULTS_DIR, document_id)
+        document_dir = os.path.join(results_dir or RESULTS_DIR, document_id)
 
         # Diretório de imagens
         images_dir = os.path.join(document_dir, "images")
@@ -298,6 +914,20 @@ class ImageExtractor:
 
         return images_dir
 
+    def _create_ocr_directory(self, images_dir: str) -> str:
+        """
+        Cria o diretório para os resultados de OCR, ao lado do diretório de imagens.
+
+        Args:
+            images_dir: Diretório de imagens do documento
+
+        Returns:
+            Caminho para o diretório de OCR
+        """
+        ocr_dir = words_directory(os.path.dirname(images_dir))
+        os.makedirs(ocr_dir, exist_ok=True)
+        return ocr_dir
+
 
 def process_image(image_path: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
     """
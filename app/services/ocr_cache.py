@@ -0,0 +1,285 @@
+"""
+Módulo de cache persistente de resultados de OCR.
+
+O mesmo conteúdo é reconhecido várias vezes: timbres repetidos, digitalizações reenviadas e o
+endpoint de OCR de uma imagem chamado de novo pela interface. Este módulo guarda os resultados
+em um banco SQLite, indexados pelo SHA-256 do conteúdo da imagem e pelos parâmetros do OCR
+(idioma, configuração, tipo de saída, motor e pré-processamento), com descarte das entradas
+usadas há mais tempo (LRU) quando o tamanho máximo é excedido.
+"""
+
+import os
+import json
+import time
+import base64
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional, Union
+
+from PIL import Image
+
+from app.core.config import OCR_CACHE_ENABLED, OCR_CACHE_MAX_BYTES, OCR_CACHE_PATH
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Após um descarte, o cache é reduzido a esta fração do tamanho máximo
+_EVICTION_TARGET = 0.9
+
+# Tamanho dos blocos lidos no cálculo do hash de arquivos
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ocr_results (
+    key TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ocr_results_last_access ON ocr_results (last_access);
+"""
+
+
+def image_digest(image: Union[str, Image.Image]) -> str:
+    """
+    Calcula o SHA-256 do conteúdo de uma imagem.
+
+    Args:
+        image: Caminho para o arquivo (o hash é do arquivo, sem decodificá-lo) ou imagem PIL
+            já carregada (o hash é dos pixels, do modo e das dimensões)
+
+    Returns:
+        Hash hexadecimal
+    """
+    digest = hashlib.sha256()
+    if isinstance(image, Image.Image):
+        digest.update(f"{image.mode}:{image.width}x{image.height}:".encode("ascii"))
+        digest.update(image.tobytes())
+    else:
+        with open(image, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(digest: str, **params: Any) -> str:
+    """
+    Monta a chave de um resultado a partir do hash da imagem e dos parâmetros do OCR.
+
+    Args:
+        digest: SHA-256 da imagem (ver image_digest)
+        **params: Parâmetros que alteram o resultado (idioma, configuração, tipo de saída, ...)
+
+    Returns:
+        Chave do resultado no cache
+    """
+    encoded = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    return f"{digest}:{hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:32]}"
+
+
+class OCRCache:
+    """
+    Cache de resultados de OCR em SQLite com descarte LRU.
+
+    A data do último acesso de cada entrada é atualizada a cada leitura e define a ordem de
+    descarte. O banco usa journal WAL, de modo que pode ser compartilhado pelos processos do
+    servidor; os contadores de acertos são do processo atual.
+    """
+
+    def __init__(self, db_path: str, max_bytes: int):
+        """
+        Inicializa o cache.
+
+        Args:
+            db_path: Caminho do banco SQLite (criado no primeiro uso)
+            max_bytes: Tamanho máximo dos resultados guardados, em bytes
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._size: Optional[int] = None
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtém um resultado do cache, marcando-o como usado recentemente.
+
+        Args:
+            key: Chave do resultado (ver cache_key)
+
+        Returns:
+            Resultado do OCR ou None se ele não estiver no cache
+        """
+        with self._lock:
+            try:
+                connection = self._connect()
+                row = connection.execute("SELECT result FROM ocr_results WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self._misses += 1
+                    return None
+                connection.execute("UPDATE ocr_results SET last_access = ? WHERE key = ?", (time.time(), key))
+                connection.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Erro ao ler o cache de OCR: {str(e)}")
+                self._misses += 1
+                return None
+            self._hits += 1
+
+        return json.loads(row[0], object_hook=_decode_bytes)
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Guarda um resultado, descartando os usados há mais tempo se necessário.
+
+        Args:
+            key: Chave do resultado (ver cache_key)
+            result: Resultado do OCR (serializável em JSON; bytes são aceitos)
+        """
+        encoded = json.dumps(result, ensure_ascii=False, default=_encode_bytes)
+        size = len(encoded.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            try:
+                connection = self._connect()
+                connection.execute(
+                    "INSERT OR REPLACE INTO ocr_results (key, result, size, last_access) VALUES (?, ?, ?, ?)",
+                    (key, encoded, size, time.time()),
+                )
+                connection.commit()
+
+                if self._size is None:
+                    self._size = self._stored_bytes(connection)
+                else:
+                    self._size += size
+                if self._size > self.max_bytes:
+                    self._evict(connection)
+            except sqlite3.Error as e:
+                logger.warning(f"Erro ao gravar no cache de OCR: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores do cache.
+
+        Returns:
+            Dicionário com acertos, falhas, taxa de acerto, entradas e bytes em uso
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            try:
+                if self._connection is None and not os.path.exists(self.db_path):
+                    # Consultar os contadores não deve criar o banco
+                    entries, size = 0, 0
+                else:
+                    entries, size = self._connect().execute(
+                        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_results"
+                    ).fetchone()
+            except sqlite3.Error:
+                entries, size = None, None
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "entries": entries,
+                "size_bytes": size,
+                "max_bytes": self.max_bytes,
+            }
+
+    def close(self) -> None:
+        """
+        Fecha a conexão com o banco.
+        """
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre a conexão no primeiro uso (chamado com o lock adquirido)."""
+        if self._connection is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def _stored_bytes(self, connection: sqlite3.Connection) -> int:
+        """Soma o tamanho das entradas (chamado com o lock adquirido)."""
+        return connection.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_results").fetchone()[0]
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        """Remove as entradas usadas há mais tempo (chamado com o lock adquirido)."""
+        # O tamanho é recalculado do banco, que pode ter sido alterado por outro processo
+        total = self._stored_bytes(connection)
+        target = self.max_bytes * _EVICTION_TARGET
+        removed = 0
+
+        rows = connection.execute("SELECT key, size FROM ocr_results ORDER BY last_access").fetchall()
+        keys = []
+        for key, size in rows:
+            if total <= target:
+                break
+            keys.append((key,))
+            total -= size
+        if keys:
+            connection.executemany("DELETE FROM ocr_results WHERE key = ?", keys)
+            connection.commit()
+            removed = len(keys)
+
+        self._size = total
+        logger.info(f"Cache de OCR: {removed} resultados descartados ({total} bytes em uso)")
+
+
+def _encode_bytes(value: Any) -> Any:
+    """Serializa valores bytes (como a saída hOCR) em JSON."""
+    if isinstance(value, bytes):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def _decode_bytes(value: Dict[str, Any]) -> Any:
+    """Restaura os valores bytes serializados por _encode_bytes."""
+    if len(value) == 1 and "__bytes__" in value:
+        return base64.b64decode(value["__bytes__"])
+    return value
+
+
+_shared_cache: Optional[OCRCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_ocr_cache() -> Optional[OCRCache]:
+    """
+    Retorna o cache de OCR compartilhado pelo processo.
+
+    Returns:
+        Cache configurado em OCR_CACHE_PATH ou None se OCR_CACHE_ENABLED estiver desativado
+    """
+    global _shared_cache
+    if not OCR_CACHE_ENABLED:
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = OCRCache(OCR_CACHE_PATH, OCR_CACHE_MAX_BYTES)
+        return _shared_cache
+
+
+def reset_ocr_cache() -> None:
+    """
+    Descarta o cache compartilhado do processo sem fechar a sua conexão.
+
+    Usado nos workers do pool de processos: o próximo get_ocr_cache() cria um cache com uma
+    conexão própria do worker, em vez de reaproveitar um objeto (e a sua conexão e o seu lock)
+    criado em outro processo.
+    """
+    global _shared_cache, _shared_lock
+    _shared_cache = None
+    _shared_lock = threading.Lock()
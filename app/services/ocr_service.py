@@ -7,29 +7,171 @@ o Tesseract OCR, permitindo processar imagens individuais ou PDFs escaneados.
 
 import os
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Union
 from pathlib import Path
 import tempfile
 
 import pytesseract
 from PIL import Image
 
-from app.core.config import RESULTS_DIR
+from app.core.config import (
+    RESULTS_DIR,
+    OCR_ENGINE,
+    OCR_OSD_MAX_SIDE,
+    OCR_AUTO_LATIN_LANGS,
+    OCR_PREPROCESS,
+    OCR_PREPROCESS_STEPS,
+    OCR_TARGET_DPI,
+)
+from app.services.ocr_cache import OCRCache, cache_key, image_digest
+from app.services.ocr_preprocessing import preprocess_for_ocr
+from app.services.tesserocr_engine import TesserocrEngine, resolve_ocr_engine
 
 # Configurar logger
 logger = logging.getLogger(__name__)
 
+# Idioma do Tesseract usado para cada alfabeto identificado pelo OSD
+SCRIPT_TO_LANG = {
+    'Latin': 'por',  # Assumir português para script latino
+    'Arabic': 'ara',
+    'Cyrillic': 'rus',
+    'Devanagari': 'hin',
+    'Han': 'chi_sim',
+    'Chinese': 'chi_sim',
+    'Japanese': 'jpn',
+    'Hangul': 'kor',
+    'Korean': 'kor',
+}
+
+# Palavras frequentes usadas para identificar o idioma de textos em alfabeto latino
+_STOPWORDS = {
+    'por': {'de', 'que', 'não', 'para', 'com', 'uma', 'os', 'no', 'se', 'na', 'por', 'mais',
+            'as', 'dos', 'como', 'mas', 'ao', 'das', 'à', 'ou', 'são', 'também', 'pela', 'pelo'},
+    'eng': {'the', 'and', 'of', 'to', 'in', 'is', 'that', 'for', 'it', 'with', 'as', 'was',
+            'on', 'are', 'be', 'this', 'by', 'from', 'or', 'which', 'have', 'an', 'not', 'at'},
+    'spa': {'de', 'que', 'el', 'la', 'los', 'las', 'del', 'por', 'con', 'una', 'para', 'es',
+            'se', 'no', 'al', 'lo', 'como', 'más', 'pero', 'sus', 'le', 'ya', 'muy', 'también'},
+    'fra': {'de', 'la', 'le', 'et', 'les', 'des', 'est', 'un', 'une', 'du', 'que', 'pour',
+            'dans', 'qui', 'pas', 'sur', 'au', 'avec', 'ce', 'il', 'sont', 'par', 'mais', 'ou'},
+    'deu': {'der', 'die', 'und', 'in', 'den', 'von', 'zu', 'das', 'mit', 'sich', 'des', 'auf',
+            'für', 'ist', 'im', 'dem', 'nicht', 'ein', 'eine', 'als', 'auch', 'es', 'an', 'werden'},
+    'ita': {'di', 'che', 'il', 'la', 'per', 'non', 'una', 'del', 'della', 'sono', 'con', 'le',
+            'si', 'gli', 'da', 'nel', 'alla', 'anche', 'come', 'più', 'dei', 'ma', 'questo', 'lo'},
+}
+
+# Número mínimo de palavras frequentes para confiar na identificação do idioma
+_MIN_STOPWORD_HITS = 5
+
+
+def identify_language(text: str, candidates: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Identifica o idioma de um texto em alfabeto latino pelas palavras mais frequentes.
+
+    É uma identificação leve, pensada para escolher o pacote de idioma do Tesseract a partir
+    do texto de uma primeira passagem de OCR.
+
+    Args:
+        text: Texto a ser analisado
+        candidates: Idiomas aceitos (padrão: todos os conhecidos)
+
+    Returns:
+        Código do idioma (por, eng, spa, fra, deu, ita) ou None se o texto for insuficiente
+    """
+    words = [word.strip('.,;:!?()[]"\'«»“”') for word in text.lower().split()]
+    scores = {}
+    for lang, stopwords in _STOPWORDS.items():
+        if candidates is None or lang in candidates:
+            scores[lang] = sum(1 for word in words if word in stopwords)
+
+    if not scores:
+        return None
+    best = max(scores, key=scores.get)
+    return best if scores[best] >= _MIN_STOPWORD_HITS else None
+
+
+class LanguageSelector:
+    """
+    Escolhe o idioma do OCR uma única vez por documento.
+
+    Com o idioma "auto", o alfabeto é identificado pelo OSD na primeira imagem (reduzida). Para
+    alfabetos não latinos, o idioma correspondente é usado em todas as imagens. Para o alfabeto
+    latino, a primeira passagem de OCR usa os idiomas de OCR_AUTO_LATIN_LANGS combinados, e o
+    texto reconhecido define o idioma das imagens seguintes.
+    """
+
+    def __init__(self, ocr_service: "OCRService", requested: str = "auto"):
+        """
+        Inicializa o seletor.
+
+        Args:
+            ocr_service: Serviço de OCR usado na detecção
+            requested: Idioma pedido ("auto" para detecção automática)
+        """
+        self.ocr_service = ocr_service
+        self.lang = None if requested == "auto" else requested
+        self._first_pass = None
+
+    def select(self, image_path: str, timeout: float = 0) -> str:
+        """
+        Retorna o idioma a ser usado no OCR de uma imagem.
+
+        Args:
+            image_path: Caminho para a imagem a ser reconhecida
+            timeout: Tempo máximo em segundos para o OSD (0 para ilimitado)
+
+        Returns:
+            Código do idioma (ou idiomas combinados na primeira passagem de texto latino)
+        """
+        if self.lang is not None:
+            return self.lang
+        if self._first_pass is not None:
+            return self._first_pass
+
+        script = self.ocr_service.detect_script(image_path, timeout=timeout)
+        if script is not None and script != 'Latin':
+            self.lang = SCRIPT_TO_LANG.get(script, 'por')
+            logger.info(f"Alfabeto detectado: {script}. Idioma do OCR: {self.lang}")
+            return self.lang
+
+        supported = self.ocr_service.supported_languages
+        latin = [lang for lang in OCR_AUTO_LATIN_LANGS.split("+") if lang in supported] or ['por']
+        self._first_pass = "+".join(latin)
+        return self._first_pass
+
+    def observe(self, text: str) -> None:
+        """
+        Define o idioma do documento a partir do texto da primeira passagem de OCR.
+
+        Args:
+            text: Texto reconhecido com o idioma retornado por select
+        """
+        if self.lang is not None or self._first_pass is None:
+            return
+
+        identified = identify_language(text, [lang for lang in _STOPWORDS if lang in self.ocr_service.supported_languages])
+        if identified is not None:
+            self.lang = identified
+            logger.info(f"Idioma identificado pelo texto: {identified}")
+
+
 class OCRService:
     """
     Serviço para reconhecimento óptico de caracteres (OCR) em imagens.
     """
 
-    def __init__(self):
+    def __init__(self, engine: Optional[str] = None, cache: Optional[OCRCache] = None):
         """
         Inicializa o serviço de OCR.
+
+        Args:
+            engine: Motor de OCR (pytesseract ou tesserocr; padrão: OCR_ENGINE)
+            cache: Cache persistente de resultados (None para sempre executar o OCR)
         """
+        self.engine = resolve_ocr_engine(engine or OCR_ENGINE)
+        self.cache = cache
+        self._tesserocr = TesserocrEngine() if self.engine == "tesserocr" else None
         self.supported_languages = self._get_supported_languages()
-        logger.info(f"OCR Service inicializado com {len(self.supported_languages)} idiomas suportados")
+        logger.info(f"OCR Service inicializado com {len(self.supported_languages)} idiomas suportados (motor: {self.engine})")
 
     def _get_supported_languages(self) -> List[str]:
         """
@@ -40,7 +182,7 @@ class OCRService:
         """
         try:
             # Obter idiomas disponíveis no Tesseract
-            langs = pytesseract.get_languages()
+            langs = self._backend().get_languages()
             return langs if langs else ["por", "eng"]  # Fallback para português e inglês
         except Exception as e:
             logger.warning(f"Não foi possível obter idiomas do Tesseract: {str(e)}")
@@ -48,78 +190,116 @@ class OCRService:
 
     def process_image(
         self, 
-        image_path: str, 
+        image_path: Union[str, Image.Image], 
         lang: str = "por", 
         config: str = "",
-        output_type: str = "text"
+        output_type: str = "text",
+        timeout: float = 0,
+        preprocess: Optional[bool] = None,
+        source_dpi: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Processa uma imagem com OCR para extrair texto.
+
+        Caminhos são repassados diretamente ao Tesseract, que lê o arquivo sem que a imagem
+        seja decodificada e recodificada no Python. Imagens já carregadas (por exemplo, uma
+        página recém-rasterizada) são entregues ao Tesseract em formato não comprimido (PNM).
+        Com o pré-processamento ativo, a imagem é carregada, limpa (ver ocr_preprocessing) e
+        entregue da mesma forma.
+        Com o motor tesserocr, o reconhecimento acontece no próprio processo, reaproveitando um
+        motor já inicializado por thread e idioma. Com um cache configurado, resultados já
+        obtidos para o mesmo conteúdo e os mesmos parâmetros são retornados com "cached": True.
         
         Args:
-            image_path: Caminho para a imagem a ser processada
+            image_path: Caminho para a imagem ou imagem PIL já carregada
             lang: Código do idioma para OCR (por=português, eng=inglês, etc)
             config: Configurações adicionais para o Tesseract
             output_type: Tipo de saída (text, hocr, tsv, etc)
+            timeout: Tempo máximo em segundos para o Tesseract (0 para ilimitado)
+            preprocess: Se deve pré-processar a imagem (padrão: OCR_PREPROCESS)
+            source_dpi: Resolução da imagem, usada na redução para OCR_TARGET_DPI (None para
+                ler dos metadados da imagem)
             
         Returns:
             Dicionário com os resultados do OCR
         """
-        logger.info(f"Processando OCR na imagem: {image_path}")
+        in_memory = isinstance(image_path, Image.Image)
+        image_name = "imagem em memória" if in_memory else image_path
+        logger.info(f"Processando OCR na imagem: {image_name}")
         
         try:
             # Verificar se o arquivo existe
-            if not os.path.exists(image_path):
+            if not in_memory and not os.path.exists(image_path):
                 return {
                     "success": False,
                     "error": f"Arquivo não encontrado: {image_path}",
                     "text": ""
                 }
             
-            # Verificar se o idioma é suportado
-            if lang not in self.supported_languages:
+            # Verificar se o idioma é suportado (idiomas combinados, como "por+eng", são aceitos)
+            if any(part not in self.supported_languages for part in lang.split("+")):
                 logger.warning(f"Idioma {lang} não suportado. Usando 'por' como fallback.")
                 lang = "por"
-            
-            # Abrir a imagem
-            with Image.open(image_path) as img:
-                # Pré-processamento da imagem (opcional)
-                # img = self._preprocess_image(img)
-                
-                # Extrair texto com OCR
-                if output_type == "text":
-                    text = pytesseract.image_to_string(img, lang=lang, config=config)
-                    result = {
-                        "success": True,
-                        "text": text,
-                        "lang": lang
-                    }
-                elif output_type == "data":
-                    data = pytesseract.image_to_data(img, lang=lang, config=config, output_type=pytesseract.Output.DICT)
-                    result = {
-                        "success": True,
-                        "data": data,
-                        "lang": lang
-                    }
-                elif output_type == "hocr":
-                    hocr = pytesseract.image_to_pdf_or_hocr(img, lang=lang, config=config, extension='hocr')
-                    result = {
-                        "success": True,
-                        "hocr": hocr,
-                        "lang": lang
-                    }
+
+            if preprocess is None:
+                preprocess = OCR_PREPROCESS
+
+            # Resultados já obtidos para o mesmo conteúdo e os mesmos parâmetros são reaproveitados
+            key = None
+            if self.cache is not None:
+                key = cache_key(
+                    image_digest(image_path), lang=lang, config=config, output_type=output_type,
+                    engine=self.engine, preprocess=self._preprocess_signature(preprocess, source_dpi),
+                )
+                cached = self.cache.get(key)
+                if cached is not None:
+                    logger.info(f"Resultado de OCR obtido do cache: {image_name}")
+                    return {**cached, "cached": True}
+
+            # O pytesseract grava imagens em memória no formato indicado em image.format;
+            # PPM evita a compressão PNG usada por padrão
+            image = image_path
+            if preprocess:
+                # Pré-processamento da imagem (tons de cinza, redução, binarização, deskew e recorte)
+                if in_memory:
+                    image = self._preprocess_image(image_path, source_dpi)
                 else:
-                    text = pytesseract.image_to_string(img, lang=lang, config=config)
-                    result = {
-                        "success": True,
-                        "text": text,
-                        "lang": lang
-                    }
-                
-                return result
+                    with Image.open(image_path) as source:
+                        image = self._preprocess_image(source, source_dpi)
+                image.format = "PPM"
+            elif in_memory:
+                image = image_path.copy() if image_path.mode in ("1", "L", "RGB") else image_path.convert("RGB")
+                image.format = "PPM"
+            
+            # Extrair texto com OCR
+            if output_type == "data":
+                data = self._backend().image_to_data(image, lang=lang, config=config, output_type=pytesseract.Output.DICT, timeout=timeout)
+                result = {
+                    "success": True,
+                    "data": data,
+                    "lang": lang
+                }
+            elif output_type == "hocr":
+                hocr = self._backend().image_to_pdf_or_hocr(image, lang=lang, config=config, extension='hocr', timeout=timeout)
+                result = {
+                    "success": True,
+                    "hocr": hocr,
+                    "lang": lang
+                }
+            else:
+                text = self._backend().image_to_string(image, lang=lang, config=config, timeout=timeout)
+                result = {
+                    "success": True,
+                    "text": text,
+                    "lang": lang
+                }
+
+            if key is not None:
+                self.cache.put(key, result)
+            return result
                 
         except Exception as e:
-            logger.error(f"Erro ao processar OCR na imagem {image_path}: {str(e)}")
+            logger.error(f"Erro ao processar OCR na imagem {image_name}: {str(e)}")
             return {
                 "success": False,
                 "error": f"Erro ao processar OCR: {str(e)}",
@@ -201,68 +381,97 @@ class OCRService:
                 "full_text": ""
             }
 
-    def detect_language(self, image_path: str) -> str:
+    def detect_language(self, image_path: str, timeout: float = 0) -> str:
         """
-        Detecta o idioma do texto em uma imagem.
+        Detecta o idioma do texto em uma imagem a partir do alfabeto (script) identificado.
         
         Args:
             image_path: Caminho para a imagem
+            timeout: Tempo máximo em segundos para o Tesseract (0 para ilimitado)
             
         Returns:
-            Código do idioma detectado (ou 'por' como fallback)
+            Código do idioma detectado (ou 'por' como fallback, inclusive para o alfabeto latino)
+        """
+        script = self.detect_script(image_path, timeout=timeout)
+        return SCRIPT_TO_LANG.get(script, 'por')
+
+    def detect_script(self, image_path: str, timeout: float = 0) -> Optional[str]:
+        """
+        Identifica o alfabeto (script) do texto com o OSD do Tesseract.
+
+        O OSD roda sobre uma cópia reduzida da imagem em tons de cinza (maior lado com até
+        OCR_OSD_MAX_SIDE pixels), bem mais barata que a página em resolução completa.
+
+        Args:
+            image_path: Caminho para a imagem
+            timeout: Tempo máximo em segundos para o Tesseract (0 para ilimitado)
+
+        Returns:
+            Nome do alfabeto (por exemplo, "Latin" ou "Cyrillic") ou None se não identificado
         """
         try:
-            # Esta é uma implementação simplificada
-            # Uma implementação mais robusta usaria o OSD do Tesseract
-            # ou uma biblioteca específica para detecção de idioma
-            
-            # Usar o Tesseract para extrair texto com detecção de script
+            key = None
+            if self.cache is not None:
+                key = cache_key(image_digest(image_path), output_type="osd", engine=self.engine, max_side=OCR_OSD_MAX_SIDE)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    return cached["script"]
+
             with Image.open(image_path) as img:
-                osd = pytesseract.image_to_osd(img)
-                
-                # Extrair o script detectado
-                for line in osd.split('\n'):
-                    if 'Script' in line:
-                        script = line.split(':')[1].strip()
-                        
-                        # Mapear script para idioma (simplificado)
-                        script_to_lang = {
-                            'Latin': 'por',  # Assumir português para script latino
-                            'Arabic': 'ara',
-                            'Cyrillic': 'rus',
-                            'Devanagari': 'hin',
-                            'Chinese': 'chi_sim',
-                            'Japanese': 'jpn',
-                            'Korean': 'kor'
-                        }
-                        
-                        return script_to_lang.get(script, 'por')
-            
-            return 'por'  # Fallback para português
+                # Para JPEG, a redução acontece já na decodificação
+                img.draft("L", (OCR_OSD_MAX_SIDE, OCR_OSD_MAX_SIDE))
+                sample = img.convert("L")
+            sample.thumbnail((OCR_OSD_MAX_SIDE, OCR_OSD_MAX_SIDE))
+            sample.format = "PPM"
+
+            osd = self._backend().image_to_osd(sample, timeout=timeout)
+            script = None
+            for line in osd.split('\n'):
+                if line.startswith('Script:'):
+                    script = line.split(':')[1].strip()
+                    break
+
+            if key is not None and script is not None:
+                self.cache.put(key, {"script": script})
+            return script
         except Exception as e:
             logger.warning(f"Erro ao detectar idioma: {str(e)}")
-            return 'por'  # Fallback para português
+            return None
+
+    def _preprocess_signature(self, preprocess: bool, source_dpi: Optional[float]) -> Optional[Dict[str, Any]]:
+        """
+        Descreve o pré-processamento aplicado, para compor a chave do cache.
+
+        Args:
+            preprocess: Se o pré-processamento está ativo
+            source_dpi: Resolução informada da imagem
+
+        Returns:
+            Etapas, resolução alvo e resolução da imagem, ou None sem pré-processamento
+        """
+        if not preprocess:
+            return None
+        return {"steps": OCR_PREPROCESS_STEPS, "target_dpi": OCR_TARGET_DPI, "source_dpi": source_dpi}
+
+    def _backend(self) -> Any:
+        """
+        Retorna o motor que executa o Tesseract.
+
+        Returns:
+            O TesserocrEngine (motor em processo) ou o módulo pytesseract (um processo por
+            chamada); ambos expõem as mesmas funções
+        """
+        return self._tesserocr if self._tesserocr is not None else pytesseract
 
-    def _preprocess_image(self, image: Image.Image) -> Image.Image:
+    def _preprocess_image(self, image: Image.Image, source_dpi: Optional[float] = None) -> Image.Image:
         """
         Pré-processa uma imagem para melhorar os resultados do OCR.
         
         Args:
             image: Imagem PIL a ser processada
+            source_dpi: Resolução da imagem (None para ler dos metadados)
             
         Returns:
-            Imagem processada
+            Imagem processada, em tons de cinza, com as etapas de OCR_PREPROCESS_STEPS aplicadas
         """
-        # Implementação básica - pode ser expandida com técnicas mais avançadas
-        # como binarização adaptativa, remoção de ruído, etc.
-        
-        # Converter para escala de cinza
-        if image.mode != 'L':
-            image = image.convert('L')
-        
-        # Aumentar contraste (opcional)
-        # from PIL import ImageEnhance
-        # enhancer = ImageEnhance.Contrast(image)
-        # image = enhancer.enhance(2.0)
-        
-        return image
+        return preprocess_for_ocr(image, source_dpi=source_dpi)
@@ -0,0 +1,263 @@
+"""
+Módulo para armazenamento das palavras reconhecidas pelo OCR em formato colunar.
+
+A saída estruturada do Tesseract (image_to_data) tem uma entrada por palavra com texto,
+posição, confiança e a hierarquia bloco/parágrafo/linha. Em JSON, isso é várias vezes maior
+que o próprio texto. Este módulo guarda as palavras de cada página em um arquivo NumPy
+comprimido (.npz), com uma coluna por atributo e os textos concatenados em UTF-8, e responde
+a consultas por região ou confiança lendo apenas o arquivo da página consultada.
+"""
+
+import os
+import re
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Sufixo dos arquivos de palavras, gravados ao lado do texto do OCR (page_1.txt, page_1.words.npz)
+WORDS_SUFFIX = ".words.npz"
+
+# Subdiretório do OCR dentro do diretório de resultados de um documento
+OCR_DIRNAME = "ocr"
+
+# Nome dos arquivos de palavras das páginas (page_2) e das imagens incorporadas (page_2_image_1)
+_TABLE_NAME = re.compile(r"^page_(\d+)(_image_\d+)?$")
+
+# Colunas numéricas e seus tipos: coordenadas em pixels, confiança de 0 a 100 e a hierarquia
+_COLUMNS = {
+    "left": np.int32,
+    "top": np.int32,
+    "width": np.int32,
+    "height": np.int32,
+    "conf": np.float32,
+    "block_num": np.uint16,
+    "par_num": np.uint16,
+    "line_num": np.uint16,
+    "word_num": np.uint16,
+}
+
+# Nível das palavras na saída do Tesseract (1 é a página)
+_WORD_LEVEL = 5
+_PAGE_LEVEL = 1
+
+
+def build_word_table(data: Dict[str, List[Any]]) -> Dict[str, np.ndarray]:
+    """
+    Converte a saída de image_to_data em colunas.
+
+    Entradas sem texto (blocos, linhas e palavras vazias) são descartadas.
+
+    Args:
+        data: Dicionário de listas retornado pelo OCR com output_type="data"
+
+    Returns:
+        Colunas da tabela de palavras: as de _COLUMNS, "text" (bytes UTF-8 concatenados),
+        "text_offsets" (início de cada palavra em "text") e "page_size" (largura e altura da
+        imagem, quando conhecidas)
+    """
+    texts = data.get("text", [])
+    levels = data.get("level", [_WORD_LEVEL] * len(texts))
+    keep = [
+        index for index, text in enumerate(texts)
+        if levels[index] == _WORD_LEVEL and text and text.strip() and float(data["conf"][index]) >= 0
+    ]
+
+    encoded = [texts[index].strip().encode("utf-8") for index in keep]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(word) for word in encoded], dtype=np.int64)
+
+    table: Dict[str, np.ndarray] = {
+        "text": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        "text_offsets": offsets,
+    }
+    for column, dtype in _COLUMNS.items():
+        values = data.get(column, [0] * len(texts))
+        table[column] = np.asarray([float(values[index]) for index in keep], dtype=np.float64).astype(dtype)
+
+    # A entrada de nível 1 descreve a página inteira
+    page_size = [0, 0]
+    for index, level in enumerate(levels):
+        if level == _PAGE_LEVEL:
+            page_size = [int(data["width"][index]), int(data["height"][index])]
+            break
+    table["page_size"] = np.asarray(page_size, dtype=np.int32)
+
+    return table
+
+
+def words_to_text(data: Dict[str, List[Any]]) -> str:
+    """
+    Reconstrói o texto da página a partir das palavras, como na saída de texto do Tesseract.
+
+    Palavras da mesma linha são separadas por espaço, linhas por quebra de linha e parágrafos
+    por uma linha em branco.
+
+    Args:
+        data: Dicionário de listas retornado pelo OCR com output_type="data"
+
+    Returns:
+        Texto reconhecido
+    """
+    paragraphs: List[List[str]] = []
+    line_words: List[str] = []
+    current_line: Optional[Tuple[int, int, int]] = None
+    current_par: Optional[Tuple[int, int]] = None
+
+    texts = data.get("text", [])
+    levels = data.get("level", [_WORD_LEVEL] * len(texts))
+    for index, text in enumerate(texts):
+        if levels[index] != _WORD_LEVEL or not text or not text.strip():
+            continue
+
+        par = (data["block_num"][index], data["par_num"][index])
+        line = par + (data["line_num"][index],)
+        if line != current_line:
+            if line_words:
+                paragraphs[-1].append(" ".join(line_words))
+            line_words = []
+            if par != current_par:
+                paragraphs.append([])
+                current_par = par
+            current_line = line
+        line_words.append(text.strip())
+
+    if line_words:
+        paragraphs[-1].append(" ".join(line_words))
+
+    return "\n\n".join("\n".join(lines) for lines in paragraphs)
+
+
+def words_directory(document_dir: str) -> str:
+    """
+    Retorna o diretório onde são gravados o texto e as palavras do OCR de um documento.
+
+    Args:
+        document_dir: Diretório de resultados do documento (results_dir/{id})
+
+    Returns:
+        Caminho do diretório de OCR
+    """
+    return os.path.join(document_dir, OCR_DIRNAME)
+
+
+def list_word_tables(
+    words_dir: str, image_pages: Optional[Dict[str, int]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Lista os arquivos de palavras de um documento, das páginas e das imagens.
+
+    Args:
+        words_dir: Diretório de OCR do documento (ver words_directory)
+        image_pages: Página de cada arquivo de palavras cujo nome não indica a página (por
+            exemplo, imagens de DOCX), pelo nome do arquivo
+
+    Returns:
+        Lista ordenada por página com name (nome do arquivo sem o sufixo), source ("page" para a
+        página inteira ou "image" para uma imagem), page (None se o nome não indicar a página)
+        e path
+    """
+    if not os.path.isdir(words_dir):
+        return []
+
+    tables = []
+    for filename in os.listdir(words_dir):
+        if not filename.endswith(WORDS_SUFFIX):
+            continue
+        name = filename[: -len(WORDS_SUFFIX)]
+        match = _TABLE_NAME.match(name)
+        tables.append({
+            "name": name,
+            "source": "page" if match and not match.group(2) else "image",
+            "page": int(match.group(1)) if match else (image_pages or {}).get(filename),
+            "path": os.path.join(words_dir, filename),
+        })
+
+    # Páginas em ordem numérica, com a tabela da página antes das tabelas das suas imagens
+    tables.sort(key=lambda t: (t["page"] is None, t["page"] or 0, t["source"] != "page", t["name"]))
+    return tables
+
+
+def save_word_table(path: str, data: Dict[str, List[Any]]) -> int:
+    """
+    Grava as palavras de uma página em um arquivo .npz comprimido.
+
+    Args:
+        path: Caminho do arquivo (terminado em WORDS_SUFFIX)
+        data: Dicionário de listas retornado pelo OCR com output_type="data"
+
+    Returns:
+        Número de palavras gravadas
+    """
+    table = build_word_table(data)
+    # Passar um arquivo aberto impede o NumPy de acrescentar outra extensão .npz
+    with open(path, "wb") as f:
+        np.savez_compressed(f, **table)
+    return len(table["text_offsets"]) - 1
+
+
+def query_words(
+    path: str,
+    region: Optional[Tuple[float, float, float, float]] = None,
+    min_conf: Optional[float] = None,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Consulta as palavras de uma página.
+
+    O filtro é aplicado sobre as colunas numéricas; apenas os textos das palavras selecionadas
+    são decodificados.
+
+    Args:
+        path: Arquivo de palavras da página
+        region: Região (x0, y0, x1, y1) em pixels; são retornadas as palavras que a intersectam
+        min_conf: Confiança mínima, de 0 a 100
+        limit: Número máximo de palavras retornadas
+
+    Returns:
+        Dicionário com page_size, total (palavras na página), count (palavras selecionadas) e
+        words (texto, caixa, confiança e hierarquia de cada palavra)
+    """
+    with np.load(path) as table:
+        left, top = table["left"], table["top"]
+        right, bottom = left + table["width"], top + table["height"]
+        conf = table["conf"]
+
+        mask = np.ones(len(left), dtype=bool)
+        if region is not None:
+            x0, y0, x1, y1 = region
+            mask &= (left < x1) & (right > x0) & (top < y1) & (bottom > y0)
+        if min_conf is not None:
+            mask &= conf >= min_conf
+
+        selected = np.flatnonzero(mask)
+        count = len(selected)
+        if limit is not None:
+            selected = selected[:limit]
+
+        text = table["text"]
+        offsets = table["text_offsets"]
+        hierarchy = {column: table[column] for column in ("block_num", "par_num", "line_num", "word_num")}
+        page_size = table["page_size"].tolist()
+
+        words = []
+        for index in selected:
+            words.append({
+                "text": text[offsets[index]:offsets[index + 1]].tobytes().decode("utf-8"),
+                "left": int(left[index]),
+                "top": int(top[index]),
+                "width": int(right[index] - left[index]),
+                "height": int(bottom[index] - top[index]),
+                "conf": round(float(conf[index]), 2),
+                **{column: int(values[index]) for column, values in hierarchy.items()},
+            })
+
+    return {
+        "page_size": {"width": page_size[0], "height": page_size[1]},
+        "total": len(left),
+        "count": count,
+        "words": words,
+    }
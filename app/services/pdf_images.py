@@ -0,0 +1,292 @@
+"""
+Módulo para extração das imagens incorporadas em PDFs (XObjects de imagem).
+
+Em vez de rasterizar páginas inteiras, as imagens são lidas diretamente dos objetos do PDF.
+Fluxos JPEG (DCTDecode) e JPEG 2000 (JPXDecode) são gravados sem alteração, com os bytes
+originais; os demais filtros são decodificados e as amostras gravadas em PNG. A posição de
+cada imagem na página é obtida acompanhando a matriz de transformação (cm, q, Q) do fluxo de
+conteúdo até o operador Do.
+"""
+
+import logging
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import PyPDF2
+from PyPDF2.generic import ContentStream
+from PIL import Image
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Filtros cujo fluxo já é um arquivo de imagem completo
+_PASSTHROUGH_FILTERS = {"/DCTDecode": "jpg", "/JPXDecode": "jp2"}
+
+# Espaços de cor suportados na decodificação, com o modo PIL e o número de componentes
+_COLOR_SPACES = {
+    "/DeviceGray": ("L", 1),
+    "/CalGray": ("L", 1),
+    "/DeviceRGB": ("RGB", 3),
+    "/CalRGB": ("RGB", 3),
+    "/DeviceCMYK": ("CMYK", 4),
+}
+
+# Profundidade máxima de XObjects de formulário aninhados
+_MAX_FORM_DEPTH = 8
+
+# Matriz de transformação [a b c d e f] e caixa (x0, y0, x1, y1) em pontos
+Matrix = Tuple[float, float, float, float, float, float]
+BBox = Tuple[float, float, float, float]
+
+_IDENTITY: Matrix = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+def iter_page_images(page: PyPDF2.PageObject) -> Iterator[Tuple[Tuple[int, int], Any, List[BBox]]]:
+    """
+    Gera as imagens desenhadas em uma página, na ordem do primeiro desenho.
+
+    Apenas imagens efetivamente desenhadas (operador Do) são geradas, inclusive as que estão
+    dentro de XObjects de formulário. Imagens apenas declaradas nos recursos, comuns quando
+    várias páginas compartilham o mesmo dicionário de recursos, são ignoradas. Imagens em
+    linha (BI/ID/EI) também são ignoradas.
+
+    Args:
+        page: Página do PyPDF2
+
+    Yields:
+        Tuplas (chave do objeto, fluxo da imagem, caixas em pontos de cada desenho na página);
+        a chave identifica o mesmo objeto em outras páginas
+    """
+    placements: Dict[Tuple[int, int], List[BBox]] = {}
+    streams: Dict[Tuple[int, int], Any] = {}
+
+    resources = _resolve(page.get("/Resources"))
+    if not _has_xobjects(resources):
+        return
+
+    contents = page.get_contents()
+    if contents is None:
+        return
+
+    _walk(contents, resources, page.pdf, _IDENTITY, placements, streams, set(), 0)
+    for key, bboxes in placements.items():
+        yield key, streams[key], bboxes
+
+
+def write_image(stream: Any, base_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Grava um XObject de imagem em disco.
+
+    Args:
+        stream: Fluxo da imagem
+        base_path: Caminho do arquivo sem extensão
+
+    Returns:
+        Dicionário com path, format, width, height e passthrough (True se os bytes originais
+        foram gravados), ou None se o filtro ou o espaço de cor não forem suportados
+    """
+    width, height = int(stream.get("/Width", 0)), int(stream.get("/Height", 0))
+    filters = _filters(stream)
+
+    if filters and filters[-1] in _PASSTHROUGH_FILTERS:
+        extension = _PASSTHROUGH_FILTERS[filters[-1]]
+        # Com um único filtro, o fluxo armazenado já é o arquivo; filtros anteriores (raros)
+        # são decodificados pelo PyPDF2, que mantém o JPEG intacto
+        data = stream._data if len(filters) == 1 else stream.get_data()
+        path = f"{base_path}.{extension}"
+        with open(path, "wb") as f:
+            f.write(data)
+        return {"path": path, "format": "jpeg" if extension == "jpg" else "jpeg2000",
+                "width": width, "height": height, "passthrough": True}
+
+    if "/JBIG2Decode" in filters:
+        logger.debug("Imagem JBIG2 ignorada: filtro não suportado")
+        return None
+
+    data = stream.get_data()
+    if filters and filters[-1] == "/CCITTFaxDecode":
+        # O PyPDF2 entrega o fluxo CCITT já envolvido em um cabeçalho TIFF
+        path = f"{base_path}.tif"
+        with open(path, "wb") as f:
+            f.write(data)
+        return {"path": path, "format": "tiff", "width": width, "height": height, "passthrough": False}
+
+    image = _samples_to_image(stream, data, width, height)
+    if image is None:
+        return None
+    if image.mode == "CMYK":
+        image = image.convert("RGB")
+
+    path = f"{base_path}.png"
+    image.save(path, "PNG")
+    return {"path": path, "format": "png", "width": width, "height": height, "passthrough": False}
+
+
+def effective_dpi(width: int, bbox: BBox) -> Optional[int]:
+    """
+    Calcula a resolução de uma imagem no tamanho em que ela é desenhada na página.
+
+    Args:
+        width: Largura da imagem em pixels
+        bbox: Caixa do desenho em pontos (1/72 de polegada)
+
+    Returns:
+        Resolução horizontal em DPI ou None se a caixa não tiver largura
+    """
+    points = bbox[2] - bbox[0]
+    if points <= 0:
+        return None
+    return int(round(width * 72 / points))
+
+
+def _walk(contents: Any, resources: Any, pdf: Any, ctm: Matrix, placements: Dict[Tuple[int, int], List[BBox]],
+          streams: Dict[Tuple[int, int], Any], visiting: Set[Tuple[int, int]], depth: int) -> None:
+    """Percorre um fluxo de conteúdo, registrando a caixa de cada imagem desenhada."""
+    xobjects = _resolve(resources.get("/XObject")) if resources is not None else None
+    if xobjects is None:
+        return
+
+    stack: List[Matrix] = []
+    if not isinstance(contents, ContentStream):
+        contents = ContentStream(contents, pdf)
+
+    for operands, operator in contents.operations:
+        if operator == b"q":
+            stack.append(ctm)
+        elif operator == b"Q":
+            if stack:
+                ctm = stack.pop()
+        elif operator == b"cm" and len(operands) == 6:
+            ctm = _multiply(tuple(float(value) for value in operands), ctm)
+        elif operator == b"Do" and operands:
+            reference = xobjects.raw_get(operands[0]) if operands[0] in xobjects else None
+            if reference is None:
+                continue
+            xobject = reference.get_object()
+            key = (reference.idnum, reference.generation) if hasattr(reference, "idnum") else (id(xobject), 0)
+            subtype = xobject.get("/Subtype")
+
+            if subtype == "/Image":
+                placements.setdefault(key, []).append(_unit_square_bbox(ctm))
+                streams[key] = xobject
+            elif subtype == "/Form" and depth < _MAX_FORM_DEPTH and key not in visiting:
+                # O formulário é desenhado com a sua própria matriz e, se houver, seus recursos
+                matrix = xobject.get("/Matrix")
+                form_ctm = _multiply(tuple(float(value) for value in matrix), ctm) if matrix else ctm
+                form_resources = _resolve(xobject.get("/Resources")) or resources
+                visiting.add(key)
+                _walk(xobject, form_resources, pdf, form_ctm, placements, streams, visiting, depth + 1)
+                visiting.discard(key)
+
+
+def _samples_to_image(stream: Any, data: bytes, width: int, height: int) -> Optional[Image.Image]:
+    """Converte as amostras decodificadas de uma imagem em uma imagem PIL."""
+    bits = int(stream.get("/BitsPerComponent", 1 if stream.get("/ImageMask") else 8))
+    if stream.get("/ImageMask"):
+        # Máscara de estêncil: 1 bit, 0 é a área pintada
+        return Image.frombytes("1", (width, height), data)
+
+    color_space = _resolve(stream.get("/ColorSpace"))
+    palette = None
+    if isinstance(color_space, list) and color_space and color_space[0] == "/Indexed":
+        mode, components = _base_color_space(_resolve(color_space[1]))
+        palette = _palette(_lookup_bytes(_resolve(color_space[3])), mode, components)
+        if palette is None:
+            return None
+        mode = "P"
+    else:
+        mode, components = _base_color_space(color_space)
+        if mode is None:
+            logger.debug(f"Imagem ignorada: espaço de cor não suportado ({color_space})")
+            return None
+
+    if bits == 16:
+        # Mantém o byte mais significativo de cada amostra
+        data = (np.frombuffer(data, dtype=">u2") >> 8).astype(np.uint8).tobytes()
+        bits = 8
+
+    if mode == "L" and bits == 1:
+        return Image.frombytes("1", (width, height), data)
+    if bits == 8:
+        image = Image.frombytes(mode, (width, height), data)
+    elif mode in ("L", "P") and bits in (2, 4):
+        image = Image.frombytes(mode, (width, height), data, "raw", f"{mode};{bits}")
+    elif mode == "P" and bits == 1:
+        image = Image.frombytes(mode, (width, height), data, "raw", "P;1")
+    else:
+        logger.debug(f"Imagem ignorada: {bits} bits por componente em {mode}")
+        return None
+
+    if palette is not None:
+        image.putpalette(palette)
+    return image
+
+
+def _base_color_space(color_space: Any) -> Tuple[Optional[str], int]:
+    """Obtém o modo PIL e o número de componentes de um espaço de cor."""
+    if isinstance(color_space, list) and color_space:
+        if color_space[0] == "/ICCBased":
+            components = int(_resolve(color_space[1]).get("/N", 3))
+            return {1: ("L", 1), 3: ("RGB", 3), 4: ("CMYK", 4)}.get(components, (None, 0))
+        color_space = color_space[0]
+    return _COLOR_SPACES.get(color_space, (None, 0))
+
+
+def _palette(lookup: bytes, mode: Optional[str], components: int) -> Optional[List[int]]:
+    """Converte a tabela de um espaço de cor indexado em uma paleta RGB."""
+    if mode is None:
+        return None
+    entries = np.frombuffer(lookup[: len(lookup) // components * components], dtype=np.uint8).reshape(-1, components)
+    if mode == "L":
+        entries = np.repeat(entries, 3, axis=1)
+    elif mode == "CMYK":
+        entries = np.asarray(Image.frombytes("CMYK", (len(entries), 1), entries.tobytes()).convert("RGB")).reshape(-1, 3)
+    return entries.flatten().tolist()
+
+
+def _lookup_bytes(lookup: Any) -> bytes:
+    """Obtém os bytes da tabela de um espaço de cor indexado (fluxo ou string)."""
+    if hasattr(lookup, "get_data"):
+        return lookup.get_data()
+    if hasattr(lookup, "original_bytes"):
+        return lookup.original_bytes
+    return bytes(lookup)
+
+
+def _filters(stream: Any) -> List[str]:
+    """Obtém a lista de filtros de um fluxo."""
+    filters = _resolve(stream.get("/Filter"))
+    if filters is None:
+        return []
+    if isinstance(filters, list):
+        return [str(_resolve(name)) for name in filters]
+    return [str(filters)]
+
+
+def _has_xobjects(resources: Any) -> bool:
+    """Verifica se um dicionário de recursos declara XObjects."""
+    return resources is not None and bool(_resolve(resources.get("/XObject")))
+
+
+def _resolve(value: Any) -> Any:
+    """Resolve uma referência indireta."""
+    return value.get_object() if hasattr(value, "get_object") else value
+
+
+def _multiply(m: Matrix, n: Matrix) -> Matrix:
+    """Multiplica duas matrizes de transformação do PDF (m × n)."""
+    return (
+        m[0] * n[0] + m[1] * n[2],
+        m[0] * n[1] + m[1] * n[3],
+        m[2] * n[0] + m[3] * n[2],
+        m[2] * n[1] + m[3] * n[3],
+        m[4] * n[0] + m[5] * n[2] + n[4],
+        m[4] * n[1] + m[5] * n[3] + n[5],
+    )
+
+
+def _unit_square_bbox(ctm: Matrix) -> BBox:
+    """Caixa, em pontos da página, do quadrado unitário onde as imagens são desenhadas."""
+    xs = [ctm[0] * u + ctm[2] * v + ctm[4] for u, v in ((0, 0), (1, 0), (0, 1), (1, 1))]
+    ys = [ctm[1] * u + ctm[3] * v + ctm[5] for u, v in ((0, 0), (1, 0), (0, 1), (1, 1))]
+    return (round(min(xs), 2), round(min(ys), 2), round(max(xs), 2), round(max(ys), 2))
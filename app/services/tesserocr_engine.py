@@ -0,0 +1,337 @@
+"""
+Módulo com o motor de OCR em processo, baseado no tesserocr.
+
+O pytesseract executa um processo do Tesseract por imagem: a imagem é gravada em um arquivo
+temporário, o modelo do idioma é carregado de novo a cada chamada e a saída é lida do stdout.
+Para muitas imagens pequenas, esse custo fixo supera o do próprio reconhecimento. Este módulo
+usa a API C do Tesseract pelo tesserocr e mantém um motor inicializado por thread e por idioma,
+reaproveitado entre as imagens.
+
+As funções expostas seguem as assinaturas do pytesseract usadas pelo OCRService, de modo que
+os dois motores são intercambiáveis.
+"""
+
+import shlex
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from PIL import Image
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Motores de OCR suportados
+OCR_ENGINES = ("pytesseract", "tesserocr")
+
+# Chave de um motor inicializado: idioma, modo de segmentação (psm), modo do motor (oem) e
+# variáveis de configuração
+_EngineKey = Tuple[str, int, int, Tuple[Tuple[str, str], ...]]
+
+
+def is_available() -> bool:
+    """
+    Verifica se o tesserocr está instalado.
+
+    Returns:
+        True se o motor em processo puder ser utilizado
+    """
+    try:
+        import tesserocr  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_ocr_engine(engine: Optional[str]) -> str:
+    """
+    Resolve o motor de OCR a ser usado.
+
+    Args:
+        engine: Nome do motor solicitado (pytesseract ou tesserocr)
+
+    Returns:
+        Nome do motor efetivamente utilizado ("pytesseract" se o tesserocr não estiver instalado)
+
+    Raises:
+        ValueError: Se o motor não for suportado
+    """
+    engine = (engine or "pytesseract").lower()
+    if engine not in OCR_ENGINES:
+        raise ValueError(f"Motor de OCR não suportado: {engine}. Use: {', '.join(OCR_ENGINES)}")
+
+    if engine == "tesserocr" and not is_available():
+        logger.warning("Motor de OCR tesserocr indisponível. Usando 'pytesseract' como fallback.")
+        return "pytesseract"
+    return engine
+
+
+def parse_config(config: str) -> Tuple[Optional[int], Optional[int], Dict[str, str]]:
+    """
+    Interpreta as opções de linha de comando do Tesseract aceitas pelo pytesseract.
+
+    Args:
+        config: Opções como "--psm 6 --oem 1 -c preserve_interword_spaces=1"
+
+    Returns:
+        Tupla (psm, oem, variáveis); psm e oem são None quando não informados
+
+    Raises:
+        ValueError: Se alguma opção não for suportada
+    """
+    psm = oem = None
+    variables: Dict[str, str] = {}
+    tokens = shlex.split(config or "")
+
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        value = tokens[index + 1] if index + 1 < len(tokens) else None
+        if token in ("--psm", "--oem") and value is not None:
+            if token == "--psm":
+                psm = int(value)
+            else:
+                oem = int(value)
+            index += 2
+        elif token == "-c" and value is not None and "=" in value:
+            name, _, setting = value.partition("=")
+            variables[name] = setting
+            index += 2
+        else:
+            raise ValueError(f"Opção do Tesseract não suportada pelo tesserocr: {token}")
+
+    return psm, oem, variables
+
+
+class TesserocrEngine:
+    """
+    Motor de OCR em processo com um TessBaseAPI por thread, idioma e configuração.
+
+    Um TessBaseAPI não pode ser usado por duas threads ao mesmo tempo, por isso cada thread do
+    pool mantém os seus próprios motores. A inicialização (carregar o traineddata) acontece uma
+    vez por combinação e as chamadas seguintes apenas trocam a imagem.
+    """
+
+    def __init__(self, tessdata_path: Optional[str] = None):
+        """
+        Inicializa o motor.
+
+        Args:
+            tessdata_path: Diretório dos arquivos traineddata (None para o padrão do Tesseract)
+        """
+        import tesserocr
+
+        self._tesserocr = tesserocr
+        self.tessdata_path = tessdata_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._apis: List[Any] = []
+
+    def get_languages(self) -> List[str]:
+        """
+        Obtém os idiomas instalados.
+
+        Returns:
+            Lista de códigos de idioma
+        """
+        if self.tessdata_path:
+            _, languages = self._tesserocr.get_languages(self.tessdata_path)
+        else:
+            _, languages = self._tesserocr.get_languages()
+        return list(languages)
+
+    def image_to_string(self, image: Union[str, Image.Image], lang: str = "por", config: str = "", timeout: float = 0) -> str:
+        """
+        Reconhece o texto de uma imagem.
+
+        Args:
+            image: Caminho para a imagem ou imagem PIL
+            lang: Idioma (ou idiomas combinados, como "por+eng")
+            config: Opções do Tesseract (--psm, --oem e -c)
+            timeout: Tempo máximo em segundos (0 para ilimitado)
+
+        Returns:
+            Texto reconhecido
+
+        Raises:
+            RuntimeError: Se o reconhecimento exceder o tempo limite
+        """
+        api = self._recognize(image, lang, config, timeout)
+        try:
+            return api.GetUTF8Text()
+        finally:
+            api.Clear()
+
+    def image_to_data(self, image: Union[str, Image.Image], lang: str = "por", config: str = "", output_type: Any = None, timeout: float = 0) -> Dict[str, List[Any]]:
+        """
+        Reconhece as palavras de uma imagem com posição e confiança.
+
+        Args:
+            image: Caminho para a imagem ou imagem PIL
+            lang: Idioma (ou idiomas combinados, como "por+eng")
+            config: Opções do Tesseract (--psm, --oem e -c)
+            output_type: Ignorado; o resultado é sempre um dicionário, como com Output.DICT
+            timeout: Tempo máximo em segundos (0 para ilimitado)
+
+        Returns:
+            Dicionário de listas com as mesmas chaves do pytesseract (level, block_num, par_num,
+            line_num, word_num, left, top, width, height, conf e text), uma entrada por palavra
+
+        Raises:
+            RuntimeError: Se o reconhecimento exceder o tempo limite
+        """
+        tesserocr = self._tesserocr
+        api = self._recognize(image, lang, config, timeout)
+        data: Dict[str, List[Any]] = {
+            key: []
+            for key in ("level", "page_num", "block_num", "par_num", "line_num", "word_num",
+                        "left", "top", "width", "height", "conf", "text")
+        }
+
+        try:
+            iterator = api.GetIterator()
+            if iterator is None:
+                return data
+
+            block = par = line = word = 0
+            level = tesserocr.RIL.WORD
+            while True:
+                # Numeração hierárquica, como na saída TSV do Tesseract
+                if iterator.IsAtBeginningOf(tesserocr.RIL.BLOCK):
+                    block, par, line, word = block + 1, 0, 0, 0
+                if iterator.IsAtBeginningOf(tesserocr.RIL.PARA):
+                    par, line, word = par + 1, 0, 0
+                if iterator.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                    line, word = line + 1, 0
+                word += 1
+
+                box = iterator.BoundingBox(level)
+                text = iterator.GetUTF8Text(level)
+                if box is not None and text is not None:
+                    left, top, right, bottom = box
+                    data["level"].append(5)
+                    data["page_num"].append(1)
+                    data["block_num"].append(block)
+                    data["par_num"].append(par)
+                    data["line_num"].append(line)
+                    data["word_num"].append(word)
+                    data["left"].append(left)
+                    data["top"].append(top)
+                    data["width"].append(right - left)
+                    data["height"].append(bottom - top)
+                    data["conf"].append(round(iterator.Confidence(level), 2))
+                    data["text"].append(text)
+
+                if not iterator.Next(level):
+                    break
+            return data
+        finally:
+            api.Clear()
+
+    def image_to_pdf_or_hocr(self, image: Union[str, Image.Image], lang: str = "por", config: str = "", extension: str = "hocr", timeout: float = 0) -> bytes:
+        """
+        Reconhece uma imagem e retorna o resultado em hOCR.
+
+        Args:
+            image: Caminho para a imagem ou imagem PIL
+            lang: Idioma (ou idiomas combinados, como "por+eng")
+            config: Opções do Tesseract (--psm, --oem e -c)
+            extension: Apenas "hocr" é suportado
+            timeout: Tempo máximo em segundos (0 para ilimitado)
+
+        Returns:
+            Documento hOCR codificado em UTF-8, como no pytesseract
+
+        Raises:
+            ValueError: Se a extensão não for "hocr"
+            RuntimeError: Se o reconhecimento exceder o tempo limite
+        """
+        if extension != "hocr":
+            raise ValueError(f"Formato não suportado pelo tesserocr: {extension}")
+
+        api = self._recognize(image, lang, config, timeout)
+        try:
+            return api.GetHOCRText(0).encode("utf-8")
+        finally:
+            api.Clear()
+
+    def image_to_osd(self, image: Union[str, Image.Image], timeout: float = 0) -> str:
+        """
+        Detecta a orientação e o alfabeto (script) de uma imagem.
+
+        Args:
+            image: Caminho para a imagem ou imagem PIL
+            timeout: Ignorado; a detecção não pode ser interrompida pela API C
+
+        Returns:
+            Texto no mesmo formato da saída do "tesseract --psm 0"
+        """
+        api = self._api("osd", int(self._tesserocr.PSM.OSD_ONLY), None, {})
+        try:
+            self._set_image(api, image)
+            result = api.DetectOrientationScript()
+        finally:
+            api.Clear()
+
+        if not result:
+            raise RuntimeError("Não foi possível detectar a orientação e o alfabeto")
+        return (
+            f"Orientation in degrees: {result['orient_deg']}\n"
+            f"Orientation confidence: {result['orient_conf']:.2f}\n"
+            f"Script: {result['script_name']}\n"
+            f"Script confidence: {result['script_conf']:.2f}\n"
+        )
+
+    def close(self) -> None:
+        """
+        Libera todos os motores inicializados, de todas as threads.
+        """
+        with self._lock:
+            apis, self._apis = self._apis, []
+        for api in apis:
+            api.End()
+        self._local = threading.local()
+
+    def _recognize(self, image: Union[str, Image.Image], lang: str, config: str, timeout: float) -> Any:
+        """Carrega a imagem no motor da thread atual e executa o reconhecimento."""
+        psm, oem, variables = parse_config(config)
+        api = self._api(lang, psm, oem, variables)
+        self._set_image(api, image)
+
+        # Recognize aceita um tempo limite em milissegundos (0 para ilimitado)
+        if not api.Recognize(int(timeout * 1000) if timeout else 0):
+            api.Clear()
+            raise RuntimeError("Tesseract process timeout")
+        return api
+
+    def _set_image(self, api: Any, image: Union[str, Image.Image]) -> None:
+        """Carrega uma imagem no motor sem convertê-la (caminhos são lidos pelo Leptonica)."""
+        if isinstance(image, Image.Image):
+            api.SetImage(image)
+        else:
+            api.SetImageFile(image)
+
+    def _api(self, lang: str, psm: Optional[int], oem: Optional[int], variables: Dict[str, str]) -> Any:
+        """Obtém (ou cria) o motor da thread atual para o idioma e a configuração."""
+        tesserocr = self._tesserocr
+        psm = int(tesserocr.PSM.AUTO) if psm is None else psm
+        oem = int(tesserocr.OEM.DEFAULT) if oem is None else oem
+        key: _EngineKey = (lang, psm, oem, tuple(sorted(variables.items())))
+
+        apis = getattr(self._local, "apis", None)
+        if apis is None:
+            apis = self._local.apis = {}
+
+        api = apis.get(key)
+        if api is None:
+            options = {"lang": lang, "psm": psm, "oem": oem, "init": True}
+            if self.tessdata_path:
+                options["path"] = self.tessdata_path
+            if variables:
+                options["variables"] = dict(variables)
+            api = tesserocr.PyTessBaseAPI(**options)
+            apis[key] = api
+            with self._lock:
+                self._apis.append(api)
+            logger.info(f"Motor tesserocr inicializado: idioma {lang}, psm {psm}, oem {oem} ({threading.current_thread().name})")
+        return api
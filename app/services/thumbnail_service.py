@@ -0,0 +1,251 @@
+"""
+Módulo para geração de miniaturas de páginas sob demanda.
+
+Este módulo rasteriza uma única página de um PDF já processado na largura pedida, direto pelo
+pdftoppm (que escala a página durante a renderização), e guarda o resultado em um cache em
+disco com descarte das miniaturas usadas há mais tempo (LRU) quando o tamanho máximo é
+excedido.
+"""
+
+import os
+import uuid
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+import pdf2image
+
+from app.core.config import (
+    RENDER_QUALITY,
+    THUMBNAIL_CACHE_DIR,
+    THUMBNAIL_CACHE_MAX_BYTES,
+    THUMBNAIL_FORMAT,
+    THUMBNAIL_MAX_WIDTH,
+)
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Largura mínima aceita para uma miniatura, em pixels
+THUMBNAIL_MIN_WIDTH = 16
+
+# Após um descarte, o cache é reduzido a esta fração do tamanho máximo
+_EVICTION_TARGET = 0.9
+
+# Extensão e tipo MIME de cada formato de miniatura
+_THUMBNAIL_FORMATS = {"jpeg": ("jpg", "image/jpeg"), "png": ("png", "image/png")}
+
+
+class ThumbnailCache:
+    """
+    Cache de miniaturas em disco com descarte LRU.
+
+    A data de modificação de cada arquivo é atualizada a cada acesso e serve como a ordem de
+    uso. O tamanho total é mantido em memória e recalculado a partir do disco a cada descarte,
+    de modo que o cache continua consistente se for compartilhado entre processos.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        """
+        Inicializa o cache.
+
+        Args:
+            cache_dir: Diretório das miniaturas (criado no primeiro uso)
+            max_bytes: Tamanho máximo do cache em bytes
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+
+    def get(self, name: str) -> Optional[str]:
+        """
+        Obtém uma miniatura do cache, marcando-a como usada recentemente.
+
+        Args:
+            name: Nome do arquivo da miniatura
+
+        Returns:
+            Caminho da miniatura ou None se ela não estiver no cache
+        """
+        path = os.path.join(self.cache_dir, name)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, name: str, source_path: str) -> str:
+        """
+        Move uma miniatura recém-gerada para o cache, descartando as mais antigas se necessário.
+
+        Args:
+            name: Nome do arquivo da miniatura
+            source_path: Arquivo gerado, no mesmo sistema de arquivos do cache
+
+        Returns:
+            Caminho da miniatura no cache
+        """
+        path = os.path.join(self.cache_dir, name)
+        size = os.path.getsize(source_path)
+        # A troca é atômica: requisições simultâneas nunca leem um arquivo incompleto
+        os.replace(source_path, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._disk_usage()
+            else:
+                self._size += size
+            if self._size > self.max_bytes:
+                self._evict(keep=path)
+        return path
+
+    def temp_dir(self) -> str:
+        """
+        Retorna o diretório onde as miniaturas devem ser geradas antes de entrar no cache.
+
+        Returns:
+            Caminho do diretório temporário do cache
+        """
+        path = os.path.join(self.cache_dir, "tmp")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _disk_usage(self) -> int:
+        """Soma o tamanho das miniaturas no cache (chamado com o lock adquirido)."""
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file():
+                total += entry.stat().st_size
+        return total
+
+    def _evict(self, keep: str) -> None:
+        """Remove as miniaturas usadas há mais tempo (chamado com o lock adquirido)."""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.path != keep:
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries) + os.path.getsize(keep)
+        target = self.max_bytes * _EVICTION_TARGET
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+
+        self._size = total
+        logger.info(f"Cache de miniaturas: {removed} arquivos descartados ({total} bytes em uso)")
+
+
+def validate_width(width: int) -> None:
+    """
+    Verifica se a largura pedida para uma miniatura é aceita.
+
+    Args:
+        width: Largura em pixels
+
+    Raises:
+        ValueError: Se a largura estiver fora dos limites
+    """
+    if not THUMBNAIL_MIN_WIDTH <= width <= THUMBNAIL_MAX_WIDTH:
+        raise ValueError(
+            f"Largura inválida: {width} (use de {THUMBNAIL_MIN_WIDTH} a {THUMBNAIL_MAX_WIDTH})"
+        )
+
+
+def thumbnail_etag(original_path: str, document_id: str, page: int, width: int) -> str:
+    """
+    Calcula a ETag de uma miniatura sem gerá-la.
+
+    A ETag depende apenas do documento (tamanho e data de modificação do original), da página,
+    da largura e do formato, então uma requisição condicional pode ser respondida com 304
+    antes de qualquer rasterização.
+
+    Args:
+        original_path: Caminho para o PDF original
+        document_id: ID do documento
+        page: Número da página (iniciando em 1)
+        width: Largura da miniatura em pixels
+
+    Returns:
+        ETag entre aspas, pronta para o cabeçalho HTTP
+    """
+    stat = os.stat(original_path)
+    key = f"{document_id}:{stat.st_size}:{stat.st_mtime_ns}:{page}:{width}:{THUMBNAIL_FORMAT}"
+    return f'"{hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def get_thumbnail(
+    original_path: str,
+    document_id: str,
+    page: int,
+    width: int,
+    timeout: Optional[float] = None,
+    cache: Optional[ThumbnailCache] = None,
+) -> Dict[str, Any]:
+    """
+    Obtém a miniatura de uma página, gerando-a apenas se ela não estiver no cache.
+
+    Args:
+        original_path: Caminho para o PDF original
+        document_id: ID do documento
+        page: Número da página (iniciando em 1)
+        width: Largura da miniatura em pixels (a altura segue a proporção da página)
+        timeout: Tempo máximo da rasterização em segundos (None para ilimitado)
+        cache: Cache de miniaturas (padrão: o cache compartilhado)
+
+    Returns:
+        Dicionário com path, etag, media_type e cached (se a miniatura já estava no cache)
+
+    Raises:
+        ValueError: Se a largura for inválida ou a página não existir
+        PDFPopplerTimeoutError: Se a rasterização exceder o tempo limite
+    """
+    validate_width(width)
+    cache = cache or thumbnail_cache
+    extension, media_type = _THUMBNAIL_FORMATS.get(THUMBNAIL_FORMAT, _THUMBNAIL_FORMATS["jpeg"])
+
+    etag = thumbnail_etag(original_path, document_id, page, width)
+    name = f"{etag.strip(chr(34))}.{extension}"
+
+    path = cache.get(name)
+    if path is not None:
+        return {"path": path, "etag": etag, "media_type": media_type, "cached": True}
+
+    # O pdftoppm renderiza a página já na largura pedida (-scale-to-x), sem passar pela
+    # resolução completa nem por uma recodificação no Python
+    temp_dir = cache.temp_dir()
+    rendered = pdf2image.convert_from_path(
+        original_path,
+        size=(width, None),
+        fmt=extension,
+        jpegopt={"quality": RENDER_QUALITY, "optimize": True} if extension == "jpg" else None,
+        first_page=page,
+        last_page=page,
+        output_folder=temp_dir,
+        output_file=f"thumb_{uuid.uuid4().hex}",
+        paths_only=True,
+        timeout=timeout,
+    )
+    if not rendered:
+        raise ValueError(f"Página {page} não encontrada no documento")
+
+    path = cache.put(name, rendered[0])
+    for extra in rendered[1:]:
+        os.remove(extra)
+
+    logger.info(f"Miniatura gerada: documento {document_id}, página {page}, largura {width}")
+    return {"path": path, "etag": etag, "media_type": media_type, "cached": False}
+
+
+# Cache compartilhado pelos endpoints de miniaturas
+thumbnail_cache = ThumbnailCache(THUMBNAIL_CACHE_DIR, THUMBNAIL_CACHE_MAX_BYTES)
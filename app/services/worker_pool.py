@@ -0,0 +1,277 @@
+"""
+Módulo com o pool de processos compartilhado pelos processamentos.
+
+A extração é limitada pela GIL, então os documentos são processados em processos. O pool é
+criado uma única vez, na inicialização da aplicação (ou no primeiro uso, na linha de comando e
+nos testes), e encerrado junto com ela.
+
+Os workers são iniciados com WORKER_START_METHOD ("spawn" ou "forkserver") e não são cópias
+do servidor, que tem várias threads: não herdam a conexão do cache de OCR, os motores do
+tesserocr nem locks adquiridos por outras threads. O initializer ainda descarta esse estado
+explicitamente, de modo que cada worker cria o seu próprio cache de OCR e os seus motores.
+
+Como os workers não herdam objetos do processo principal, o cancelamento chega a eles por
+eventos criados em um Manager (create_cancel_event), repassados como argumento de cada tarefa.
+
+Cada processamento roda em um worker sob hard_limits: cada worker fica em um grupo de processos
+próprio, de modo que o cancelamento e os limites de JOB_TIMEOUT_SECONDS e JOB_CPU_LIMIT_SECONDS
+encerram também o tesseract e o pdftoppm e interrompem o código Python fora dos pontos de
+verificação. Um worker encerrado por não responder à interrupção torna o pool inutilizável, e
+ele é recriado na próxima tarefa.
+"""
+
+import queue
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.managers import SyncManager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from app.core.config import (
+    CANCEL_POLL_INTERVAL,
+    JOB_CPU_LIMIT_SECONDS,
+    JOB_TIMEOUT_SECONDS,
+    WORKER_POOL_SIZE,
+    WORKER_START_METHOD,
+)
+from app.core.cancellation import CancelToken, hard_limits, isolate_process_group
+from app.services import document_service
+from app.services.ocr_cache import reset_ocr_cache
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Métodos de início aceitos para os workers
+WORKER_START_METHODS = ("spawn", "forkserver")
+
+_executor: Optional[ProcessPoolExecutor] = None
+_manager: Optional[SyncManager] = None
+_lock = threading.Lock()
+
+
+def start_worker_pool() -> ProcessPoolExecutor:
+    """
+    Cria o pool de processos compartilhado, se ainda não existir.
+
+    Returns:
+        Pool de processos
+
+    Raises:
+        ValueError: Se WORKER_START_METHOD não for "spawn" nem "forkserver"
+    """
+    global _executor, _manager
+    with _lock:
+        if _executor is None:
+            if WORKER_START_METHOD not in WORKER_START_METHODS:
+                raise ValueError(
+                    f"Método de início não suportado: {WORKER_START_METHOD}. "
+                    f"Use: {', '.join(WORKER_START_METHODS)}"
+                )
+            context = multiprocessing.get_context(WORKER_START_METHOD)
+            if _manager is None:
+                _manager = context.Manager()
+            _executor = ProcessPoolExecutor(
+                max_workers=WORKER_POOL_SIZE, mp_context=context, initializer=_init_worker
+            )
+            logger.info(
+                f"Pool de processos iniciado: {WORKER_POOL_SIZE} workers ({WORKER_START_METHOD})"
+            )
+        return _executor
+
+
+def get_worker_pool() -> ProcessPoolExecutor:
+    """
+    Retorna o pool de processos compartilhado, criando-o no primeiro uso.
+
+    Returns:
+        Pool de processos
+    """
+    return _executor or start_worker_pool()
+
+
+def create_cancel_event() -> Any:
+    """
+    Cria um evento de cancelamento que pode ser repassado às tarefas do pool.
+
+    Returns:
+        Proxy de threading.Event mantido pelo Manager do pool
+    """
+    start_worker_pool()
+    assert _manager is not None
+    return _manager.Event()
+
+
+def create_queue() -> Any:
+    """
+    Cria uma fila que pode ser repassada às tarefas do pool.
+
+    Returns:
+        Proxy de queue.Queue mantido pelo Manager do pool
+    """
+    start_worker_pool()
+    assert _manager is not None
+    return _manager.Queue()
+
+
+def submit_job(fn: Callable[..., Any], *args, **kwargs) -> Future:
+    """
+    Envia uma tarefa ao pool, recriando-o se um worker tiver sido encerrado.
+
+    Args:
+        fn: Função executada no worker (definida no nível do módulo)
+        *args: Argumentos da função
+        **kwargs: Argumentos nomeados da função
+
+    Returns:
+        Future da tarefa
+    """
+    executor = get_worker_pool()
+    try:
+        return executor.submit(fn, *args, **kwargs)
+    except BrokenProcessPool:
+        logger.warning("Pool de processos interrompido por um worker encerrado; criando um novo")
+        _discard(executor)
+        return get_worker_pool().submit(fn, *args, **kwargs)
+
+
+def start_job(func: Callable[..., Any], **kwargs) -> Tuple[Future, Any]:
+    """
+    Inicia um processamento em um worker do pool, sob hard_limits.
+
+    Args:
+        func: Função de processamento (recebe cancel_token como argumento nomeado)
+        **kwargs: Argumentos da função
+
+    Returns:
+        Tupla (future do resultado, evento que cancela o processamento)
+    """
+    cancel_event = create_cancel_event()
+    return submit_job(run_job, func, cancel_event, **kwargs), cancel_event
+
+
+def start_stream_job(
+    func: Callable[..., Iterator[Dict[str, Any]]], **kwargs
+) -> Tuple[Future, Iterator[Dict[str, Any]]]:
+    """
+    Inicia um processamento em streaming em um worker do pool, sob hard_limits.
+
+    Se o consumidor fechar o gerador de registros (cliente desconectado), o processamento é
+    cancelado. Se o worker falhar fora do processamento, um registro "error" é gerado.
+
+    Args:
+        func: Gerador de registros (recebe cancel_token como argumento nomeado)
+        **kwargs: Argumentos da função
+
+    Returns:
+        Tupla (future que termina junto com o worker, gerador dos registros produzidos)
+    """
+    cancel_event = create_cancel_event()
+    records = create_queue()
+    future = submit_job(_stream_job, func, cancel_event, records, **kwargs)
+    return future, _iter_records(future, cancel_event, records)
+
+
+def _iter_records(future: Future, cancel_event: Any, records: Any) -> Iterator[Dict[str, Any]]:
+    """Repassa os registros da fila de um processamento em streaming até o None final."""
+    try:
+        while True:
+            try:
+                record = records.get(timeout=CANCEL_POLL_INTERVAL)
+            except queue.Empty:
+                # Worker encerrado antes de sinalizar o fim dos registros
+                if future.done() and records.empty():
+                    record = None
+                else:
+                    continue
+            if record is None:
+                break
+            yield record
+
+        error = future.exception()
+        if error is not None:
+            message = f"Erro ao processar documento: {str(error)}"
+            yield {"type": "error", "stage": "processing", "message": message}
+    except GeneratorExit:
+        cancel_event.set()
+        raise
+
+
+def run_job(func: Callable[..., Any], cancel_event: Any, **kwargs) -> Any:
+    """
+    Executa um processamento no worker, com um token limitado e sob hard_limits.
+
+    Args:
+        func: Função de processamento (recebe cancel_token como argumento nomeado)
+        cancel_event: Evento que cancela o processamento
+        **kwargs: Argumentos da função
+
+    Returns:
+        Resultado da função
+    """
+    token = _job_token(cancel_event)
+    with hard_limits(token):
+        return func(cancel_token=token, **kwargs)
+
+
+def _stream_job(
+    func: Callable[..., Iterator[Dict[str, Any]]],
+    cancel_event: Any,
+    records: Any,
+    **kwargs,
+) -> None:
+    """Executa um gerador de registros no worker, enviando-os pela fila e terminando com None."""
+    token = _job_token(cancel_event)
+    try:
+        with hard_limits(token):
+            for record in func(cancel_token=token, **kwargs):
+                records.put(record)
+    finally:
+        records.put(None)
+
+
+def _job_token(cancel_event: Any) -> CancelToken:
+    """Cria o token de um processamento no worker, com o tempo de CPU medido no processo."""
+    return CancelToken(
+        timeout=JOB_TIMEOUT_SECONDS,
+        cpu_limit=JOB_CPU_LIMIT_SECONDS,
+        cancel_event=cancel_event,
+        process_cpu=True,
+    )
+
+
+def _discard(executor: ProcessPoolExecutor) -> None:
+    """Descarta um pool interrompido, para que o próximo uso crie outro."""
+    global _executor
+    with _lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False)
+
+
+def shutdown_worker_pool() -> None:
+    """
+    Encerra o pool de processos, aguardando as tarefas em execução e descartando as pendentes.
+    """
+    global _executor, _manager
+    with _lock:
+        executor, manager = _executor, _manager
+        _executor, _manager = None, None
+
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+        logger.info("Pool de processos encerrado")
+    if manager is not None:
+        manager.shutdown()
+
+
+def _init_worker() -> None:
+    """
+    Inicializa um worker do pool em um grupo de processos próprio, com um cache de OCR e
+    motores de OCR próprios.
+    """
+    isolate_process_group()
+    reset_ocr_cache()
+    # O novo adaptador cria os motores de OCR e obtém um novo cache de OCR neste processo
+    document_service.reset_adapter()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Benchmark da extração de tabelas de documentos DOCX.
+
+Este script gera um DOCX com uma tabela grande (5.000 linhas por padrão, com células mescladas
+na horizontal e na vertical), extrai as linhas com o python-docx (row.cells, que reconstrói a
+grade de mesclagens a cada acesso) e com a leitura direta do XML (docx_stream), e reporta o
+tempo de cada um e se as linhas extraídas são iguais.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import zipfile
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Adicionar o diretório raiz ao PYTHONPATH
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import docx
+
+from app.core import docx_stream
+
+WORDS = (
+    "documento processamento texto tabela imagem pagina relatorio analise dados "
+    "resultado servico extracao conteudo arquivo formato sistema valor coluna linha"
+).split()
+
+_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def _cell(text: str, properties: str = "") -> str:
+    """Monta uma célula (w:tc) com um parágrafo."""
+    tc_pr = f"<w:tcPr>{properties}</w:tcPr>" if properties else ""
+    return f"<w:tc>{tc_pr}<w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:tc>"
+
+
+def generate_docx(path: str, rows: int, cols: int, merge_every: int = 10, seed: int = 0) -> None:
+    """
+    Gera um DOCX com uma única tabela.
+
+    O pacote base é criado pelo python-docx e o corpo de word/document.xml é gerado diretamente,
+    pois acrescentar milhares de linhas pelo python-docx é lento.
+
+    Args:
+        path: Caminho do arquivo de saída
+        rows: Número de linhas da tabela
+        cols: Número de colunas da grade
+        merge_every: A cada quantas linhas inserir mesclagens (0 para nenhuma)
+        seed: Semente para geração do texto
+    """
+    rng = random.Random(seed)
+    grid = "".join('<w:gridCol w:w="1000"/>' for _ in range(cols))
+    body = []
+    for index in range(rows):
+        cells = []
+        column = 0
+        if merge_every and index % merge_every == 0 and cols >= 3:
+            # Célula que ocupa as duas primeiras colunas
+            cells.append(_cell(f"mesclada {index}", '<w:gridSpan w:val="2"/>'))
+            column = 2
+        while column < cols:
+            if merge_every and column == cols - 1 and index % merge_every in (1, 2):
+                # Mesclagem vertical na última coluna, iniciada na linha anterior
+                merge = '<w:vMerge w:val="restart"/>' if index % merge_every == 1 else "<w:vMerge/>"
+                cells.append(_cell(f"vertical {index}", merge))
+            else:
+                cells.append(_cell(" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))))
+            column += 1
+        body.append(f"<w:tr>{''.join(cells)}</w:tr>")
+
+    document = (
+        f'<w:document xmlns:w="{_W}"><w:body>'
+        f"<w:tbl><w:tblPr/><w:tblGrid>{grid}</w:tblGrid>{''.join(body)}</w:tbl>"
+        "<w:p/></w:body></w:document>"
+    )
+
+    base = path + ".base"
+    docx.Document().save(base)
+    with zipfile.ZipFile(base) as source, zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as target:
+        for item in source.infolist():
+            data = document.encode("utf-8") if item.filename == "word/document.xml" else source.read(item)
+            target.writestr(item, data)
+    os.remove(base)
+
+
+def extract_python_docx(path: str) -> List[List[List[str]]]:
+    """Extrai as tabelas com o python-docx, como o adaptador fazia."""
+    document = docx.Document(path)
+    return [[[cell.text for cell in row.cells] for row in table.rows] for table in document.tables]
+
+
+def extract_stream(path: str) -> List[List[List[str]]]:
+    """Extrai as tabelas lendo o XML diretamente."""
+    with zipfile.ZipFile(path) as package:
+        return [block["rows"] for block in docx_stream.iter_blocks(package) if block["type"] == "table"]
+
+
+def measure(extractor: Any, path: str, repeat: int) -> Dict[str, Any]:
+    """
+    Mede o melhor tempo de um extrator.
+
+    Args:
+        extractor: Função que recebe o caminho do DOCX e retorna as tabelas
+        path: Caminho do DOCX
+        repeat: Número de execuções
+
+    Returns:
+        Melhor tempo em segundos e as tabelas extraídas
+    """
+    best = None
+    tables = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tables = extractor(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {"seconds": best, "tables": tables}
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Analisa os argumentos da linha de comando.
+
+    Returns:
+        Argumentos analisados
+    """
+    parser = argparse.ArgumentParser(
+        description="Compara a extração de tabelas DOCX do python-docx com a leitura direta do XML",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+
+    parser.add_argument("--rows", type=int, default=5000, help="Linhas da tabela gerada")
+    parser.add_argument("--cols", type=int, default=8, help="Colunas da tabela gerada")
+    parser.add_argument(
+        "--merge-every", type=int, default=10, help="A cada quantas linhas inserir mesclagens (0 desativa)"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por extrator (vale o melhor tempo)")
+    parser.add_argument("--input", "-i", type=str, help="DOCX existente (substitui o documento gerado)")
+    parser.add_argument("--output", "-o", type=str, help="Salva os resultados em um arquivo JSON")
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    """
+    Função principal.
+    """
+    args = parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="docling_bench_") as temp_dir:
+        if args.input:
+            path = args.input
+        else:
+            path = os.path.join(temp_dir, "table.docx")
+            generate_docx(path, args.rows, args.cols, args.merge_every)
+            print(f"Documento: {args.rows} linhas x {args.cols} colunas")
+
+        baseline = measure(extract_python_docx, path, args.repeat)
+        stream = measure(extract_stream, path, args.repeat)
+
+    rows = sum(len(table) for table in baseline["tables"])
+    summary = []
+    print("\n=== Resultados ===")
+    print(f"{'extrator':<14}{'segundos':>12}{'linhas/s':>14}{'iguais':>10}")
+    for name, data in (("python-docx", baseline), ("docx_stream", stream)):
+        row = {
+            "extractor": name,
+            "rows": rows,
+            "seconds": round(data["seconds"], 3),
+            "rows_per_sec": round(rows / data["seconds"], 1) if data["seconds"] else None,
+            "matches_python_docx": data["tables"] == baseline["tables"],
+        }
+        summary.append(row)
+        print(f"{name:<14}{row['seconds']:>12}{str(row['rows_per_sec']):>14}{str(row['matches_python_docx']):>10}")
+
+    if stream["seconds"]:
+        print(f"\nGanho: {baseline['seconds'] / stream['seconds']:.1f}x")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"\nResultados salvos em: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Benchmark do pré-processamento de imagens para OCR.
+
+Este script gera páginas digitalizadas sintéticas (fundo acinzentado, iluminação irregular,
+ruído e leve inclinação), executa o OCR com e sem o pré-processamento e reporta o tempo por
+página, o número de pixels entregues ao Tesseract e a similaridade do texto reconhecido com o
+texto original.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import difflib
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# Adicionar o diretório raiz ao PYTHONPATH
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytesseract
+
+from app.core.config import OCR_PREPROCESS_STEPS
+from app.services.ocr_preprocessing import parse_steps, preprocess_for_ocr
+from app.services.ocr_service import OCRService
+
+WORDS = (
+    "document processing text table image page report analysis data result service "
+    "extraction content file format system value column line invoice contract total"
+).split()
+
+
+def generate_scan(path: str, dpi: int, lines: int = 30, skew: float = 1.5, seed: int = 0) -> str:
+    """
+    Gera uma página A4 digitalizada sintética.
+
+    Args:
+        path: Caminho do arquivo PNG de saída
+        dpi: Resolução da página
+        lines: Número de linhas de texto
+        skew: Inclinação máxima da página, em graus
+        seed: Semente para geração do texto e das imperfeições
+
+    Returns:
+        Texto original da página
+    """
+    rng = random.Random(seed)
+    width, height = int(8.27 * dpi), int(11.69 * dpi)
+    font_size = int(12 * dpi / 72)
+    try:
+        font = ImageFont.load_default(size=font_size)
+    except TypeError:
+        # Pillow antigo: fonte bitmap de tamanho fixo
+        font = ImageFont.load_default()
+
+    page = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(page)
+    text_lines = []
+    margin = int(dpi)
+    for index in range(lines):
+        line = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 9)))
+        text_lines.append(line)
+        draw.text((margin, margin + index * int(font_size * 1.6)), line, fill=20, font=font)
+
+    page = page.rotate(rng.uniform(-skew, skew), resample=Image.BICUBIC, fillcolor=255)
+
+    # Fundo acinzentado com iluminação irregular e ruído de digitalização
+    np_rng = np.random.default_rng(seed)
+    pixels = np.asarray(page, dtype=np.float32)
+    shading = np.linspace(0.75, 0.95, width, dtype=np.float32)[None, :]
+    pixels = pixels * shading + np_rng.normal(0, 8, pixels.shape).astype(np.float32)
+    scan = Image.fromarray(pixels.clip(0, 255).astype(np.uint8), mode="L").convert("RGB")
+    scan.save(path, dpi=(dpi, dpi))
+
+    return "\n".join(text_lines)
+
+
+def similarity(expected: str, recognized: str) -> float:
+    """
+    Calcula a similaridade entre o texto original e o reconhecido, ignorando o espaçamento.
+
+    Args:
+        expected: Texto original
+        recognized: Texto reconhecido pelo OCR
+
+    Returns:
+        Similaridade entre 0 e 1
+    """
+    a = " ".join(expected.split())
+    b = " ".join(recognized.split())
+    return difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def run_mode(service: OCRService, pages: List[Tuple[str, str]], dpi: int, steps: Optional[Tuple[str, ...]], lang: str) -> Dict[str, Any]:
+    """
+    Executa o OCR de todas as páginas em um modo.
+
+    Args:
+        service: Serviço de OCR
+        pages: Pares (caminho, texto original)
+        dpi: Resolução das páginas
+        steps: Etapas de pré-processamento (None para entregar o arquivo original ao Tesseract)
+        lang: Idioma do OCR
+
+    Returns:
+        Tempo total (incluindo o pré-processamento), pixels entregues ao Tesseract e
+        similaridade média
+    """
+    seconds = 0.0
+    pixels = 0
+    ratios = []
+
+    for path, expected in pages:
+        start = time.perf_counter()
+        if steps is None:
+            result = service.process_image(path, lang=lang, preprocess=False)
+            with Image.open(path) as image:
+                pixels += image.width * image.height
+        else:
+            with Image.open(path) as image:
+                processed = preprocess_for_ocr(image, source_dpi=dpi, steps=steps)
+            result = service.process_image(processed, lang=lang, preprocess=False)
+            pixels += processed.width * processed.height
+        seconds += time.perf_counter() - start
+        ratios.append(similarity(expected, result.get("text", "")) if result["success"] else 0.0)
+
+    return {
+        "mode": "raw" if steps is None else "preprocessed",
+        "pages": len(pages),
+        "seconds_per_page": round(seconds / len(pages), 3),
+        "megapixels_per_page": round(pixels / len(pages) / 1e6, 2),
+        "mean_similarity": round(sum(ratios) / len(ratios), 4),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Analisa os argumentos da linha de comando.
+
+    Returns:
+        Argumentos analisados
+    """
+    parser = argparse.ArgumentParser(
+        description="Compara o OCR com e sem o pré-processamento de imagens do Docling",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+
+    parser.add_argument("--pages", type=int, default=5, help="Número de páginas geradas")
+    parser.add_argument("--dpi", type=int, default=400, help="Resolução das páginas geradas")
+    parser.add_argument("--skew", type=float, default=1.5, help="Inclinação máxima das páginas, em graus")
+    parser.add_argument("--lang", type=str, default="eng", help="Idioma do OCR")
+    parser.add_argument(
+        "--steps",
+        type=str,
+        help="Etapas de pré-processamento, separadas por vírgula (padrão: OCR_PREPROCESS_STEPS)",
+    )
+    parser.add_argument("--output", "-o", type=str, help="Salva os resultados em um arquivo JSON")
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    """
+    Função principal.
+    """
+    args = parse_args()
+    steps = parse_steps(args.steps if args.steps is not None else OCR_PREPROCESS_STEPS)
+
+    with tempfile.TemporaryDirectory(prefix="docling_ocr_bench_") as temp_dir:
+        pages = []
+        for i in range(args.pages):
+            path = os.path.join(temp_dir, f"scan_{i}.png")
+            pages.append((path, generate_scan(path, args.dpi, skew=args.skew, seed=i)))
+
+        print(f"Corpus: {len(pages)} páginas a {args.dpi} DPI; etapas: {', '.join(steps) or 'nenhuma'}")
+
+        # Tempo do pré-processamento isolado, sem o Tesseract
+        start = time.perf_counter()
+        for path, _ in pages:
+            with Image.open(path) as image:
+                preprocess_for_ocr(image, source_dpi=args.dpi, steps=steps)
+        preprocess_seconds = (time.perf_counter() - start) / len(pages)
+        print(f"Pré-processamento: {preprocess_seconds:.3f} s/página")
+
+        try:
+            pytesseract.get_tesseract_version()
+        except Exception:
+            print("Tesseract indisponível: apenas o pré-processamento foi medido")
+            return
+
+        service = OCRService()
+        summary = [run_mode(service, pages, args.dpi, mode, args.lang) for mode in (None, steps)]
+
+        print("\n=== Resultados ===")
+        print(f"{'modo':<14}{'s/página':>10}{'MP/página':>12}{'similaridade':>14}")
+        for row in summary:
+            print(
+                f"{row['mode']:<14}{row['seconds_per_page']:>10}"
+                f"{row['megapixels_per_page']:>12}{row['mean_similarity']:>14}"
+            )
+
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"preprocess_seconds_per_page": round(preprocess_seconds, 3), "modes": summary},
+                    f,
+                    ensure_ascii=False,
+                    indent=2,
+                )
+            print(f"\nResultados salvos em: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos motores de extração de texto de PDFs.
+
+Este script gera um corpus de PDFs sintéticos, executa cada motor de extração de texto
+(PyPDF2, pdftotext e pypdfium2) em um processo separado e reporta páginas por segundo,
+pico de memória (RSS) e as diferenças de saída em relação ao PyPDF2.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import difflib
+import argparse
+import resource
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Any
+
+# Adicionar o diretório raiz ao PYTHONPATH
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.pdf_text import PDF_TEXT_ENGINES, is_engine_available, iter_page_texts
+
+# Palavras sem acentos para caberem na codificação padrão da fonte Helvetica
+WORDS = (
+    "documento processamento texto tabela imagem pagina relatorio analise dados "
+    "resultado servico extracao conteudo arquivo formato sistema valor coluna linha"
+).split()
+
+
+def generate_pdf(path: str, pages: int, lines_per_page: int = 40, seed: int = 0) -> None:
+    """
+    Gera um PDF simples com texto em Helvetica, sem dependências externas.
+
+    Args:
+        path: Caminho do arquivo de saída
+        pages: Número de páginas
+        lines_per_page: Número de linhas de texto por página
+        seed: Semente para geração do texto
+    """
+    rng = random.Random(seed)
+    objects: List[bytes] = []
+
+    # 1: catálogo, 2: árvore de páginas, 3: fonte; páginas e conteúdos a seguir
+    page_ids = [4 + 2 * i for i in range(pages)]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode("ascii"))
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    for page_id in page_ids:
+        lines = []
+        for _ in range(lines_per_page):
+            lines.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 12))))
+        stream = "BT /F1 10 Tf 14 TL 50 800 Td " + " ".join(f"({line}) '" for line in lines) + " ET"
+        stream_bytes = stream.encode("ascii")
+        objects.append(
+            (
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>"
+            ).encode("ascii")
+        )
+        objects.append(
+            f"<< /Length {len(stream_bytes)} >>\nstream\n".encode("ascii")
+            + stream_bytes
+            + b"\nendstream"
+        )
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n".encode("ascii") + body + b"\nendobj\n"
+
+    xref_offset = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii")
+    for offset in offsets:
+        output += f"{offset:010d} 00000 n \n".encode("ascii")
+    output += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n"
+    ).encode("ascii")
+
+    with open(path, "wb") as f:
+        f.write(output)
+
+
+def run_worker(engine: str, files: List[str]) -> Dict[str, Any]:
+    """
+    Executa um motor sobre o corpus no processo atual.
+
+    Args:
+        engine: Motor de extração
+        files: Lista de PDFs
+
+    Returns:
+        Estatísticas e textos extraídos por arquivo
+    """
+    texts: Dict[str, List[str]] = {}
+    pages = 0
+    start = time.perf_counter()
+
+    for file_path in files:
+        page_texts = [text for _, text in iter_page_texts(file_path, engine)]
+        texts[file_path] = page_texts
+        pages += len(page_texts)
+
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss é reportado em KB no Linux
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+    return {
+        "engine": engine,
+        "pages": pages,
+        "seconds": elapsed,
+        "peak_rss_kb": max(self_rss, children_rss),
+        "texts": texts,
+    }
+
+
+def compare_texts(baseline: Dict[str, List[str]], other: Dict[str, List[str]]) -> Dict[str, Any]:
+    """
+    Compara a saída de um motor com a saída de referência.
+
+    Args:
+        baseline: Textos da referência por arquivo
+        other: Textos do motor comparado por arquivo
+
+    Returns:
+        Número de páginas divergentes e similaridade média
+    """
+    ratios = []
+    differing_pages = 0
+
+    for file_path, base_pages in baseline.items():
+        other_pages = other.get(file_path, [])
+        for index, base_text in enumerate(base_pages):
+            other_text = other_pages[index] if index < len(other_pages) else ""
+            # Comparar ignorando diferenças de espaçamento entre os motores
+            a = " ".join(base_text.split())
+            b = " ".join(other_text.split())
+            ratio = difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
+            ratios.append(ratio)
+            if a != b:
+                differing_pages += 1
+
+    return {
+        "differing_pages": differing_pages,
+        "mean_similarity": sum(ratios) / len(ratios) if ratios else 1.0,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Analisa os argumentos da linha de comando.
+
+    Returns:
+        Argumentos analisados
+    """
+    parser = argparse.ArgumentParser(
+        description="Compara os motores de extração de texto de PDFs do Docling",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+
+    parser.add_argument("--documents", type=int, default=10, help="Número de PDFs gerados")
+    parser.add_argument("--pages", type=int, default=50, help="Páginas por PDF")
+    parser.add_argument(
+        "--engines",
+        type=str,
+        default=",".join(PDF_TEXT_ENGINES),
+        help="Motores a comparar, separados por vírgula",
+    )
+    parser.add_argument(
+        "--corpus", type=str, help="Diretório com PDFs existentes (substitui o corpus gerado)"
+    )
+    parser.add_argument("--output", "-o", type=str, help="Salva os resultados em um arquivo JSON")
+    parser.add_argument("--worker", type=str, help=argparse.SUPPRESS)
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    """
+    Função principal.
+    """
+    args = parse_args()
+
+    # Modo trabalhador: executa um único motor e devolve o resultado em JSON
+    if args.worker:
+        files = sys.stdin.read().splitlines()
+        json.dump(run_worker(args.worker, files), sys.stdout)
+        return
+
+    with tempfile.TemporaryDirectory(prefix="docling_bench_") as temp_dir:
+        if args.corpus:
+            files = sorted(str(p) for p in Path(args.corpus).rglob("*.pdf"))
+        else:
+            files = []
+            for i in range(args.documents):
+                path = os.path.join(temp_dir, f"doc_{i}.pdf")
+                generate_pdf(path, args.pages, seed=i)
+                files.append(path)
+
+        print(f"Corpus: {len(files)} PDFs")
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for engine in [e.strip() for e in args.engines.split(",") if e.strip()]:
+            if not is_engine_available(engine):
+                print(f"{engine}: indisponível, ignorado")
+                continue
+
+            # Cada motor roda em um processo novo para isolar o pico de memória
+            completed = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", engine],
+                input="\n".join(files),
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+            if completed.returncode != 0:
+                print(f"{engine}: falhou\n{completed.stderr}")
+                continue
+
+            results[engine] = json.loads(completed.stdout)
+
+        baseline = results.get("pypdf2")
+
+        print("\n=== Resultados ===")
+        print(f"{'motor':<12}{'páginas/s':>12}{'RSS (MB)':>12}{'divergentes':>14}{'similaridade':>14}")
+        summary = []
+        for engine, data in results.items():
+            pages_per_sec = data["pages"] / data["seconds"] if data["seconds"] else 0.0
+            diff = compare_texts(baseline["texts"], data["texts"]) if baseline else {}
+            row = {
+                "engine": engine,
+                "pages": data["pages"],
+                "seconds": round(data["seconds"], 3),
+                "pages_per_sec": round(pages_per_sec, 1),
+                "peak_rss_mb": round(data["peak_rss_kb"] / 1024, 1),
+                "differing_pages": diff.get("differing_pages"),
+                "mean_similarity": round(diff["mean_similarity"], 4) if diff else None,
+            }
+            summary.append(row)
+            print(
+                f"{engine:<12}{row['pages_per_sec']:>12}{row['peak_rss_mb']:>12}"
+                f"{str(row['differing_pages']):>14}{str(row['mean_similarity']):>14}"
+            )
+
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+            print(f"\nResultados salvos em: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Geradores de pacotes OOXML mínimos (PPTX) para os testes.
+"""
+
+import io
+import zipfile
+
+from PIL import Image
+
+_P = "http://schemas.openxmlformats.org/presentationml/2006/main"
+_A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+
+def _text_body(paragraphs):
+    """Monta um p:txBody com um parágrafo por item."""
+    return "<p:txBody><a:bodyPr/>" + "".join(
+        f"<a:p><a:r><a:t>{text}</a:t></a:r></a:p>" for text in paragraphs
+    ) + "</p:txBody>"
+
+
+def _shape(paragraphs, placeholder=None):
+    """Monta uma forma com texto, opcionalmente em um espaço reservado."""
+    ph = f'<p:ph type="{placeholder}"/>' if placeholder else ""
+    return (
+        f'<p:sp><p:nvSpPr><p:cNvPr id="1" name="s"/><p:cNvSpPr/><p:nvPr>{ph}</p:nvPr></p:nvSpPr>'
+        f"{_text_body(paragraphs)}</p:sp>"
+    )
+
+
+def _table(rows):
+    """Monta uma tabela; células None são cobertas por mesclagem horizontal."""
+    body = ""
+    for row in rows:
+        cells = "".join(
+            '<a:tc hMerge="1"><a:txBody><a:p/></a:txBody></a:tc>' if cell is None
+            else f"<a:tc><a:txBody><a:p><a:r><a:t>{cell}</a:t></a:r></a:p></a:txBody></a:tc>"
+            for cell in row
+        )
+        body += f"<a:tr>{cells}</a:tr>"
+    return (
+        '<p:graphicFrame><p:nvGraphicFramePr><p:cNvPr id="2" name="t"/><p:cNvGraphicFramePr/><p:nvPr/>'
+        f"</p:nvGraphicFramePr><a:graphic><a:graphicData><a:tbl>{body}</a:tbl></a:graphicData></a:graphic>"
+        "</p:graphicFrame>"
+    )
+
+
+def write_pptx(path, slides, properties=None):
+    """
+    Grava um PPTX mínimo.
+
+    Args:
+        path: Caminho do arquivo
+        slides: Lista de dicionários com title, paragraphs, tables (listas de linhas), images
+            (nomes das imagens em ppt/media usadas pelo slide), group (parágrafos dentro de um
+            grupo de formas) e hidden
+        properties: Elementos de docProps/app.xml, como {"Slides": "2"} (opcional)
+
+    Returns:
+        Caminho do arquivo
+    """
+    with zipfile.ZipFile(path, "w") as package:
+        package.writestr("[Content_Types].xml", "<Types/>")
+
+        slide_ids = ""
+        presentation_rels = ""
+        written_media = set()
+        # Grava os slides na ordem inversa no pacote, para verificar a ordem da apresentação
+        for number in reversed(range(1, len(slides) + 1)):
+            slide = slides[number - 1]
+            shapes = ""
+            if slide.get("title"):
+                shapes += _shape([slide["title"]], "title")
+            if slide.get("paragraphs"):
+                shapes += _shape(slide["paragraphs"], "body")
+            if slide.get("group"):
+                shapes += f"<p:grpSp><p:nvGrpSpPr/><p:grpSpPr/>{_shape(slide['group'])}</p:grpSp>"
+            for rows in slide.get("tables", []):
+                shapes += _table(rows)
+
+            show = ' show="0"' if slide.get("hidden") else ""
+            package.writestr(
+                f"ppt/slides/slide{number}.xml",
+                f'<p:sld xmlns:p="{_P}" xmlns:a="{_A}" xmlns:r="{_R}"{show}>'
+                f"<p:cSld><p:spTree>{shapes}</p:spTree></p:cSld></p:sld>",
+            )
+
+            rels = ""
+            for index, name in enumerate(slide.get("images", []), start=1):
+                rels += (
+                    f'<Relationship Id="rId{index}" Target="../media/{name}" '
+                    f'Type="{_R}/image"/>'
+                )
+                if name not in written_media:
+                    buffer = io.BytesIO()
+                    Image.new("RGB", (30 + number, 20), "white").save(buffer, "PNG")
+                    package.writestr(f"ppt/media/{name}", buffer.getvalue())
+                    written_media.add(name)
+            package.writestr(f"ppt/slides/_rels/slide{number}.xml.rels", f'<Relationships xmlns="{_REL}">{rels}</Relationships>')
+
+        for number in range(1, len(slides) + 1):
+            slide_ids += f'<p:sldId id="{255 + number}" r:id="rId{number + 10}"/>'
+            presentation_rels += (
+                f'<Relationship Id="rId{number + 10}" Target="slides/slide{number}.xml" Type="{_R}/slide"/>'
+            )
+
+        package.writestr(
+            "ppt/presentation.xml",
+            f'<p:presentation xmlns:p="{_P}" xmlns:r="{_R}"><p:sldIdLst>{slide_ids}</p:sldIdLst></p:presentation>',
+        )
+        package.writestr("ppt/_rels/presentation.xml.rels", f'<Relationships xmlns="{_REL}">{presentation_rels}</Relationships>')
+
+        if properties:
+            elements = "".join(f"<{key}>{value}</{key}>" for key, value in properties.items())
+            package.writestr(
+                "docProps/app.xml",
+                '<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+                f"{elements}</Properties>",
+            )
+    return path
@@ -67,9 +67,7 @@ class TestAPIIntegration(unittest.TestCase):
         
         # Verificar conteúdo
         self.assertIn("content", data)
-        self.assertIn("text", data["content"])
         self.assertIn("markdown", data["content"])
-        self.assertIn("html", data["content"])
         
         # Verificar imagens
         self.assertIn("images", data["content"])
@@ -115,7 +113,7 @@ class TestAPIIntegration(unittest.TestCase):
         
         # Verificar conteúdo
         self.assertIn("content", data)
-        self.assertIn("text", data["content"])
+        self.assertIn("markdown", data["content"])
         
         # Verificar que não há imagens
         self.assertNotIn("images", data["content"])
@@ -1,21 +1,40 @@
 """
 Testes para o módulo app.api.routes
 """
+import io
 import os
 import json
+import queue
+import zipfile
+import threading
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, MagicMock, mock_open
 from fastapi.testclient import TestClient
 from datetime import datetime
 
 from app.main import app
 from app.api.routes import router
+from app.core.cancellation import ProcessingTimeout
+from app.core.admission import AdmissionRejected
+from app.services.ocr_words import save_word_table
 
 
 # Cliente de teste para simular requisições HTTP
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def local_worker_pool():
+    """Fixture que troca o pool de processos por threads, para que os workers vejam os mocks."""
+    executor = ThreadPoolExecutor(max_workers=2)
+    with patch("app.services.worker_pool.get_worker_pool", return_value=executor), patch(
+        "app.services.worker_pool.create_cancel_event", side_effect=threading.Event
+    ), patch("app.services.worker_pool.create_queue", side_effect=queue.Queue):
+        yield executor
+    executor.shutdown(wait=False)
+
+
 @pytest.fixture
 def mock_process_document():
     """Fixture para simular a função process_document."""
@@ -119,6 +138,265 @@ class TestAPIRoutes:
         assert response.json()["original_filename"] == "test_document.pdf"
         assert response.json()["status"] == "success"
 
+    def test_upload_and_process_document_stream(self):
+        """Testa o processamento em modo streaming (NDJSON)."""
+        records = [
+            {"type": "document", "id": "123e4567-e89b-12d3-a456-426614174000"},
+            {"type": "page", "page": 1, "text": "Conteúdo de teste"},
+            {"type": "done", "id": "123e4567-e89b-12d3-a456-426614174000", "status": "success"},
+        ]
+        files = {"file": ("test_document.pdf", b"PDF content", "application/pdf")}
+        data = {"stream": "true"}
+
+        with patch("app.api.routes.stream_document", return_value=iter(records)):
+            with patch("builtins.open", mock_open()):
+                response = client.post("/api/process", files=files, data=data)
+
+        # Verificar o resultado
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["type"] for line in lines] == ["document", "page", "done"]
+
+    def test_upload_and_process_document_invalid_pages(self):
+        """Testa a recusa de uma seleção de páginas inválida."""
+        with patch("app.api.routes.process_document") as mock_process:
+            response = client.post(
+                "/api/process",
+                files={"file": ("test.pdf", b"PDF", "application/pdf")},
+                data={"pages": "5-2"},
+            )
+
+        assert response.status_code == 400
+        mock_process.assert_not_called()
+
+    def test_upload_and_process_document_invalid_render_options(self):
+        """Testa a recusa de opções de rasterização inválidas."""
+        with patch("app.api.routes.process_document") as mock_process:
+            response = client.post(
+                "/api/process",
+                files={"file": ("test.pdf", b"PDF", "application/pdf")},
+                data={"image_format": "gif"},
+            )
+
+        assert response.status_code == 400
+        mock_process.assert_not_called()
+
+    def test_inspect_document(self):
+        """Testa a inspeção de metadados sem gravar o arquivo."""
+        inspection = {"filename": "test.pdf", "status": "success", "metadata": {"pages": 3}}
+
+        with patch("app.api.routes.inspect_document", return_value=inspection) as mock_inspect:
+            with patch("app.api.routes.process_document") as mock_process:
+                response = client.post("/api/inspect", files={"file": ("test.pdf", b"PDF", "application/pdf")})
+                metadata_response = client.post(
+                    "/api/process",
+                    files={"file": ("test.pdf", b"PDF", "application/pdf")},
+                    data={"metadata_only": "true"},
+                )
+
+        assert response.status_code == 200
+        assert response.json()["metadata"]["pages"] == 3
+        assert metadata_response.json() == response.json()
+        mock_process.assert_not_called()
+        # O conteúdo é lido direto do upload, sem caminho em UPLOAD_DIR
+        assert mock_inspect.call_args[0][0] == "test.pdf"
+
+    def test_inspect_document_error(self):
+        """Testa a inspeção de um documento ilegível."""
+        inspection = {"filename": "test.pdf", "status": "error", "message": "Erro ao extrair metadados"}
+
+        with patch("app.api.routes.inspect_document", return_value=inspection):
+            response = client.post("/api/inspect", files={"file": ("test.pdf", b"PDF", "application/pdf")})
+
+        assert response.status_code == 400
+
+    def test_upload_and_process_document_timeout(self, mock_process_document):
+        """Testa se um processamento que excede o tempo limite retorna 504."""
+        mock_process_document.side_effect = ProcessingTimeout("Tempo limite de processamento excedido")
+        files = {"file": ("test_document.pdf", b"PDF content", "application/pdf")}
+
+        with patch("builtins.open", mock_open()):
+            with patch("os.path.exists", return_value=True):
+                with patch("os.remove") as mock_remove:
+                    response = client.post("/api/process", files=files)
+
+        assert response.status_code == 504
+        assert "Tempo limite" in response.json().get("message", "")
+        mock_remove.assert_called_once()
+        assert "cancel_token" in mock_process_document.call_args.kwargs
+
+    def test_upload_and_process_document_xlsx(self, mock_process_document):
+        """Testa se planilhas seguem o processamento cancelável e devolvem a capacidade reservada."""
+        mock_process_document.side_effect = ProcessingTimeout("Tempo limite de processamento excedido")
+        files = {"file": ("planilha.xlsx", b"XLSX content", "application/octet-stream")}
+
+        with patch("builtins.open", mock_open()):
+            with patch("os.path.exists", return_value=True):
+                with patch("os.remove"):
+                    response = client.post("/api/process", files=files)
+
+        assert response.status_code == 504
+        assert "cancel_token" in mock_process_document.call_args.kwargs
+        assert client.get("/api/status").json()["load"]["active"] == 0
+
+    def test_upload_and_process_document_rejected(self, mock_process_document):
+        """Testa a recusa rápida com Retry-After quando o serviço está sobrecarregado."""
+        files = {"file": ("test_document.pdf", b"PDF content", "application/pdf")}
+        rejection = AdmissionRejected("Servidor ocupado. Tente novamente mais tarde.", 429, 12)
+
+        with patch("app.api.routes.admission_controller.acquire", side_effect=rejection):
+            with patch("builtins.open", mock_open()):
+                with patch("os.path.exists", return_value=True):
+                    with patch("os.remove") as mock_remove:
+                        response = client.post("/api/process", files=files)
+
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "12"
+        mock_remove.assert_called_once()
+        mock_process_document.assert_not_called()
+
+    def test_upload_and_process_batch(self):
+        """Testa o processamento em lote com resposta em NDJSON."""
+        records = [
+            {"type": "batch", "id": "lote"},
+            {"type": "result", "filename": "a.pdf", "status": "success"},
+            {"type": "result", "filename": "b.docx", "status": "success"},
+            {"type": "done", "id": "lote", "status": "partial"},
+        ]
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zip_file:
+            zip_file.writestr("docs/b.docx", b"DOCX content")
+        files = [
+            ("files", ("a.pdf", b"PDF content", "application/pdf")),
+            ("files", ("lote.zip", archive.getvalue(), "application/zip")),
+            ("files", ("notas.txt", b"texto", "text/plain")),
+        ]
+        sources = []
+
+        def consume(batch_sources, **kwargs):
+            # Os documentos chegam como objetos de arquivo, sem passar por UPLOAD_DIR
+            for name, content in batch_sources:
+                sources.append((name, content.read() if content is not None else None))
+            return iter(records)
+
+        with patch("app.api.routes.process_batch", side_effect=consume):
+            response = client.post("/api/process/batch", files=files)
+
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["type"] for line in lines] == ["batch", "result", "result", "done"]
+        assert sources == [
+            ("a.pdf", b"PDF content"),
+            ("docs/b.docx", b"DOCX content"),
+            ("notas.txt", None),
+        ]
+
+    def test_get_page_thumbnail(self, mock_get_document_info, tmp_path):
+        """Testa a miniatura de uma página, com ETag, Cache-Control e resposta 304."""
+        original = tmp_path / "original.pdf"
+        original.write_bytes(b"%PDF")
+        thumbnail = tmp_path / "thumb.jpg"
+        thumbnail.write_bytes(b"jpeg")
+        mock_get_document_info.return_value["files"]["original"] = str(original)
+
+        with patch("app.api.routes.get_thumbnail") as mock_thumbnail:
+            mock_thumbnail.return_value = {"path": str(thumbnail), "media_type": "image/jpeg", "cached": False}
+            response = client.get("/api/documents/123/pages/2/thumbnail?w=120")
+
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "image/jpeg"
+            assert response.headers["cache-control"].startswith("public, max-age=")
+            assert mock_thumbnail.call_args.args[1:4] == ("123", 2, 120)
+
+            # Repetição com a ETag: respondida sem gerar a miniatura
+            etag = response.headers["etag"]
+            response = client.get(
+                "/api/documents/123/pages/2/thumbnail?w=120", headers={"If-None-Match": etag}
+            )
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert mock_thumbnail.call_count == 1
+
+    def test_get_page_thumbnail_invalid(self, mock_get_document_info):
+        """Testa a recusa de larguras inválidas e de documentos que não são PDF."""
+        response = client.get("/api/documents/123/pages/1/thumbnail?w=5000")
+        assert response.status_code == 400
+
+        mock_get_document_info.return_value["file_type"] = "docx"
+        response = client.get("/api/documents/123/pages/1/thumbnail")
+        assert response.status_code == 400
+
+    def _save_words(self, path, text):
+        """Grava uma tabela de palavras com uma palavra na região (10, 10) e outra fora dela."""
+        save_word_table(str(path), {
+            "level": [1, 5, 5],
+            "block_num": [0, 1, 1], "par_num": [0, 1, 1], "line_num": [0, 1, 1], "word_num": [0, 1, 2],
+            "left": [0, 10, 200], "top": [0, 10, 10], "width": [600, 50, 60], "height": [800, 20, 20],
+            "conf": [-1, 95.0, 40.0], "text": ["", text, "mundo"],
+        })
+
+    def test_get_page_words(self, mock_get_document_info, tmp_path):
+        """Testa a consulta das palavras do OCR de uma página por região, com as das imagens."""
+        ocr_dir = tmp_path / "123" / "ocr"
+        ocr_dir.mkdir(parents=True)
+        self._save_words(ocr_dir / "page_2.words.npz", "Olá")
+        self._save_words(ocr_dir / "page_2_image_1.words.npz", "Figura")
+
+        with patch("app.services.document_service.RESULTS_DIR", str(tmp_path)):
+            response = client.get("/api/documents/123/pages/2/words?x0=0&y0=0&x1=100&y1=100")
+            missing = client.get("/api/documents/123/pages/3/words")
+            partial = client.get("/api/documents/123/pages/2/words?x0=0&y0=0")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["page"] == 2
+        assert data["page_size"] == {"width": 600, "height": 800}
+        assert data["total"] == 2
+        assert [word["text"] for word in data["words"]] == ["Olá"]
+        assert [(table["name"], table["source"]) for table in data["tables"]] == [
+            ("page_2", "page"),
+            ("page_2_image_1", "image"),
+        ]
+        assert [word["text"] for word in data["tables"][1]["words"]] == ["Figura"]
+        assert missing.status_code == 404
+        assert partial.status_code == 400
+
+    def test_get_document_words(self, mock_get_document_info, tmp_path):
+        """Testa a consulta de todas as tabelas de palavras de um documento."""
+        ocr_dir = tmp_path / "123" / "ocr"
+        ocr_dir.mkdir(parents=True)
+        self._save_words(ocr_dir / "page_10.words.npz", "Dez")
+        self._save_words(ocr_dir / "page_2.words.npz", "Dois")
+        self._save_words(ocr_dir / "image1.words.npz", "Mídia")
+        mock_get_document_info.return_value["content"] = {
+            "images": [{"page": 4, "ocr": {"words_file": "/outro/caminho/image1.words.npz"}}],
+        }
+
+        with patch("app.services.document_service.RESULTS_DIR", str(tmp_path)):
+            response = client.get("/api/documents/123/words?min_conf=90")
+            page = client.get("/api/documents/123/pages/4/words")
+
+        assert response.status_code == 200
+        tables = response.json()["tables"]
+        assert [(table["name"], table["page"]) for table in tables] == [
+            ("page_2", 2), ("image1", 4), ("page_10", 10)
+        ]
+        assert all(table["count"] == 1 for table in tables)
+        assert page.status_code == 200
+        assert "words" not in page.json()
+        assert page.json()["tables"][0]["name"] == "image1"
+
+    def test_get_status(self):
+        """Testa o endpoint de carga do serviço."""
+        response = client.get("/api/status")
+
+        assert response.status_code == 200
+        assert response.json()["status"] in ("available", "busy")
+        assert "capacity" in response.json()["load"]
+        assert "queued" in response.json()["load"]
+
     def test_upload_and_process_document_invalid_extension(self):
         """Testa o upload de documento com extensão inválida."""
         # Criar um arquivo de teste com extensão inválida
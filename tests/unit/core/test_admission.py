@@ -0,0 +1,220 @@
+"""
+Testes para o módulo app.core.admission
+"""
+import io
+import asyncio
+import zipfile
+import pytest
+import PyPDF2
+from PIL import Image
+from concurrent.futures import Future
+from unittest.mock import patch
+
+from app.core.admission import AdmissionController, AdmissionRejected, _count_images
+
+
+def test_acquire_and_release():
+    """Testa a reserva e a devolução de capacidade."""
+    controller = AdmissionController(capacity=4)
+
+    async def scenario():
+        lease = await controller.acquire(3)
+        assert controller.status()["in_use"] == 3
+        assert controller.status()["active"] == 1
+        lease.release()
+        lease.release()  # Chamadas repetidas são ignoradas
+
+    asyncio.run(scenario())
+
+    status = controller.status()
+    assert status["in_use"] == 0
+    assert status["active"] == 0
+    assert status["admitted"] == 1
+
+
+def test_cost_is_clamped_to_capacity():
+    """Testa se um documento maior que a capacidade ainda pode ser admitido sozinho."""
+    controller = AdmissionController(capacity=2)
+
+    async def scenario():
+        lease = await controller.acquire(50)
+        assert lease.cost == 2
+        lease.release()
+
+    asyncio.run(scenario())
+
+
+def test_queue_full_rejects_with_429():
+    """Testa a recusa imediata quando a fila está cheia."""
+    controller = AdmissionController(capacity=1, max_queue=0, retry_after=7)
+
+    async def scenario():
+        lease = await controller.acquire(1)
+        with pytest.raises(AdmissionRejected) as exc_info:
+            await controller.acquire(1)
+        lease.release()
+        return exc_info.value
+
+    error = asyncio.run(scenario())
+
+    assert error.status_code == 429
+    assert error.retry_after >= 1
+    assert controller.status()["rejected"] == 1
+
+
+def test_queued_request_is_admitted_on_release():
+    """Testa se a requisição da fila é admitida quando há capacidade liberada."""
+    controller = AdmissionController(capacity=2, max_queue=4, queue_timeout=5)
+
+    async def scenario():
+        first = await controller.acquire(2)
+        waiting = asyncio.ensure_future(controller.acquire(1))
+        await asyncio.sleep(0)
+        assert controller.status()["queued"] == 1
+
+        first.release()
+        second = await waiting
+        assert controller.status()["in_use"] == 1
+        second.release()
+
+    asyncio.run(scenario())
+
+    assert controller.status()["queued"] == 0
+
+
+def test_queue_timeout_rejects_with_503():
+    """Testa a recusa após esgotar o tempo de espera na fila."""
+    controller = AdmissionController(capacity=1, max_queue=4, queue_timeout=0.05)
+
+    async def scenario():
+        lease = await controller.acquire(1)
+        try:
+            with pytest.raises(AdmissionRejected) as exc_info:
+                await controller.acquire(1)
+        finally:
+            lease.release()
+        return exc_info.value
+
+    error = asyncio.run(scenario())
+
+    assert error.status_code == 503
+    assert controller.status()["queued"] == 0
+
+
+def test_expired_lease_keeps_cost_as_debt():
+    """Testa se a reserva expirada continua ocupando a capacidade até o worker terminar."""
+    controller = AdmissionController(capacity=4, retry_after=5)
+
+    async def scenario():
+        lease = await controller.acquire(3)
+        future = Future()
+        lease.release_when_done(future)
+        lease.expire()
+        lease.expire()  # Chamadas repetidas são ignoradas
+
+        status = controller.status()
+        assert status["active"] == 0
+        assert status["in_use"] == 3
+        assert status["debt"] == 3
+
+        future.set_exception(RuntimeError("Worker encerrado"))
+
+    asyncio.run(scenario())
+
+    status = controller.status()
+    assert status["in_use"] == 0
+    assert status["debt"] == 0
+    assert status["active"] == 0
+    # O processamento interrompido não entra na média de duração
+    assert status["avg_job_seconds"] == 5
+
+
+def test_only_completed_jobs_update_average():
+    """Testa se apenas os processamentos concluídos alteram a média usada no Retry-After."""
+    controller = AdmissionController(capacity=4, retry_after=5)
+
+    async def scenario():
+        failed = await controller.acquire(1)
+        failed.release()
+        assert controller.status()["avg_job_seconds"] == 5
+
+        completed = await controller.acquire(1)
+        future = Future()
+        completed.release_when_done(future)
+        future.set_result({"status": "success"})
+
+    asyncio.run(scenario())
+
+    assert controller.status()["avg_job_seconds"] < 5
+
+
+def test_abandoned_waiter_does_not_update_average():
+    """Testa se uma requisição que desiste da fila não altera a média de duração."""
+    controller = AdmissionController(capacity=1, max_queue=4, queue_timeout=5, retry_after=5)
+
+    async def scenario():
+        lease = await controller.acquire(1)
+        waiting = asyncio.ensure_future(controller.acquire(1))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        lease.release()
+
+    asyncio.run(scenario())
+
+    status = controller.status()
+    assert status["queued"] == 0
+    assert status["in_use"] == 0
+    assert status["avg_job_seconds"] == 5
+
+
+def test_estimate_cost_weights_ocr(tmp_path):
+    """Testa se a rasterização com OCR aumenta o custo estimado."""
+    controller = AdmissionController(capacity=1000)
+    file_path = tmp_path / "documento.pdf"
+    file_path.write_bytes(b"%PDF-1.4")
+
+    with patch("app.core.admission._count_pages", return_value=20):
+        text_only = controller.estimate_cost(str(file_path))
+        with_ocr = controller.estimate_cost(str(file_path), True, True, True)
+
+    assert text_only == pytest.approx(1 + 8 / (10 * 1024 * 1024) + 20 / 50)
+    assert with_ocr > text_only + 20
+
+
+def test_estimate_cost_missing_file():
+    """Testa a estimativa para um arquivo inexistente."""
+    controller = AdmissionController(capacity=10)
+
+    assert controller.estimate_cost("/caminho/inexistente.docx") == pytest.approx(1.02)
+
+
+def test_estimate_cost_weights_embedded_images(tmp_path):
+    """Testa se o OCR das imagens incorporadas aumenta o custo estimado."""
+    controller = AdmissionController(capacity=1000)
+    file_path = tmp_path / "documento.docx"
+    with zipfile.ZipFile(file_path, "w") as package:
+        package.writestr("word/document.xml", "<w:document/>")
+        for index in range(4):
+            package.writestr(f"word/media/image{index}.png", b"png")
+
+    without_ocr = controller.estimate_cost(str(file_path), extract_images=True)
+    with_ocr = controller.estimate_cost(str(file_path), extract_images=True, apply_ocr=True)
+
+    assert with_ocr == pytest.approx(without_ocr + 4 * 0.5)
+
+
+def test_count_images_in_selected_pdf_pages(tmp_path):
+    """Testa a contagem das imagens de um PDF apenas nas páginas selecionadas."""
+    writer = PyPDF2.PdfWriter()
+    for size in (20, 10, 30):
+        buffer = io.BytesIO()
+        Image.new("RGB", (size, size), "red").save(buffer, "PDF")
+        writer.add_page(PyPDF2.PdfReader(buffer).pages[0])
+    file_path = tmp_path / "documento.pdf"
+    with open(file_path, "wb") as file:
+        writer.write(file)
+
+    assert _count_images(str(file_path)) == 3
+    assert _count_images(str(file_path), [(2, 3)]) == 2
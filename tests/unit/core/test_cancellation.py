@@ -0,0 +1,144 @@
+"""
+Testes para o módulo app.core.cancellation
+"""
+import sys
+import time
+import threading
+import pytest
+from unittest.mock import patch
+
+from app.core.cancellation import (
+    CancelToken,
+    ProcessingCancelled,
+    ProcessingTimeout,
+    check_cancelled,
+    hard_limits,
+    remaining_time,
+)
+
+
+def test_check_without_limits():
+    """Testa se um token sem limites não interrompe o processamento."""
+    token = CancelToken()
+
+    token.check()
+
+    assert token.remaining() is None
+    assert not token.cancelled
+    assert not token.expired
+
+
+def test_cancel_raises_on_check():
+    """Testa se o cancelamento é reportado na próxima verificação."""
+    token = CancelToken()
+    token.cancel("Cliente desconectado")
+
+    with pytest.raises(ProcessingCancelled) as exc_info:
+        token.check()
+
+    assert not isinstance(exc_info.value, ProcessingTimeout)
+    assert "Cliente desconectado" in str(exc_info.value)
+
+
+def test_cancel_event():
+    """Testa se um evento externo cancela o token na próxima verificação."""
+    event = threading.Event()
+    token = CancelToken(cancel_event=event)
+    token.check()
+
+    event.set()
+
+    with pytest.raises(ProcessingCancelled):
+        token.check()
+    assert token.cancelled
+
+
+def test_wall_clock_timeout():
+    """Testa se o limite de tempo real gera ProcessingTimeout e cancela o token."""
+    token = CancelToken(timeout=10)
+
+    with patch("app.core.cancellation.time.monotonic", return_value=time.monotonic() + 20):
+        assert token.expired
+        with pytest.raises(ProcessingTimeout):
+            token.check()
+
+    assert token.cancelled
+
+
+def test_cpu_limit():
+    """Testa se o tempo de CPU acumulado entre verificações é limitado."""
+    token = CancelToken(cpu_limit=5)
+
+    with patch("app.core.cancellation.time.thread_time", side_effect=[1.0, 3.0, 7.0]):
+        token.check()
+        token.check()
+        with pytest.raises(ProcessingTimeout) as exc_info:
+            token.check()
+
+    assert token.cpu_used == pytest.approx(6.0)
+    assert "CPU" in str(exc_info.value)
+
+
+def test_process_cpu_limit():
+    """Testa se o tempo de CPU do processo inteiro, desde a criação do token, é limitado."""
+    with patch("app.core.cancellation.process_cpu_time", side_effect=[10.0, 12.0, 16.0]):
+        token = CancelToken(cpu_limit=5, process_cpu=True)
+        token.check()
+        error = token.poll()
+
+    assert isinstance(error, ProcessingTimeout)
+    assert token.cpu_used == pytest.approx(6.0)
+    assert token.cancelled
+
+
+def test_hard_limits_cancels_without_check():
+    """Testa se a thread vigia cancela o token sem depender de check()."""
+    token = CancelToken(timeout=0.2)
+
+    with patch("app.core.cancellation.CANCEL_POLL_INTERVAL", 0.05):
+        with hard_limits(token):
+            start = time.monotonic()
+            while not token.cancelled and time.monotonic() - start < 10:
+                time.sleep(0.01)
+
+    assert token.cancelled
+    assert "Tempo limite" in token.reason
+
+
+def test_run_returns_output():
+    """Testa a execução de um subprocesso vinculado ao token."""
+    token = CancelToken(timeout=30)
+
+    completed = token.run([sys.executable, "-c", "print('ok')"])
+
+    assert completed.returncode == 0
+    assert completed.stdout.strip() == b"ok"
+
+
+def test_run_killed_on_cancel():
+    """Testa se cancelar o token encerra o subprocesso em execução."""
+    token = CancelToken()
+    timer = threading.Timer(0.2, token.cancel)
+    timer.start()
+
+    start = time.monotonic()
+    with pytest.raises(ProcessingCancelled):
+        token.run([sys.executable, "-c", "import time; time.sleep(30)"])
+    timer.cancel()
+
+    assert time.monotonic() - start < 10
+
+
+def test_run_timeout():
+    """Testa se o subprocesso é encerrado quando o tempo restante acaba."""
+    token = CancelToken(timeout=0.2)
+
+    with pytest.raises(ProcessingTimeout):
+        token.run([sys.executable, "-c", "import time; time.sleep(30)"])
+
+
+def test_optional_token_helpers():
+    """Testa os utilitários para tokens opcionais."""
+    check_cancelled(None)
+    assert remaining_time(None) is None
+    assert remaining_time(CancelToken(timeout=30)) > 0
@@ -6,7 +6,9 @@ import pytest
 from unittest.mock import patch, MagicMock, mock_open
 from pathlib import Path
 
-from app.core.docling_adapter import DoclingAdapter
+from app.core.docling_adapter import DoclingAdapter, markdown_to_html, markdown_to_text
+from app.core.cancellation import CancelToken, ProcessingCancelled
+from tests.fixtures.ooxml import write_pptx
 from tests.fixtures.mock_dependencies import (
     mock_docx,
     mock_pdf,
@@ -45,7 +47,13 @@ class TestDoclingAdapter:
         """Testa se o adaptador processa diferentes tipos de arquivo corretamente."""
         # Criar um arquivo temporário com a extensão especificada
         file_path = tmp_path / f"test_document{file_extension}"
-        file_path.write_text("Conteúdo de teste")
+        if file_extension == ".docx":
+            # O DOCX é lido diretamente do pacote, sem o python-docx
+            import docx
+
+            docx.Document().save(str(file_path))
+        else:
+            file_path.write_text("Conteúdo de teste")
 
         # Aplicar mocks para evitar acesso real às bibliotecas
         with patch("docx.Document"), patch("PyPDF2.PdfReader"), patch("pandas.read_excel"), patch(
@@ -58,6 +66,8 @@ class TestDoclingAdapter:
             assert result["status"] == expected_status
             if expected_status == "success":
                 assert "content" in result
+                if "markdown" in result["content"]:
+                    assert "text" in result["content"]
             else:
                 assert "Formato de arquivo não suportado" in result["message"]
 
@@ -97,60 +107,245 @@ class TestDoclingAdapter:
                 self.adapter._process_pdf("test.pdf", result, True, True, False)
 
         # Verificar o resultado
-        assert "text" in result["content"]
-        assert "markdown" in result["content"]
-        assert "html" in result["content"]
+        assert result["content"]["markdown"] == "Página 1\n\nPágina 2\n\n"
+        assert "text" not in result["content"] and "html" not in result["content"]
         assert "metadata" in result
         assert "pages" in result["metadata"]
         assert "title" in result["metadata"]
 
-    def test_process_docx(self):
-        """Testa o processamento de arquivos DOCX."""
-        # Configurar o resultado inicial
-        result = {"status": "success", "content": {}}
+    def test_iter_pdf_records_interleaves_images(self):
+        """Testa se as imagens de cada página são entregues logo após o texto da página."""
+        self.adapter.image_extractor = MagicMock()
+        self.adapter.image_extractor.iter_images.return_value = iter([
+            {"filename": "page_1.png", "page": 1},
+            {"filename": "page_2.png", "page": 2},
+        ])
 
-        # Chamar o método a ser testado com mocks
-        with patch("docx.Document") as mock_document:
-            # Configurar o mock para retornar um documento com parágrafos e tabelas
-            mock_doc = MagicMock()
+        with patch("builtins.open", mock_open(read_data=b"PDF content")):
+            with patch("PyPDF2.PdfReader") as mock_reader:
+                mock_instance = MagicMock()
+                mock_instance.pages = [MagicMock(), MagicMock()]
+                mock_instance.pages[0].extract_text.return_value = "Página 1"
+                mock_instance.pages[1].extract_text.return_value = "Página 2"
+                mock_instance.metadata = MagicMock(title="Título do PDF")
+                mock_instance.trailer = {"/Root": {"/Pages": {"/Count": 2}}}
+                mock_reader.return_value = mock_instance
+
+                records = list(
+                    self.adapter.iter_pdf_records(
+                        "test.pdf", "doc-id", extract_images=True, pdf_text_engine="pypdf2"
+                    )
+                )
+
+        assert [r["type"] for r in records] == ["metadata", "page", "image", "page", "image"]
+        assert records[0]["pages"] == 2
+        assert records[2]["image"]["filename"] == "page_1.png"
+
+    def test_iter_pdf_records_image_error(self):
+        """Testa se uma falha na extração de imagens não interrompe a extração de texto."""
+        self.adapter.image_extractor = MagicMock()
+        self.adapter.image_extractor.iter_images.side_effect = RuntimeError("Falha simulada")
 
-            # Simular parágrafos
-            mock_paragraph1 = MagicMock()
-            mock_paragraph1.text = "Título do Documento"
-            mock_paragraph1.style.name = "Heading1"
+        with patch("builtins.open", mock_open(read_data=b"PDF content")):
+            with patch("PyPDF2.PdfReader") as mock_reader:
+                mock_instance = MagicMock()
+                mock_instance.pages = [MagicMock()]
+                mock_instance.pages[0].extract_text.return_value = "Página 1"
+                mock_reader.return_value = mock_instance
 
-            mock_paragraph2 = MagicMock()
-            mock_paragraph2.text = "Este é um parágrafo de exemplo."
-            mock_paragraph2.style.name = "Normal"
+                records = list(
+                    self.adapter.iter_pdf_records(
+                        "test.pdf", "doc-id", extract_images=True, pdf_text_engine="pypdf2"
+                    )
+                )
 
-            mock_doc.paragraphs = [mock_paragraph1, mock_paragraph2]
+        assert [r["type"] for r in records] == ["metadata", "page", "error"]
+        assert "Falha simulada" in records[2]["message"]
 
-            # Simular tabelas
-            mock_table = MagicMock()
-            mock_row = MagicMock()
-            mock_cell = MagicMock()
-            mock_cell.text = "Conteúdo da célula"
-            mock_row.cells = [mock_cell]
-            mock_table.rows = [mock_row]
-            mock_doc.tables = [mock_table]
+    def test_iter_pdf_records_auto_ocr(self):
+        """Testa se apenas as páginas sem camada de texto passam pelo OCR."""
+        self.adapter.image_extractor = MagicMock()
+        self.adapter.image_extractor.ocr_pdf_page.return_value = {
+            "success": True, "text": "Texto reconhecido na página digitalizada", "lang": "por"
+        }
 
-            # Simular propriedades do documento
-            mock_doc.core_properties = MagicMock()
-            mock_doc.core_properties.title = "Título do Documento"
+        with patch("builtins.open", mock_open(read_data=b"PDF content")):
+            with patch("PyPDF2.PdfReader") as mock_reader:
+                mock_instance = MagicMock()
+                mock_instance.pages = [MagicMock(), MagicMock()]
+                mock_instance.pages[0].extract_text.return_value = "Texto digital com conteúdo suficiente na página"
+                mock_instance.pages[1].extract_text.return_value = " \n"
+                mock_instance.trailer = {"/Root": {"/Pages": {"/Count": 2}}}
+                mock_reader.return_value = mock_instance
 
-            mock_document.return_value = mock_doc
+                records = list(
+                    self.adapter.iter_pdf_records(
+                        "test.pdf", "doc-id", pdf_text_engine="pypdf2", ocr_mode="auto", ocr_lang="eng"
+                    )
+                )
+
+        assert records[0]["ocr_mode"] == "auto"
+        assert "text_source" not in records[1]
+        assert records[2]["text"] == "Texto reconhecido na página digitalizada"
+        assert records[2]["text_source"] == "ocr"
+        self.adapter.image_extractor.ocr_pdf_page.assert_called_once()
+        assert self.adapter.image_extractor.ocr_pdf_page.call_args.args[1:3] == (2, "eng")
+
+    def test_iter_records_unsupported(self):
+        """Testa se o pipeline rejeita formatos não suportados."""
+        with pytest.raises(ValueError):
+            self.adapter.iter_records("test.txt", "doc-id")
+
+    def test_iter_records_applies_ocr_stage(self):
+        """Testa se o OCR é aplicado como estágio sobre os registros de imagem."""
+        self.adapter.image_extractor = MagicMock()
+        records = [
+            {"type": "metadata", "pages": 1},
+            {"type": "image", "page": 1, "image": {"filename": "page_1.png"}},
+        ]
+
+        with patch.object(self.adapter, "iter_pdf_records", return_value=iter(records)):
+            result = list(
+                self.adapter.iter_records(
+                    "test.pdf", "doc-id", extract_images=True, apply_ocr=True, ocr_lang="eng"
+                )
+            )
+
+        # Um único seletor de idioma é criado para o documento e usado em todas as imagens
+        extractor = self.adapter.image_extractor
+        assert result == records
+        extractor.language_selector.assert_called_once_with("eng")
+        extractor.ocr_image.assert_called_once_with(
+            {"filename": "page_1.png"}, extractor.language_selector.return_value, None
+        )
+
+    def test_iter_records_cancellation(self):
+        """Testa se o pipeline é interrompido entre registros quando o token é cancelado."""
+        token = CancelToken()
+        records = [
+            {"type": "metadata", "pages": 2},
+            {"type": "page", "page": 1, "text": "Página 1"},
+            {"type": "page", "page": 2, "text": "Página 2"},
+        ]
+        received = []
+
+        with patch.object(self.adapter, "iter_pdf_records", return_value=iter(records)):
+            with pytest.raises(ProcessingCancelled):
+                for record in self.adapter.iter_records("test.pdf", "doc-id", cancel_token=token):
+                    received.append(record)
+                    if record["type"] == "page":
+                        token.cancel()
+
+        assert [r["type"] for r in received] == ["metadata", "page"]
+
+    def test_process_document_propagates_cancellation(self, tmp_path):
+        """Testa se o cancelamento não é convertido em resposta de erro."""
+        file_path = tmp_path / "test_document.pdf"
+        file_path.write_text("Conteúdo de teste")
+        token = CancelToken()
+        token.cancel()
 
-            # Patch para markdown
-            with patch("markdown.markdown", return_value="<h1>Título do Documento</h1>"):
-                self.adapter._process_docx("test.docx", result, True, True, False)
+        with patch("PyPDF2.PdfReader"):
+            with pytest.raises(ProcessingCancelled):
+                self.adapter.process_document(file_path, cancel_token=token)
+
+    def test_process_docx(self, tmp_path):
+        """Testa o processamento de arquivos DOCX."""
+        import docx
+
+        file_path = tmp_path / "test.docx"
+        document = docx.Document()
+        document.core_properties.title = "Título do Documento"
+        document.add_heading("Título do Documento", level=1)
+        document.add_paragraph("Este é um parágrafo de exemplo.")
+        table = document.add_table(rows=1, cols=1)
+        table.cell(0, 0).text = "Conteúdo da célula"
+        document.add_heading("Seção", level=2)
+        document.save(str(file_path))
+
+        # Configurar o resultado inicial
+        result = {"status": "success", "content": {}}
+        self.adapter._process_docx(str(file_path), result, True, True, False)
 
         # Verificar o resultado
-        assert "text" in result["content"]
-        assert "markdown" in result["content"]
-        assert "html" in result["content"]
-        assert "metadata" in result
-        assert "title" in result["metadata"]
-        assert "pages" in result["metadata"]
+        assert result["content"]["markdown"] == (
+            "# Título do Documento\n\nEste é um parágrafo de exemplo.\n\n## Seção\n\n"
+        )
+        assert "<h1>Título do Documento</h1>" in markdown_to_html(result["content"]["markdown"], "docx")
+        assert markdown_to_text(result["content"]["markdown"], "docx") == (
+            "Título do Documento\nEste é um parágrafo de exemplo.\nSeção"
+        )
+        assert result["content"]["tables"] == [{"page": 1, "data": [["Conteúdo da célula"]]}]
+        assert result["metadata"]["title"] == "Título do Documento"
+        assert result["metadata"]["pages"] == 1
+
+    def test_iter_docx_records_streams_blocks(self, tmp_path):
+        """Testa a ordem do documento, as quebras dos trechos e o texto de hiperlinks."""
+        import docx
+        from docx.oxml import OxmlElement
+
+        file_path = tmp_path / "test.docx"
+        document = docx.Document()
+        paragraph = document.add_paragraph("Linha 1")
+        paragraph.runs[0].add_break()
+        paragraph.add_run("Linha 2\tfim")
+        document.add_table(rows=1, cols=2).cell(0, 1).text = "B"
+        link = OxmlElement("w:hyperlink")
+        run = OxmlElement("w:r")
+        text = OxmlElement("w:t")
+        text.text = "link"
+        run.append(text)
+        link.append(run)
+        document.add_paragraph("Veja o ")._p.append(link)
+        document.save(str(file_path))
+
+        records = list(self.adapter.iter_docx_records(file_path, "doc-1"))
+
+        assert [record["type"] for record in records] == ["metadata", "paragraph", "table", "paragraph"]
+        assert records[0]["title"] == "Sem título"
+        assert records[1]["text"] == "Linha 1\nLinha 2\tfim"
+        assert records[2]["table"]["data"] == [["", "B"]]
+        assert (records[3]["index"], records[3]["text"]) == (1, "Veja o link")
+
+    def test_process_pptx(self, tmp_path):
+        """Testa o processamento de apresentações PPTX a partir do pacote."""
+        file_path = write_pptx(tmp_path / "deck.pptx", [
+            {"title": "Abertura", "paragraphs": ["Agenda"]},
+            {"paragraphs": ["Sem título"], "tables": [[["A", "B"], ["1", "2"]]]},
+        ], properties={"Slides": "2"})
+
+        result = self.adapter.process_document(file_path)
+
+        assert result["status"] == "success"
+        assert result["metadata"]["pages"] == 2
+        assert result["content"]["markdown"] == "## Abertura\n\nAgenda\n\n## Slide 2\n\nSem título\n\n"
+        assert "<h2>Abertura</h2>" in markdown_to_html(result["content"]["markdown"], "pptx")
+        assert result["content"]["tables"] == [{"page": 2, "data": [["A", "B"], ["1", "2"]]}]
+
+    def test_iter_pptx_records_images(self, tmp_path):
+        """Testa as imagens da apresentação, entregues após os slides com o número do slide."""
+        file_path = write_pptx(tmp_path / "deck.pptx", [
+            {"title": "Capa"},
+            {"title": "Fotos", "images": ["image1.png"]},
+        ])
+
+        with patch("app.services.image_service.RESULTS_DIR", str(tmp_path / "results")):
+            records = list(self.adapter.iter_records(file_path, "doc-1", extract_images=True))
+
+        assert [record["type"] for record in records] == ["metadata", "slide", "slide", "image"]
+        image = records[-1]
+        assert image["page"] == 2
+        assert image["image"]["filename"] == "image1.png"
+        assert os.path.exists(image["image"]["path"])
+
+    def test_get_document_metadata_pptx(self, tmp_path):
+        """Testa a leitura das propriedades do pacote PPTX sem abrir os slides."""
+        file_path = write_pptx(tmp_path / "deck.pptx", [{"title": "Capa"}], properties={"Slides": "1"})
+
+        metadata = self.adapter.get_document_metadata(file_path)
+
+        assert metadata["format"] == "pptx"
+        assert metadata["pages"] == 1
 
     def test_process_excel(self):
         """Testa o processamento de arquivos Excel."""
@@ -179,67 +374,68 @@ class TestDoclingAdapter:
                 self.adapter._process_excel("test.xlsx", result, True, True)
 
         # Verificar o resultado
-        assert "text" in result["content"]
         assert "markdown" in result["content"]
-        assert "html" in result["content"]
+        assert "text" not in result["content"] and "html" not in result["content"]
         assert "tables" in result["content"]
         assert "metadata" in result
         assert "title" in result["metadata"]
         assert "sheets" in result["metadata"]
 
     def test_get_document_metadata_pdf(self):
-        """Testa a extração de metadados de arquivos PDF."""
+        """Testa a extração de metadados de arquivos PDF pelo trailer."""
         # Chamar o método a ser testado com mocks
         with patch("builtins.open", mock_open(read_data=b"PDF content")):
             with patch("PyPDF2.PdfReader") as mock_reader:
-                # Configurar o mock para retornar páginas e metadados
+                # Configurar o mock para retornar a árvore de páginas e metadados
                 mock_instance = MagicMock()
-                mock_instance.pages = [MagicMock(), MagicMock()]
-                mock_instance.metadata = MagicMock(title="Título do PDF")
+                mock_instance.is_encrypted = False
+                mock_instance.trailer = {"/Root": {"/Pages": {"/Count": 12}}}
+                mock_instance.metadata = MagicMock(title="Título do PDF", author=None, producer=None)
                 mock_reader.return_value = mock_instance
 
                 metadata = self.adapter.get_document_metadata("test.pdf")
 
         # Verificar o resultado
-        assert "title" in metadata
-        assert "format" in metadata
         assert metadata["format"] == "pdf"
-        assert "pages" in metadata
+        assert metadata["title"] == "Título do PDF"
+        assert metadata["pages"] == 12
 
-    def test_get_document_metadata_docx(self):
-        """Testa a extração de metadados de arquivos DOCX."""
-        # Chamar o método a ser testado com mocks
-        with patch("docx.Document") as mock_document:
-            # Configurar o mock para retornar um documento com propriedades
-            mock_doc = MagicMock()
-            mock_doc.core_properties = MagicMock()
-            mock_doc.core_properties.title = "Título do Documento DOCX"
-            mock_document.return_value = mock_doc
+    def test_get_document_metadata_docx(self, tmp_path):
+        """Testa a leitura das propriedades do pacote DOCX sem abrir o documento."""
+        import docx
 
-            metadata = self.adapter.get_document_metadata("test.docx")
+        file_path = tmp_path / "test.docx"
+        document = docx.Document()
+        document.core_properties.title = "Título do Documento DOCX"
+        document.add_paragraph("Conteúdo")
+        document.save(str(file_path))
 
-        # Verificar o resultado
-        assert "title" in metadata
-        assert "format" in metadata
+        with patch("docx.Document") as mock_document:
+            metadata = self.adapter.get_document_metadata(file_path)
+
+        # O corpo do documento não é carregado
+        mock_document.assert_not_called()
         assert metadata["format"] == "docx"
+        assert metadata["title"] == "Título do Documento DOCX"
+        assert metadata["size"] == file_path.stat().st_size
 
-    def test_get_document_metadata_excel(self):
-        """Testa a extração de metadados de arquivos Excel."""
-        # Chamar o método a ser testado
-        with patch("pandas.ExcelFile") as mock_excel_file_class:
-            # Configurar o mock para retornar nomes de planilhas
-            mock_excel_file_instance = MagicMock()
-            mock_excel_file_instance.sheet_names = ["Sheet1", "Sheet2"]
-            mock_excel_file_class.return_value = mock_excel_file_instance
+    def test_get_document_metadata_excel(self, tmp_path):
+        """Testa a leitura da lista de planilhas sem carregar as células."""
+        import io
+        import pandas as pd
 
-            metadata = self.adapter.get_document_metadata("test.xlsx")
+        content = io.BytesIO()
+        with pd.ExcelWriter(content) as writer:
+            pd.DataFrame({"a": [1]}).to_excel(writer, sheet_name="Sheet1")
+            pd.DataFrame({"b": [2]}).to_excel(writer, sheet_name="Sheet2")
 
-        # Verificar o resultado
-        assert "title" in metadata
-        assert "format" in metadata
+        with patch("pandas.ExcelFile") as mock_excel_file_class:
+            metadata = self.adapter.get_document_metadata("test.xlsx", file_obj=content)
+
+        mock_excel_file_class.assert_not_called()
         assert metadata["format"] == "xlsx"
-        assert "sheets" in metadata
-        assert len(metadata["sheets"]) == 2
+        assert metadata["title"] == "test.xlsx"
+        assert metadata["sheets"] == ["Sheet1", "Sheet2"]
 
     def test_get_document_metadata_exception(self, tmp_path):
         """Testa se o adaptador lida corretamente com exceções durante a extração de metadados."""
@@ -278,10 +474,17 @@ class TestDoclingAdapter:
             # Verificar o resultado
             assert result == "# Título\n\nConteúdo de teste"
 
-    def test_convert_to_format_html(self, tmp_path):
-        """Testa a conversão para HTML."""
+    @pytest.mark.parametrize(
+        "file_extension, expected",
+        [
+            (".docx", "<h1>Título</h1>\n<p>Conteúdo de teste</p>"),
+            (".pdf", "<pre># Título\n\nConteúdo de teste</pre>"),
+        ],
+    )
+    def test_convert_to_format_html(self, tmp_path, file_extension, expected):
+        """Testa a conversão para HTML, gerado a partir do markdown."""
         # Criar um arquivo temporário
-        file_path = tmp_path / "test_document.pdf"
+        file_path = tmp_path / f"test_document{file_extension}"
         file_path.write_text("Conteúdo de teste")
 
         # Simular o processamento do documento
@@ -290,14 +493,14 @@ class TestDoclingAdapter:
             "process_document",
             return_value={
                 "status": "success",
-                "content": {"html": "<h1>Título</h1><p>Conteúdo de teste</p>"},
+                "content": {"markdown": "# Título\n\nConteúdo de teste"},
             },
         ):
             # Chamar o método a ser testado
             result = self.adapter.convert_to_format(file_path, "html")
 
             # Verificar o resultado
-            assert result == "<h1>Título</h1><p>Conteúdo de teste</p>"
+            assert result == expected
 
     def test_convert_to_format_text(self, tmp_path):
         """Testa a conversão para texto."""
@@ -309,7 +512,7 @@ class TestDoclingAdapter:
         with patch.object(
             self.adapter,
             "process_document",
-            return_value={"status": "success", "content": {"text": "Conteúdo de teste"}},
+            return_value={"status": "success", "content": {"markdown": "Conteúdo de teste"}},
         ):
             # Chamar o método a ser testado
             result = self.adapter.convert_to_format(file_path, "text")
@@ -317,6 +520,23 @@ class TestDoclingAdapter:
             # Verificar o resultado
             assert result == "Conteúdo de teste"
 
+    def test_convert_to_format_text_docx(self, tmp_path):
+        """Testa se a conversão de DOCX para texto remove as marcações de título."""
+        file_path = tmp_path / "test_document.docx"
+        file_path.write_text("Conteúdo de teste")
+
+        with patch.object(
+            self.adapter,
+            "process_document",
+            return_value={
+                "status": "success",
+                "content": {"markdown": "# Título\n\nParágrafo\n\n"},
+            },
+        ):
+            result = self.adapter.convert_to_format(file_path, "text")
+
+        assert result == "Título\nParágrafo"
+
     def test_convert_to_format_unsupported(self, tmp_path):
         """Testa a conversão para um formato não suportado."""
         # Criar um arquivo temporário
@@ -327,7 +547,7 @@ class TestDoclingAdapter:
         with patch.object(
             self.adapter,
             "process_document",
-            return_value={"status": "success", "content": {"text": "Conteúdo de teste"}},
+            return_value={"status": "success", "content": {"markdown": "Conteúdo de teste"}},
         ):
             # Chamar o método a ser testado
             result = self.adapter.convert_to_format(file_path, "json")
@@ -0,0 +1,132 @@
+"""
+Testes unitários para o módulo docx_stream.
+"""
+
+import zipfile
+
+import pytest
+
+from app.core import docx_stream
+
+_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+_STYLES = (
+    f'<w:styles xmlns:w="{_W}">'
+    '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Titulo1"><w:name w:val="heading 1"/></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Titulo2"><w:name w:val="Heading 2"/></w:style>'
+    '<w:style w:type="character" w:styleId="Heading3Char"><w:name w:val="heading 3"/></w:style>'
+    "</w:styles>"
+)
+
+
+def _paragraph(text, style=None):
+    """Monta um w:p com um único trecho."""
+    properties = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+    return f"<w:p>{properties}<w:r><w:t>{text}</w:t></w:r></w:p>"
+
+
+def _write_docx(path, body, styles=_STYLES):
+    """Grava um DOCX mínimo com o corpo informado."""
+    with zipfile.ZipFile(path, "w") as package:
+        package.writestr("word/document.xml", f'<w:document xmlns:w="{_W}"><w:body>{body}</w:body></w:document>')
+        if styles:
+            package.writestr("word/styles.xml", styles)
+    return path
+
+
+def _blocks(path, **kwargs):
+    """Lê os blocos de um DOCX."""
+    with zipfile.ZipFile(path) as package:
+        return list(docx_stream.iter_blocks(package, **kwargs))
+
+
+def test_heading_levels(tmp_path):
+    """Testa o nível dos estilos de título, pelo nome e não pelo id do estilo."""
+    path = _write_docx(tmp_path / "doc.docx", "")
+
+    with zipfile.ZipFile(path) as package:
+        levels, default_style = docx_stream.heading_levels(package)
+
+    assert levels == {"Titulo1": 1, "Titulo2": 2}
+    assert default_style == "Normal"
+
+
+def test_heading_levels_without_styles(tmp_path):
+    """Testa um pacote sem word/styles.xml."""
+    path = _write_docx(tmp_path / "doc.docx", _paragraph("Texto", "Titulo1"), styles=None)
+
+    assert _blocks(path) == [{"type": "paragraph", "text": "Texto", "level": 0}]
+
+
+def test_iter_blocks_document_order(tmp_path):
+    """Testa a ordem dos blocos e a exclusão dos parágrafos das células."""
+    table = (
+        "<w:tbl><w:tr>"
+        f"<w:tc>{_paragraph('A1')}{_paragraph('A2')}</w:tc><w:tc>{_paragraph('B', 'Titulo1')}</w:tc>"
+        "</w:tr></w:tbl>"
+    )
+    body = _paragraph("Capítulo", "Titulo1") + _paragraph("Texto") + table + _paragraph("Seção", "Titulo2")
+    path = _write_docx(tmp_path / "doc.docx", body)
+
+    assert _blocks(path) == [
+        {"type": "paragraph", "text": "Capítulo", "level": 1},
+        {"type": "paragraph", "text": "Texto", "level": 0},
+        {"type": "table", "rows": [["A1\nA2", "B"]]},
+        {"type": "paragraph", "text": "Seção", "level": 2},
+    ]
+    assert [block["type"] for block in _blocks(path, include_tables=False)] == ["paragraph"] * 3
+
+
+@pytest.mark.parametrize(
+    "runs, expected",
+    [
+        ("<w:r><w:t>a</w:t><w:tab/><w:t>b</w:t></w:r>", "a\tb"),
+        ("<w:r><w:t>a</w:t><w:br/><w:t>b</w:t><w:cr/></w:r>", "a\nb\n"),
+        ('<w:r><w:t>a</w:t><w:br w:type="page"/><w:t>b</w:t></w:r>', "ab"),
+        ("<w:r><w:t>Veja </w:t></w:r><w:hyperlink><w:r><w:t>o link</w:t></w:r></w:hyperlink>", "Veja o link"),
+        ("<w:r><w:delText>removido</w:delText></w:r>", ""),
+    ],
+)
+def test_paragraph_text(tmp_path, runs, expected):
+    """Testa o texto de tabulações, quebras, hiperlinks e trechos excluídos."""
+    path = _write_docx(tmp_path / "doc.docx", f"<w:p>{runs}</w:p>")
+
+    assert _blocks(path)[0]["text"] == expected
+
+
+def test_table_rows_merged_cells(tmp_path):
+    """Testa a repetição das células mescladas na horizontal e na vertical."""
+    table = (
+        "<w:tbl>"
+        f'<w:tr><w:tc><w:tcPr><w:gridSpan w:val="2"/></w:tcPr>{_paragraph("A")}</w:tc>'
+        f'<w:tc><w:tcPr><w:vMerge w:val="restart"/></w:tcPr>{_paragraph("C")}</w:tc></w:tr>'
+        f'<w:tr><w:tc>{_paragraph("D")}</w:tc><w:tc>{_paragraph("E")}</w:tc>'
+        f"<w:tc><w:tcPr><w:vMerge/></w:tcPr><w:p/></w:tc></w:tr>"
+        f'<w:tr><w:trPr><w:gridBefore w:val="2"/></w:trPr>'
+        f'<w:tc><w:tcPr><w:vMerge w:val="continue"/></w:tcPr><w:p/></w:tc></w:tr>'
+        "</w:tbl>"
+    )
+    path = _write_docx(tmp_path / "doc.docx", table)
+
+    assert _blocks(path)[0]["rows"] == [["A", "A", "C"], ["D", "E", "C"], ["C"]]
+
+
+def test_table_rows_match_python_docx(tmp_path):
+    """Testa se as linhas coincidem com row.cells do python-docx."""
+    import docx
+
+    path = str(tmp_path / "doc.docx")
+    document = docx.Document()
+    table = document.add_table(rows=4, cols=4)
+    for row_index, row in enumerate(table.rows):
+        for column, cell in enumerate(row.cells):
+            cell.text = f"{row_index}{column}"
+    table.cell(0, 0).merge(table.cell(0, 1))
+    table.cell(1, 1).merge(table.cell(3, 2))
+    table.cell(2, 3).merge(table.cell(3, 3))
+    document.save(path)
+
+    expected = [[cell.text for cell in row.cells] for row in docx.Document(path).tables[0].rows]
+
+    assert [block["rows"] for block in _blocks(path) if block["type"] == "table"] == [expected]
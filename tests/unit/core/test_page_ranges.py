@@ -0,0 +1,43 @@
+"""
+Testes para o módulo app.core.page_ranges
+"""
+import pytest
+
+from app.core.page_ranges import (
+    count_selected_pages,
+    iter_page_numbers,
+    parse_page_ranges,
+    resolve_page_ranges,
+)
+
+
+def test_parse_page_ranges():
+    """Testa a interpretação, ordenação e união dos intervalos."""
+    assert parse_page_ranges(None) is None
+    assert parse_page_ranges(" ") is None
+    assert parse_page_ranges("1-5,10") == [(1, 5), (10, 10)]
+    assert parse_page_ranges("10, 3-4, 1-3") == [(1, 4), (10, 10)]
+    assert parse_page_ranges("2-,5-8") == [(2, None)]
+
+
+@pytest.mark.parametrize("spec", ["0", "5-3", "a", "1-2-3", "1,,2", "-4"])
+def test_parse_page_ranges_invalid(spec):
+    """Testa a recusa de expressões inválidas."""
+    with pytest.raises(ValueError):
+        parse_page_ranges(spec)
+
+
+def test_resolve_page_ranges():
+    """Testa a limitação dos intervalos ao número de páginas do documento."""
+    assert resolve_page_ranges(None, 3) == [(1, 3)]
+    assert resolve_page_ranges([(2, 5), (7, 7)], 4) == [(2, 4)]
+    assert resolve_page_ranges([(3, None)], 5) == [(3, 5)]
+    assert resolve_page_ranges([(8, 9)], 5) == []
+
+
+def test_count_and_iter_pages():
+    """Testa a contagem e a enumeração das páginas selecionadas."""
+    ranges = [(1, 3), (10, 10)]
+
+    assert count_selected_pages(ranges) == 4
+    assert list(iter_page_numbers(ranges)) == [1, 2, 3, 10]
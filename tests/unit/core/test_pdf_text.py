@@ -0,0 +1,111 @@
+"""
+Testes para o módulo app.core.pdf_text
+"""
+import subprocess
+import pytest
+from unittest.mock import patch, MagicMock
+
+from app.core import pdf_text
+
+
+def test_resolve_engine_default():
+    """Testa se o motor configurado é usado quando nenhum é informado."""
+    with patch("app.core.pdf_text.PDF_TEXT_ENGINE", "pypdf2"):
+        assert pdf_text.resolve_engine(None) == "pypdf2"
+
+
+def test_resolve_engine_unsupported():
+    """Testa se um motor desconhecido gera erro."""
+    with pytest.raises(ValueError) as exc_info:
+        pdf_text.resolve_engine("inexistente")
+
+    assert "não suportado" in str(exc_info.value)
+
+
+def test_resolve_engine_fallback_when_unavailable():
+    """Testa o fallback para PyPDF2 quando o motor solicitado não está instalado."""
+    with patch("app.core.pdf_text.shutil.which", return_value=None):
+        assert pdf_text.resolve_engine("pdftotext") == "pypdf2"
+
+
+def test_resolve_engine_pdftotext_available():
+    """Testa a seleção do pdftotext quando o binário está disponível."""
+    with patch("app.core.pdf_text.shutil.which", return_value="/usr/bin/pdftotext"):
+        assert pdf_text.resolve_engine("PDFTOTEXT") == "pdftotext"
+
+
+def test_iter_page_texts_pypdf2():
+    """Testa a extração página a página com o PyPDF2."""
+    mock_reader = MagicMock()
+    mock_reader.pages = [MagicMock(), MagicMock()]
+    mock_reader.pages[0].extract_text.return_value = "Página 1"
+    mock_reader.pages[1].extract_text.return_value = "Página 2"
+
+    pages = list(pdf_text.iter_page_texts("test.pdf", "pypdf2", mock_reader))
+
+    assert pages == [(1, "Página 1"), (2, "Página 2")]
+
+
+def test_iter_page_texts_pypdf2_page_ranges():
+    """Testa se apenas as páginas selecionadas são extraídas."""
+    mock_reader = MagicMock()
+    mock_reader.pages = [MagicMock() for _ in range(5)]
+    for index, page in enumerate(mock_reader.pages):
+        page.extract_text.return_value = f"Página {index + 1}"
+
+    pages = list(pdf_text.iter_page_texts("test.pdf", "pypdf2", mock_reader, page_ranges=[(2, 3), (5, 5)]))
+
+    assert pages == [(2, "Página 2"), (3, "Página 3"), (5, "Página 5")]
+    assert not mock_reader.pages[0].extract_text.called
+
+
+def test_iter_page_texts_pdftotext_page_ranges():
+    """Testa se o pdftotext recebe -f/-l e numera as páginas a partir do intervalo."""
+    completed = subprocess.CompletedProcess(
+        args=[], returncode=0, stdout="Página 4\fPágina 5\f".encode("utf-8"), stderr=b""
+    )
+
+    with patch("app.core.pdf_text.subprocess.run", return_value=completed) as mock_run:
+        pages = list(pdf_text.iter_page_texts("test.pdf", "pdftotext", page_ranges=[(4, 5)]))
+
+    assert pages == [(4, "Página 4"), (5, "Página 5")]
+    args = mock_run.call_args[0][0]
+    assert args[args.index("-f") + 1] == "4"
+    assert args[args.index("-l") + 1] == "5"
+
+
+def test_iter_page_texts_pdftotext():
+    """Testa a separação das páginas na saída do pdftotext."""
+    completed = subprocess.CompletedProcess(
+        args=[], returncode=0, stdout="Página 1\fPágina 2\f".encode("utf-8"), stderr=b""
+    )
+
+    with patch("app.core.pdf_text.subprocess.run", return_value=completed) as mock_run:
+        pages = list(pdf_text.iter_page_texts("test.pdf", "pdftotext"))
+
+    assert pages == [(1, "Página 1"), (2, "Página 2")]
+    assert mock_run.call_args[0][0][0] == "pdftotext"
+
+
+def test_iter_page_texts_pdftotext_error():
+    """Testa se uma falha do pdftotext é reportada."""
+    completed = subprocess.CompletedProcess(
+        args=[], returncode=1, stdout=b"", stderr=b"Syntax Error"
+    )
+
+    with patch("app.core.pdf_text.subprocess.run", return_value=completed):
+        with pytest.raises(RuntimeError) as exc_info:
+            list(pdf_text.iter_page_texts("test.pdf", "pdftotext"))
+
+    assert "Syntax Error" in str(exc_info.value)
+
+
+def test_needs_ocr():
+    """Testa a classificação das páginas pela qualidade da camada de texto."""
+    assert pdf_text.needs_ocr("")
+    assert pdf_text.needs_ocr("12")
+    assert pdf_text.needs_ocr("\ufffd" * 40 + "texto")
+    assert not pdf_text.needs_ocr("Relatório anual de atividades com texto suficiente.")
+
+    score = pdf_text.score_text_layer("ab \ue000\ufffd")
+    assert score == {"chars": 4, "garbage_ratio": 0.5}
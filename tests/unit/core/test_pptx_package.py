@@ -0,0 +1,49 @@
+"""
+Testes para a leitura de apresentações PPTX a partir do pacote.
+"""
+
+import zipfile
+
+import pytest
+
+from app.core import pptx_package
+from tests.fixtures.ooxml import write_pptx
+
+
+@pytest.fixture
+def pptx_path(tmp_path):
+    """Apresentação com título, corpo, grupo, tabela mesclada, imagens e um slide oculto."""
+    return write_pptx(tmp_path / "deck.pptx", [
+        {"title": "Resultados", "paragraphs": ["Receita", "Custos"], "images": ["image1.png"]},
+        {
+            "title": "Tabela",
+            "group": ["Nota no grupo"],
+            "tables": [[["Região", "Total", None], ["Sul", "10", "20"]]],
+            "images": ["image1.png", "image2.png"],
+        },
+        {"paragraphs": ["Oculto"], "hidden": True},
+    ])
+
+
+def test_iter_slides(pptx_path):
+    """Testa a ordem dos slides, o título, o texto dos grupos e as tabelas."""
+    with zipfile.ZipFile(pptx_path) as package:
+        slides = list(pptx_package.iter_slides(package))
+
+    assert [slide["number"] for slide in slides] == [1, 2, 3]
+    assert slides[0]["path"] == "ppt/slides/slide1.xml"
+    assert slides[0]["title"] == "Resultados"
+    assert slides[0]["paragraphs"] == ["Receita", "Custos"]
+    assert slides[1]["paragraphs"] == ["Nota no grupo"]
+    assert slides[1]["tables"] == [[["Região", "Total", ""], ["Sul", "10", "20"]]]
+    assert slides[2]["hidden"] is True
+    assert slides[2]["title"] == ""
+
+
+def test_media_slides(pptx_path):
+    """Testa a associação de cada mídia ao primeiro slide que a usa."""
+    with zipfile.ZipFile(pptx_path) as package:
+        assert pptx_package.media_slides(package) == {
+            "ppt/media/image1.png": 1,
+            "ppt/media/image2.png": 2,
+        }
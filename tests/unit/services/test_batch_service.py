@@ -0,0 +1,185 @@
+"""
+Testes para o módulo app.services.batch_service
+"""
+import io
+import os
+import tarfile
+import zipfile
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from app.services.batch_service import is_archive, iter_archive_members, process_batch, spool
+from app.services.worker_pool import shutdown_worker_pool
+
+
+@pytest.fixture
+def thread_pool():
+    """Fixture que troca o pool de processos por threads, para que os workers vejam os mocks."""
+    executor = ThreadPoolExecutor(max_workers=2)
+    with patch("app.services.worker_pool.get_worker_pool", return_value=executor), patch(
+        "app.services.batch_service.create_cancel_event", side_effect=threading.Event
+    ):
+        yield
+    executor.shutdown()
+
+
+def _document_info(file_path, original_filename, file_obj=None, **kwargs):
+    """Simula o resultado de process_document."""
+    if original_filename == "falha.pdf":
+        raise Exception("Erro simulado")
+    assert file_obj.read() == b"%PDF-1.4"
+    return {
+        "id": f"id-{original_filename}",
+        "status": "success",
+        "message": "Documento processado com sucesso",
+        "content": {"tables": [{"data": []}]},
+    }
+
+
+def test_is_archive():
+    """Testa a identificação de arquivos compactados."""
+    assert is_archive("lote.zip")
+    assert is_archive("lote.TAR.GZ")
+    assert not is_archive("documento.pdf")
+
+
+def test_spool_limit():
+    """Testa a cópia de um fluxo para memória e o limite de tamanho."""
+    content = spool(io.BytesIO(b"12345"))
+    assert content.read() == b"12345"
+
+    with pytest.raises(ValueError):
+        spool(io.BytesIO(b"12345"), limit=4)
+
+
+def test_iter_zip_members():
+    """Testa a leitura dos membros de um ZIP sem extração para o disco."""
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        zip_file.writestr("pasta/a.pdf", b"%PDF-1.4")
+        zip_file.writestr("../b.docx", b"docx")
+        zip_file.writestr("notas.txt", b"texto")
+
+    with patch("tempfile.SpooledTemporaryFile") as mock_spool:
+        sources = list(iter_archive_members(archive))
+    members = [(name, content.read() if content else None) for name, content in sources]
+
+    assert members == [("pasta/a.pdf", b"%PDF-1.4"), ("../b.docx", b"docx"), ("notas.txt", None)]
+    assert all(isinstance(content, io.BytesIO) for _, content in sources if content)
+    mock_spool.assert_not_called()
+    assert archive.closed
+
+
+def test_iter_archive_members_limit():
+    """Testa a recusa de um membro maior que BATCH_MAX_MEMBER_BYTES."""
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        zip_file.writestr("a.pdf", b"%PDF-1.4")
+
+    with patch("app.services.batch_service.BATCH_MAX_MEMBER_BYTES", 4):
+        with pytest.raises(ValueError):
+            list(iter_archive_members(archive))
+
+
+def test_iter_tar_members():
+    """Testa a leitura sequencial dos membros de um TAR compactado."""
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode="w:gz") as tar_file:
+        data = b"%PDF-1.4"
+        info = tarfile.TarInfo("docs/a.pdf")
+        info.size = len(data)
+        tar_file.addfile(info, io.BytesIO(data))
+        directory = tarfile.TarInfo("docs")
+        directory.type = tarfile.DIRTYPE
+        tar_file.addfile(directory)
+
+    members = [(name, content.read()) for name, content in iter_archive_members(archive)]
+
+    assert members == [("docs/a.pdf", b"%PDF-1.4")]
+
+
+def test_iter_invalid_archive():
+    """Testa a recusa de um arquivo compactado inválido."""
+    with pytest.raises(ValueError):
+        list(iter_archive_members(io.BytesIO(b"conteudo invalido"), "lote.tar"))
+
+
+def test_process_batch(thread_pool):
+    """Testa o processamento do lote e o status agregado."""
+    sources = [
+        ("a.pdf", io.BytesIO(b"%PDF-1.4")),
+        ("falha.pdf", io.BytesIO(b"%PDF-1.4")),
+        ("notas.txt", None),
+    ]
+
+    with patch("app.services.batch_service.process_document", side_effect=_document_info) as mock_process:
+        records = list(process_batch(sources, max_workers=2))
+
+    assert records[0]["type"] == "batch"
+    results = {r["filename"]: r for r in records if r["type"] == "result"}
+    assert results["a.pdf"]["status"] == "success"
+    assert results["a.pdf"]["id"] == "id-a.pdf"
+    assert results["a.pdf"]["table_count"] == 1
+    assert results["falha.pdf"]["status"] == "error"
+    assert results["notas.txt"]["status"] == "error"
+
+    done = records[-1]
+    assert done["type"] == "done"
+    assert done["status"] == "partial"
+    assert done["total"] == 3
+    assert done["succeeded"] == 1
+    assert done["failed"] == 2
+
+    # Cada documento recebe seu próprio token de cancelamento, o conteúdo chega ao worker em
+    # memória e o objeto de arquivo da fonte é fechado ao final
+    assert all(call.kwargs["cancel_token"] is not None for call in mock_process.call_args_list)
+    calls = mock_process.call_args_list
+    assert all(isinstance(call.kwargs["file_obj"], io.BytesIO) for call in calls)
+    assert all(content.closed for _, content in sources if content is not None)
+
+
+def test_process_batch_source_error(thread_pool):
+    """Testa o registro de erro quando a leitura das fontes falha."""
+
+    def sources():
+        yield "a.pdf", io.BytesIO(b"%PDF-1.4")
+        raise ValueError("Arquivo compactado inválido")
+
+    with patch("app.services.batch_service.process_document", side_effect=_document_info):
+        records = list(process_batch(sources(), max_workers=1))
+
+    errors = [r for r in records if r["type"] == "error"]
+    assert errors[0]["stage"] == "sources"
+    assert records[-1]["status"] == "partial"
+    assert records[-1]["succeeded"] == 1
+
+
+def test_process_batch_worker_processes(tmp_path, monkeypatch):
+    """Testa o processamento dos documentos nos processos do pool compartilhado."""
+    import docx
+
+    path = str(tmp_path / "a.docx")
+    document = docx.Document()
+    document.add_paragraph("Conteúdo do lote")
+    document.save(path)
+    with open(path, "rb") as f:
+        data = f.read()
+
+    results_dir = tmp_path / "results"
+    results_dir.mkdir()
+    sources = [("a.docx", io.BytesIO(data)), ("b.docx", io.BytesIO(data))]
+
+    # Os workers são iniciados com spawn e leem a configuração do ambiente
+    monkeypatch.setenv("RESULTS_DIR", str(results_dir))
+    shutdown_worker_pool()
+    try:
+        records = list(process_batch(sources, max_workers=2))
+    finally:
+        shutdown_worker_pool()
+
+    results = [r for r in records if r["type"] == "result"]
+    assert [r["status"] for r in results] == ["success", "success"]
+    assert sorted(os.listdir(results_dir)) == sorted(r["id"] for r in results)
+    assert records[-1]["status"] == "success"
@@ -10,9 +10,13 @@ import shutil
 
 from app.services.document_service import (
     process_document,
+    stream_document,
     get_document_info,
     list_documents,
+    load_document_content,
+    render_document_format,
 )
+from app.core.cancellation import CancelToken, ProcessingTimeout
 
 
 @pytest.fixture
@@ -50,9 +54,8 @@ def mock_docling_adapter():
             "status": "success",
             "message": "Documento processado com sucesso",
             "content": {
-                "text": "Conteúdo de teste",
                 "markdown": "# Título\n\nConteúdo de teste",
-                "html": "<h1>Título</h1><p>Conteúdo de teste</p>",
+                "tables": [],
             },
         }
         yield mock
@@ -104,7 +107,107 @@ class TestDocumentService:
         assert os.path.exists(result_dir)
         assert os.path.exists(os.path.join(result_dir, "metadata.json"))
         assert os.path.exists(os.path.join(result_dir, "content.md"))
-        assert os.path.exists(os.path.join(result_dir, "content.html"))
+        assert not os.path.exists(os.path.join(result_dir, "content.html"))
+
+        # O markdown vai na resposta e em content.md; nem ele nem o texto se repetem em metadata.json
+        assert result["content"]["markdown"] == "# Título\n\nConteúdo de teste"
+        with open(os.path.join(result_dir, "metadata.json"), encoding="utf-8") as f:
+            assert json.load(f)["content"] == {"tables": []}
+
+    def _scanned_pdf(self, tmp_path, mock_convert, mock_ocr_process):
+        """Cria um PDF sem camada de texto, que passa pelo OCR seletivo, e simula o OCR."""
+        import PyPDF2
+        from PIL import Image
+
+        file_path = str(tmp_path / "scan.pdf")
+        writer = PyPDF2.PdfWriter()
+        writer.add_blank_page(width=200, height=200)
+        with open(file_path, "wb") as f:
+            writer.write(f)
+
+        def fake_pdftoppm(file_path, first_page, last_page, output_folder=None, output_file=None, fmt="ppm", **kwargs):
+            path = os.path.join(output_folder, f"{output_file}-{first_page}.{fmt}")
+            Image.new("RGB", (80, 60), "white").save(path, "PNG")
+            return [path]
+
+        mock_convert.side_effect = fake_pdftoppm
+        mock_ocr_process.return_value = {"success": True, "lang": "por", "data": {
+            "level": [5], "block_num": [1], "par_num": [1], "line_num": [1], "word_num": [1],
+            "left": [5], "top": [5], "width": [40], "height": [10], "conf": [90.0], "text": ["Digitalizado"],
+        }}
+        return file_path
+
+    @patch("app.services.image_service.OCR_WORD_BOXES", True)
+    @patch("app.services.ocr_service.OCRService.process_image")
+    @patch("app.services.image_service.pdf2image.convert_from_path")
+    def test_process_document_ocr_words(self, mock_convert, mock_ocr_process, mock_results_dir, tmp_path):
+        """Testa se as palavras do OCR são gravadas no diretório do ID retornado."""
+        from app.services.ocr_words import WORDS_SUFFIX, query_words
+
+        file_path = self._scanned_pdf(tmp_path, mock_convert, mock_ocr_process)
+
+        result = process_document(file_path, "scan.pdf", ocr_mode="auto")
+
+        words_path = os.path.join(mock_results_dir, result["id"], "ocr", f"page_1{WORDS_SUFFIX}")
+        assert [word["text"] for word in query_words(words_path)["words"]] == ["Digitalizado"]
+        assert os.listdir(mock_results_dir) == [result["id"]]
+
+    def _docx_with_image(self, tmp_path):
+        """Cria um DOCX com uma imagem incorporada."""
+        import docx
+        from PIL import Image
+
+        image_path = str(tmp_path / "figura.png")
+        Image.new("RGB", (30, 20), "white").save(image_path)
+        file_path = str(tmp_path / "figura.docx")
+        document = docx.Document()
+        document.add_picture(image_path)
+        document.save(file_path)
+        return file_path
+
+    def test_process_document_docx_images(self, mock_results_dir, tmp_path):
+        """Testa se as imagens do DOCX são gravadas no diretório do ID retornado."""
+        result = process_document(self._docx_with_image(tmp_path), "figura.docx", extract_images=True)
+
+        images_dir = os.path.join(mock_results_dir, result["id"], "images")
+        assert [image["path"] for image in result["content"]["images"]] == [os.path.join(images_dir, "image1.png")]
+        assert os.listdir(mock_results_dir) == [result["id"]]
+
+    def test_process_document_cancelled_removes_images(self, mock_results_dir, tmp_path):
+        """Testa se as imagens já gravadas são descartadas quando o processamento é interrompido."""
+        from app.services.document_service import docling_adapter
+
+        def collect_then_cancel(records, *args):
+            list(records)
+            raise ProcessingTimeout("Tempo limite")
+
+        with patch.object(docling_adapter, "_collect_records", side_effect=collect_then_cancel):
+            with pytest.raises(ProcessingTimeout):
+                process_document(self._docx_with_image(tmp_path), "figura.docx", extract_images=True)
+
+        assert os.listdir(mock_results_dir) == []
+
+    @patch("app.services.image_service.OCR_WORD_BOXES", True)
+    @patch("app.services.ocr_service.OCRService.process_image")
+    @patch("app.services.image_service.pdf2image.convert_from_path")
+    def test_process_document_cancelled_removes_ocr_words(
+        self, mock_convert, mock_ocr_process, mock_results_dir, tmp_path
+    ):
+        """Testa se as palavras do OCR já gravadas são descartadas quando o processamento é interrompido."""
+        from app.services.document_service import docling_adapter
+
+        file_path = self._scanned_pdf(tmp_path, mock_convert, mock_ocr_process)
+
+        def collect_then_cancel(records, *args):
+            list(records)
+            raise ProcessingTimeout("Tempo limite")
+
+        with patch.object(docling_adapter, "_collect_records", side_effect=collect_then_cancel):
+            with pytest.raises(ProcessingTimeout):
+                process_document(file_path, "scan.pdf", ocr_mode="auto")
+
+        mock_ocr_process.assert_called_once()
+        assert os.listdir(mock_results_dir) == []
 
     def test_process_document_error(self, mock_results_dir, sample_document):
         """Testa o processamento de um documento com erro."""
@@ -120,6 +223,138 @@ class TestDocumentService:
                     original_filename="test_document.pdf",
                 )
 
+    def test_process_document_cancelled(self, mock_results_dir, sample_document, mock_docling_adapter):
+        """Testa se os resultados parciais são descartados quando o processamento é interrompido."""
+        mock_docling_adapter.process_document.side_effect = ProcessingTimeout("Tempo limite")
+
+        with pytest.raises(ProcessingTimeout):
+            process_document(
+                file_path=sample_document,
+                original_filename="test_document.pdf",
+                cancel_token=CancelToken(),
+            )
+
+        assert os.listdir(mock_results_dir) == []
+
+    def test_stream_document_pdf(self, mock_results_dir, sample_document, mock_docling_adapter):
+        """Testa o processamento em streaming de um PDF."""
+        mock_docling_adapter.iter_records.return_value = iter([
+            {"type": "metadata", "pages": 2, "title": "Título"},
+            {"type": "page", "page": 1, "text": "Página 1"},
+            {"type": "image", "page": 1, "image": {"filename": "page_1.png", "page": 1}},
+            {"type": "page", "page": 2, "text": "Página 2"},
+        ])
+
+        with patch("uuid.uuid4", return_value="123e4567-e89b-12d3-a456-426614174000"):
+            records = list(stream_document(sample_document, "test_document.pdf"))
+
+        # Verificar a sequência de registros
+        assert [r["type"] for r in records] == ["document", "metadata", "page", "image", "page", "done"]
+        assert records[-1]["status"] == "success"
+        assert records[-1]["pages"] == 2
+        assert records[-1]["image_count"] == 1
+
+        # Verificar se o texto foi gravado incrementalmente e os metadados salvos
+        result_dir = os.path.join(mock_results_dir, "123e4567-e89b-12d3-a456-426614174000")
+        with open(os.path.join(result_dir, "content.md"), encoding="utf-8") as f:
+            assert f.read() == "Página 1\n\nPágina 2\n\n"
+        with open(os.path.join(result_dir, "metadata.json"), encoding="utf-8") as f:
+            metadata = json.load(f)
+        assert metadata["streamed"] is True
+        assert metadata["content"]["images"][0]["filename"] == "page_1.png"
+
+    def test_stream_document_docx(self, mock_results_dir, tmp_path, mock_docling_adapter):
+        """Testa se parágrafos de DOCX são gravados como markdown, com o HTML gerado sob demanda."""
+        file_path = tmp_path / "test_document.docx"
+        file_path.write_text("Conteúdo de teste")
+        mock_docling_adapter.iter_records.return_value = iter([
+            {"type": "metadata", "title": "Título", "pages": 1},
+            {"type": "paragraph", "index": 0, "text": "Título", "level": 1},
+            {"type": "paragraph", "index": 1, "text": "Parágrafo", "level": 0},
+            {"type": "table", "table": {"page": 1, "data": [["a", "b"]]}},
+        ])
+
+        with patch("uuid.uuid4", return_value="123e4567-e89b-12d3-a456-426614174000"):
+            records = list(stream_document(str(file_path), "test_document.docx"))
+
+        assert records[-1]["table_count"] == 1
+        result_dir = os.path.join(mock_results_dir, "123e4567-e89b-12d3-a456-426614174000")
+        with open(os.path.join(result_dir, "content.md"), encoding="utf-8") as f:
+            assert f.read() == "# Título\n\nParágrafo\n\n"
+        assert not os.path.exists(os.path.join(result_dir, "content.html"))
+
+        html_path = render_document_format(get_document_info("123e4567-e89b-12d3-a456-426614174000"), "html")
+        with open(html_path, encoding="utf-8") as f:
+            assert "<h1>Título</h1>" in f.read()
+
+        # O texto puro é gerado sob demanda, sem as marcações de título
+        document_info = get_document_info("123e4567-e89b-12d3-a456-426614174000")
+        text_path = render_document_format(document_info, "text")
+        assert text_path == os.path.join(result_dir, "content.txt")
+        with open(text_path, encoding="utf-8") as f:
+            assert f.read() == "Título\nParágrafo"
+
+    def test_render_document_format(self, mock_results_dir, sample_document, mock_docling_adapter):
+        """Testa se o HTML é gerado a partir do markdown no primeiro acesso e reaproveitado depois."""
+        with patch("uuid.uuid4", return_value="123e4567-e89b-12d3-a456-426614174000"):
+            process_document(file_path=sample_document, original_filename="test_document.pdf")
+        document_info = get_document_info("123e4567-e89b-12d3-a456-426614174000")
+        result_dir = os.path.join(mock_results_dir, "123e4567-e89b-12d3-a456-426614174000")
+
+        # Para PDF, o texto puro é o próprio markdown
+        assert render_document_format(document_info, "text") == os.path.join(result_dir, "content.md")
+        assert document_info["files"]["html"] is None
+
+        html_path = render_document_format(document_info, "html")
+        assert html_path == os.path.join(result_dir, "content.html")
+        with open(html_path, encoding="utf-8") as f:
+            assert f.read() == "<pre># Título\n\nConteúdo de teste</pre>"
+        assert [name for name in os.listdir(result_dir) if name.endswith(".tmp")] == []
+
+        # Nos acessos seguintes, o arquivo guardado é usado sem nova conversão
+        with patch("app.services.document_service.markdown_to_html") as mock_convert:
+            document_info = get_document_info("123e4567-e89b-12d3-a456-426614174000")
+            assert render_document_format(document_info, "html") == html_path
+        mock_convert.assert_not_called()
+
+    def test_render_document_format_without_text(self, mock_results_dir, sample_document, mock_docling_adapter):
+        """Testa formatos indisponíveis quando o documento não tem texto extraído."""
+        mock_docling_adapter.process_document.return_value["content"] = {"tables": []}
+        with patch("uuid.uuid4", return_value="123e4567-e89b-12d3-a456-426614174000"):
+            process_document(file_path=sample_document, original_filename="test_document.pdf")
+        document_info = get_document_info("123e4567-e89b-12d3-a456-426614174000")
+
+        assert render_document_format(document_info, "markdown") is None
+        assert render_document_format(document_info, "html") is None
+        assert render_document_format(document_info, "original") == document_info["files"]["original"]
+
+    def test_stream_document_error(self, mock_results_dir, sample_document, mock_docling_adapter):
+        """Testa se falhas no streaming geram um registro de erro e um status final de erro."""
+        mock_docling_adapter.iter_records.side_effect = Exception("Erro simulado")
+
+        records = list(stream_document(sample_document, "test_document.pdf"))
+
+        assert records[-2]["type"] == "error"
+        assert "Erro simulado" in records[-2]["message"]
+        assert records[-1]["type"] == "done"
+        assert records[-1]["status"] == "error"
+
+    def test_stream_document_closed_by_consumer(self, mock_results_dir, sample_document, mock_docling_adapter):
+        """Testa se fechar o fluxo cancela o token e descarta os resultados parciais."""
+        mock_docling_adapter.iter_records.return_value = iter([
+            {"type": "metadata", "pages": 2},
+            {"type": "page", "page": 1, "text": "Página 1"},
+        ])
+        token = CancelToken()
+
+        records = stream_document(sample_document, "test_document.pdf", cancel_token=token)
+        next(records)  # document
+        next(records)  # metadata
+        records.close()
+
+        assert token.cancelled
+        assert os.listdir(mock_results_dir) == []
+
     def test_get_document_info_existing(self, mock_results_dir, sample_document_info):
         """Testa a obtenção de informações de um documento existente."""
         # Criar um diretório de resultados e arquivos de metadados
@@ -157,6 +392,25 @@ class TestDocumentService:
         assert result["files"]["html"] == os.path.join(result_dir, "content.html")
         assert result["files"]["original"] == os.path.join(result_dir, "test_document.pdf")
 
+    def test_load_document_content(self, mock_results_dir, tmp_path, mock_docling_adapter):
+        """Testa se o markdown e o texto simples são lidos de content.md na consulta."""
+        file_path = tmp_path / "test_document.docx"
+        file_path.write_text("Conteúdo de teste")
+        mock_docling_adapter.process_document.return_value["content"] = {
+            "markdown": "# Título\n\nParágrafo\n\n",
+            "text": "Título\nParágrafo",
+            "tables": [],
+        }
+        with patch("uuid.uuid4", return_value="123e4567-e89b-12d3-a456-426614174000"):
+            process_document(file_path=str(file_path), original_filename="test_document.docx")
+
+        document_info = get_document_info("123e4567-e89b-12d3-a456-426614174000")
+        assert "text" not in document_info["content"]
+
+        content = load_document_content(document_info)["content"]
+        assert content["markdown"] == "# Título\n\nParágrafo\n\n"
+        assert content["text"] == "Título\nParágrafo"
+
     def test_get_document_info_nonexistent(self, mock_results_dir):
         """Testa a obtenção de informações de um documento inexistente."""
         # Chamar a função a ser testada
@@ -2,12 +2,16 @@
 Testes para o módulo de serviço de imagens.
 """
 
+import io
 import os
+import zipfile
 import pytest
 from unittest.mock import patch, MagicMock
+from PIL import Image
 
-from app.services.image_service import ImageExtractor, get_image_info, process_image
+from app.services.image_service import ImageExtractor, build_render_options, get_image_info, process_image
 from app.services.ocr_service import OCRService
+from tests.fixtures.ooxml import write_pptx
 
 
 def test_image_extractor_initialization():
@@ -45,42 +49,258 @@ def test_extract_images_unsupported_format(mock_exists):
     assert result['images'] == []
 
 
-@patch('os.path.exists')
-@patch('os.makedirs')
-@patch('app.services.image_service.pdf2image.convert_from_path')
-@patch('os.path.getsize')
-def test_extract_from_pdf_success(mock_getsize, mock_convert, mock_makedirs, mock_exists):
-    """Testa a extração de imagens de um PDF com sucesso."""
-    # Configurar mocks
-    mock_exists.return_value = True
-    mock_makedirs.return_value = None
-    mock_getsize.return_value = 1024  # 1KB
+def _fake_pdftoppm(file_path, first_page, last_page, output_folder=None, output_file=None, paths_only=False, fmt="ppm", grayscale=False, **kwargs):
+    """Simula o pdftoppm: grava as páginas no diretório de saída ou as retorna em memória."""
+    mode = "L" if grayscale else "RGB"
+    pages = [Image.new(mode, (80, 60), "white") for _ in range(first_page, last_page + 1)]
+    if not paths_only:
+        return pages
 
-    # Criar mock para as páginas do PDF
-    mock_page1 = MagicMock()
-    mock_page1.width = 800
-    mock_page1.height = 600
-    mock_page1.save.return_value = None
+    paths = []
+    for page_number, page in zip(range(first_page, last_page + 1), pages):
+        path = os.path.join(output_folder, f"{output_file}-{page_number:02d}.{'jpg' if fmt == 'jpeg' else fmt}")
+        page.save(path, "JPEG" if fmt == "jpeg" else "PNG")
+        paths.append(path)
+    return paths
 
-    mock_page2 = MagicMock()
-    mock_page2.width = 800
-    mock_page2.height = 600
-    mock_page2.save.return_value = None
 
-    mock_convert.return_value = [mock_page1, mock_page2]
+@patch('app.services.image_service.pdf2image.convert_from_path')
+def test_extract_from_pdf_success(mock_convert, tmp_path):
+    """Testa a extração de imagens de um PDF com sucesso, gravadas direto pelo pdftoppm."""
+    mock_convert.side_effect = lambda file_path, first_page, last_page, **kwargs: _fake_pdftoppm(
+        file_path, first_page, min(last_page, 2), **kwargs
+    )
 
     # Testar extração
     extractor = ImageExtractor()
-    result = extractor.extract_from_pdf('test.pdf', '/tmp/test_images', True)
+    result = extractor.extract_from_pdf('test.pdf', str(tmp_path), True)
 
     # Verificar resultado
     assert result['success'] is True
-    assert len(result['images']) == 2
     assert result['count'] == 2
+    assert [image['filename'] for image in result['images']] == ['page_1.png', 'page_2.png']
+    assert result['images'][0]['width'] == 80
+    assert result['images'][0]['format'] == 'png'
+    assert sorted(os.listdir(tmp_path)) == ['page_1.png', 'page_2.png']
+
+    # As páginas são gravadas pelo pdftoppm, sem recodificação no Python
+    kwargs = mock_convert.call_args.kwargs
+    assert kwargs['dpi'] == 200
+    assert kwargs['paths_only'] is True
+    assert kwargs['output_folder'] == str(tmp_path)
+
+
+@patch('app.services.image_service.RENDER_BATCH_PAGES', 2)
+@patch('app.services.image_service.pdf2image.convert_from_path')
+def test_extract_from_pdf_page_ranges(mock_convert, tmp_path):
+    """Testa se apenas os intervalos selecionados são rasterizados, em lotes."""
+    mock_convert.side_effect = _fake_pdftoppm
+
+    extractor = ImageExtractor()
+    result = extractor.extract_from_pdf('test.pdf', str(tmp_path), True, page_ranges=[(2, 4), (9, 9)])
+
+    assert [image['page'] for image in result['images']] == [2, 3, 4, 9]
+    calls = [(c.kwargs['first_page'], c.kwargs['last_page']) for c in mock_convert.call_args_list]
+    assert calls == [(2, 3), (4, 4), (9, 9)]
+
+
+@patch('app.services.image_service.pdf2image.convert_from_path')
+def test_extract_from_pdf_gray_jpeg(mock_convert, tmp_path):
+    """Testa a rasterização em tons de cinza e JPEG, com as opções repassadas ao pdftoppm."""
+    mock_convert.side_effect = lambda file_path, first_page, last_page, **kwargs: _fake_pdftoppm(
+        file_path, first_page, first_page, **kwargs
+    )
+    render = build_render_options(dpi=150, color_mode='gray', image_format='jpeg', quality=60)
+
+    result = ImageExtractor().extract_from_pdf('test.pdf', str(tmp_path), True, render_options=render)
+
+    assert result['images'][0]['filename'] == 'page_1.jpg'
+    assert result['images'][0]['format'] == 'jpeg'
+    kwargs = mock_convert.call_args.kwargs
+    assert kwargs['dpi'] == 150
+    assert kwargs['fmt'] == 'jpeg'
+    assert kwargs['grayscale'] is True
+    assert kwargs['jpegopt'] == {'quality': 60, 'optimize': True}
+
+
+@pytest.mark.parametrize('color_mode, image_format, expected_mode', [
+    ('rgb', 'webp', 'RGB'),
+    ('bilevel', 'png', '1'),
+])
+@patch('app.services.image_service.pdf2image.convert_from_path')
+def test_extract_from_pdf_encoded_once(mock_convert, color_mode, image_format, expected_mode, tmp_path):
+    """Testa WebP e preto e branco, codificados uma única vez a partir da saída bruta."""
+    mock_convert.side_effect = lambda file_path, first_page, last_page, **kwargs: _fake_pdftoppm(
+        file_path, first_page, first_page, **kwargs
+    )
+    render = build_render_options(color_mode=color_mode, image_format=image_format)
+
+    result = ImageExtractor().extract_from_pdf('test.pdf', str(tmp_path), True, render_options=render)
+
+    assert mock_convert.call_args.kwargs['fmt'] == 'ppm'
+    with Image.open(result['images'][0]['path']) as image:
+        assert image.format == image_format.upper()
+        assert image.mode == expected_mode
 
-    # Verificar se as páginas foram salvas
-    assert mock_page1.save.called
-    assert mock_page2.save.called
+
+@patch('app.services.ocr_service.OCRService.process_image')
+@patch('app.services.image_service.pdf2image.convert_from_path')
+def test_iter_images_fused_ocr(mock_convert, mock_ocr_process, tmp_path):
+    """Testa o OCR direto das páginas em PNM, sem manter as imagens."""
+    mock_convert.side_effect = lambda file_path, first_page, last_page, **kwargs: _fake_pdftoppm(
+        file_path, first_page, first_page, **kwargs
+    )
+    mock_ocr_process.return_value = {"success": True, "text": "Texto da página", "lang": "por"}
+    images_dir = tmp_path / "doc" / "images"
+    render = build_render_options(color_mode='gray', persist=False)
+
+    extractor = ImageExtractor()
+    image_info = next(extractor._iter_pdf_images('test.pdf', str(images_dir), True, render_options=render))
+
+    # A página sai do pdftoppm sem compressão e é lida diretamente pelo Tesseract
+    assert mock_convert.call_args.kwargs['fmt'] == 'ppm'
+    assert image_info['format'] == 'pnm'
+    assert image_info['filename'] == 'page_1.pgm'
+
+    extractor._apply_ocr(image_info, extractor._create_ocr_directory(str(images_dir)), "por")
+
+    assert mock_ocr_process.call_args.args[0].endswith('page_1.pgm')
+    assert image_info['path'] is None
+    assert image_info['persisted'] is False
+    assert image_info['ocr']['text'] == "Texto da página"
+    assert os.listdir(images_dir) == []
+    assert (tmp_path / "doc" / "ocr" / "page_1.txt").read_text(encoding="utf-8") == "Texto da página"
+
+
+@patch('app.services.ocr_service.OCRService.process_image')
+@patch('app.services.image_service.pdf2image.convert_from_path')
+def test_ocr_pdf_page(mock_convert, mock_ocr_process):
+    """Testa o OCR de uma única página, sem manter a imagem gerada."""
+    mock_convert.side_effect = _fake_pdftoppm
+    mock_ocr_process.return_value = {"success": True, "text": "Texto", "lang": "por"}
+
+    result = ImageExtractor().ocr_pdf_page('test.pdf', 5)
+
+    assert result == {"success": True, "text": "Texto", "lang": "por"}
+    kwargs = mock_convert.call_args.kwargs
+    assert (kwargs['first_page'], kwargs['last_page']) == (5, 5)
+    assert kwargs['fmt'] == 'ppm'
+    assert not os.path.exists(os.path.dirname(mock_ocr_process.call_args.args[0]))
+
+
+@patch('app.services.image_service.OCR_WORD_BOXES', True)
+@patch('app.services.ocr_service.OCRService.process_image')
+@patch('app.services.image_service.pdf2image.convert_from_path')
+def test_ocr_pdf_page_word_boxes(mock_convert, mock_ocr_process, tmp_path):
+    """Testa a gravação das palavras da página com uma única passagem do OCR."""
+    mock_convert.side_effect = _fake_pdftoppm
+    mock_ocr_process.return_value = {"success": True, "lang": "por", "data": {
+        "level": [5, 5], "block_num": [1, 1], "par_num": [1, 1], "line_num": [1, 2], "word_num": [1, 1],
+        "left": [5, 5], "top": [5, 30], "width": [40, 30], "height": [10, 10], "conf": [90.0, 80.0],
+        "text": ["Título", "corpo"],
+    }}
+
+    result = ImageExtractor().ocr_pdf_page('test.pdf', 2, words_dir=str(tmp_path / "ocr"))
+
+    assert mock_ocr_process.call_count == 1
+    assert mock_ocr_process.call_args.kwargs['output_type'] == 'data'
+    assert result["text"] == "Título\ncorpo"
+    assert "data" not in result
+    assert result["word_count"] == 2
+    assert result["words_file"] == str(tmp_path / "ocr" / "page_2.words.npz")
+    assert os.path.exists(result["words_file"])
+
+
+@patch('app.services.ocr_service.OCRService.detect_script')
+@patch('app.services.ocr_service.OCRService.process_image')
+@patch('app.services.image_service.pdf2image.convert_from_path')
+def test_iter_images_detects_language_once(mock_convert, mock_ocr_process, mock_script, tmp_path):
+    """Testa se o idioma automático é detectado uma vez e reaproveitado nas demais páginas."""
+    mock_convert.side_effect = _fake_pdftoppm
+    mock_script.return_value = "Cyrillic"
+    mock_ocr_process.return_value = {"success": True, "text": "Текст", "lang": "rus"}
+
+    images_dir = tmp_path / "doc" / "images"
+
+    extractor = ImageExtractor()
+    ocr_dir = extractor._create_ocr_directory(str(images_dir))
+    languages = extractor.language_selector("auto")
+    images = list(extractor._iter_pdf_images('test.pdf', str(images_dir), True, page_ranges=[(1, 3)]))
+    for image_info in images:
+        extractor._apply_ocr(image_info, ocr_dir, languages)
+
+    assert len(images) == 3
+    assert mock_script.call_count == 1
+    assert [image['ocr']['lang'] for image in images] == ["rus"] * 3
+
+
+def _write_package(path, media_dir, images):
+    """Grava um pacote OOXML mínimo com as imagens informadas em media_dir."""
+    with zipfile.ZipFile(path, "w") as package:
+        package.writestr("[Content_Types].xml", "<Types/>")
+        for name, image in images.items():
+            buffer = io.BytesIO()
+            image.save(buffer, "PNG" if name.endswith(".png") else "JPEG")
+            package.writestr(f"{media_dir}{name}", buffer.getvalue())
+    return path
+
+
+def test_extract_from_docx(tmp_path):
+    """Testa a cópia das imagens do DOCX com os bytes originais e as dimensões do cabeçalho."""
+    docx_path = _write_package(tmp_path / "doc.docx", "word/media/", {
+        "image1.png": Image.new("RGB", (120, 80), "red"),
+        "image2.jpeg": Image.new("RGB", (64, 32), "blue"),
+    })
+    images_dir = tmp_path / "images"
+
+    result = ImageExtractor().extract_from_docx(str(docx_path), str(images_dir))
+
+    assert result["success"] is True
+    assert result["count"] == 2
+    first, second = result["images"]
+    assert (first["filename"], first["format"], first["width"], first["height"]) == ("image1.png", "png", 120, 80)
+    assert (second["format"], second["width"], second["height"]) == ("jpeg", 64, 32)
+    assert first["source"] == "word/media/image1.png"
+    with zipfile.ZipFile(docx_path) as package:
+        assert (images_dir / "image2.jpeg").read_bytes() == package.read("word/media/image2.jpeg")
+
+
+def test_extract_from_docx_invalid(tmp_path):
+    """Testa a falha com um arquivo que não é um pacote ZIP."""
+    docx_path = tmp_path / "doc.docx"
+    docx_path.write_bytes(b"not a zip")
+
+    result = ImageExtractor().extract_from_docx(str(docx_path), str(tmp_path / "images"))
+
+    assert result["success"] is False
+    assert result["images"] == []
+
+
+def test_extract_from_pptx(tmp_path):
+    """Testa a cópia das mídias da apresentação com o primeiro slide que as usa."""
+    pptx_path = write_pptx(tmp_path / "deck.pptx", [
+        {"title": "Capa", "images": ["image1.png"]},
+        {"title": "Repetida", "images": ["image1.png", "image2.png"]},
+    ])
+
+    result = ImageExtractor().extract_from_pptx(str(pptx_path), str(tmp_path / "images"))
+
+    assert result["success"] is True
+    assert sorted((image["filename"], image["page"]) for image in result["images"]) == [
+        ("image1.png", 1),
+        ("image2.png", 2),
+    ]
+
+
+def test_build_render_options():
+    """Testa os valores padrão e a validação das opções de rasterização."""
+    assert build_render_options() == {'dpi': 200, 'color_mode': 'rgb', 'format': 'png', 'quality': 85, 'persist': True}
+    assert build_render_options(image_format='JPG')['format'] == 'jpeg'
+
+    for kwargs in ({'dpi': 10}, {'color_mode': 'cmyk'}, {'image_format': 'gif'}, {'quality': 0},
+                   {'color_mode': 'bilevel', 'image_format': 'jpeg'}):
+        with pytest.raises(ValueError):
+            build_render_options(**kwargs)
 
 
 @patch('PIL.Image.open')
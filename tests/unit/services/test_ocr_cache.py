@@ -0,0 +1,60 @@
+"""
+Testes para o cache persistente de resultados de OCR.
+"""
+
+from PIL import Image
+
+from app.services.ocr_cache import OCRCache, cache_key, image_digest
+
+
+def test_put_and_get(tmp_path):
+    """Testa a gravação e a leitura de resultados, inclusive saídas em bytes (hOCR)."""
+    cache = OCRCache(str(tmp_path / "ocr.sqlite3"), max_bytes=1024 * 1024)
+    key = cache_key("abc", lang="por", config="", output_type="hocr")
+
+    assert cache.get(key) is None
+    cache.put(key, {"success": True, "hocr": b"<html>Texto</html>", "lang": "por"})
+
+    assert cache.get(key) == {"success": True, "hocr": b"<html>Texto</html>", "lang": "por"}
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hit_rate"] == 0.5
+    assert cache.stats()["entries"] == 1
+
+    # Outro processo (ou um reinício) enxerga os resultados já gravados
+    cache.close()
+    reopened = OCRCache(str(tmp_path / "ocr.sqlite3"), max_bytes=1024 * 1024)
+    assert reopened.get(key)["lang"] == "por"
+
+
+def test_evicts_least_recently_used(tmp_path):
+    """Testa o descarte dos resultados usados há mais tempo ao exceder o tamanho máximo."""
+    cache = OCRCache(str(tmp_path / "ocr.sqlite3"), max_bytes=250)
+    text = "x" * 80
+
+    cache.put("a", {"text": text})
+    cache.put("b", {"text": text})
+    # "a" é lida de novo e passa a ser a mais recente
+    assert cache.get("a") is not None
+    cache.put("c", {"text": text})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["size_bytes"] <= 250
+
+
+def test_cache_key_and_digest(tmp_path):
+    """Testa se a chave depende do conteúdo da imagem e dos parâmetros do OCR."""
+    first = tmp_path / "a.png"
+    second = tmp_path / "b.png"
+    Image.new("L", (20, 20), 255).save(first)
+    Image.new("L", (20, 20), 255).save(second)
+
+    # O mesmo conteúdo em arquivos diferentes tem o mesmo hash
+    assert image_digest(str(first)) == image_digest(str(second))
+    assert image_digest(Image.new("L", (20, 20), 255)) != image_digest(Image.new("L", (20, 20), 0))
+
+    digest = image_digest(str(first))
+    assert cache_key(digest, lang="por", output_type="text") == cache_key(digest, output_type="text", lang="por")
+    assert cache_key(digest, lang="por", output_type="text") != cache_key(digest, lang="eng", output_type="text")
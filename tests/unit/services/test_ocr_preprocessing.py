@@ -0,0 +1,90 @@
+"""
+Testes para o pré-processamento de imagens para OCR.
+"""
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from app.services.ocr_preprocessing import (
+    PREPROCESS_STEPS,
+    adaptive_threshold,
+    content_bounds,
+    estimate_skew,
+    parse_steps,
+    preprocess_for_ocr,
+)
+
+
+@pytest.fixture
+def text_page():
+    """Cria uma página com linhas escuras sobre um fundo acinzentado."""
+    image = Image.new("L", (800, 600), 220)
+    draw = ImageDraw.Draw(image)
+    for index in range(10):
+        top = 100 + index * 40
+        draw.rectangle((100, top, 700, top + 8), fill=40)
+    return image
+
+
+def test_adaptive_threshold_uneven_background():
+    """Testa a binarização com iluminação irregular, que um limiar global confundiria."""
+    # Fundo em degradê de 120 a 250, com traços 60 níveis mais escuros que o fundo local
+    background = np.tile(np.linspace(120, 250, 400), (100, 1))
+    pixels = background.copy()
+    pixels[45:55, :] -= 60
+    pixels = pixels.clip(0, 255).astype(np.uint8)
+
+    ink = adaptive_threshold(pixels, window=31)
+
+    assert ink[45:55, 20:380].mean() > 0.95
+    assert ink[:30, :].mean() < 0.01
+
+
+@pytest.mark.parametrize("angle", [3.0, -2.0])
+def test_estimate_skew(text_page, angle):
+    """Testa a estimativa da inclinação das linhas de uma página girada."""
+    rotated = text_page.rotate(angle, expand=True, fillcolor=220)
+    ink = adaptive_threshold(np.asarray(rotated))
+
+    # Girar no sentido anti-horário faz as linhas subirem da esquerda para a direita
+    assert estimate_skew(ink) == pytest.approx(-angle, abs=0.25)
+
+
+def test_content_bounds():
+    """Testa o recorte das margens sem tinta."""
+    ink = np.zeros((100, 200), dtype=bool)
+    ink[30:40, 50:150] = True
+
+    assert content_bounds(ink, margin=5) == (25, 45, 45, 155)
+    assert content_bounds(np.zeros((10, 10), dtype=bool)) == (0, 10, 0, 10)
+
+
+def test_preprocess_for_ocr(text_page):
+    """Testa o pipeline completo: redução, binarização, deskew e recorte."""
+    rotated = text_page.convert("RGB").rotate(2.0, expand=True, fillcolor=(220, 220, 220))
+
+    processed = preprocess_for_ocr(rotated, source_dpi=600, steps=PREPROCESS_STEPS, target_dpi=300)
+    pixels = np.asarray(processed)
+
+    assert processed.mode == "L"
+    assert set(np.unique(pixels)) <= {0, 255}
+    # Reduzida à metade e sem as margens em branco
+    assert processed.width < rotated.width // 2
+    assert processed.height < rotated.height // 2
+    assert estimate_skew(pixels == 0) == pytest.approx(0.0, abs=0.25)
+
+
+def test_preprocess_for_ocr_does_not_upscale(text_page):
+    """Testa se imagens abaixo da resolução alvo não são ampliadas."""
+    processed = preprocess_for_ocr(text_page, source_dpi=150, steps=("grayscale", "resample"), target_dpi=300)
+
+    assert processed.size == text_page.size
+
+
+def test_parse_steps():
+    """Testa a interpretação e a validação da lista de etapas."""
+    assert parse_steps("crop, Threshold,grayscale") == ("grayscale", "threshold", "crop")
+    assert parse_steps("") == ()
+    with pytest.raises(ValueError):
+        parse_steps("grayscale,sharpen")
@@ -8,7 +8,8 @@ from unittest.mock import patch, MagicMock
 from PIL import Image
 import io
 
-from app.services.ocr_service import OCRService
+from app.services.ocr_cache import OCRCache
+from app.services.ocr_service import LanguageSelector, OCRService, identify_language
 
 
 @pytest.fixture
@@ -75,6 +76,27 @@ def test_process_image_text(ocr_service, sample_image):
     assert result["lang"] == "por"
 
 
+def test_process_image_reads_path_directly(ocr_service, sample_image):
+    """Testa se o caminho é repassado ao Tesseract sem decodificar a imagem no Python."""
+    with patch('app.services.ocr_service.pytesseract.image_to_string') as mock_to_string:
+        mock_to_string.return_value = "Texto"
+        ocr_service.process_image(sample_image)
+
+    assert mock_to_string.call_args.args[0] == sample_image
+
+
+def test_process_image_in_memory(ocr_service):
+    """Testa o OCR de uma imagem em memória, entregue ao Tesseract sem compressão."""
+    image = Image.new('L', (100, 30), color=255)
+
+    with patch('app.services.ocr_service.pytesseract.image_to_string') as mock_to_string:
+        mock_to_string.return_value = "Texto"
+        result = ocr_service.process_image(image)
+
+    assert result["success"] is True
+    assert mock_to_string.call_args.args[0].format == "PPM"
+
+
 def test_process_image_data(ocr_service, sample_image):
     """Testa o processamento de OCR em uma imagem para extrair dados estruturados."""
     result = ocr_service.process_image(sample_image, lang="por", output_type="data")
@@ -125,6 +147,85 @@ def test_detect_language(ocr_service, sample_image):
     assert lang == "por"
 
 
+def test_process_image_preprocessed(ocr_service, tmp_path):
+    """Testa se, com o pré-processamento ativo, o Tesseract recebe a imagem já limpa."""
+    image_path = tmp_path / "scan.png"
+    Image.new('RGB', (1200, 900), color=(230, 230, 230)).save(image_path)
+
+    with patch('app.services.ocr_service.pytesseract.image_to_string') as mock_to_string:
+        mock_to_string.return_value = "Texto"
+        result = ocr_service.process_image(str(image_path), preprocess=True, source_dpi=600)
+
+    image = mock_to_string.call_args.args[0]
+    assert result["success"] is True
+    assert image.mode == "L"
+    assert image.format == "PPM"
+    assert image.size == (600, 450)
+
+
+def test_process_image_cached(ocr_service, sample_image, tmp_path):
+    """Testa se a mesma imagem com os mesmos parâmetros é reconhecida uma única vez."""
+    ocr_service.cache = OCRCache(str(tmp_path / "ocr.sqlite3"), max_bytes=1024 * 1024)
+
+    with patch('app.services.ocr_service.pytesseract.image_to_string') as mock_to_string:
+        mock_to_string.return_value = "Texto"
+        first = ocr_service.process_image(sample_image, lang="por")
+        second = ocr_service.process_image(sample_image, lang="por")
+        other_lang = ocr_service.process_image(sample_image, lang="eng")
+
+    assert mock_to_string.call_count == 2
+    assert "cached" not in first
+    assert second == {**first, "cached": True}
+    assert other_lang["lang"] == "eng"
+    assert ocr_service.cache.stats()["hits"] == 1
+
+
+def test_process_image_combined_languages(ocr_service, sample_image):
+    """Testa o OCR com idiomas combinados, como "por+eng"."""
+    result = ocr_service.process_image(sample_image, lang="por+eng")
+
+    assert result["lang"] == "por+eng"
+
+
+def test_detect_script_downscaled(ocr_service, tmp_path):
+    """Testa se o OSD recebe uma cópia reduzida e em tons de cinza da imagem."""
+    image_path = tmp_path / "page.png"
+    Image.new('RGB', (2400, 3000), color=(255, 255, 255)).save(image_path)
+
+    with patch('app.services.ocr_service.pytesseract.image_to_osd') as mock_osd:
+        mock_osd.return_value = "Page number: 0\nScript: Cyrillic\nScript confidence: 2.0"
+        script = ocr_service.detect_script(str(image_path))
+
+    sample = mock_osd.call_args.args[0]
+    assert script == "Cyrillic"
+    assert sample.mode == "L"
+    assert max(sample.size) == 1200
+
+
+def test_identify_language():
+    """Testa a identificação do idioma pelas palavras frequentes."""
+    assert identify_language("O contrato de locação não foi assinado pela parte e deve ser revisto com o cliente para que") == "por"
+    assert identify_language("The report of the committee is attached and it was sent to the board for review") == "eng"
+    assert identify_language("Total 123") is None
+
+
+def test_language_selector_detects_once(ocr_service, sample_image):
+    """Testa a detecção do idioma uma única vez por documento."""
+    selector = LanguageSelector(ocr_service, "auto")
+
+    with patch.object(ocr_service, 'detect_script', return_value="Latin") as mock_script:
+        # A primeira passagem usa os idiomas latinos combinados
+        assert selector.select(sample_image) == "por+eng"
+        selector.observe("The report of the committee is attached and it was sent to the board for review")
+        assert selector.select(sample_image) == "eng"
+        assert selector.select(sample_image) == "eng"
+
+    assert mock_script.call_count == 1
+
+    fixed = LanguageSelector(ocr_service, "spa")
+    assert fixed.select(sample_image) == "spa"
+
+
 def test_process_pdf_images(ocr_service, sample_image):
     """Testa o processamento de OCR em um diretório de imagens."""
     # Criar um diretório temporário com uma imagem
@@ -0,0 +1,98 @@
+"""
+Testes para o armazenamento colunar das palavras do OCR.
+"""
+
+import pytest
+
+from app.services.ocr_words import (
+    build_word_table,
+    list_word_tables,
+    query_words,
+    save_word_table,
+    words_directory,
+    words_to_text,
+)
+
+
+@pytest.fixture
+def ocr_data():
+    """Saída de image_to_data com uma página, dois parágrafos e uma entrada vazia."""
+    rows = [
+        # level, block, par, line, word, left, top, width, height, conf, text
+        (1, 0, 0, 0, 0, 0, 0, 1000, 1400, -1, ""),
+        (2, 1, 0, 0, 0, 100, 100, 500, 60, -1, ""),
+        (5, 1, 1, 1, 1, 100, 100, 80, 20, 96.5, "Relatório"),
+        (5, 1, 1, 1, 2, 190, 100, 60, 20, 91.0, "anual"),
+        (5, 1, 1, 2, 1, 100, 130, 70, 20, 88.0, "página"),
+        (5, 1, 1, 2, 2, 180, 130, 10, 20, 12.0, " "),
+        (5, 2, 1, 1, 1, 100, 700, 90, 20, 35.0, "rodapé"),
+    ]
+    columns = ("level", "block_num", "par_num", "line_num", "word_num",
+               "left", "top", "width", "height", "conf", "text")
+    return {column: [row[index] for row in rows] for index, column in enumerate(columns)}
+
+
+def test_words_to_text(ocr_data):
+    """Testa a reconstrução do texto com linhas e parágrafos."""
+    assert words_to_text(ocr_data) == "Relatório anual\npágina\n\nrodapé"
+
+
+def test_build_word_table(ocr_data):
+    """Testa a conversão em colunas, sem as entradas vazias e de outros níveis."""
+    table = build_word_table(ocr_data)
+
+    assert table["left"].tolist() == [100, 190, 100, 100]
+    assert table["text_offsets"][-1] == len(table["text"])
+    assert table["page_size"].tolist() == [1000, 1400]
+
+
+def test_save_and_query_words(ocr_data, tmp_path):
+    """Testa a gravação e as consultas por região, confiança e limite."""
+    path = str(tmp_path / "page_1.words.npz")
+
+    assert save_word_table(path, ocr_data) == 4
+
+    result = query_words(path)
+    assert result["page_size"] == {"width": 1000, "height": 1400}
+    assert result["total"] == 4
+    assert [word["text"] for word in result["words"]] == ["Relatório", "anual", "página", "rodapé"]
+    assert result["words"][0] == {
+        "text": "Relatório", "left": 100, "top": 100, "width": 80, "height": 20, "conf": 96.5,
+        "block_num": 1, "par_num": 1, "line_num": 1, "word_num": 1,
+    }
+
+    region = query_words(path, region=(150, 90, 300, 125))
+    assert [word["text"] for word in region["words"]] == ["Relatório", "anual"]
+
+    confident = query_words(path, min_conf=50, limit=2)
+    assert confident["count"] == 3
+    assert [word["text"] for word in confident["words"]] == ["Relatório", "anual"]
+
+
+def test_save_word_table_empty(tmp_path):
+    """Testa páginas sem palavras reconhecidas."""
+    path = str(tmp_path / "page_1.words.npz")
+
+    assert save_word_table(path, {"level": [], "text": [], "conf": []}) == 0
+    assert query_words(path) == {"page_size": {"width": 0, "height": 0}, "total": 0, "count": 0, "words": []}
+
+
+def test_list_word_tables(ocr_data, tmp_path):
+    """Testa a listagem das tabelas das páginas e das imagens de um documento."""
+    words_dir = words_directory(str(tmp_path))
+    assert list_word_tables(words_dir) == []
+
+    tmp_path.joinpath("ocr").mkdir()
+    for name in ("page_10", "page_2_image_1", "page_2", "image1", "image2"):
+        save_word_table(str(tmp_path / "ocr" / f"{name}.words.npz"), ocr_data)
+    (tmp_path / "ocr" / "page_2.txt").write_text("texto")
+
+    tables = list_word_tables(words_dir, {"image1.words.npz": 5})
+
+    assert [(t["name"], t["source"], t["page"]) for t in tables] == [
+        ("page_2", "page", 2),
+        ("page_2_image_1", "image", 2),
+        ("image1", "image", 5),
+        ("page_10", "page", 10),
+        ("image2", "image", None),
+    ]
@@ -0,0 +1,110 @@
+"""
+Testes para a extração das imagens incorporadas em PDFs.
+"""
+
+import io
+import zlib
+
+import pytest
+from PIL import Image
+
+from app.services.image_service import ImageExtractor
+
+
+def _stream(dictionary, data):
+    """Monta um objeto de fluxo do PDF."""
+    return dictionary + b" /Length %d >>\nstream\n" % len(data) + data + b"\nendstream"
+
+
+def _write_pdf(path, objects):
+    """Grava um PDF mínimo com os objetos informados (o primeiro é o catálogo)."""
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        output.write(b"%010d 00000 n \n" % offset)
+    output.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    path.write_bytes(output.getvalue())
+    return path
+
+
+@pytest.fixture
+def jpeg_bytes():
+    """JPEG de 40x20 pixels."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (40, 20), "red").save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def pdf_path(tmp_path, jpeg_bytes):
+    """
+    PDF de duas páginas que compartilham os recursos: a primeira desenha um JPEG e uma imagem
+    RGB comprimida com Flate; a segunda desenha o mesmo JPEG e um formulário com uma imagem
+    indexada em tons de cinza.
+    """
+    rgb = zlib.compress(Image.new("RGB", (10, 5), (0, 255, 0)).tobytes())
+    indexed = zlib.compress(bytes([0, 1] * 8))
+    resources = b"/Resources << /XObject << /Im1 5 0 R /Im2 6 0 R /Fm1 9 0 R >> >>"
+    return _write_pdf(tmp_path / "images.pdf", [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R 4 0 R] /Count 2 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 200 200] " + resources + b" /Contents 7 0 R >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 200 200] " + resources + b" /Contents 8 0 R >>",
+        _stream(b"<< /Type /XObject /Subtype /Image /Width 40 /Height 20 /ColorSpace /DeviceRGB"
+                b" /BitsPerComponent 8 /Filter /DCTDecode", jpeg_bytes),
+        _stream(b"<< /Type /XObject /Subtype /Image /Width 10 /Height 5 /ColorSpace /DeviceRGB"
+                b" /BitsPerComponent 8 /Filter /FlateDecode", rgb),
+        _stream(b"<<", b"q 80 0 0 40 10 20 cm /Im1 Do Q q 20 0 0 10 100 100 cm /Im2 Do Q"),
+        _stream(b"<<", b"q 40 0 0 20 0 0 cm /Im1 Do Q q 1 0 0 1 50 50 cm /Fm1 Do Q"),
+        _stream(b"<< /Type /XObject /Subtype /Form /BBox [0 0 100 100] /Matrix [2 0 0 2 0 0]"
+                b" /Resources << /XObject << /Im3 10 0 R >> >>", b"q 16 0 0 1 0 0 cm /Im3 Do Q"),
+        _stream(b"<< /Type /XObject /Subtype /Image /Width 16 /Height 1"
+                b" /ColorSpace [/Indexed /DeviceGray 1 <00FF>] /BitsPerComponent 8 /Filter /FlateDecode", indexed),
+    ])
+
+
+def test_extract_embedded_images(pdf_path, jpeg_bytes, tmp_path):
+    """Testa a cópia do JPEG, a decodificação dos demais filtros e as posições na página."""
+    images_dir = tmp_path / "images"
+
+    result = ImageExtractor().extract_from_pdf(str(pdf_path), str(images_dir), extract_pages=False)
+
+    assert result["success"] is True
+    images = result["images"]
+    assert [(image["page"], image["filename"]) for image in images] == [
+        (1, "page_1_image_1.jpg"),
+        (1, "page_1_image_2.png"),
+        (2, "page_1_image_1.jpg"),
+        (2, "page_2_image_2.png"),
+    ]
+
+    # JPEG gravado com os bytes originais
+    assert images[0]["passthrough"] is True
+    assert (images_dir / "page_1_image_1.jpg").read_bytes() == jpeg_bytes
+    assert images[0]["placements"] == [{"x0": 10.0, "y0": 20.0, "x1": 90.0, "y1": 60.0}]
+    assert images[0]["dpi"] == 36
+
+    with Image.open(images[1]["path"]) as image:
+        assert image.size == (10, 5)
+        assert image.convert("RGB").getpixel((0, 0)) == (0, 255, 0)
+
+    # Imagem indexada dentro de um formulário com matriz própria
+    assert images[3]["placements"] == [{"x0": 50.0, "y0": 50.0, "x1": 82.0, "y1": 52.0}]
+    with Image.open(images[3]["path"]) as image:
+        assert [image.convert("L").getpixel((x, 0)) for x in range(3)] == [0, 255, 0]
+
+
+def test_extract_embedded_images_page_ranges(pdf_path, tmp_path):
+    """Testa a extração restrita às páginas selecionadas."""
+    images = list(ImageExtractor()._iter_pdf_images(
+        str(pdf_path), str(tmp_path / "images"), extract_pages=False, page_ranges=[(2, 2)]
+    ))
+
+    assert [image["page"] for image in images] == [2, 2]
+    assert images[0]["filename"] == "page_2_image_1.jpg"
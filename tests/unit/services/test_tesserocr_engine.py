@@ -0,0 +1,104 @@
+"""
+Testes para o motor de OCR em processo (tesserocr).
+"""
+
+import sys
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from PIL import Image
+
+from app.services.ocr_service import OCRService
+from app.services.tesserocr_engine import TesserocrEngine, parse_config, resolve_ocr_engine
+
+
+@pytest.fixture
+def fake_tesserocr():
+    """Simula o módulo tesserocr, criando um TessBaseAPI falso a cada inicialização."""
+    module = MagicMock()
+    module.PSM = SimpleNamespace(AUTO=3, OSD_ONLY=0)
+    module.OEM = SimpleNamespace(DEFAULT=3)
+    module.get_languages.return_value = ("/usr/share/tessdata/", ["eng", "osd", "por"])
+
+    module.created = []
+
+    def create_api(**options):
+        api = MagicMock()
+        module.created.append(api)
+        api.options = options
+        api.Recognize.return_value = True
+        api.GetUTF8Text.return_value = f"Texto em {options['lang']}"
+        return api
+
+    module.PyTessBaseAPI.side_effect = create_api
+    with patch.dict(sys.modules, {"tesserocr": module}):
+        yield module
+
+
+def test_parse_config():
+    """Testa a conversão das opções de linha de comando do Tesseract."""
+    assert parse_config("--psm 6 --oem 1 -c preserve_interword_spaces=1") == (
+        6, 1, {"preserve_interword_spaces": "1"}
+    )
+    assert parse_config("") == (None, None, {})
+    with pytest.raises(ValueError):
+        parse_config("--dpi 300")
+
+
+def test_resolve_ocr_engine_fallback():
+    """Testa o uso do pytesseract quando o tesserocr não está instalado."""
+    with patch.dict(sys.modules, {"tesserocr": None}):
+        assert resolve_ocr_engine("tesserocr") == "pytesseract"
+    with pytest.raises(ValueError):
+        resolve_ocr_engine("easyocr")
+
+
+def test_engine_reused_per_thread_and_language(fake_tesserocr):
+    """Testa se cada thread mantém um motor por idioma, reaproveitado entre as imagens."""
+    engine = TesserocrEngine()
+    image = Image.new("L", (50, 20), 255)
+
+    assert engine.image_to_string(image, lang="por") == "Texto em por"
+    assert engine.image_to_string("page.png", lang="por") == "Texto em por"
+    engine.image_to_string(image, lang="eng")
+    assert fake_tesserocr.PyTessBaseAPI.call_count == 2
+
+    # Outra thread não compartilha o motor da primeira
+    thread = threading.Thread(target=engine.image_to_string, args=(image,), kwargs={"lang": "por"})
+    thread.start()
+    thread.join()
+    assert fake_tesserocr.PyTessBaseAPI.call_count == 3
+
+    engine.close()
+    for api in fake_tesserocr.created:
+        api.End.assert_called_once()
+
+
+def test_engine_timeout(fake_tesserocr):
+    """Testa se um reconhecimento interrompido pelo tempo limite gera um erro."""
+    engine = TesserocrEngine()
+    fake_tesserocr.PyTessBaseAPI.side_effect = None
+    api = fake_tesserocr.PyTessBaseAPI.return_value
+    api.Recognize.return_value = False
+
+    with pytest.raises(RuntimeError):
+        engine.image_to_string("page.png", lang="por", timeout=0.5)
+    api.Recognize.assert_called_once_with(500)
+    api.Clear.assert_called()
+
+
+def test_ocr_service_with_tesserocr(fake_tesserocr, tmp_path):
+    """Testa o OCRService com o motor em processo, sem chamar o executável do Tesseract."""
+    image_path = tmp_path / "page.png"
+    Image.new("RGB", (50, 20), "white").save(image_path)
+
+    with patch("app.services.ocr_service.pytesseract.image_to_string") as mock_to_string:
+        service = OCRService(engine="tesserocr")
+        result = service.process_image(str(image_path), lang="eng")
+
+    assert service.engine == "tesserocr"
+    assert service.supported_languages == ["eng", "osd", "por"]
+    assert result == {"success": True, "text": "Texto em eng", "lang": "eng"}
+    mock_to_string.assert_not_called()
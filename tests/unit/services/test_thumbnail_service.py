@@ -0,0 +1,83 @@
+"""
+Testes para o módulo de miniaturas de páginas.
+"""
+
+import os
+import pytest
+from unittest.mock import patch
+
+from app.services.thumbnail_service import ThumbnailCache, get_thumbnail, thumbnail_etag
+
+
+@pytest.fixture
+def original_pdf(tmp_path):
+    """Cria um arquivo original de teste."""
+    path = tmp_path / "original.pdf"
+    path.write_bytes(b"%PDF-1.4")
+    return str(path)
+
+
+def _fake_pdftoppm(file_path, first_page, last_page, output_folder, output_file, **kwargs):
+    """Simula o pdftoppm gravando uma página no diretório de saída."""
+    path = os.path.join(output_folder, f"{output_file}-{first_page}.jpg")
+    with open(path, "wb") as f:
+        f.write(b"x" * 100)
+    return [path]
+
+
+def test_thumbnail_cache_evicts_least_recently_used(tmp_path):
+    """Testa o descarte das miniaturas usadas há mais tempo ao exceder o tamanho máximo."""
+    cache = ThumbnailCache(str(tmp_path / "cache"), max_bytes=250)
+
+    for index, name in enumerate(["a.jpg", "b.jpg"]):
+        source = os.path.join(cache.temp_dir(), name)
+        with open(source, "wb") as f:
+            f.write(b"x" * 100)
+        path = cache.put(name, source)
+        os.utime(path, ns=(index, index))
+
+    # "a" é usada de novo e passa a ser a mais recente
+    assert cache.get("a.jpg") is not None
+
+    source = os.path.join(cache.temp_dir(), "c.jpg")
+    with open(source, "wb") as f:
+        f.write(b"x" * 100)
+    cache.put("c.jpg", source)
+
+    assert cache.get("b.jpg") is None
+    assert cache.get("a.jpg") is not None
+    assert cache.get("c.jpg") is not None
+
+
+@patch("app.services.thumbnail_service.pdf2image.convert_from_path")
+def test_get_thumbnail_renders_once(mock_convert, original_pdf, tmp_path):
+    """Testa a geração da miniatura na largura pedida e o uso do cache na repetição."""
+    mock_convert.side_effect = _fake_pdftoppm
+    cache = ThumbnailCache(str(tmp_path / "cache"), max_bytes=1024 * 1024)
+
+    first = get_thumbnail(original_pdf, "doc1", 3, 150, cache=cache)
+    second = get_thumbnail(original_pdf, "doc1", 3, 150, cache=cache)
+
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert first["path"] == second["path"]
+    assert first["etag"] == thumbnail_etag(original_pdf, "doc1", 3, 150)
+    assert first["media_type"] == "image/jpeg"
+    assert mock_convert.call_count == 1
+
+    kwargs = mock_convert.call_args.kwargs
+    assert kwargs["size"] == (150, None)
+    assert (kwargs["first_page"], kwargs["last_page"]) == (3, 3)
+    assert os.listdir(cache.temp_dir()) == []
+
+
+@patch("app.services.thumbnail_service.pdf2image.convert_from_path")
+def test_get_thumbnail_missing_page(mock_convert, original_pdf, tmp_path):
+    """Testa a recusa de uma página inexistente e de larguras fora dos limites."""
+    mock_convert.return_value = []
+    cache = ThumbnailCache(str(tmp_path / "cache"), max_bytes=1024)
+
+    with pytest.raises(ValueError):
+        get_thumbnail(original_pdf, "doc1", 99, 150, cache=cache)
+    with pytest.raises(ValueError):
+        get_thumbnail(original_pdf, "doc1", 1, 5, cache=cache)
@@ -0,0 +1,114 @@
+"""
+Testes para o módulo app.services.worker_pool
+"""
+import time
+import signal
+import subprocess
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import patch
+
+from app.core.cancellation import ProcessingCancelled, ProcessingTimeout
+from app.services import document_service, ocr_cache, worker_pool
+
+
+def test_start_worker_pool_rejects_fork():
+    """Testa a recusa do método de início fork, que copiaria o estado do servidor."""
+    with patch("app.services.worker_pool.WORKER_START_METHOD", "fork"):
+        with pytest.raises(ValueError):
+            worker_pool.start_worker_pool()
+    assert worker_pool._executor is None
+
+
+def test_init_worker_resets_state():
+    """Testa se o worker descarta o cache de OCR e o adaptador criados em outro processo."""
+    inherited_adapter = document_service.docling_adapter
+    with patch("app.services.ocr_cache.OCR_CACHE_ENABLED", True), patch(
+        "app.services.ocr_cache.OCR_CACHE_PATH", ":memory:"
+    ):
+        inherited_cache = ocr_cache.get_ocr_cache()
+        with patch("app.services.document_service.DoclingAdapter") as mock_adapter:
+            worker_pool._init_worker()
+
+        assert ocr_cache.get_ocr_cache() is not inherited_cache
+        assert document_service.docling_adapter is mock_adapter.return_value
+
+    document_service.docling_adapter = inherited_adapter
+    ocr_cache.reset_ocr_cache()
+
+
+def test_worker_pool_lifecycle():
+    """Testa a criação única do pool, os eventos de cancelamento e o encerramento."""
+    worker_pool.shutdown_worker_pool()
+    try:
+        executor = worker_pool.get_worker_pool()
+        assert worker_pool.get_worker_pool() is executor
+        assert executor.submit(pow, 2, 10).result(timeout=60) == 1024
+
+        event = worker_pool.create_cancel_event()
+        event.set()
+        assert event.is_set()
+    finally:
+        worker_pool.shutdown_worker_pool()
+    assert worker_pool._executor is None
+
+
+def _busy_loop(cancel_token):
+    """Processamento que nunca chega a um ponto de verificação."""
+    while True:
+        pass
+
+
+def _wait_subprocess(cancel_token):
+    """Processamento preso em um subprocesso não registrado no token, como o do pytesseract."""
+    subprocess.run(["sleep", "60"])
+
+
+def _native_hang(cancel_token):
+    """Processamento que não volta ao interpretador (o sinal de interrupção fica bloqueado)."""
+    signal.pthread_sigmask(signal.SIG_BLOCK, [signal.SIGUSR1])
+    time.sleep(60)
+
+
+@pytest.fixture
+def limited_pool(monkeypatch):
+    """Fixture com um pool de processos novo, com limites curtos lidos do ambiente."""
+    monkeypatch.setenv("JOB_TIMEOUT_SECONDS", "1")
+    monkeypatch.setenv("CANCEL_POLL_INTERVAL", "0.1")
+    monkeypatch.setenv("JOB_KILL_GRACE_SECONDS", "1")
+    monkeypatch.setenv("WORKER_POOL_SIZE", "1")
+    worker_pool.shutdown_worker_pool()
+    yield
+    worker_pool.shutdown_worker_pool()
+
+
+@pytest.mark.parametrize("func", [_busy_loop, _wait_subprocess])
+def test_run_job_hard_timeout(limited_pool, func):
+    """Testa a interrupção de código Python e de subprocessos fora dos pontos de verificação."""
+    start = time.monotonic()
+    future, _ = worker_pool.start_job(func)
+    with pytest.raises(ProcessingTimeout):
+        future.result(timeout=60)
+
+    assert time.monotonic() - start < 30
+
+
+def test_run_job_cancel_event(limited_pool, monkeypatch):
+    """Testa a interrupção de um processamento pelo evento de cancelamento."""
+    monkeypatch.setenv("JOB_TIMEOUT_SECONDS", "0")
+    future, cancel_event = worker_pool.start_job(_busy_loop)
+    time.sleep(1)
+    cancel_event.set()
+
+    with pytest.raises(ProcessingCancelled) as exc_info:
+        future.result(timeout=60)
+    assert not isinstance(exc_info.value, ProcessingTimeout)
+
+
+def test_run_job_native_hang_replaces_pool(limited_pool):
+    """Testa o encerramento de um worker que não responde e a recriação do pool."""
+    future, _ = worker_pool.start_job(_native_hang)
+    with pytest.raises(BrokenProcessPool):
+        future.result(timeout=60)
+
+    assert worker_pool.submit_job(pow, 2, 3).result(timeout=60) == 8
@@ -0,0 +1,122 @@
+"""
+Testes para o módulo app.cli
+"""
+import io
+import os
+import json
+import pytest
+import docx
+
+from app.cli import MANIFEST_NAME, Manifest, convert, file_sha256, iter_documents, main
+
+
+@pytest.fixture
+def documents_dir(tmp_path):
+    """Cria uma árvore de documentos de teste."""
+    root = tmp_path / "entrada"
+    (root / "sub").mkdir(parents=True)
+
+    document = docx.Document()
+    document.add_paragraph("Conteúdo de teste")
+    document.save(str(root / "a.docx"))
+    (root / "sub" / "falha.pdf").write_bytes(b"conteudo invalido")
+    (root / "sub" / "notas.txt").write_text("ignorado")
+    return root
+
+
+def test_iter_documents(documents_dir):
+    """Testa a busca de documentos suportados, ignorando o diretório de saída."""
+    output = documents_dir / "saida"
+    output.mkdir()
+    (output / "copia.docx").write_bytes(b"docx")
+
+    documents = list(iter_documents(str(documents_dir), exclude=str(output)))
+
+    assert documents == [str(documents_dir / "a.docx"), str(documents_dir / "sub" / "falha.pdf")]
+
+
+def test_manifest_resume(tmp_path):
+    """Testa a leitura do manifesto, tolerando uma última linha incompleta."""
+    source = tmp_path / "a.docx"
+    source.write_bytes(b"docx")
+    stat = os.stat(source)
+    (tmp_path / "doc1").mkdir()
+    (tmp_path / "doc1" / "metadata.json").write_text("{}")
+
+    path = tmp_path / MANIFEST_NAME
+    entry = {"source": str(source), "id": "doc1", "status": "success",
+             "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    path.write_text(json.dumps(entry) + "\n" + '{"source": "/outro"')
+
+    manifest = Manifest(str(path))
+    assert manifest.is_done(str(source), stat, str(tmp_path))
+
+    # Um arquivo alterado depois da conversão é processado de novo
+    source.write_bytes(b"docx alterado")
+    assert not manifest.is_done(str(source), os.stat(source), str(tmp_path))
+    manifest.close()
+
+
+def test_convert_and_resume(documents_dir, tmp_path):
+    """Testa a conversão da árvore e a retomada sem reprocessamento."""
+    output = tmp_path / "resultados"
+    out = io.StringIO()
+
+    stats = convert(str(documents_dir), output=str(output), workers=1, options={}, out=out)
+
+    assert stats["converted"] == 1
+    assert stats["failed"] == 1
+    assert stats["failures"][0]["source"] == str(documents_dir / "sub" / "falha.pdf")
+    document_id = file_sha256(str(documents_dir / "a.docx"))
+    assert (output / document_id / "metadata.json").exists()
+    assert "docs/s" in out.getvalue()
+
+    # Segunda execução: o documento convertido é ignorado e a falha é tentada de novo
+    stats = convert(str(documents_dir), output=str(output), workers=1, options={}, out=io.StringIO())
+
+    assert stats["converted"] == 0
+    assert stats["skipped"] == 1
+    assert stats["failed"] == 1
+
+
+def test_convert_options_change(documents_dir, tmp_path):
+    """Testa se mudar as opções de processamento converte novamente os documentos."""
+    output = tmp_path / "resultados"
+    (documents_dir / "sub" / "falha.pdf").unlink()
+
+    stats = convert(str(documents_dir), output=str(output), workers=1, options={}, out=io.StringIO())
+    assert stats["converted"] == 1
+
+    options = {"extract_tables": False}
+    stats = convert(str(documents_dir), output=str(output), workers=1, options=options, out=io.StringIO())
+    assert (stats["converted"], stats["skipped"]) == (1, 0)
+
+    # Mesmo com o manifesto removido, o diretório de resultados registra as opções usadas
+    (output / MANIFEST_NAME).unlink()
+    stats = convert(str(documents_dir), output=str(output), workers=1, options=options, out=io.StringIO())
+    assert (stats["converted"], stats["skipped"]) == (0, 1)
+
+
+def test_convert_images_in_output(tmp_path):
+    """Testa se as imagens extraídas ficam no diretório de saída da conversão."""
+    from PIL import Image
+
+    root = tmp_path / "entrada"
+    root.mkdir()
+    image_path = tmp_path / "figura.png"
+    Image.new("RGB", (30, 20), "white").save(image_path)
+    document = docx.Document()
+    document.add_picture(str(image_path))
+    document.save(str(root / "figura.docx"))
+    output = tmp_path / "resultados"
+
+    stats = convert(str(root), output=str(output), workers=1, options={"extract_images": True}, out=io.StringIO())
+
+    assert stats["converted"] == 1
+    document_id = file_sha256(str(root / "figura.docx"))
+    assert os.listdir(output / document_id / "images") == ["image1.png"]
+
+
+def test_main_missing_directory(tmp_path):
+    """Testa o código de saída para um diretório inexistente."""
+    assert main(["convert", str(tmp_path / "inexistente")]) == 2